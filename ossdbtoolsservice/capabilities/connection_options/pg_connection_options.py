@@ -200,6 +200,16 @@ pg_conn_provider_opts = ConnectionProviderOptions(
             value_type=ConnectionOption.VALUE_TYPE_STRING,
             group_name="Client",
         ),
+        ConnectionOption(
+            name="poolerCompatible",
+            display_name="Transaction pooler compatible",
+            description="Whether the server is behind a transaction pooler such as "
+            "PgBouncer. Session state such as held cursors, prepared statements and "
+            "session settings is then not used.",
+            value_type=ConnectionOption.VALUE_TYPE_BOOLEAN,
+            group_name="Server",
+            default_value="false",
+        ),
         ConnectionOption(
             name="copilotAccessMode",
             display_name="Copilot access mode",
@@ -22,6 +22,7 @@ from ossdbtoolsservice.chat.messages import (
 from ossdbtoolsservice.chat.plugin.plugin_base import PGTSChatPlugin
 from ossdbtoolsservice.connection import PooledConnection
 from ossdbtoolsservice.connection.connection_service import ConnectionService
+from ossdbtoolsservice.connection.contracts import ConnectionPriority
 from ossdbtoolsservice.hosting import RequestContext
 
 from .postgres_utils import (
@@ -83,8 +84,13 @@ class PostgresPlugin(PGTSChatPlugin):
             kernel_functions, plugin_name=self.name, description=self.description
         )
 
-    def _get_pooled_connection(self) -> PooledConnection | None:
-        return self._connection_service.get_pooled_connection(self._owner_uri)
+    def _get_pooled_connection(self, read_only: bool = False) -> PooledConnection | None:
+        """Get a connection for the chat. Schema dumps pass read_only,
+        as they tolerate being read from a replica that lags behind.
+        """
+        return self._connection_service.get_pooled_connection(
+            self._owner_uri, ConnectionPriority.BACKGROUND, read_only
+        )
 
     def _process_script_result(self, result: Any) -> Any:
         if not result:
@@ -122,7 +128,7 @@ class PostgresPlugin(PGTSChatPlugin):
             ),
         )
         try:
-            pooled_connection = self._get_pooled_connection()
+            pooled_connection = self._get_pooled_connection(read_only=True)
             if pooled_connection is None:
                 return "Error. Could not connect to the database. No connection found."
 
@@ -186,7 +192,7 @@ class PostgresPlugin(PGTSChatPlugin):
         )
 
         try:
-            pooled_connection = self._get_pooled_connection()
+            pooled_connection = self._get_pooled_connection(read_only=True)
             if pooled_connection is None:
                 return "Error. Could not connect to the database. No connection found."
 
@@ -2,6 +2,11 @@ from typing import Callable
 
 from psycopg import Connection, sql
 
+from ossdbtoolsservice.connection.contracts import BackgroundQueryCategory
+from ossdbtoolsservice.connection.core.statement_timeouts import (
+    get_statement_timeouts,
+    is_timeout_error,
+)
 from ossdbtoolsservice.utils.sql import as_sql
 
 
@@ -685,37 +690,48 @@ def fetch_full_schema(connection: Connection) -> str:
     """
     Fetch a complete schema creation script by assembling outputs
     from specialized helper functions.
+    Each part is read under the chat schema timeouts. Parts that time out
+    are left out of the script, with a comment in their place.
     """
+    statement_timeouts = get_statement_timeouts()
     with connection.cursor() as cur:
         schema_creation_script = []
 
         def try_extend(name: str, script_part: Callable[[], str]) -> None:
             try:
-                script = script_part()
+                category = BackgroundQueryCategory.CHAT_SCHEMA
+                with statement_timeouts.apply(connection, category):
+                    script = script_part()
                 if script:
                     schema_creation_script.append(script)
             except Exception as e:
-                schema_creation_script.append(f"-- Error fetching {name}: {str(e)}")
-
-        # PostgreSQL version.
-        cur.execute("SELECT version();")
-        version = cur.fetchone()
-        if version:
-            schema_creation_script.append(f"-- PostgreSQL version: {version[0]}")
-
-        # Extensions.
-        cur.execute("SELECT extname FROM pg_extension;")
-        for (extname,) in cur.fetchall():
-            schema_creation_script.append(f"CREATE EXTENSION IF NOT EXISTS {extname};")
-
-        # Process each non-system schema.
-        cur.execute("""
-            SELECT schema_name
-            FROM information_schema.schemata
-            WHERE schema_name NOT IN ('pg_catalog', 'information_schema')
-              AND schema_name NOT LIKE 'pg_%';
-        """)
-        schemas = cur.fetchall()
+                if is_timeout_error(e):
+                    schema_creation_script.append(
+                        f"-- Timed out fetching {name}, try again later: {str(e)}"
+                    )
+                else:
+                    schema_creation_script.append(f"-- Error fetching {name}: {str(e)}")
+
+        with statement_timeouts.apply(connection, BackgroundQueryCategory.CHAT_SCHEMA):
+            # PostgreSQL version.
+            cur.execute("SELECT version();")
+            version = cur.fetchone()
+            if version:
+                schema_creation_script.append(f"-- PostgreSQL version: {version[0]}")
+
+            # Extensions.
+            cur.execute("SELECT extname FROM pg_extension;")
+            for (extname,) in cur.fetchall():
+                schema_creation_script.append(f"CREATE EXTENSION IF NOT EXISTS {extname};")
+
+            # Process each non-system schema.
+            cur.execute("""
+                SELECT schema_name
+                FROM information_schema.schemata
+                WHERE schema_name NOT IN ('pg_catalog', 'information_schema')
+                  AND schema_name NOT LIKE 'pg_%';
+            """)
+            schemas = cur.fetchall()
         for (schema_name,) in schemas:
             schema_creation_script.append(f"CREATE SCHEMA {schema_name};")
 
@@ -15,15 +15,19 @@ from ossdbtoolsservice.connection.contracts import (
     CONNECTION_COMPLETE_METHOD,
     DISCONNECT_REQUEST,
     LIST_DATABASES_REQUEST,
+    POOL_STATS_REQUEST,
     AzureToken,
     CancelConnectParams,
     ConnectionCompleteParams,
+    ConnectionPriority,
     ConnectionType,
     ConnectRequestParams,
     DisconnectRequestParams,
     GetConnectionStringParams,
     ListDatabasesParams,
     ListDatabasesResponse,
+    PoolStatsParams,
+    PoolStatsResponse,
 )
 from ossdbtoolsservice.connection.contracts.fetch_azure_token_request import (
     FETCH_AZURE_TOKEN_REQUEST_METHOD,
@@ -40,8 +44,10 @@ from ossdbtoolsservice.connection.core.errors import AzureTokenRefreshError
 from ossdbtoolsservice.connection.core.owner_connection_info import OwnerConnectionInfo
 from ossdbtoolsservice.connection.core.pooled_connection import PooledConnection
 from ossdbtoolsservice.connection.core.server_connection import ServerConnection
+from ossdbtoolsservice.connection.core.statement_timeouts import get_statement_timeouts
 from ossdbtoolsservice.hosting import RequestContext, Service, ServiceProvider
 from ossdbtoolsservice.utils import constants
+from ossdbtoolsservice.workspace.contracts import Configuration
 from ossdbtoolsservice.workspace.workspace_service import WorkspaceService
 
 
@@ -82,6 +88,18 @@ class ConnectionService(Service):
         service_provider.server.set_request_handler(
             TRANSFER_CONNECTION_REQUEST, self.handle_transfer_connection_request
         )
+        service_provider.server.set_request_handler(
+            POOL_STATS_REQUEST, self.handle_pool_stats_request
+        )
+
+        try:
+            workspace_service = service_provider.get(
+                constants.WORKSPACE_SERVICE_NAME, WorkspaceService
+            )
+            workspace_service.register_config_change_callback(self._handle_config_change)
+        except (KeyError, RuntimeError, TypeError):
+            # Without a workspace service the default timeouts are used
+            pass
 
         # This is unimplemented
         # service_provider.server.set_request_handler(
@@ -155,12 +173,26 @@ class ConnectionService(Service):
 
         return self._connection_manager.get_long_lived_connection(owner_uri, connection_type)
 
-    def get_pooled_connection(self, owner_uri: str) -> Optional[PooledConnection]:
+    def get_pooled_connection(
+        self,
+        owner_uri: str,
+        priority: ConnectionPriority = ConnectionPriority.INTERACTIVE,
+        read_only: bool = False,
+        checkout_timeout: float | None = None,
+    ) -> Optional[PooledConnection]:
         """
-        Get a pooled connection for the given owner URI if it exists, otherwise return None
+        Get a pooled connection for the given owner URI if it exists, otherwise return None.
+        Work the user is not waiting on should pass a background or bulk priority,
+        so that it does not hold up interactive work when the pool is busy.
+        Work that only reads, and tolerates stale data, should pass read_only,
+        so that it is sent to a read replica of the server if there is one.
+        Work that does without the connection rather than wait for it should pass
+        a checkout timeout, the seconds to wait at most for a free connection.
         """
 
-        return self._connection_manager.get_pooled_connection(owner_uri)
+        return self._connection_manager.get_pooled_connection(
+            owner_uri, priority, read_only, checkout_timeout
+        )
 
     def register_on_connect_callback(
         self, task: Callable[[OwnerConnectionInfo], Any]
@@ -254,6 +286,29 @@ class ConnectionService(Service):
         )
         request_context.send_response(result)
 
+    def handle_pool_stats_request(
+        self, request_context: RequestContext, params: PoolStatsParams
+    ) -> None:
+        """Report the usage of the connection pools, to tell pool exhaustion
+        from slow queries
+        """
+        pools = self._connection_manager.get_pool_stats_summary(params.owner_uri)
+        azure_token_cache = self._connection_manager.get_azure_token_cache_stats()
+        request_context.send_response(
+            PoolStatsResponse(
+                pools=pools,
+                azure_token_cache=azure_token_cache,
+                background_queries=self._connection_manager.get_background_query_stats(),
+            )
+        )
+
+    def _handle_config_change(self, config: Configuration) -> None:
+        """Apply the timeouts of the catalog queries the service runs on its own behalf"""
+        try:
+            get_statement_timeouts().configure(config.pgsql.background_query_timeouts)
+        except (ValueError, TypeError, AttributeError) as e:
+            self._log_exception(e)
+
     def handle_get_connection_string_request(
         self, request_context: RequestContext, params: GetConnectionStringParams
     ) -> None:
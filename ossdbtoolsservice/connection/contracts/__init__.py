@@ -13,7 +13,9 @@ from ossdbtoolsservice.connection.contracts.change_database_request import (
 )
 from ossdbtoolsservice.connection.contracts.common import (
     AzureToken,
+    BackgroundQueryCategory,
     ConnectionDetails,
+    ConnectionPriority,
     ConnectionSummary,
     ConnectionType,
     ServerInfo,
@@ -39,9 +41,21 @@ from ossdbtoolsservice.connection.contracts.list_databases import (
     ListDatabasesParams,
     ListDatabasesResponse,
 )
+from ossdbtoolsservice.connection.contracts.pool_stats_request import (
+    POOL_STATS_REQUEST,
+    AzureTokenCacheStats,
+    BackgroundQueryStats,
+    PoolLaneStats,
+    PoolStats,
+    PoolStatsParams,
+    PoolStatsResponse,
+)
 
 __all__ = [
     "AzureToken",
+    "AzureTokenCacheStats",
+    "BackgroundQueryCategory",
+    "BackgroundQueryStats",
     "CANCEL_CONNECT_REQUEST",
     "CancelConnectParams",
     "CONNECT_REQUEST",
@@ -53,6 +67,7 @@ __all__ = [
     "CONNECTION_COMPLETE_METHOD",
     "ConnectionCompleteParams",
     "ConnectionDetails",
+    "ConnectionPriority",
     "ConnectionSummary",
     "ConnectionType",
     "ServerInfo",
@@ -61,4 +76,9 @@ __all__ = [
     "LIST_DATABASES_REQUEST",
     "ListDatabasesParams",
     "ListDatabasesResponse",
+    "POOL_STATS_REQUEST",
+    "PoolLaneStats",
+    "PoolStats",
+    "PoolStatsParams",
+    "PoolStatsResponse",
 ]
@@ -173,6 +173,63 @@ class ConnectionDetails(Serializable):
             else constants.DEFAULT_CONNECT_TIMEOUT
         )
 
+    @property
+    def pooler_compatible(self) -> bool:
+        """
+        Returns whether the server is behind a transaction pooler such as PgBouncer,
+        so that no state may be kept on the session between transactions: no named
+        or held cursors, no prepared statements and no session settings.
+        """
+        pooler_compatible = self.options.get("poolerCompatible") if self.options else None
+        if isinstance(pooler_compatible, str):
+            return pooler_compatible.lower() == "true"
+        return bool(pooler_compatible)
+
+    @property
+    def replica_hosts(self) -> list[str]:
+        """
+        Returns the read replicas of the server, as "host" or "host:port",
+        from the comma separated replicaHosts option.
+        """
+        replica_hosts = self._get_str_option("replicaHosts")
+        if not replica_hosts:
+            return []
+        return [host.strip() for host in replica_hosts.split(",") if host.strip()]
+
+    @property
+    def max_replica_lag_seconds(self) -> int:
+        """
+        Returns the replication lag beyond which a replica is not used, in seconds.
+        """
+        try:
+            max_lag = self._get_int_option("maxReplicaLagSeconds")
+        except ValueError:
+            return constants.DEFAULT_MAX_REPLICA_LAG_SECONDS
+        return max_lag if max_lag is not None else constants.DEFAULT_MAX_REPLICA_LAG_SECONDS
+
+    def get_replica_details(self, replica_host: str) -> "ConnectionDetails":
+        """
+        Returns the details to connect to a replica of replica_hosts,
+        with the same database and credentials.
+        """
+        options = {
+            k: v
+            for (k, v) in self.options.items()
+            if k not in ("replicaHosts", "maxReplicaLagSeconds")
+        }
+        # IPv6 addresses with a port are written in brackets, as in [::1]:5432
+        if replica_host.startswith("["):
+            host, _, port = replica_host[1:].partition("]")
+            port = port.lstrip(":")
+        elif replica_host.count(":") == 1:
+            host, _, port = replica_host.partition(":")
+        else:
+            host, port = replica_host, ""
+        options["host"] = host
+        if port:
+            options["port"] = int(port)
+        return ConnectionDetails(options)
+
     def get_connection_params(self, config: Configuration | None = None) -> dict[str, Any]:
         """
         Returns the connection parameters as a dictionary.
@@ -311,3 +368,41 @@ class ConnectionType(str, enum.Enum):
 
     def __str__(self) -> str:
         return str(self.value)
+
+
+class ConnectionPriority(str, enum.Enum):
+    """
+    Priority classes of the connections checked out of a pool.
+
+    Interactive: Work the user is waiting on, such as queries and edits.
+        Has connections reserved for it, and is served first.
+    Background: Work the user is not waiting on, such as metadata and intellisense refreshes.
+    Bulk: Extra connections of large operations, such as batches run in parallel.
+    """
+
+    INTERACTIVE = "Interactive"
+    BACKGROUND = "Background"
+    BULK = "Bulk"
+
+    def __str__(self) -> str:
+        return str(self.value)
+
+
+class BackgroundQueryCategory(str, enum.Enum):
+    """
+    Categories of the catalog queries the service runs on its own behalf,
+    each with its own statement and lock timeouts.
+
+    CompletionMetadata: Intellisense metadata refreshes.
+    Catalog: The object model templates, such as the object explorer's nodes and properties.
+    SchemaEditor: The schema model of the schema editor.
+    ChatSchema: The full schema script fetched for chat.
+    """
+
+    COMPLETION_METADATA = "CompletionMetadata"
+    CATALOG = "Catalog"
+    SCHEMA_EDITOR = "SchemaEditor"
+    CHAT_SCHEMA = "ChatSchema"
+
+    def __str__(self) -> str:
+        return str(self.value)
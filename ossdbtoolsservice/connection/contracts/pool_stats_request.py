@@ -0,0 +1,109 @@
+# --------------------------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for license information.
+# --------------------------------------------------------------------------------------------
+
+"""This module holds contracts for the connection/poolStats method"""
+
+from ossdbtoolsservice.connection.contracts.common import (
+    BackgroundQueryCategory,
+    ConnectionPriority,
+)
+from ossdbtoolsservice.core.models import PGTSBaseModel
+from ossdbtoolsservice.hosting import (
+    IncomingMessageConfiguration,
+    OutgoingMessageRegistration,
+)
+
+
+class PoolStatsParams(PGTSBaseModel):
+    """Parameters for the connection/poolStats request"""
+
+    # Only report the pool of this owner URI, if set
+    owner_uri: str | None = None
+
+
+class PoolLaneStats(PGTSBaseModel):
+    """Usage of the connections of a pool by one priority class"""
+
+    priority: ConnectionPriority
+    reserved_count: int = 0
+    max_count: int = 0
+    in_use_count: int = 0
+    requests_waiting: int = 0
+    checkout_count: int = 0
+    checkout_timeouts: int = 0
+    # Percentiles of the time the checkouts of this class waited for a connection
+    wait_time_p50_ms: float = 0
+    wait_time_p95_ms: float = 0
+    wait_time_p99_ms: float = 0
+
+
+class PoolStats(PGTSBaseModel):
+    """Usage of a connection pool, since it was created"""
+
+    name: str
+    owner_uri_count: int = 0
+    pool_size: int = 0
+    pool_max: int = 0
+    idle_count: int = 0
+    busy_count: int = 0
+    requests_waiting: int = 0
+    checkout_count: int = 0
+    checkout_timeouts: int = 0
+    connection_errors: int = 0
+    # Resets of the connections returned to the pool. Resets are skipped when
+    # the session state was untouched, and fall back to DISCARD ALL when unsure.
+    reset_count: int = 0
+    reset_skipped_count: int = 0
+    discard_all_count: int = 0
+    reset_round_trips_saved_per_hour: float = 0
+    # Percentiles of the time spent waiting for a connection from the pool
+    wait_time_p50_ms: float = 0
+    wait_time_p95_ms: float = 0
+    wait_time_p99_ms: float = 0
+    # Percentiles of the time connections were held before they were returned
+    checkout_duration_p50_ms: float = 0
+    checkout_duration_p95_ms: float = 0
+    checkout_duration_max_ms: float = 0
+    # Usage by priority class
+    lanes: list[PoolLaneStats] = []
+
+
+class AzureTokenCacheStats(PGTSBaseModel):
+    """Usage of the cache of the Azure tokens that connections are opened with"""
+
+    token_count: int = 0
+    hit_count: int = 0
+    miss_count: int = 0
+    # Tokens fetched in the background before they expired
+    refresh_count: int = 0
+    fetch_count: int = 0
+    fetch_errors: int = 0
+    # Percentiles of the time taken to fetch a token from the client
+    fetch_latency_p50_ms: float = 0
+    fetch_latency_p95_ms: float = 0
+    fetch_latency_max_ms: float = 0
+
+
+class BackgroundQueryStats(PGTSBaseModel):
+    """Timeouts of a category of the catalog queries the service runs on its own behalf"""
+
+    category: BackgroundQueryCategory
+    statement_timeout_ms: int = 0
+    lock_timeout_ms: int = 0
+    operation_count: int = 0
+    statement_timeout_count: int = 0
+    lock_timeout_count: int = 0
+
+
+class PoolStatsResponse(PGTSBaseModel):
+    """Response for the connection/poolStats request"""
+
+    pools: list[PoolStats]
+    azure_token_cache: AzureTokenCacheStats | None = None
+    background_queries: list[BackgroundQueryStats] = []
+
+
+POOL_STATS_REQUEST = IncomingMessageConfiguration("connection/poolStats", PoolStatsParams)
+OutgoingMessageRegistration.register_outgoing_message(PoolStatsResponse)
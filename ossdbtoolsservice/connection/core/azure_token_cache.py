@@ -0,0 +1,240 @@
+# --------------------------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for license information.
+# --------------------------------------------------------------------------------------------
+
+import logging
+import threading
+import time
+from collections import deque
+from collections.abc import Callable
+from dataclasses import dataclass, field
+from typing import Any
+
+from ossdbtoolsservice.connection.contracts import AzureToken
+from ossdbtoolsservice.connection.core.pool_metrics import SAMPLE_COUNT, percentile
+
+# Tokens in use are refreshed this long before they expire
+DEFAULT_REFRESH_MARGIN_SECONDS = 60 * 5
+
+# Shortest time between two refreshes of a token, so that a client returning
+# tokens that are about to expire does not cause a refresh loop
+MIN_REFRESH_INTERVAL_SECONDS = 30
+
+# Longest the refresh thread sleeps, so that it notices changes of the system clock
+MAX_REFRESH_WAIT_SECONDS = 60
+
+AzureTokenKey = tuple[str, str | None]
+
+
+def _now() -> float:
+    return time.time()
+
+
+@dataclass
+class _CachedToken:
+    token: AzureToken | None = None
+    # Unix time the token is refreshed in the background at
+    refresh_at: float = 0.0
+    # Number of pools that connect with the token
+    user_count: int = 0
+    # Serializes the fetches of the token
+    fetch_lock: threading.Lock = field(default_factory=threading.Lock)
+
+
+class AzureTokenCache:
+    """Azure tokens by account ID and tenant ID.
+
+    Fetching a token is a request to the client, which can take seconds.
+    Tokens of the accounts that pools connect with are refreshed by a background
+    thread well before they expire, so that opening a connection does not wait
+    on the client. A token is only fetched on demand if it expired anyway,
+    such as when the background refresh failed.
+
+    Args:
+        fetch_azure_token: A function to fetch the token of an account ID and tenant ID.
+        refresh_margin: Seconds before their expiry that tokens are refreshed.
+        clock: The Unix time, which token expiry times are in.
+    """
+
+    def __init__(
+        self,
+        fetch_azure_token: Callable[[str, str | None], AzureToken] | None = None,
+        refresh_margin: float = DEFAULT_REFRESH_MARGIN_SECONDS,
+        clock: Callable[[], float] = _now,
+        logger: logging.Logger | None = None,
+    ) -> None:
+        self._fetch_azure_token = fetch_azure_token
+        self._refresh_margin = refresh_margin
+        self._clock = clock
+        self._logger = logger or logging.getLogger(__name__)
+        self._lock = threading.Lock()
+        self._tokens: dict[AzureTokenKey, _CachedToken] = {}
+        self._wakeup = threading.Event()
+        self._closed = threading.Event()
+        self._refresh_thread: threading.Thread | None = None
+
+        self._fetch_latencies_ms: deque[float] = deque(maxlen=SAMPLE_COUNT)
+        self.hit_count = 0
+        self.miss_count = 0
+        self.refresh_count = 0
+        self.fetch_errors = 0
+
+    def set_fetch_azure_token(
+        self, fetch_azure_token: Callable[[str, str | None], AzureToken]
+    ) -> None:
+        self._fetch_azure_token = fetch_azure_token
+
+    def set_logger(self, logger: logging.Logger) -> None:
+        self._logger = logger
+
+    def add_user(self, account_id: str, tenant_id: str | None, token: AzureToken) -> None:
+        """Keep the token of the account refreshed in the background,
+        until each call is matched by a call to remove_user
+        """
+        with self._lock:
+            cached = self._tokens.setdefault((account_id, tenant_id), _CachedToken())
+            cached.user_count += 1
+            self._store(cached, token)
+            if self._refresh_thread is None:
+                self._refresh_thread = threading.Thread(
+                    target=self._refresh_tokens, name="AzureTokenRefresh", daemon=True
+                )
+                self._refresh_thread.start()
+        self._wakeup.set()
+
+    def remove_user(self, account_id: str, tenant_id: str | None) -> None:
+        """Stop refreshing the token of the account, once it has no users left"""
+        with self._lock:
+            cached = self._tokens.get((account_id, tenant_id))
+            if cached is None:
+                return
+            cached.user_count -= 1
+            if cached.user_count <= 0:
+                del self._tokens[(account_id, tenant_id)]
+
+    def get_token(
+        self, account_id: str, tenant_id: str | None, token: AzureToken | None = None
+    ) -> AzureToken | None:
+        """Get the token of the account, fetching it if the cached one expired.
+
+        Args:
+            account_id: The Azure account ID.
+            tenant_id: The Azure tenant ID.
+            token: A token of the account that is already known, such as the one
+                in the connection details. Used if it is newer than the cached one.
+        Returns:
+            The token, or the expired token if tokens cannot be fetched.
+        """
+        with self._lock:
+            cached = self._tokens.setdefault((account_id, tenant_id), _CachedToken())
+            if token is not None:
+                self._store(cached, token)
+            if cached.token is not None and not cached.token.is_azure_token_expired():
+                self.hit_count += 1
+                return cached.token
+            self.miss_count += 1
+
+        with cached.fetch_lock:
+            # Another thread may have fetched the token while this one waited
+            if cached.token is not None and not cached.token.is_azure_token_expired():
+                return cached.token
+            if not self._fetch_azure_token:
+                self._logger.warning(
+                    "Azure token refresh needed but is not supported "
+                    "in this connection manager."
+                )
+                return cached.token
+            return self._fetch(account_id, tenant_id, cached)
+
+    def get_stats(self) -> dict[str, Any]:
+        with self._lock:
+            fetch_latencies_ms = sorted(self._fetch_latencies_ms)
+            return {
+                "token_count": len(self._tokens),
+                "hit_count": self.hit_count,
+                "miss_count": self.miss_count,
+                "refresh_count": self.refresh_count,
+                "fetch_count": len(fetch_latencies_ms),
+                "fetch_errors": self.fetch_errors,
+                "fetch_latency_p50_ms": percentile(fetch_latencies_ms, 50),
+                "fetch_latency_p95_ms": percentile(fetch_latencies_ms, 95),
+                "fetch_latency_max_ms": fetch_latencies_ms[-1] if fetch_latencies_ms else 0.0,
+            }
+
+    def close(self) -> None:
+        with self._lock:
+            self._tokens.clear()
+        self._closed.set()
+        self._wakeup.set()
+
+    def _fetch(
+        self, account_id: str, tenant_id: str | None, cached: _CachedToken
+    ) -> AzureToken:
+        """Fetch the token and cache it. Must hold the fetch lock of the token."""
+        assert self._fetch_azure_token is not None
+        start = time.monotonic()
+        try:
+            token = self._fetch_azure_token(account_id, tenant_id)
+        except Exception:
+            with self._lock:
+                self.fetch_errors += 1
+            raise
+        with self._lock:
+            self._fetch_latencies_ms.append((time.monotonic() - start) * 1000)
+            self._store(cached, token)
+            cached.refresh_at = max(
+                cached.refresh_at, self._clock() + MIN_REFRESH_INTERVAL_SECONDS
+            )
+        return token
+
+    def _store(self, cached: _CachedToken, token: AzureToken) -> None:
+        """Cache the token if it is newer than the cached one, or if it is the cached
+        token with another expiry. Must hold the lock.
+        """
+        if (
+            cached.token is not None
+            and cached.token.token != token.token
+            and cached.token.expiry >= token.expiry
+        ):
+            return
+        cached.token = token
+        cached.refresh_at = token.expiry - self._refresh_margin
+
+    def _refresh_tokens(self) -> None:
+        """Refresh the tokens in use as they come due, until the cache is closed"""
+        while not self._closed.is_set():
+            self._wakeup.clear()
+            now = self._clock()
+            with self._lock:
+                due = [
+                    (key, cached)
+                    for key, cached in self._tokens.items()
+                    if cached.user_count > 0 and cached.refresh_at <= now
+                ]
+            for (account_id, tenant_id), cached in due:
+                self._refresh(account_id, tenant_id, cached)
+
+            with self._lock:
+                next_refresh_at = min(
+                    (c.refresh_at for c in self._tokens.values() if c.user_count > 0),
+                    default=now + MAX_REFRESH_WAIT_SECONDS,
+                )
+            wait = min(max(next_refresh_at - self._clock(), 0), MAX_REFRESH_WAIT_SECONDS)
+            self._wakeup.wait(wait)
+
+    def _refresh(self, account_id: str, tenant_id: str | None, cached: _CachedToken) -> None:
+        if not self._fetch_azure_token:
+            with self._lock:
+                cached.refresh_at = self._clock() + MAX_REFRESH_WAIT_SECONDS
+            return
+        with cached.fetch_lock:
+            try:
+                self._fetch(account_id, tenant_id, cached)
+                with self._lock:
+                    self.refresh_count += 1
+            except Exception as e:
+                self._logger.warning(f"Could not refresh Azure token in the background: {e}")
+                with self._lock:
+                    # Try again later. Connections fetch the token themselves once it expires.
+                    cached.refresh_at = self._clock() + MIN_REFRESH_INTERVAL_SECONDS
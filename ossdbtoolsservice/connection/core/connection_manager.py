@@ -5,61 +5,67 @@
 
 import contextlib
 import logging
-import queue
 import threading
+import time
 import uuid
-from dataclasses import dataclass
+from collections.abc import Hashable
 from typing import Any, Callable
 
+import psycopg
 from psycopg.conninfo import make_conninfo
 from psycopg_pool import ConnectionPool, PoolTimeout
 
 from ossdbtoolsservice.connection.contracts import (
     AzureToken,
     ConnectionDetails,
+    ConnectionPriority,
     ConnectionSummary,
     ConnectionType,
     ServerInfo,
 )
+from ossdbtoolsservice.connection.contracts.pool_stats_request import (
+    AzureTokenCacheStats,
+    BackgroundQueryStats,
+    PoolLaneStats,
+    PoolStats,
+)
+from ossdbtoolsservice.connection.core.azure_token_cache import AzureTokenCache
 from ossdbtoolsservice.connection.core.connection_class import (
     ConnectionClassFactory,
     ConnectionClassFactoryBase,
 )
+from ossdbtoolsservice.connection.core.connection_task_scheduler import (
+    DEFAULT_MAX_WORKERS,
+    ConnectionTaskScheduler,
+)
 from ossdbtoolsservice.connection.core.errors import GetConnectionTimeout
 from ossdbtoolsservice.connection.core.owner_connection_info import OwnerConnectionInfo
+from ossdbtoolsservice.connection.core.pool_lanes import PRIORITY_ORDER, PoolLanes
+from ossdbtoolsservice.connection.core.pool_maintenance import (
+    PoolMaintenance,
+    PoolMaintenanceSettings,
+)
+from ossdbtoolsservice.connection.core.pool_metrics import PoolMetrics
+from ossdbtoolsservice.connection.core.pool_sizing import (
+    ConnectionBudget,
+    PoolSizer,
+    PoolSizingSettings,
+)
 from ossdbtoolsservice.connection.core.pooled_connection import PooledConnection
+from ossdbtoolsservice.connection.core.replica_router import ReplicaRouter
 from ossdbtoolsservice.connection.core.server_connection import ServerConnection
+from ossdbtoolsservice.connection.core.statement_timeouts import get_statement_timeouts
 from ossdbtoolsservice.workspace.contracts.did_change_config_notification import Configuration
 
+# Interval between the log records of the stats of the connection pools
+POOL_STATS_LOG_INTERVAL_SECONDS = 300
 
-@dataclass
-class ConnectionTaskResponse:
-    """A response to a connection task.
-
-    Args:
-        result: The result of the task.
-        error: The error that occurred during the task.
-    """
-
-    result: Any = None
-    error: Exception | None = None
-
+# Longest the maintenance thread sleeps between looking for pools due for maintenance
+POOL_MAINTENANCE_MAX_WAIT_SECONDS = 60
 
-@dataclass
-class ConnectionTaskMessage:
-    """A task to be processed by the connection manager.
-
-    Args:
-        task: The function to be executed.
-        args: The arguments to pass to the function.
-        response: A response object to store the result of the task.
-        event: An event to signal when the task is complete.
-    """
-
-    task: Callable
-    args: tuple
-    response: ConnectionTaskResponse
-    event: threading.Event
+# Seconds that read-only statements wait for a connection of a replica. Without a free
+# one in time, they run on the primary instead.
+REPLICA_CHECKOUT_TIMEOUT_SECONDS = 1.0
 
 
 class ConnectionManager:
@@ -70,6 +76,8 @@ class ConnectionManager:
         connection_class_factory: ConnectionClassFactoryBase | None = None,
         logger: logging.Logger | None = None,
         timeout_override: int | None = None,
+        pool_stats_log_interval: float | None = POOL_STATS_LOG_INTERVAL_SECONDS,
+        max_connection_workers: int = DEFAULT_MAX_WORKERS,
     ) -> None:
         """Initialize the connection manager.
 
@@ -80,6 +88,10 @@ class ConnectionManager:
             connection_class_factory: A factory to create the connection class.
             logger: A logger to use for logging.
             timeout_override: If True, will override the timeout for the connection pool.
+            pool_stats_log_interval: Seconds between the log records of the pool stats,
+                or None to not log them.
+            max_connection_workers: The number of connect and disconnect requests
+                that can be processed at the same time.
         """
         self.connection_class_factory = connection_class_factory or ConnectionClassFactory()
         self._lock = threading.RLock()  # Use RLock to allow re-entrance
@@ -93,9 +105,10 @@ class ConnectionManager:
         self._owner_uri_to_long_lived_connection: dict[str, ServerConnection] = {}
         self._owner_uri_to_conn_info: dict[str, OwnerConnectionInfo] = {}
 
-        self._fetch_azure_token = fetch_azure_token
         self._max_pool_size = max_pool_size
         self._logger = logger or logging.getLogger(__name__)
+        # Tokens of the pools that connect with Entra auth, refreshed before they expire
+        self._azure_token_cache = AzureTokenCache(fetch_azure_token, logger=self._logger)
         self._timeout_override = timeout_override
 
         # Hold on to connection errors to be able to report them
@@ -104,36 +117,64 @@ class ConnectionManager:
         # if connections cannot be established after a timeout.
         self._details_to_connection_errors: dict[int, list[Exception]] = {}
 
-        # Process connection and disconnection requests in a background thread
-        # to ensure propert ordering of requests. This avoids situations where
+        # Instrumentation of the checkouts of each pool, reported with the pool stats.
+        # Separate lock, as connection errors are recorded by pool worker threads.
+        self._pool_metrics_lock = threading.Lock()
+        self._details_to_pool_metrics: dict[int, PoolMetrics] = {}
+        # Admission of the checkouts of each pool by priority class
+        self._details_to_pool_lanes: dict[int, PoolLanes] = {}
+
+        # Background maintenance of each pool, run by a thread started with the first pool
+        self._details_to_pool_maintenance: dict[int, PoolMaintenance] = {}
+        self._maintenance_wakeup = threading.Event()
+        self._maintenance_thread: threading.Thread | None = None
+        # Adaptive sizing of each pool, run by the maintenance thread, within a budget
+        # of connections shared by all the pools of the process
+        self._details_to_pool_sizer: dict[int, PoolSizer] = {}
+        self._connection_budget = ConnectionBudget()
+
+        # Routing of the read-only traffic of each pool to the read replicas of its server
+        self._details_to_replica_router: dict[int, ReplicaRouter] = {}
+
+        # Process connection and disconnection requests in background threads
+        # to ensure proper ordering of requests. This avoids situations where
         # repeated connect/disconnect requests are processed out of order.
-        self._task_queue = queue.Queue[ConnectionTaskMessage]()
-        self._request_thread = threading.Thread(
-            target=self._process_tasks, name="ConnectionManagerWorker", daemon=True
+        # Requests are ordered per owner URI and per connection details, so that
+        # requests to other servers are not held up by a slow server.
+        self._task_scheduler = ConnectionTaskScheduler(
+            max_connection_workers, name="ConnectionManagerWorker"
         )
-        self._request_thread.start()
+
+        self._closed = threading.Event()
+        if pool_stats_log_interval:
+            threading.Thread(
+                target=self._log_pool_stats,
+                args=(pool_stats_log_interval,),
+                name="ConnectionManagerStatsLogger",
+                daemon=True,
+            ).start()
         self._logger.info("Initialized ConnectionManager")
 
-    def _process_tasks(self) -> None:
-        while True:
-            message = self._task_queue.get()
-            try:
-                result = message.task(*message.args)
-                message.response.result = result
-                message.event.set()
-            except Exception as e:
-                # Handle exceptions in the task processing
-                message.response.error = e
-                message.event.set()
-
-    def _run_task(self, task: Callable, args: tuple) -> Any:
-        event = threading.Event()
-        response = ConnectionTaskResponse()
-        self._task_queue.put(ConnectionTaskMessage(task, args, response, event))
-        event.wait()
-        if response.error:
-            raise response.error
-        return response.result
+    def _run_task(
+        self,
+        task: Callable,
+        args: tuple,
+        owner_uris: list[str],
+        details_hashes: list[int] | None = None,
+    ) -> Any:
+        """Run the task after the earlier tasks of the same owner URIs or pools.
+        The pools the owner URIs are currently connected to are included.
+        """
+        keys: set[Hashable] = {
+            ("details", details_hash) for details_hash in details_hashes or []
+        }
+        with self._lock:
+            for owner_uri in owner_uris:
+                keys.add(("owner", owner_uri))
+                details_and_pool = self._owner_uri_to_details.get(owner_uri)
+                if details_and_pool is not None:
+                    keys.add(("details", details_and_pool[0].to_hash()))
+        return self._task_scheduler.run(task, args, frozenset(keys))
 
     def connect(
         self, owner_uri: str, details: ConnectionDetails, config: Configuration
@@ -148,7 +189,9 @@ class ConnectionManager:
         Returns:
             The connection complete params for the connection.
         """
-        return self._run_task(self._connect, (owner_uri, details, config))
+        return self._run_task(
+            self._connect, (owner_uri, details, config), [owner_uri], [details.to_hash()]
+        )
 
     def _connect(
         self, owner_uri: str, details: ConnectionDetails, config: Configuration
@@ -182,39 +225,72 @@ class ConnectionManager:
                         # Call _disconnect directly, as we are processing a task.
                         self._disconnect(owner_uri)
 
+            # If the pool exists, join it while holding the lock,
+            # so that it is not closed by the disconnect of its last owner URI.
             pool = self._details_to_pools.get(details_hash)
-            if pool is None:
-                self._logger.info(
-                    f"Creating new connection pool for details_hash={details_hash}"
-                )
-                # Create a new pool.
-                try:
-                    pool = self._create_connection_pool(details, config)
-                except PoolTimeout as e:
-                    # If the pool is empty, this means that the connection
-                    # could not be established.
-                    conn_str = self._get_user_facing_conn_str(details)
-
-                    # check if we have any connection errors to report
-                    connection_error_message = self._get_and_clear_connection_errors(
-                        details_hash
-                    )
+            if pool is not None:
+                self._associate_owner_uri(owner_uri, details, pool)
+                # Open the warm spares the new owner URI is about to use
+                self._request_pool_maintenance(details_hash)
+
+        if pool is None:
+            self._logger.info(f"Creating new connection pool for details_hash={details_hash}")
+            # Create a new pool, without holding the lock, as this waits for the
+            # first connection. Connects with the same details are ordered by the
+            # task scheduler, so no other task creates this pool in the meantime.
+            try:
+                pool = self._create_connection_pool(details, config)
+            except PoolTimeout as e:
+                # If the pool is empty, this means that the connection
+                # could not be established.
+                conn_str = self._get_user_facing_conn_str(details)
 
-                    raise ConnectionError(
-                        f"Could not connect to {conn_str}. Pool initialization timed out."
-                        + connection_error_message
-                    ) from e
+                # check if we have any connection errors to report
+                connection_error_message = self._get_and_clear_connection_errors(details_hash)
+                with self._pool_metrics_lock:
+                    self._details_to_pool_maintenance.pop(details_hash, None)
+                self._remove_pool_sizer(details_hash)
+
+                raise ConnectionError(
+                    f"Could not connect to {conn_str}. Pool initialization timed out."
+                    + connection_error_message
+                ) from e
+            with self._lock:
                 self._details_to_pools[details_hash] = pool
-            # Associate the owner URI with the connection pool.
-            self._owner_uri_to_details[owner_uri] = (details, pool)
-            self._details_to_owner_uri.setdefault(details_hash, set()).add(owner_uri)
-            with pool.connection() as conn:
-                owner_conn_info = self._build_owner_connection_info(
-                    owner_uri, details, ServerConnection(conn)
-                )
-                self._owner_uri_to_conn_info[owner_uri] = owner_conn_info
-                self._logger.info(f"Connection established for owner_uri={owner_uri}")
-                return owner_conn_info
+                self._associate_owner_uri(owner_uri, details, pool)
+                if details.replica_hosts:
+                    self._details_to_replica_router[details_hash] = ReplicaRouter(
+                        [details.get_replica_details(h) for h in details.replica_hosts],
+                        details.max_replica_lag_seconds,
+                        lambda replica_details: self._create_replica_pool(
+                            replica_details, config
+                        ),
+                        logger=self._logger,
+                    )
+            self._add_azure_token_user(details)
+            with self._pool_metrics_lock:
+                lanes = PoolLanes(self._get_max_pool_size(config))
+                self._details_to_pool_lanes[details_hash] = lanes
+                sizer = self._details_to_pool_sizer.get(details_hash)
+                if sizer is not None:
+                    sizer.lanes = lanes
+            self._request_pool_maintenance(details_hash)
+
+        with pool.connection() as conn:
+            owner_conn_info = self._build_owner_connection_info(
+                owner_uri, details, ServerConnection(conn)
+            )
+        with self._lock:
+            self._owner_uri_to_conn_info[owner_uri] = owner_conn_info
+        self._logger.info(f"Connection established for owner_uri={owner_uri}")
+        return owner_conn_info
+
+    def _associate_owner_uri(
+        self, owner_uri: str, details: ConnectionDetails, pool: ConnectionPool
+    ) -> None:
+        """Associate the owner URI with the connection pool. Must hold the lock."""
+        self._owner_uri_to_details[owner_uri] = (details, pool)
+        self._details_to_owner_uri.setdefault(details.to_hash(), set()).add(owner_uri)
 
     def disconnect(self, owner_uri: str) -> bool:
         """Disconnect the owner URI from the connection pool.
@@ -226,7 +302,7 @@ class ConnectionManager:
         Returns:
             True if the connection was disconnected, False if no connection was found.
         """
-        return self._run_task(self._disconnect, (owner_uri,))
+        return self._run_task(self._disconnect, (owner_uri,), [owner_uri])
 
     def _disconnect(self, owner_uri: str) -> bool:
         self._logger.info(f"Disconnecting owner_uri={owner_uri}")
@@ -234,6 +310,7 @@ class ConnectionManager:
             # Remove connections currently in transaction.
             if owner_uri in self._owner_uri_to_active_tx_connection:
                 conn, pool = self._owner_uri_to_active_tx_connection.pop(owner_uri)
+                self._release_lane_slot(owner_uri, conn)
                 conn.close()
 
             # Remove long lived connection.
@@ -259,6 +336,15 @@ class ConnectionManager:
                 # If no owner URIs are left, close the pool.
                 if not pool_owner_uris:
                     pool = self._details_to_pools.pop(details_hash, None)
+                    with self._pool_metrics_lock:
+                        self._details_to_pool_metrics.pop(details_hash, None)
+                        self._details_to_pool_lanes.pop(details_hash, None)
+                        self._details_to_pool_maintenance.pop(details_hash, None)
+                    self._remove_pool_sizer(details_hash)
+                    self._remove_azure_token_user(details)
+                    replica_router = self._details_to_replica_router.pop(details_hash, None)
+                    if replica_router is not None:
+                        self._close_replica_pools(replica_router)
                     if pool:
                         pool.close()
                         self._logger.info(
@@ -286,7 +372,11 @@ class ConnectionManager:
         Returns:
             True if the connection was disconnected, False if no connection was found.
         """
-        return self._run_task(self._transfer_connection, (old_owner_uri, new_owner_uri))
+        return self._run_task(
+            self._transfer_connection,
+            (old_owner_uri, new_owner_uri),
+            [old_owner_uri, new_owner_uri],
+        )
 
     def _transfer_connection(self, old_owner_uri: str, new_owner_uri: str) -> bool:
         self._logger.info(f"Transferring connection from {old_owner_uri} to {new_owner_uri}")
@@ -339,7 +429,13 @@ class ConnectionManager:
 
             return True
 
-    def get_pooled_connection(self, owner_uri: str) -> PooledConnection | None:
+    def get_pooled_connection(
+        self,
+        owner_uri: str,
+        priority: ConnectionPriority = ConnectionPriority.INTERACTIVE,
+        read_only: bool = False,
+        checkout_timeout: float | None = None,
+    ) -> PooledConnection | None:
         """Get a pooled connection for the given owner URI.
 
         The pooled connection is a context manager that will produce a connection
@@ -350,6 +446,16 @@ class ConnectionManager:
 
         Args:
             owner_uri: The owner URI of the connection.
+            priority: The priority class the connection is checked out with.
+                Background and bulk work is capped so that it cannot take
+                the connections reserved for interactive work.
+            read_only: If the connection is only read from, and the work tolerates
+                stale data. The connection is then made to a read replica of the
+                server if there is one that is caught up, and to the primary otherwise.
+                The owner URI's connection in transaction is still used if it has one.
+            checkout_timeout: Seconds to wait at most for a free connection, for work
+                that does without the connection rather than wait for it.
+                None to wait up to the connect timeout.
         Returns:
             The pooled connection if a connection is established
             for the owner_uri, None otherwise.
@@ -373,9 +479,19 @@ class ConnectionManager:
                 self._logger.info(
                     f"Returning new pooled connection for owner_uri={owner_uri}"
                 )
+                replica_router = self._details_to_replica_router.get(details.to_hash())
+                if read_only and replica_router is not None:
+                    return PooledConnection(
+                        get_connection=lambda pooled_conn: self._get_read_only_connection(
+                            replica_router, pool, details, pooled_conn, priority
+                        ),
+                        put_connection=lambda conn: self._put_read_only_connection(
+                            conn, pool, owner_uri, replica_router
+                        ),
+                    )
                 return PooledConnection(
                     get_connection=lambda pooled_conn: self._get_connection(
-                        pool, details, pooled_conn
+                        pool, details, pooled_conn, priority, checkout_timeout
                     ),
                     put_connection=lambda conn: self._put_connection(conn, pool, owner_uri),
                 )
@@ -436,9 +552,12 @@ class ConnectionManager:
                 conn = self._get_connection(pool, details)
                 conn.autocommit = True
                 # Set the application name to show the connection type.
-                application_name = conn.application_name or ""
-                application_name = f"{application_name} - {connection_name}"
-                conn.execute_statement("SET application_name = %s", [application_name])
+                # Behind a transaction pooler, the setting would stay on the server
+                # connection for the next client, so it is left as it is.
+                if not details.pooler_compatible:
+                    application_name = conn.application_name or ""
+                    application_name = f"{application_name} - {connection_name}"
+                    conn.execute_statement("SET application_name = %s", [application_name])
                 # Store the connection in the long lived connection map.
                 self._owner_uri_to_long_lived_connection[owner_uri] = conn
                 self._logger.info(
@@ -461,27 +580,100 @@ class ConnectionManager:
                 conn[0].close()
             for pool in self._details_to_pools.values():
                 pool.close()
+            for replica_router in self._details_to_replica_router.values():
+                replica_router.close()
             self._details_to_pools.clear()
+            self._details_to_replica_router.clear()
             self._details_to_owner_uri.clear()
             self._owner_uri_to_details.clear()
             self._owner_uri_to_active_tx_connection.clear()
             self._owner_uri_to_long_lived_connection.clear()
             self._owner_uri_to_conn_info.clear()
             self._details_to_connection_errors.clear()
+            with self._pool_metrics_lock:
+                self._details_to_pool_metrics.clear()
+                self._details_to_pool_lanes.clear()
+                self._details_to_pool_maintenance.clear()
+                sizers = list(self._details_to_pool_sizer.values())
+                self._details_to_pool_sizer.clear()
+            for sizer in sizers:
+                sizer.close()
+        self._azure_token_cache.close()
+        self._closed.set()
+        self._maintenance_wakeup.set()
 
     def get_pool_stats(self) -> dict[str, Any]:
         """Get the pool stats for all pools.
         See https://www.psycopg.org/psycopg3/docs/advanced/pool.html#pool-stats
+        The stats of each pool also include the checkout metrics of PoolMetrics.
         """
         with self._lock:
             stats = {}
-            for _, pool in self._details_to_pools.items():
+            for details_hash, pool in self._details_to_pools.items():
                 pool_stats = pool.get_stats()
                 stats[pool.name] = {
                     **pool_stats,
+                    **self._get_pool_metrics(details_hash).get_stats(),
                 }
             return stats
 
+    def get_pool_stats_summary(self, owner_uri: str | None = None) -> list[PoolStats]:
+        """Summarize the stats of all pools, or of the pool of the owner URI:
+        their size, idle and busy connections, waits and checkouts
+        """
+        with self._lock:
+            if owner_uri is not None:
+                details_and_pool = self._owner_uri_to_details.get(owner_uri)
+                if details_and_pool is None:
+                    return []
+                details_hashes = [details_and_pool[0].to_hash()]
+            else:
+                details_hashes = list(self._details_to_pools)
+
+            summary = []
+            for details_hash in details_hashes:
+                pool = self._details_to_pools.get(details_hash)
+                if pool is None:
+                    continue
+                pool_stats = pool.get_stats()
+                pool_size = pool_stats.get("pool_size", 0)
+                idle_count = pool_stats.get("pool_available", 0)
+                metrics = self._get_pool_metrics(details_hash)
+                lanes = self._get_pool_lanes(details_hash)
+                lane_counts = lanes.get_lane_stats() if lanes is not None else {}
+                summary.append(
+                    PoolStats(
+                        name=pool.name,
+                        owner_uri_count=len(self._details_to_owner_uri.get(details_hash, [])),
+                        pool_size=pool_size,
+                        pool_max=pool_stats.get("pool_max", 0),
+                        idle_count=idle_count,
+                        busy_count=max(pool_size - idle_count, 0),
+                        lanes=[
+                            PoolLaneStats(
+                                priority=priority,
+                                **lane_counts.get(priority, {}),
+                                **metrics.get_lane_stats(priority),
+                            )
+                            for priority in PRIORITY_ORDER
+                        ],
+                        **metrics.get_stats(),
+                    )
+                )
+            return summary
+
+    def get_azure_token_cache_stats(self) -> AzureTokenCacheStats:
+        """Get the hits, misses and fetch latencies of the Azure token cache"""
+        return AzureTokenCacheStats(**self._azure_token_cache.get_stats())
+
+    def get_background_query_stats(self) -> list[BackgroundQueryStats]:
+        """Get the timeouts and the timeout counts of the catalog queries
+        the service runs on its own behalf, by category
+        """
+        return [
+            BackgroundQueryStats(**stats) for stats in get_statement_timeouts().get_stats()
+        ]
+
     def set_fetch_azure_token(
         self, fetch_azure_token: Callable[[str, str | None], AzureToken]
     ) -> None:
@@ -490,7 +682,7 @@ class ConnectionManager:
         Args:
             fetch_azure_token: The function to fetch the Azure token.
         """
-        self._fetch_azure_token = fetch_azure_token
+        self._azure_token_cache.set_fetch_azure_token(fetch_azure_token)
 
     def set_logger(self, logger: logging.Logger) -> None:
         """Set the logger for the connection manager.
@@ -499,15 +691,43 @@ class ConnectionManager:
             logger: The logger to use.
         """
         self._logger = logger
+        self._azure_token_cache.set_logger(logger)
 
     def _get_connection(
         self,
         pool: ConnectionPool,
         details: ConnectionDetails,
         pooled_connection: PooledConnection | None = None,
+        priority: ConnectionPriority | None = None,
+        checkout_timeout: float | None = None,
     ) -> ServerConnection:
+        """Check a connection out of the pool. If a priority is given, wait for a slot
+        of its class first. Long-lived connections are checked out without one.
+        If a checkout timeout is given, wait no longer than it for the connection.
+        """
+        details_hash = details.to_hash()
+        metrics = self._get_pool_metrics(details_hash)
+        lanes = self._get_pool_lanes(details_hash) if priority is not None else None
+        wait_start = metrics.start_wait()
+        conn: psycopg.Connection | None = None
+        server_connection: ServerConnection | None = None
+        timed_out = False
         try:
-            conn = pool.getconn()
+            timeout: float = self._timeout_override or details.connect_timeout
+            if checkout_timeout is not None:
+                timeout = min(timeout, checkout_timeout)
+            if lanes is not None and priority is not None:
+                deadline = time.monotonic() + timeout
+                lanes.acquire(priority, timeout)
+                try:
+                    # The wait for the slot and for the connection share the timeout
+                    conn = pool.getconn(max(deadline - time.monotonic(), 0))
+                except BaseException:
+                    lanes.release(priority)
+                    raise
+                lanes.add_connection(conn, priority)
+            else:
+                conn = pool.getconn(timeout)
 
             # This is a connection not in a transaction, otherwise it would
             # not have been returned from the pool.
@@ -521,8 +741,10 @@ class ConnectionManager:
 
             # If this is an long lived connection, set the pool so that
             # it can be manually returned to the pool.
-            return ServerConnection(conn, pool, pooled_connection)
+            server_connection = ServerConnection(conn, pool, pooled_connection)
+            return server_connection
         except PoolTimeout as e:
+            timed_out = True
             stats = pool.get_stats()
             pool_size = stats.get("pool_size", 0)
             if pool_size == 0:
@@ -537,20 +759,35 @@ class ConnectionManager:
             for owner_uri in self._details_to_owner_uri.get(details.to_hash(), []):
                 active_tx += 1 if owner_uri in self._owner_uri_to_active_tx_connection else 0
             connect_error_message = self._get_and_clear_connection_errors(details.to_hash())
-            self._logger.exception(e)
-            self._logger.error(
-                f"Connection error for {self._get_user_facing_conn_str(details)}."
-                f"Pool size: {pool_size}, "
-                f"Max size: {max_size}, "
-                f"Active transactions: {active_tx}, "
-                f"Connection error: {connect_error_message}"
-            )
+            # Callers that set their own checkout timeout expect to time out at times
+            if checkout_timeout is None:
+                self._logger.exception(e)
+                self._logger.error(
+                    f"Connection error for {self._get_user_facing_conn_str(details)}."
+                    f"Pool size: {pool_size}, "
+                    f"Max size: {max_size}, "
+                    f"Active transactions: {active_tx}, "
+                    f"Connection error: {connect_error_message}"
+                )
             raise GetConnectionTimeout(
                 pool_size=pool_size,
                 pool_max=max_size,
                 active_tx=active_tx,
                 connection_error_message=connect_error_message,
             ) from e
+        finally:
+            # The wait ends however the checkout ends
+            if server_connection is not None:
+                metrics.end_wait(wait_start, server_connection.connection, priority)
+            elif timed_out:
+                metrics.end_wait(wait_start, None, priority)
+            else:
+                metrics.cancel_wait()
+            if server_connection is None and conn is not None:
+                # The connection was checked out, but not handed over
+                if lanes is not None:
+                    lanes.release_connection(conn)
+                pool.putconn(conn)
 
     def _put_connection(
         self,
@@ -579,24 +816,157 @@ class ConnectionManager:
                 if owner_uri in self._owner_uri_to_active_tx_connection:
                     del self._owner_uri_to_active_tx_connection[owner_uri]
 
+                details_and_pool = self._owner_uri_to_details.get(owner_uri)
+                details_hash = (
+                    details_and_pool[0].to_hash() if details_and_pool is not None else None
+                )
+                metrics = (
+                    self._get_pool_metrics(details_hash) if details_hash is not None else None
+                )
+
                 # Reset the connection to its initial state.
                 # If errors, the pool should clean up the connection.
                 with contextlib.suppress(Exception):
-                    conn.reset()
+                    reset_statement = conn.reset()
+                    if metrics is not None:
+                        metrics.record_reset(reset_statement)
 
                 # Return the connection to the pool.
+                if metrics is not None:
+                    metrics.record_return(conn.connection)
+                maintenance = (
+                    self._get_pool_maintenance(details_hash)
+                    if details_hash is not None
+                    else None
+                )
+                if maintenance is not None:
+                    maintenance.record_return(conn.connection)
+                self._release_lane_slot(owner_uri, conn)
                 pool.putconn(conn.connection)
 
+    def _get_read_only_connection(
+        self,
+        replica_router: ReplicaRouter,
+        pool: ConnectionPool,
+        details: ConnectionDetails,
+        pooled_connection: PooledConnection,
+        priority: ConnectionPriority,
+    ) -> ServerConnection:
+        """Check a connection out of a usable replica, or out of the primary's pool
+        if there is none, or if none of its connections is free in time
+        """
+        replica = replica_router.get_replica()
+        if replica is not None and replica.pool is not None:
+            try:
+                return self._get_connection(
+                    replica.pool,
+                    replica.details,
+                    pooled_connection,
+                    priority,
+                    REPLICA_CHECKOUT_TIMEOUT_SECONDS,
+                )
+            except GetConnectionTimeout:
+                # The replica is busy rather than failed
+                self._logger.info(
+                    f"No connection of replica {replica.details.server_name} was free, "
+                    "using the primary"
+                )
+            except Exception as e:
+                replica_router.mark_failed(replica, e)
+        return self._get_connection(pool, details, pooled_connection, priority)
+
+    def _put_read_only_connection(
+        self,
+        conn: ServerConnection,
+        pool: ConnectionPool,
+        owner_uri: str,
+        replica_router: ReplicaRouter,
+    ) -> None:
+        if conn.pool is None or conn.pool is pool:
+            self._put_connection(conn, pool, owner_uri)
+            return
+        # Connections to replicas are not kept in transaction for the owner URI,
+        # as later statements of the owner URI go to the primary.
+        with contextlib.suppress(Exception):
+            if conn.transaction_in_trans or conn.transaction_in_error:
+                conn.connection.rollback()
+            conn.reset()
+        replica_details = next(
+            (r.details for r in replica_router.replicas if r.pool is conn.pool), None
+        )
+        if replica_details is not None:
+            replica_hash = replica_details.to_hash()
+            self._get_pool_metrics(replica_hash).record_return(conn.connection)
+            lanes = self._get_pool_lanes(replica_hash)
+            if lanes is not None:
+                lanes.release_connection(conn.connection)
+        conn.pool.putconn(conn.connection)
+
+    def _create_replica_pool(
+        self, details: ConnectionDetails, config: Configuration
+    ) -> ConnectionPool:
+        """Create the pool of a replica, with its own priority lanes"""
+        pool = self._create_connection_pool(details, config)
+        with self._pool_metrics_lock:
+            self._details_to_pool_lanes[details.to_hash()] = PoolLanes(
+                self._get_max_pool_size(config)
+            )
+        return pool
+
+    def _close_replica_pools(self, replica_router: ReplicaRouter) -> None:
+        """Close the pools of the replicas of a pool, and drop their state"""
+        for replica_details in replica_router.close():
+            details_hash = replica_details.to_hash()
+            with self._pool_metrics_lock:
+                self._details_to_pool_metrics.pop(details_hash, None)
+                self._details_to_pool_lanes.pop(details_hash, None)
+                self._details_to_pool_maintenance.pop(details_hash, None)
+            self._remove_pool_sizer(details_hash)
+            self._details_to_connection_errors.pop(details_hash, None)
+
+    def _release_lane_slot(self, owner_uri: str, conn: ServerConnection) -> None:
+        """Give back the priority class slot of a connection of the owner URI's pool"""
+        details_and_pool = self._owner_uri_to_details.get(owner_uri)
+        if details_and_pool is not None:
+            lanes = self._get_pool_lanes(details_and_pool[0].to_hash())
+            if lanes is not None:
+                lanes.release_connection(conn.connection)
+
+    def _get_max_pool_size(self, config: Configuration) -> int:
+        return self._max_pool_size or config.pgsql.max_connections
+
     def _create_connection_pool(
         self, details: ConnectionDetails, config: Configuration
     ) -> ConnectionPool:
-        max_connections = self._max_pool_size or config.pgsql.max_connections
+        max_connections = self._get_max_pool_size(config)
 
         connection_class = self.connection_class_factory.create_connection_class(
             details,
             self._store_connection_error,
             self._get_entra_token,
         )
+        connection_params = details.get_connection_params(config)
+        if details.pooler_compatible:
+            # A transaction pooler can run each statement on another server connection,
+            # where statements prepared by earlier ones do not exist. Statements run
+            # before checkout, such as the checks of idle connections, are included.
+            connection_params["prepare_threshold"] = None
+
+        # Idle connections are checked and warm spares opened in the background.
+        maintenance = PoolMaintenance(PoolMaintenanceSettings.from_config(config))
+        # If adaptive sizing is turned on, the pool grows beyond its size while
+        # checkouts wait, if the budget allows. Otherwise max_connections is its cap.
+        sizing_settings = PoolSizingSettings.from_config(config)
+        self._connection_budget.max_connections = sizing_settings.global_max_connections
+        sizer: PoolSizer | None = None
+        if sizing_settings.max_size > max_connections:
+            sizer = PoolSizer(
+                sizing_settings,
+                max_connections,
+                self._get_pool_metrics(details.to_hash()),
+                self._connection_budget,
+                logger=self._logger,
+            )
         # Create a new connection pool.
         pool = ConnectionPool(
             name=str(details.to_hash()),
@@ -604,12 +974,18 @@ class ConnectionManager:
             max_size=max_connections,
             timeout=self._timeout_override or details.connect_timeout,
             open=False,
-            check=ConnectionPool.check_connection,
-            kwargs=details.get_connection_params(config),
+            check=maintenance.check_connection,
+            kwargs=connection_params,
             connection_class=connection_class,
             max_idle=60 * 5,  # 5 minutes
-            max_lifetime=60 * 30,  # 30 minutes
+            max_lifetime=maintenance.settings.max_lifetime,
         )
+        maintenance.pool = pool
+        with self._pool_metrics_lock:
+            self._details_to_pool_maintenance[details.to_hash()] = maintenance
+            if sizer is not None:
+                sizer.pool = pool
+                self._details_to_pool_sizer[details.to_hash()] = sizer
 
         # Open and wait for the first connection to be establshed
         # to avoid creating mutliple connections when not needed.
@@ -668,7 +1044,9 @@ class ConnectionManager:
         """Gets an Entra token from connection details to connect with an
         Azure PG instance that uses Entra auth.
 
-        Refresh the Azure token for the given connection details if need be.
+        Get the Azure token for the given connection details from the token cache,
+        which refreshes the tokens of the pools in the background, and only fetches
+        the token here if it expired anyway.
         Update the connection details with the new token if it is refreshed.
 
         Args:
@@ -678,33 +1056,41 @@ class ConnectionManager:
             refreshed if needed and the token is set, or
             None if the token is not set.
         """
-        # Operate in the lock to avoid multiple pool worker threads
-        # trying to refresh the token at the same time.
-        with self._pool_worker_lock:
-            azure_token = details.azure_token
-
-            if azure_token is not None and azure_token.is_azure_token_expired():
-                if not self._fetch_azure_token:
-                    self._logger.warning(
-                        "Azure token refresh needed but is not supported "
-                        "in this connection manager."
-                    )
-                    return azure_token
-
-                # Get the account ID and tenant ID from the connection details
-                account_id = details.azure_account_id
-                tenant_id = details.azure_tenant_id
-                if not account_id:
-                    # This is a bug, the account ID and tenant ID should be
-                    # set if the token is set.
-                    raise ValueError(
-                        "Azure account ID must be provided to refresh the token."
-                    )
-
-                azure_token = self._fetch_azure_token(account_id, tenant_id)
-                details.azure_token = azure_token
+        azure_token = details.azure_token
+        if azure_token is None:
+            return None
+
+        # Get the account ID and tenant ID from the connection details
+        account_id = details.azure_account_id
+        tenant_id = details.azure_tenant_id
+        if not account_id:
+            if not azure_token.is_azure_token_expired():
+                return azure_token
+            # This is a bug, the account ID and tenant ID should be
+            # set if the token is set.
+            raise ValueError("Azure account ID must be provided to refresh the token.")
+
+        # The cache serializes the fetches of a token, so that multiple
+        # pool worker threads do not refresh the same token at the same time.
+        cached_token = self._azure_token_cache.get_token(account_id, tenant_id, azure_token)
+        if cached_token is not None and cached_token != azure_token:
+            details.azure_token = cached_token
+            azure_token = cached_token
+        return azure_token
+
+    def _add_azure_token_user(self, details: ConnectionDetails) -> None:
+        """Keep the Azure token of a new pool refreshed until the pool is closed"""
+        azure_token = details.azure_token
+        if azure_token is not None and details.azure_account_id:
+            self._azure_token_cache.add_user(
+                details.azure_account_id, details.azure_tenant_id, azure_token
+            )
 
-            return azure_token
+    def _remove_azure_token_user(self, details: ConnectionDetails) -> None:
+        if details.azure_token is not None and details.azure_account_id:
+            self._azure_token_cache.remove_user(
+                details.azure_account_id, details.azure_tenant_id
+            )
 
     def _store_connection_error(self, details: ConnectionDetails, error: Exception) -> None:
         """Store the connection error for the given connection details.
@@ -719,6 +1105,86 @@ class ConnectionManager:
         details_hash = details.to_hash()
         with self._pool_worker_lock:
             self._details_to_connection_errors.setdefault(details_hash, []).append(error)
+        self._get_pool_metrics(details_hash).record_connection_error()
+
+    def _get_pool_metrics(self, details_hash: int) -> PoolMetrics:
+        with self._pool_metrics_lock:
+            metrics = self._details_to_pool_metrics.get(details_hash)
+            if metrics is None:
+                metrics = PoolMetrics()
+                self._details_to_pool_metrics[details_hash] = metrics
+            return metrics
+
+    def _get_pool_lanes(self, details_hash: int) -> PoolLanes | None:
+        with self._pool_metrics_lock:
+            return self._details_to_pool_lanes.get(details_hash)
+
+    def _get_pool_maintenance(self, details_hash: int) -> PoolMaintenance | None:
+        with self._pool_metrics_lock:
+            return self._details_to_pool_maintenance.get(details_hash)
+
+    def _remove_pool_sizer(self, details_hash: int) -> None:
+        """Stop sizing a pool that is closed, giving its connections back to the budget"""
+        with self._pool_metrics_lock:
+            sizer = self._details_to_pool_sizer.pop(details_hash, None)
+        if sizer is not None:
+            sizer.close()
+
+    def _request_pool_maintenance(self, details_hash: int) -> None:
+        """Have the maintenance thread run the maintenance of the pool right away"""
+        maintenance = self._get_pool_maintenance(details_hash)
+        if maintenance is None:
+            return
+        maintenance.request_run()
+        with self._pool_metrics_lock:
+            if self._maintenance_thread is None:
+                self._maintenance_thread = threading.Thread(
+                    target=self._maintain_pools,
+                    name="ConnectionManagerPoolMaintenance",
+                    daemon=True,
+                )
+                self._maintenance_thread.start()
+        self._maintenance_wakeup.set()
+
+    def _maintain_pools(self) -> None:
+        """Run the maintenance and sizing of the pools that are due,
+        until the manager is closed
+        """
+        while not self._closed.is_set():
+            self._maintenance_wakeup.clear()
+            with self._pool_metrics_lock:
+                tasks: list[PoolMaintenance | PoolSizer] = [
+                    *self._details_to_pool_maintenance.values(),
+                    *self._details_to_pool_sizer.values(),
+                ]
+            next_run_at = time.monotonic() + POOL_MAINTENANCE_MAX_WAIT_SECONDS
+            for task in tasks:
+                if task.next_run_at <= time.monotonic():
+                    try:
+                        task.run()
+                    except Exception as e:
+                        self._logger.warning(f"Could not maintain connection pool: {e}")
+                next_run_at = min(next_run_at, task.next_run_at)
+            self._maintenance_wakeup.wait(max(next_run_at - time.monotonic(), 0))
+
+    def _log_pool_stats(self, interval: float) -> None:
+        """Log the stats of the pools as JSON records, until the manager is closed"""
+        while not self._closed.wait(interval):
+            try:
+                for stats in self.get_pool_stats_summary():
+                    self._logger.info(f"Connection pool stats: {stats.model_dump_json()}")
+                token_cache_stats = self.get_azure_token_cache_stats()
+                if token_cache_stats.hit_count or token_cache_stats.miss_count:
+                    self._logger.info(
+                        f"Azure token cache stats: {token_cache_stats.model_dump_json()}"
+                    )
+                for query_stats in self.get_background_query_stats():
+                    if query_stats.statement_timeout_count or query_stats.lock_timeout_count:
+                        self._logger.info(
+                            f"Background query timeouts: {query_stats.model_dump_json()}"
+                        )
+            except Exception as e:
+                self._logger.warning(f"Could not log connection pool stats: {e}")
 
     def _get_and_clear_connection_errors(self, details_hash: int) -> str:
         connection_errors = self._details_to_connection_errors.get(details_hash)
@@ -0,0 +1,123 @@
+# --------------------------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for license information.
+# --------------------------------------------------------------------------------------------
+
+import threading
+from collections.abc import Callable, Hashable
+from dataclasses import dataclass, field
+from typing import Any
+
+# Number of connection tasks that can run at the same time
+DEFAULT_MAX_WORKERS = 8
+
+
+@dataclass
+class ConnectionTaskResponse:
+    """A response to a connection task.
+
+    Args:
+        result: The result of the task.
+        error: The error that occurred during the task.
+    """
+
+    result: Any = None
+    error: Exception | None = None
+
+
+@dataclass
+class ConnectionTaskMessage:
+    """A task to be processed by the connection manager.
+
+    Args:
+        task: The function to be executed.
+        args: The arguments to pass to the function.
+        response: A response object to store the result of the task.
+        event: An event to signal when the task is complete.
+        keys: The keys the task is ordered by, such as its owner URIs and details hashes.
+    """
+
+    task: Callable
+    args: tuple
+    response: ConnectionTaskResponse
+    event: threading.Event
+    keys: frozenset[Hashable] = field(default_factory=frozenset)
+
+
+class ConnectionTaskScheduler:
+    """Runs connection tasks on a bounded set of worker threads.
+
+    Tasks that share a key run one at a time, in the order they were submitted,
+    while tasks with no key in common run in parallel. This keeps the connects and
+    disconnects of an owner URI or a pool in order, without a slow server holding up
+    the connects to every other server.
+    """
+
+    def __init__(self, max_workers: int = DEFAULT_MAX_WORKERS, name: str = "Worker") -> None:
+        self._max_workers = max_workers
+        self._name = name
+        self._condition = threading.Condition()
+        self._pending: list[ConnectionTaskMessage] = []
+        self._running_keys: set[Hashable] = set()
+        self._worker_count = 0
+        self._idle_worker_count = 0
+
+    def run(self, task: Callable, args: tuple, keys: frozenset[Hashable]) -> Any:
+        """Run the task once the earlier tasks that share a key with it are done,
+        and wait for its result.
+        """
+        message = ConnectionTaskMessage(
+            task, args, ConnectionTaskResponse(), threading.Event(), keys
+        )
+        with self._condition:
+            self._pending.append(message)
+            # Start a worker unless there is an idle one for each pending task
+            if (
+                len(self._pending) > self._idle_worker_count
+                and self._worker_count < self._max_workers
+            ):
+                self._worker_count += 1
+                threading.Thread(
+                    target=self._process_tasks,
+                    name=f"{self._name}-{self._worker_count}",
+                    daemon=True,
+                ).start()
+            self._condition.notify_all()
+
+        message.event.wait()
+        if message.response.error:
+            raise message.response.error
+        return message.response.result
+
+    def _process_tasks(self) -> None:
+        while True:
+            with self._condition:
+                message = self._take_next_task()
+                while message is None:
+                    self._idle_worker_count += 1
+                    self._condition.wait()
+                    self._idle_worker_count -= 1
+                    message = self._take_next_task()
+                self._running_keys.update(message.keys)
+
+            try:
+                message.response.result = message.task(*message.args)
+            except Exception as e:
+                # Handle exceptions in the task processing
+                message.response.error = e
+            finally:
+                with self._condition:
+                    self._running_keys.difference_update(message.keys)
+                    self._condition.notify_all()
+                message.event.set()
+
+    def _take_next_task(self) -> ConnectionTaskMessage | None:
+        """Take the first pending task that shares no key with a running task,
+        or with a pending task submitted before it. Must be called with the condition held.
+        """
+        blocked_keys = set(self._running_keys)
+        for index, message in enumerate(self._pending):
+            if blocked_keys.isdisjoint(message.keys):
+                return self._pending.pop(index)
+            blocked_keys.update(message.keys)
+        return None
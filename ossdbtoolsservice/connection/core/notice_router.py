@@ -0,0 +1,61 @@
+# --------------------------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for license information.
+# --------------------------------------------------------------------------------------------
+
+import threading
+import weakref
+from collections.abc import Callable
+
+import psycopg
+from psycopg.errors import Diagnostic
+
+NoticeReceiver = Callable[[Diagnostic], None]
+
+
+class NoticeRouter:
+    """The single notice handler of a psycopg connection.
+
+    psycopg connections cannot remove notice handlers, and connections outlive
+    the statements that run on them, so notices are dispatched to the receiver that is
+    attached while a statement runs rather than to a handler per statement.
+    Notices that arrive while no receiver is attached are dropped.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._receiver: NoticeReceiver | None = None
+
+    def attach(self, receiver: NoticeReceiver) -> None:
+        """Send the notices of the connection to the receiver, instead of the current one"""
+        with self._lock:
+            self._receiver = receiver
+
+    def detach(self, receiver: NoticeReceiver) -> None:
+        """Stop sending notices to the receiver, if it is still attached"""
+        with self._lock:
+            if self._receiver is receiver:
+                self._receiver = None
+
+    def __call__(self, notice: Diagnostic) -> None:
+        with self._lock:
+            receiver = self._receiver
+        if receiver is not None:
+            receiver(notice)
+
+
+_routers: "weakref.WeakKeyDictionary[psycopg.Connection, NoticeRouter]" = (
+    weakref.WeakKeyDictionary()
+)
+_routers_lock = threading.Lock()
+
+
+def get_notice_router(connection: psycopg.Connection) -> NoticeRouter:
+    """Get the notice router of a psycopg connection, registering it on first use"""
+    with _routers_lock:
+        router = _routers.get(connection)
+        if router is None:
+            router = NoticeRouter()
+            connection.add_notice_handler(router)
+            _routers[connection] = router
+        return router
@@ -0,0 +1,170 @@
+# --------------------------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for license information.
+# --------------------------------------------------------------------------------------------
+
+import itertools
+import threading
+import time
+from collections.abc import Callable
+from dataclasses import dataclass
+
+from psycopg_pool import PoolTimeout
+
+from ossdbtoolsservice.connection.contracts.common import ConnectionPriority
+
+# Priority classes, in the order their waiters are served
+PRIORITY_ORDER = [
+    ConnectionPriority.INTERACTIVE,
+    ConnectionPriority.BACKGROUND,
+    ConnectionPriority.BULK,
+]
+
+
+@dataclass
+class LaneLimits:
+    """Limits of the connections a priority class can hold.
+
+    Args:
+        reserved: Connections kept for the class, that other classes cannot take.
+        cap: Most connections the class can hold at once.
+    """
+
+    reserved: int
+    cap: int
+
+
+def get_default_lane_limits(max_size: int) -> dict[ConnectionPriority, LaneLimits]:
+    """Get the limits of the priority classes of a pool of the given size.
+
+    A quarter of the pool is reserved for interactive work, background work can take
+    up to half of the pool and bulk work up to a quarter of it.
+    """
+    return {
+        ConnectionPriority.INTERACTIVE: LaneLimits(reserved=max_size // 4, cap=max_size),
+        ConnectionPriority.BACKGROUND: LaneLimits(reserved=0, cap=max(1, max_size // 2)),
+        ConnectionPriority.BULK: LaneLimits(reserved=0, cap=max(1, max_size // 4)),
+    }
+
+
+@dataclass
+class _Waiter:
+    priority: ConnectionPriority
+    sequence: int
+
+
+class PoolLanes:
+    """Admits the checkouts of a connection pool by priority class.
+
+    psycopg_pool serves its waiters first come, first served, so a burst of
+    background work can take every connection and leave the user waiting.
+    Each class here has a reserved minimum and a cap, and waiters are served
+    in order of priority, then of arrival.
+
+    A slot is taken before a connection is checked out of the pool, and given back
+    when the connection returns to it.
+    """
+
+    def __init__(
+        self,
+        max_size: int,
+        lane_limits: dict[ConnectionPriority, LaneLimits] | None = None,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.max_size = max_size
+        # Limits that were not given follow the size of the pool
+        self._default_lane_limits = lane_limits is None
+        self._lane_limits = lane_limits or get_default_lane_limits(max_size)
+        self._clock = clock
+        self._condition = threading.Condition()
+        self._in_use: dict[ConnectionPriority, int] = dict.fromkeys(PRIORITY_ORDER, 0)
+        self._waiters: list[_Waiter] = []
+        self._sequence = itertools.count()
+        # Priority of the connections that are out of the pool, by connection id
+        self._connection_priorities: dict[int, ConnectionPriority] = {}
+
+    def acquire(self, priority: ConnectionPriority, timeout: float) -> None:
+        """Wait for a slot of the priority class.
+
+        Raises:
+            PoolTimeout: If no slot was free within the timeout.
+        """
+        waiter = _Waiter(priority, next(self._sequence))
+        deadline = self._clock() + timeout
+        with self._condition:
+            self._waiters.append(waiter)
+            self._waiters.sort(key=lambda w: (PRIORITY_ORDER.index(w.priority), w.sequence))
+            try:
+                while self._get_next_waiter() is not waiter:
+                    remaining = deadline - self._clock()
+                    if remaining <= 0:
+                        raise PoolTimeout(
+                            f"couldn't get a {priority} connection after {timeout:.2f} sec"
+                        )
+                    self._condition.wait(remaining)
+                self._in_use[priority] += 1
+            finally:
+                self._waiters.remove(waiter)
+                # Removing a waiter can let the ones behind it through
+                self._condition.notify_all()
+
+    def release(self, priority: ConnectionPriority) -> None:
+        """Give back a slot of the priority class"""
+        with self._condition:
+            self._in_use[priority] -= 1
+            self._condition.notify_all()
+
+    def resize(self, max_size: int) -> None:
+        """Follow a resize of the pool"""
+        with self._condition:
+            self.max_size = max_size
+            if self._default_lane_limits:
+                self._lane_limits = get_default_lane_limits(max_size)
+            # Growing can let waiters through
+            self._condition.notify_all()
+
+    def add_connection(self, connection: object, priority: ConnectionPriority) -> None:
+        """Remember the slot a connection was checked out with"""
+        with self._condition:
+            self._connection_priorities[id(connection)] = priority
+
+    def release_connection(self, connection: object) -> None:
+        """Give back the slot of a connection, if it holds one"""
+        with self._condition:
+            priority = self._connection_priorities.pop(id(connection), None)
+        if priority is not None:
+            self.release(priority)
+
+    def get_lane_stats(self) -> dict[ConnectionPriority, dict[str, int]]:
+        with self._condition:
+            return {
+                priority: {
+                    "reserved_count": self._lane_limits[priority].reserved,
+                    "max_count": self._lane_limits[priority].cap,
+                    "in_use_count": self._in_use[priority],
+                    "requests_waiting": sum(
+                        1 for waiter in self._waiters if waiter.priority == priority
+                    ),
+                }
+                for priority in PRIORITY_ORDER
+            }
+
+    def _get_next_waiter(self) -> _Waiter | None:
+        """Get the first waiter, in priority order, that can take a slot.
+        Must be called with the condition held.
+        """
+        for waiter in self._waiters:
+            if self._can_admit(waiter.priority):
+                return waiter
+        return None
+
+    def _can_admit(self, priority: ConnectionPriority) -> bool:
+        if self._in_use[priority] >= self._lane_limits[priority].cap:
+            return False
+        # Slots reserved by the other classes and not in use by them
+        held_back = sum(
+            max(limits.reserved - self._in_use[other], 0)
+            for other, limits in self._lane_limits.items()
+            if other != priority
+        )
+        return sum(self._in_use.values()) + held_back < self.max_size
@@ -0,0 +1,133 @@
+# --------------------------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for license information.
+# --------------------------------------------------------------------------------------------
+
+import threading
+import time
+import weakref
+from collections.abc import Callable
+from dataclasses import dataclass
+
+import psycopg
+from psycopg_pool import ConnectionPool
+
+from ossdbtoolsservice.utils import constants
+from ossdbtoolsservice.workspace.contracts.configuration import Configuration
+
+
+@dataclass
+class PoolMaintenanceSettings:
+    """Settings of the background maintenance of a connection pool.
+
+    Args:
+        check_interval: Seconds between the checks of the idle connections,
+            0 to check connections each time they are checked out instead.
+        warm_spares: Idle connections kept open beyond the ones in use.
+        max_lifetime: Seconds after which connections are closed and replaced.
+    """
+
+    check_interval: float = constants.DEFAULT_POOL_CHECK_INTERVAL_SECONDS
+    warm_spares: int = constants.DEFAULT_POOL_WARM_SPARES
+    max_lifetime: float = constants.DEFAULT_POOL_MAX_LIFETIME_SECONDS
+
+    @classmethod
+    def from_config(cls, config: Configuration) -> "PoolMaintenanceSettings":
+        return cls(
+            check_interval=config.pgsql.pool_check_interval_seconds,
+            warm_spares=config.pgsql.pool_warm_spares,
+            max_lifetime=config.pgsql.pool_max_lifetime_seconds,
+        )
+
+
+class PoolMaintenance:
+    """Maintenance of a connection pool, run by a background thread
+    so that dead connections and cold starts are not met on the request path.
+
+    Each run checks the idle connections, replacing the broken ones and the ones
+    past their max lifetime, and resizes the pool to keep warm spares open.
+    Connections that were known to work within the check interval are not
+    checked again when they are checked out.
+    """
+
+    def __init__(
+        self,
+        settings: PoolMaintenanceSettings,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.settings = settings
+        self.pool: ConnectionPool | None = None
+        self._clock = clock
+        self._lock = threading.Lock()
+        # Connections of a new pool are fresh
+        self._last_check_at = clock()
+        self._returned_at: weakref.WeakKeyDictionary[psycopg.Connection, float] = (
+            weakref.WeakKeyDictionary()
+        )
+        self._next_run_at = self._last_check_at
+
+    @property
+    def next_run_at(self) -> float:
+        with self._lock:
+            return self._next_run_at
+
+    def request_run(self) -> None:
+        """Run as soon as possible, such as when an owner URI joins the pool
+        and is about to check out connections
+        """
+        with self._lock:
+            self._next_run_at = self._clock()
+
+    def record_return(self, connection: psycopg.Connection) -> None:
+        """Record that a connection worked until it went back to the pool"""
+        with self._lock:
+            self._returned_at[connection] = self._clock()
+
+    def check_connection(self, connection: psycopg.Connection) -> None:
+        """Check a connection being checked out of the pool, unless it is known to work.
+        Raises if the connection is broken, so that the pool replaces it.
+        """
+        if self.settings.check_interval > 0:
+            with self._lock:
+                known_good_at = max(
+                    self._returned_at.get(connection, 0.0), self._last_check_at
+                )
+            if self._clock() - known_good_at < self.settings.check_interval:
+                return
+        ConnectionPool.check_connection(connection)
+
+    def run(self) -> None:
+        """Check the idle connections if they are due, and keep the warm spares open"""
+        start = self._clock()
+        with self._lock:
+            # Also when the run fails, run again at the next interval
+            self._next_run_at = start + (
+                self.settings.check_interval or constants.DEFAULT_POOL_CHECK_INTERVAL_SECONDS
+            )
+            check_due = (
+                self.settings.check_interval > 0
+                and start - self._last_check_at >= self.settings.check_interval
+            )
+        pool = self.pool
+        if pool is None or pool.closed:
+            return
+        if check_due:
+            pool.check()
+            with self._lock:
+                self._last_check_at = start
+        self._keep_warm_spares(pool)
+
+    def _keep_warm_spares(self, pool: ConnectionPool) -> None:
+        """Resize the pool so that it keeps the warm spares open.
+        Raising min_size opens as many connections as it is raised by.
+        """
+        stats = pool.get_stats()
+        pool_size = stats.get("pool_size", 0)
+        idle_count = stats.get("pool_available", 0)
+        missing = min(self.settings.warm_spares - idle_count, pool.max_size - pool_size)
+        if missing > 0:
+            pool.resize(min(pool.min_size + missing, pool.max_size), pool.max_size)
+        elif idle_count > self.settings.warm_spares and pool.min_size > 0:
+            # Let the pool close the idle connections beyond the spares once they expire
+            excess = idle_count - self.settings.warm_spares
+            pool.resize(max(pool.min_size - excess, 0), pool.max_size)
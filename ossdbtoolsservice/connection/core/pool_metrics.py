@@ -0,0 +1,176 @@
+# --------------------------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for license information.
+# --------------------------------------------------------------------------------------------
+
+import math
+import threading
+import time
+from collections import deque
+from collections.abc import Callable, Sequence
+from typing import Any
+
+from ossdbtoolsservice.connection.contracts.common import ConnectionPriority
+from ossdbtoolsservice.connection.core.session_state import DISCARD_ALL
+
+# Number of recent samples the wait time and checkout duration percentiles are taken from
+SAMPLE_COUNT = 1000
+
+
+class PoolMetrics:
+    """Instrumentation of the checkouts of a connection pool.
+
+    psycopg_pool reports the size and usage of a pool, but not how long each checkout
+    waited for a connection or held it, which tells pool exhaustion from slow queries.
+    """
+
+    def __init__(self, clock: Callable[[], float] = time.monotonic) -> None:
+        self._lock = threading.Lock()
+        self._clock = clock
+        self._created = clock()
+        self._wait_times_ms: deque[float] = deque(maxlen=SAMPLE_COUNT)
+        self._checkout_durations_ms: deque[float] = deque(maxlen=SAMPLE_COUNT)
+        # Wait times and timeouts since they were last taken by the pool sizing
+        self._recent_wait_times_ms: deque[float] = deque(maxlen=SAMPLE_COUNT)
+        self._recent_checkout_timeouts = 0
+        # Checkout times of the connections that are out of the pool, by connection id
+        self._checkout_times: dict[int, float] = {}
+        self.requests_waiting = 0
+        self.checkout_count = 0
+        self.checkout_timeouts = 0
+        self.connection_errors = 0
+        # Resets of the connections returned to the pool: skipped when the session state
+        # was untouched, partial when only some of it changed, or DISCARD ALL.
+        self.reset_count = 0
+        self.reset_skipped_count = 0
+        self.discard_all_count = 0
+        # Checkouts, timeouts and wait times of each priority class
+        self._lane_checkout_counts: dict[ConnectionPriority, int] = {}
+        self._lane_checkout_timeouts: dict[ConnectionPriority, int] = {}
+        self._lane_wait_times_ms: dict[ConnectionPriority, deque[float]] = {}
+
+    def start_wait(self) -> float:
+        """Record a request waiting for a connection. Returns the start of the wait."""
+        with self._lock:
+            self.requests_waiting += 1
+        return self._clock()
+
+    def end_wait(
+        self,
+        wait_start: float,
+        connection: object | None,
+        priority: ConnectionPriority | None = None,
+    ) -> None:
+        """Record the end of a wait, with the connection that was checked out,
+        or None if the wait timed out. The wait is also recorded for its priority class,
+        if it has one.
+        """
+        now = self._clock()
+        wait_time_ms = (now - wait_start) * 1000
+        with self._lock:
+            self.requests_waiting -= 1
+            if connection is None:
+                self.checkout_timeouts += 1
+                self._recent_checkout_timeouts += 1
+                if priority is not None:
+                    self._lane_checkout_timeouts[priority] = (
+                        self._lane_checkout_timeouts.get(priority, 0) + 1
+                    )
+                return
+            self.checkout_count += 1
+            self._wait_times_ms.append(wait_time_ms)
+            self._recent_wait_times_ms.append(wait_time_ms)
+            self._checkout_times[id(connection)] = now
+            if priority is not None:
+                self._lane_checkout_counts[priority] = (
+                    self._lane_checkout_counts.get(priority, 0) + 1
+                )
+                self._lane_wait_times_ms.setdefault(
+                    priority, deque(maxlen=SAMPLE_COUNT)
+                ).append(wait_time_ms)
+
+    def cancel_wait(self) -> None:
+        """Record the end of a wait that failed for another reason than a timeout"""
+        with self._lock:
+            self.requests_waiting -= 1
+
+    def take_recent_waits(self) -> tuple[list[float], int]:
+        """Get the wait times and the number of timeouts of the checkouts
+        since the last call
+        """
+        with self._lock:
+            wait_times_ms = list(self._recent_wait_times_ms)
+            timeouts = self._recent_checkout_timeouts
+            self._recent_wait_times_ms.clear()
+            self._recent_checkout_timeouts = 0
+            return wait_times_ms, timeouts
+
+    def record_return(self, connection: object) -> None:
+        """Record a connection going back into the pool"""
+        now = self._clock()
+        with self._lock:
+            checkout_time = self._checkout_times.pop(id(connection), None)
+            if checkout_time is not None:
+                self._checkout_durations_ms.append((now - checkout_time) * 1000)
+
+    def record_reset(self, reset_statement: str | None) -> None:
+        """Record the reset of a connection, with the statement that reset it,
+        or None if it needed none
+        """
+        with self._lock:
+            self.reset_count += 1
+            if reset_statement is None:
+                self.reset_skipped_count += 1
+            elif reset_statement == DISCARD_ALL:
+                self.discard_all_count += 1
+
+    def record_connection_error(self) -> None:
+        with self._lock:
+            self.connection_errors += 1
+
+    def get_lane_stats(self, priority: ConnectionPriority) -> dict[str, Any]:
+        """Get the checkouts, timeouts and wait times of a priority class"""
+        with self._lock:
+            wait_times_ms = sorted(self._lane_wait_times_ms.get(priority, []))
+            return {
+                "checkout_count": self._lane_checkout_counts.get(priority, 0),
+                "checkout_timeouts": self._lane_checkout_timeouts.get(priority, 0),
+                "wait_time_p50_ms": percentile(wait_times_ms, 50),
+                "wait_time_p95_ms": percentile(wait_times_ms, 95),
+                "wait_time_p99_ms": percentile(wait_times_ms, 99),
+            }
+
+    def get_stats(self) -> dict[str, Any]:
+        elapsed_hours = (self._clock() - self._created) / 3600
+        with self._lock:
+            wait_times_ms = sorted(self._wait_times_ms)
+            checkout_durations_ms = sorted(self._checkout_durations_ms)
+            return {
+                "requests_waiting": self.requests_waiting,
+                "checkout_count": self.checkout_count,
+                "checkout_timeouts": self.checkout_timeouts,
+                "connection_errors": self.connection_errors,
+                "reset_count": self.reset_count,
+                "reset_skipped_count": self.reset_skipped_count,
+                "discard_all_count": self.discard_all_count,
+                # Each skipped reset saves the round trip of a DISCARD ALL
+                "reset_round_trips_saved_per_hour": self.reset_skipped_count / elapsed_hours
+                if elapsed_hours > 0
+                else 0.0,
+                "wait_time_p50_ms": percentile(wait_times_ms, 50),
+                "wait_time_p95_ms": percentile(wait_times_ms, 95),
+                "wait_time_p99_ms": percentile(wait_times_ms, 99),
+                "checkout_duration_p50_ms": percentile(checkout_durations_ms, 50),
+                "checkout_duration_p95_ms": percentile(checkout_durations_ms, 95),
+                "checkout_duration_max_ms": checkout_durations_ms[-1]
+                if checkout_durations_ms
+                else 0.0,
+            }
+
+
+def percentile(sorted_values: Sequence[float], percent: float) -> float:
+    """Get the nearest-rank percentile of sorted values, 0 if there are none"""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(len(sorted_values) * percent / 100))
+    return sorted_values[rank - 1]
@@ -0,0 +1,207 @@
+# --------------------------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for license information.
+# --------------------------------------------------------------------------------------------
+
+import logging
+import threading
+import time
+from collections.abc import Callable
+from dataclasses import dataclass
+from typing import Any
+
+from psycopg_pool import ConnectionPool
+
+from ossdbtoolsservice.connection.core.pool_lanes import PoolLanes
+from ossdbtoolsservice.connection.core.pool_metrics import PoolMetrics, percentile
+from ossdbtoolsservice.utils import constants
+from ossdbtoolsservice.workspace.contracts.configuration import Configuration
+
+# Seconds between the sizing decisions of a pool
+POOL_SIZING_INTERVAL_SECONDS = 5
+
+
+@dataclass
+class PoolSizingSettings:
+    """Settings of the adaptive sizing of a connection pool.
+
+    Args:
+        max_size: Most connections a pool grows to while its checkouts wait. The pool
+            is not sized adaptively unless this is above its configured size.
+        grow_wait_threshold_ms: Wait time of the checkouts, at the 95th percentile,
+            at which the pool grows.
+        shrink_cooldown: Seconds without waits at the threshold after which the pool
+            shrinks back to its configured size.
+        global_max_connections: Most connections the pools can grow to together,
+            0 for no limit.
+    """
+
+    max_size: int = constants.DEFAULT_POOL_ADAPTIVE_MAX_CONNECTIONS
+    grow_wait_threshold_ms: float = constants.DEFAULT_POOL_GROW_WAIT_THRESHOLD_MS
+    shrink_cooldown: float = constants.DEFAULT_POOL_SHRINK_COOLDOWN_SECONDS
+    global_max_connections: int = constants.DEFAULT_POOL_GLOBAL_MAX_CONNECTIONS
+
+    @classmethod
+    def from_config(cls, config: Configuration) -> "PoolSizingSettings":
+        return cls(
+            max_size=config.pgsql.pool_adaptive_max_connections,
+            grow_wait_threshold_ms=config.pgsql.pool_grow_wait_threshold_ms,
+            shrink_cooldown=config.pgsql.pool_shrink_cooldown_seconds,
+            global_max_connections=config.pgsql.pool_global_max_connections,
+        )
+
+
+class ConnectionBudget:
+    """The connections that the pools of the process can hold together,
+    counted as the sum of their max sizes.
+
+    A pool always gets its configured size, so that connecting does not fail on the
+    budget. It only grows beyond that size with the connections the budget has left.
+    """
+
+    def __init__(
+        self, max_connections: int = constants.DEFAULT_POOL_GLOBAL_MAX_CONNECTIONS
+    ) -> None:
+        self.max_connections = max_connections
+        self._lock = threading.Lock()
+        self._pool_sizes: dict[object, int] = {}
+
+    def add_pool(self, key: object, size: int) -> None:
+        with self._lock:
+            self._pool_sizes[key] = size
+
+    def remove_pool(self, key: object) -> None:
+        with self._lock:
+            self._pool_sizes.pop(key, None)
+
+    def resize_pool(self, key: object, size: int) -> int:
+        """Resize a pool, growing it no further than the budget allows.
+        Returns the size granted.
+        """
+        with self._lock:
+            current = self._pool_sizes.get(key, 0)
+            if size > current and self.max_connections > 0:
+                available = max(self.max_connections - sum(self._pool_sizes.values()), 0)
+                size = min(size, current + available)
+            self._pool_sizes[key] = size
+            return size
+
+    def get_stats(self) -> dict[str, Any]:
+        with self._lock:
+            return {
+                "max_connections": self.max_connections,
+                "reserved_connections": sum(self._pool_sizes.values()),
+                "pool_count": len(self._pool_sizes),
+            }
+
+
+class PoolSizer:
+    """Adaptive sizing of a connection pool, run by the maintenance thread.
+
+    The pool grows toward the max size of the settings while its checkouts wait
+    at the threshold, and shrinks back to its configured size once they have not
+    for the cool-down. Shrinking lowers the max size of the pool, which then closes
+    the idle connections beyond it as they exceed the max idle time.
+
+    Args:
+        settings: The sizing settings.
+        base_size: The configured size of the pool, which it never shrinks below.
+        metrics: The checkout metrics of the pool.
+        budget: The connection budget shared by the pools of the process.
+    """
+
+    def __init__(
+        self,
+        settings: PoolSizingSettings,
+        base_size: int,
+        metrics: PoolMetrics,
+        budget: ConnectionBudget,
+        clock: Callable[[], float] = time.monotonic,
+        logger: logging.Logger | None = None,
+    ) -> None:
+        self.settings = settings
+        self.pool: ConnectionPool | None = None
+        self.lanes: PoolLanes | None = None
+        self._base_size = base_size
+        self._metrics = metrics
+        self._budget = budget
+        self._clock = clock
+        self._logger = logger or logging.getLogger(__name__)
+        self._lock = threading.Lock()
+        self._next_run_at = clock()
+        self._last_pressure_at = self._next_run_at
+        self._budget_exhausted = False
+        budget.add_pool(self, base_size)
+
+    @property
+    def next_run_at(self) -> float:
+        with self._lock:
+            return self._next_run_at
+
+    def run(self) -> None:
+        """Grow the pool if its recent checkouts waited, or shrink it after the cool-down"""
+        now = self._clock()
+        with self._lock:
+            self._next_run_at = now + POOL_SIZING_INTERVAL_SECONDS
+        pool = self.pool
+        if pool is None or pool.closed:
+            return
+        wait_times_ms, timeouts = self._metrics.take_recent_waits()
+        wait_time_p95_ms = percentile(sorted(wait_times_ms), 95)
+        if timeouts or (
+            wait_times_ms and wait_time_p95_ms >= self.settings.grow_wait_threshold_ms
+        ):
+            self._last_pressure_at = now
+            self._grow(
+                pool,
+                f"checkout wait time p95 {wait_time_p95_ms:.0f} ms, {timeouts} timeouts",
+            )
+        elif now - self._last_pressure_at >= self.settings.shrink_cooldown:
+            self._shrink(pool)
+
+    def close(self) -> None:
+        """Give the connections of the pool back to the budget"""
+        self._budget.remove_pool(self)
+
+    def _grow(self, pool: ConnectionPool, reason: str) -> None:
+        max_size = pool.max_size
+        target = min(max_size + max(1, max_size // 2), self.settings.max_size)
+        if target <= max_size:
+            return
+        granted = self._budget.resize_pool(self, target)
+        if granted <= max_size:
+            if not self._budget_exhausted:
+                self._logger.warning(
+                    f"Not growing connection pool {pool.name} beyond {max_size} connections "
+                    f"({reason}): the global budget of {self._budget.max_connections} "
+                    "connections is used up"
+                )
+            self._budget_exhausted = True
+            return
+        self._budget_exhausted = False
+        self._resize(pool, granted, reason)
+
+    def _shrink(self, pool: ConnectionPool) -> None:
+        max_size = pool.max_size
+        stats = pool.get_stats()
+        in_use = stats.get("pool_size", 0) - stats.get("pool_available", 0)
+        target = max(self._base_size, in_use)
+        if target >= max_size:
+            return
+        self._budget.resize_pool(self, target)
+        self._budget_exhausted = False
+        self._resize(
+            pool,
+            target,
+            f"no checkout waited {self.settings.grow_wait_threshold_ms:.0f} ms "
+            f"in the last {self.settings.shrink_cooldown:.0f} seconds",
+        )
+
+    def _resize(self, pool: ConnectionPool, max_size: int, reason: str) -> None:
+        self._logger.info(
+            f"Resizing connection pool {pool.name} from {pool.max_size} "
+            f"to {max_size} max connections: {reason}"
+        )
+        pool.resize(min(pool.min_size, max_size), max_size)
+        if self.lanes is not None:
+            self.lanes.resize(max_size)
@@ -0,0 +1,183 @@
+# --------------------------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for license information.
+# --------------------------------------------------------------------------------------------
+
+import logging
+import threading
+import time
+from collections.abc import Callable
+from typing import Any
+
+from psycopg_pool import ConnectionPool
+
+from ossdbtoolsservice.connection.contracts import ConnectionDetails
+
+# Seconds between the checks of the replication lag of a replica
+REPLICA_CHECK_INTERVAL_SECONDS = 10
+
+# Whether the server is a replica, and its replication lag in seconds.
+# A replica that replayed all the WAL it received is not lagging,
+# however long ago the last transaction on the primary was.
+REPLICA_LAG_QUERY = """
+SELECT
+    pg_is_in_recovery(),
+    CASE
+        WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp())
+    END
+"""
+
+
+class ReplicaPool:
+    """A read replica of a server, and the connection pool to it once it was used"""
+
+    def __init__(self, details: ConnectionDetails) -> None:
+        self.details = details
+        self.pool: ConnectionPool | None = None
+        # Replicas are not used until a check finds them in recovery and caught up
+        self.usable = False
+        self.lag_seconds: float | None = None
+        self.checked_at: float | None = None
+        self.checking = False
+
+
+class ReplicaRouter:
+    """Routes the read-only traffic of a pool to the read replicas of its server.
+
+    Replicas are checked in the background, so that the request path does not wait
+    on a replica that is down. A replica is used while it is in recovery and its
+    replication lag is below the maximum. Otherwise read-only traffic goes to the
+    primary, as it does until the first check of a replica completes.
+
+    Args:
+        replicas: The connection details of the replicas, in order of preference.
+        max_lag_seconds: The replication lag beyond which a replica is not used.
+        create_pool: A function to create and open the pool of a replica.
+    """
+
+    def __init__(
+        self,
+        replicas: list[ConnectionDetails],
+        max_lag_seconds: float,
+        create_pool: Callable[[ConnectionDetails], ConnectionPool],
+        check_interval: float = REPLICA_CHECK_INTERVAL_SECONDS,
+        clock: Callable[[], float] = time.monotonic,
+        logger: logging.Logger | None = None,
+    ) -> None:
+        self.replicas = [ReplicaPool(details) for details in replicas]
+        self._max_lag_seconds = max_lag_seconds
+        self._create_pool = create_pool
+        self._check_interval = check_interval
+        self._clock = clock
+        self._logger = logger or logging.getLogger(__name__)
+        self._lock = threading.Lock()
+        self._closed = False
+        self.replica_checkout_count = 0
+        self.primary_fallback_count = 0
+
+    def get_replica(self) -> ReplicaPool | None:
+        """Get a usable replica, or None to use the primary.
+        Starts the checks of the replicas that are due.
+        """
+        now = self._clock()
+        replica_to_use = None
+        with self._lock:
+            if self._closed:
+                return None
+            for replica in self.replicas:
+                if not replica.checking and (
+                    replica.checked_at is None
+                    or now - replica.checked_at >= self._check_interval
+                ):
+                    replica.checking = True
+                    threading.Thread(
+                        target=self.check_replica,
+                        args=(replica,),
+                        name="ReplicaLagCheck",
+                        daemon=True,
+                    ).start()
+                if replica_to_use is None and replica.usable and replica.pool is not None:
+                    replica_to_use = replica
+            if replica_to_use is not None:
+                self.replica_checkout_count += 1
+            else:
+                self.primary_fallback_count += 1
+        return replica_to_use
+
+    def check_replica(self, replica: ReplicaPool) -> None:
+        """Check that the replica is reachable, in recovery and caught up"""
+        usable = False
+        lag_seconds = None
+        try:
+            pool = replica.pool
+            if pool is None:
+                pool = self._create_pool(replica.details)
+                with self._lock:
+                    if self._closed:
+                        pool.close()
+                        return
+                    replica.pool = pool
+            with pool.connection() as conn:
+                conn.autocommit = True
+                row = conn.execute(REPLICA_LAG_QUERY).fetchone()
+            if row is not None:
+                in_recovery, lag = row
+                lag_seconds = float(lag) if lag is not None else None
+                usable = (
+                    bool(in_recovery)
+                    and lag_seconds is not None
+                    and lag_seconds <= self._max_lag_seconds
+                )
+        except Exception as e:
+            self._logger.warning(
+                f"Could not check replica {replica.details.server_name}: {e}"
+            )
+        finally:
+            self._set_state(replica, usable, lag_seconds)
+
+    def mark_failed(self, replica: ReplicaPool, error: Exception) -> None:
+        """Stop using a replica that a connection could not be checked out of,
+        until its next check
+        """
+        self._logger.warning(
+            f"Could not get a connection to replica {replica.details.server_name}, "
+            f"using the primary: {error}"
+        )
+        self._set_state(replica, False, replica.lag_seconds)
+
+    def get_stats(self) -> dict[str, Any]:
+        with self._lock:
+            return {
+                "replica_checkout_count": self.replica_checkout_count,
+                "primary_fallback_count": self.primary_fallback_count,
+                "usable_replica_count": sum(1 for r in self.replicas if r.usable),
+            }
+
+    def close(self) -> list[ConnectionDetails]:
+        """Close the pools of the replicas, and return the details of the closed pools"""
+        with self._lock:
+            self._closed = True
+            opened = [(r.details, r.pool) for r in self.replicas if r.pool is not None]
+            for replica in self.replicas:
+                replica.pool = None
+                replica.usable = False
+        for _, pool in opened:
+            pool.close()
+        return [details for details, _ in opened]
+
+    def _set_state(
+        self, replica: ReplicaPool, usable: bool, lag_seconds: float | None
+    ) -> None:
+        with self._lock:
+            was_usable = replica.usable
+            replica.usable = usable
+            replica.lag_seconds = lag_seconds
+            replica.checked_at = self._clock()
+            replica.checking = False
+        if usable != was_usable:
+            state = "using" if usable else "not using"
+            self._logger.info(
+                f"Now {state} replica {replica.details.server_name} "
+                f"for read-only traffic, replication lag: {lag_seconds} seconds"
+            )
@@ -2,7 +2,8 @@
 # Copyright (c) Microsoft Corporation. All rights reserved.
 # Licensed under the MIT License. See License.txt in the project root for license information.
 # --------------------------------------------------------------------------------------------
-from collections.abc import Mapping, Sequence
+import contextlib
+from collections.abc import Iterator, Mapping, Sequence
 from typing import Any, Union
 
 import psycopg
@@ -11,6 +12,16 @@ from psycopg import Column
 from psycopg.pq import TransactionStatus
 from psycopg_pool import ConnectionPool
 
+from ossdbtoolsservice.connection.contracts.common import BackgroundQueryCategory
+from ossdbtoolsservice.connection.core.notice_router import NoticeRouter, get_notice_router
+from ossdbtoolsservice.connection.core.session_state import (
+    SessionStateChange,
+    SessionStateTracker,
+    SessionTrackingCursor,
+    SessionTrackingServerCursor,
+    get_reset_statement,
+)
+from ossdbtoolsservice.connection.core.statement_timeouts import get_statement_timeouts
 from ossdbtoolsservice.utils import constants
 from ossdbtoolsservice.utils.sql import as_sql
 
@@ -56,6 +67,10 @@ class ServerConnection:
         # Set initial transaction is not from user
         self._user_transaction = False
 
+        # Session state changed by the statements run since the connection was checked out,
+        # so that reset only undoes what changed
+        self._session_state = SessionStateTracker()
+
         # Get the DSN parameters for the connection as a dict
         self._dsn_parameters = self._conn.info.get_parameters()
 
@@ -81,6 +96,11 @@ class ServerConnection:
         """
         self._conn.autocommit = mode
 
+    @property
+    def pool(self) -> ConnectionPool | None:
+        """Returns the pool this connection was checked out of, if any"""
+        return self._pool
+
     @property
     def host_name(self) -> str:
         """Returns the hostname for the current connection"""
@@ -154,6 +174,11 @@ class ServerConnection:
         """Returns the underlying connection"""
         return self._conn
 
+    @property
+    def notice_router(self) -> NoticeRouter:
+        """Returns the router that dispatches the notices of the underlying connection"""
+        return get_notice_router(self._conn)
+
     @property
     def open(self) -> bool:
         """Returns bool indicating if connection is open"""
@@ -174,6 +199,14 @@ class ServerConnection:
         """
         self._conn.rollback()
 
+    def transaction(self) -> psycopg.Transaction:
+        """
+        Returns a context manager that commits the statements executed in its block
+        together, or rolls them all back if the block raises.
+        Inside an open transaction, the block runs in a savepoint instead.
+        """
+        return self._conn.transaction()
+
     def cursor(self, **kwargs: Any) -> psycopg.ClientCursor[tuple[Any, ...]]:
         """
         Returns a client cursor for the current connection.
@@ -183,11 +216,26 @@ class ServerConnection:
         # TODO: kwargs are ignored. Do we need named cursors? They were not implemented here.
         # SelectBatch.get_cursor asks for a named cursor.
         if isinstance(self._conn, psycopg.Connection):
-            return psycopg.ClientCursor(self._conn)
+            return SessionTrackingCursor(self._conn, self._session_state)
         else:
             # Handle Mocks for testing. TODO
+            # Statements are not tracked, reset falls back to DISCARD ALL.
+            self._session_state.add(SessionStateChange.UNKNOWN)
             return self._conn.cursor()
 
+    def server_cursor(self, name: str) -> psycopg.ServerCursor[tuple[Any, ...]]:
+        """
+        Returns a server-side cursor, which fetches the rows of its query in chunks
+        as they are read. It only lives until the end of the transaction it runs in.
+        :param name: the name of the cursor on the server
+        """
+        if isinstance(self._conn, psycopg.Connection):
+            return SessionTrackingServerCursor(self._conn, name, self._session_state)
+        else:
+            # Handle Mocks for testing.
+            self._session_state.add(SessionStateChange.UNKNOWN)
+            return self._conn.cursor(name=name)
+
     def execute_query(
         self, query: str, all: bool = True
     ) -> list[tuple[Any, ...]] | tuple[Any, ...] | None:
@@ -232,7 +280,10 @@ class ServerConnection:
             return query_results
 
     def execute_dict(
-        self, query: str, params: Params | None = None
+        self,
+        query: str,
+        params: Params | None = None,
+        category: BackgroundQueryCategory | None = None,
     ) -> tuple[list[Column], list[dict[str, Any]]]:
         """
         Executes a query and returns the results as an ordered
@@ -241,9 +292,12 @@ class ServerConnection:
         :param conn: The connection to use to execute the query
         :param query: The text of the query to execute
         :param params: Optional parameters to inject into the query
+        :param category: The category whose timeouts the query runs under, in a
+            transaction of its own. None to run the query under the timeouts of the
+            operation it is part of, if any, as the object model does.
         :return: A list of column objects and a list of rows, which are formatted as dicts.
         """
-        with self.cursor() as cur:
+        with self.statement_timeouts(category), self.cursor() as cur:
             query_sql = as_sql(query)
             cur.execute(query_sql, params)
 
@@ -259,6 +313,19 @@ class ServerConnection:
             else:
                 return cols or [], rows
 
+    @contextlib.contextmanager
+    def statement_timeouts(self, category: BackgroundQueryCategory | None) -> Iterator[None]:
+        """
+        Runs the statements of the block under the statement and lock timeouts
+        of the category, in a transaction of their own
+        """
+        if category is None or not isinstance(self._conn, psycopg.Connection):
+            # Mocks for testing run without timeouts
+            yield
+            return
+        with get_statement_timeouts().apply(self._conn, category):
+            yield
+
     def execute_2darray(self, query: str, params: Params | None = None) -> dict[str, Any]:
         with self.cursor() as cur:
             query_sql = as_sql(query)
@@ -322,18 +389,25 @@ class ServerConnection:
         else:
             return "An unspecified database error occurred."
 
-    def reset(self) -> None:
+    def reset(self) -> str | None:
         """
         Resets the connection to a clean state.
+        Only the session state changed since the last reset is reset, which saves
+        a round trip when nothing changed. Falls back to DISCARD ALL when unsure.
+        :returns: the statement that reset the connection, None if none was needed
         """
         # Reset the connection to a clean state
         if self.transaction_in_trans:
             # Rollback the transaction if it is in progress
             self.rollback()
         self.autocommit = True
-        with self.cursor() as cur:
-            # Reset the connection to a clean state
-            cur.execute("DISCARD ALL")
+        reset_statement = get_reset_statement(self._session_state.changes)
+        if reset_statement is not None:
+            with self.cursor() as cur:
+                # Reset the connection to a clean state
+                cur.execute(as_sql(reset_statement))
+        self._session_state.clear()
+        return reset_statement
 
     def close(self) -> None:
         """
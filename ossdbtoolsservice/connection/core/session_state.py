@@ -0,0 +1,182 @@
+# --------------------------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for license information.
+# --------------------------------------------------------------------------------------------
+
+import enum
+import re
+import threading
+from collections.abc import Iterable
+from typing import Any
+
+import psycopg
+from psycopg import sql
+from psycopg.abc import Params, Query
+
+# Resets everything a session can hold. Cannot run in a transaction block.
+DISCARD_ALL = "DISCARD ALL"
+
+
+class SessionStateChange(enum.Flag):
+    """Kinds of session state that statements can leave behind on a connection"""
+
+    NONE = 0
+    SETTINGS = enum.auto()
+    TEMP_TABLES = enum.auto()
+    LISTEN = enum.auto()
+    PREPARED_STATEMENTS = enum.auto()
+    CURSORS = enum.auto()
+    ADVISORY_LOCKS = enum.auto()
+    SEQUENCES = enum.auto()
+    # A statement that can change any session state, such as a DO block
+    UNKNOWN = enum.auto()
+
+
+# Statements that undo each kind of change, in the order DISCARD ALL runs them
+_RESET_STATEMENTS = {
+    SessionStateChange.CURSORS: "CLOSE ALL",
+    SessionStateChange.SETTINGS: "SET SESSION AUTHORIZATION DEFAULT; RESET ALL",
+    SessionStateChange.PREPARED_STATEMENTS: "DEALLOCATE ALL",
+    SessionStateChange.LISTEN: "UNLISTEN *",
+    SessionStateChange.ADVISORY_LOCKS: "SELECT pg_advisory_unlock_all()",
+    SessionStateChange.TEMP_TABLES: "DISCARD TEMP",
+    SessionStateChange.SEQUENCES: "DISCARD SEQUENCES",
+}
+
+# Start of a statement: the start of the text or a semicolon, then whitespace and comments
+_STATEMENT_START = r"(?:^|;)(?:\s+|--[^\n]*(?:\n|$)|/\*.*?\*/)*"
+
+_CHANGE_PATTERNS = [
+    (
+        SessionStateChange.SETTINGS,
+        # SET LOCAL, SET TRANSACTION and SET CONSTRAINTS end with the transaction
+        _STATEMENT_START + r"SET\b(?!\s+(?:LOCAL|TRANSACTION|CONSTRAINTS)\b)"
+        r"|\bset_config\s*\(",
+    ),
+    (SessionStateChange.TEMP_TABLES, r"\bTEMP(?:ORARY)?\b|\bpg_temp\b"),
+    (SessionStateChange.LISTEN, _STATEMENT_START + r"LISTEN\b"),
+    (
+        SessionStateChange.PREPARED_STATEMENTS,
+        _STATEMENT_START + r"PREPARE\b(?!\s+TRANSACTION\b)",
+    ),
+    (SessionStateChange.CURSORS, _STATEMENT_START + r"DECLARE\b"),
+    (
+        SessionStateChange.ADVISORY_LOCKS,
+        r"\bpg_(?:try_)?advisory_lock(?:_shared)?\s*\(",
+    ),
+    (SessionStateChange.SEQUENCES, r"\b(?:nextval|setval)\s*\("),
+    (SessionStateChange.UNKNOWN, _STATEMENT_START + r"(?:DO|CALL|LOAD)\b"),
+]
+
+_CHANGE_REGEXES = [
+    (change, re.compile(pattern, re.IGNORECASE | re.DOTALL))
+    for change, pattern in _CHANGE_PATTERNS
+]
+
+
+def get_session_state_changes(query: str) -> SessionStateChange:
+    """Get the kinds of session state the statements of a query can change.
+
+    Matches are made on the text of the query, so a keyword in a string literal or
+    an identifier can report a change that did not happen. This only costs a reset.
+    """
+    changes = SessionStateChange.NONE
+    for change, regex in _CHANGE_REGEXES:
+        if regex.search(query):
+            changes |= change
+    return changes
+
+
+def get_reset_statement(changes: SessionStateChange) -> str | None:
+    """Get the statement that resets the given changes, or None if there are none.
+    Falls back to DISCARD ALL if a change is unknown.
+    """
+    if not changes:
+        return None
+    if SessionStateChange.UNKNOWN in changes:
+        return DISCARD_ALL
+    return "; ".join(
+        statement for change, statement in _RESET_STATEMENTS.items() if change in changes
+    )
+
+
+class SessionStateTracker:
+    """Tracks the session state changed by the statements run on a connection
+    since it was last reset.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._changes = SessionStateChange.NONE
+
+    @property
+    def changes(self) -> SessionStateChange:
+        return self._changes
+
+    def record(self, query: Query, context: psycopg.Connection | None = None) -> None:
+        """Record the changes of a query. Queries that cannot be read are unknown."""
+        try:
+            if isinstance(query, bytes):
+                query_text = query.decode()
+            elif isinstance(query, sql.Composable):
+                query_text = query.as_string(context)
+            else:
+                query_text = str(query)
+            changes = get_session_state_changes(query_text)
+        except Exception:
+            changes = SessionStateChange.UNKNOWN
+        self.add(changes)
+
+    def add(self, changes: SessionStateChange) -> None:
+        with self._lock:
+            self._changes |= changes
+
+    def clear(self) -> None:
+        with self._lock:
+            self._changes = SessionStateChange.NONE
+
+
+class SessionTrackingCursor(psycopg.ClientCursor[tuple[Any, ...]]):
+    """Client cursor that records the statements it runs in a SessionStateTracker"""
+
+    def __init__(self, connection: psycopg.Connection, tracker: SessionStateTracker) -> None:
+        super().__init__(connection)
+        self._tracker = tracker
+
+    def execute(
+        self,
+        query: Query,
+        params: Params | None = None,
+        *,
+        prepare: bool | None = None,
+        binary: bool | None = None,
+    ) -> "SessionTrackingCursor":
+        self._tracker.record(query, self.connection)
+        return super().execute(query, params, prepare=prepare, binary=binary)
+
+    def executemany(
+        self, query: Query, params_seq: Iterable[Params], *, returning: bool = False
+    ) -> None:
+        self._tracker.record(query, self.connection)
+        super().executemany(query, params_seq, returning=returning)
+
+
+class SessionTrackingServerCursor(psycopg.ServerCursor[tuple[Any, ...]]):
+    """Server-side cursor that records the queries it declares in a SessionStateTracker"""
+
+    def __init__(
+        self, connection: psycopg.Connection, name: str, tracker: SessionStateTracker
+    ) -> None:
+        super().__init__(connection, name)
+        self._tracker = tracker
+
+    def execute(
+        self,
+        query: Query,
+        params: Params | None = None,
+        *,
+        binary: bool | None = None,
+        **kwargs: Any,
+    ) -> "SessionTrackingServerCursor":
+        self._tracker.record(query, self.connection)
+        return super().execute(query, params, binary=binary, **kwargs)
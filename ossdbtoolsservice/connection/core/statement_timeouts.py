@@ -0,0 +1,168 @@
+# --------------------------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for license information.
+# --------------------------------------------------------------------------------------------
+
+import threading
+from collections.abc import Iterator, Mapping
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Any
+
+import psycopg
+from psycopg import errors
+from psycopg.pq import TransactionStatus
+
+from ossdbtoolsservice.connection.contracts.common import BackgroundQueryCategory
+from ossdbtoolsservice.utils import constants
+
+
+@dataclass
+class StatementTimeoutPolicy:
+    """Timeouts of the queries of a category, in milliseconds. 0 for no timeout."""
+
+    statement_timeout_ms: int
+    lock_timeout_ms: int
+
+
+def get_default_policies() -> dict[BackgroundQueryCategory, StatementTimeoutPolicy]:
+    return {
+        BackgroundQueryCategory.COMPLETION_METADATA: StatementTimeoutPolicy(
+            constants.DEFAULT_BACKGROUND_STATEMENT_TIMEOUT_MS,
+            constants.DEFAULT_BACKGROUND_LOCK_TIMEOUT_MS,
+        ),
+        BackgroundQueryCategory.CATALOG: StatementTimeoutPolicy(
+            constants.DEFAULT_BACKGROUND_STATEMENT_TIMEOUT_MS,
+            constants.DEFAULT_BACKGROUND_LOCK_TIMEOUT_MS,
+        ),
+        BackgroundQueryCategory.SCHEMA_EDITOR: StatementTimeoutPolicy(
+            constants.DEFAULT_SCHEMA_STATEMENT_TIMEOUT_MS,
+            constants.DEFAULT_BACKGROUND_LOCK_TIMEOUT_MS,
+        ),
+        BackgroundQueryCategory.CHAT_SCHEMA: StatementTimeoutPolicy(
+            constants.DEFAULT_SCHEMA_STATEMENT_TIMEOUT_MS,
+            constants.DEFAULT_BACKGROUND_LOCK_TIMEOUT_MS,
+        ),
+    }
+
+
+# Message of the QueryCanceled errors raised by statement_timeout. Cancels requested by
+# the user raise QueryCanceled as well, with "canceling statement due to user request".
+STATEMENT_TIMEOUT_MESSAGE = "canceling statement due to statement timeout"
+
+
+def is_statement_timeout_error(error: BaseException) -> bool:
+    """Whether the error is a statement timeout, rather than a cancel of the statement"""
+    if not isinstance(error, errors.QueryCanceled):
+        return False
+    message = error.diag.message_primary or str(error)
+    return STATEMENT_TIMEOUT_MESSAGE in message
+
+
+def is_timeout_error(error: BaseException) -> bool:
+    """Whether the error is a statement or lock timeout"""
+    return isinstance(error, errors.LockNotAvailable) or is_statement_timeout_error(error)
+
+
+class StatementTimeouts:
+    """Statement and lock timeouts of the catalog queries the service runs on its own behalf.
+
+    On a huge catalog, or behind DDL that locks it, such a query can hold a backend and
+    its locks for minutes. Each operation runs in a transaction that sets the timeouts
+    of its category with SET LOCAL, so that they end with the operation and leave no
+    session state behind. Operations on a connection that is already in a transaction
+    run without them, as they would last until the end of that transaction.
+
+    Timeouts are raised to the caller, which keeps what it got so far and tries
+    again later, and are counted by category.
+    """
+
+    def __init__(
+        self, policies: Mapping[BackgroundQueryCategory, StatementTimeoutPolicy] | None = None
+    ) -> None:
+        self._lock = threading.Lock()
+        self._policies = dict(policies or get_default_policies())
+        self._operation_counts: dict[BackgroundQueryCategory, int] = {}
+        self._statement_timeout_counts: dict[BackgroundQueryCategory, int] = {}
+        self._lock_timeout_counts: dict[BackgroundQueryCategory, int] = {}
+
+    def configure(self, timeouts: Mapping[str, Mapping[str, int]]) -> None:
+        """Set the timeouts of the categories, from the configuration.
+        Categories that are not given keep the default timeouts.
+
+        :raises ValueError: if a category or a timeout is not valid
+        """
+        policies = get_default_policies()
+        for category_name, policy in timeouts.items():
+            category = BackgroundQueryCategory(category_name)
+            default_policy = policies[category]
+            statement_timeout_ms = int(
+                policy.get("statementTimeoutMs", default_policy.statement_timeout_ms)
+            )
+            lock_timeout_ms = int(policy.get("lockTimeoutMs", default_policy.lock_timeout_ms))
+            if statement_timeout_ms < 0 or lock_timeout_ms < 0:
+                raise ValueError(f"Timeouts of {category} must not be negative")
+            policies[category] = StatementTimeoutPolicy(statement_timeout_ms, lock_timeout_ms)
+        with self._lock:
+            self._policies = policies
+
+    def get_policy(self, category: BackgroundQueryCategory) -> StatementTimeoutPolicy:
+        with self._lock:
+            return self._policies[category]
+
+    @contextmanager
+    def apply(
+        self, connection: psycopg.Connection, category: BackgroundQueryCategory
+    ) -> Iterator[None]:
+        """Run the statements of the block under the timeouts of the category"""
+        policy = self.get_policy(category)
+        with self._lock:
+            self._operation_counts[category] = self._operation_counts.get(category, 0) + 1
+        if connection.info.transaction_status != TransactionStatus.IDLE:
+            yield
+            return
+        try:
+            with connection.transaction():
+                connection.execute(
+                    f"SET LOCAL statement_timeout = {int(policy.statement_timeout_ms)}; "
+                    f"SET LOCAL lock_timeout = {int(policy.lock_timeout_ms)}"
+                )
+                yield
+        except errors.LockNotAvailable:
+            with self._lock:
+                self._lock_timeout_counts[category] = (
+                    self._lock_timeout_counts.get(category, 0) + 1
+                )
+            raise
+        except errors.QueryCanceled as e:
+            if is_statement_timeout_error(e):
+                with self._lock:
+                    self._statement_timeout_counts[category] = (
+                        self._statement_timeout_counts.get(category, 0) + 1
+                    )
+            raise
+
+    def get_stats(self) -> list[dict[str, Any]]:
+        """Get the timeouts and the number of operations and timeouts of each category"""
+        with self._lock:
+            return [
+                {
+                    "category": category,
+                    "statement_timeout_ms": policy.statement_timeout_ms,
+                    "lock_timeout_ms": policy.lock_timeout_ms,
+                    "operation_count": self._operation_counts.get(category, 0),
+                    "statement_timeout_count": self._statement_timeout_counts.get(
+                        category, 0
+                    ),
+                    "lock_timeout_count": self._lock_timeout_counts.get(category, 0),
+                }
+                for category, policy in self._policies.items()
+            ]
+
+
+_statement_timeouts = StatementTimeouts()
+
+
+def get_statement_timeouts() -> StatementTimeouts:
+    """Get the statement timeouts shared by all the connections of this process"""
+    return _statement_timeouts
@@ -8,6 +8,7 @@
 
 from ossdbtoolsservice.edit_data.edit_column_metadata import EditColumnMetadata
 from ossdbtoolsservice.edit_data.edit_table_metadata import EditTableMetadata
+from ossdbtoolsservice.edit_data.edit_table_metadata_cache import EditTableMetadataCache
 from ossdbtoolsservice.edit_data.smo_edit_table_metadata_factory import (
     SmoEditTableMetadataFactory,
 )
@@ -20,6 +21,7 @@ from ossdbtoolsservice.edit_data.data_editor_session import (
 __all__ = [
     "EditColumnMetadata",
     "EditTableMetadata",
+    "EditTableMetadataCache",
     "SmoEditTableMetadataFactory",
     "DataEditorSession",
     "DataEditSessionExecutionState",
@@ -0,0 +1,75 @@
+# --------------------------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for license information.
+# --------------------------------------------------------------------------------------------
+
+"""Parsing of blocks of rows pasted into an edit session"""
+
+import csv
+import io
+import re
+
+BULK_ROWS_FORMAT_TEXT = "text"
+BULK_ROWS_FORMAT_CSV = "csv"
+
+# Backslash sequences of the text format of COPY
+_TEXT_ESCAPES = {
+    "b": "\b",
+    "f": "\f",
+    "n": "\n",
+    "r": "\r",
+    "t": "\t",
+    "v": "\v",
+}
+_TEXT_ESCAPE_PATTERN = re.compile(r"\\(.)")
+_TEXT_NULL = "\\N"
+
+
+def parse_bulk_rows(
+    data: str, data_format: str | None = None, has_header: bool = False
+) -> list[list[str | None]]:
+    """Split a block of rows into their values, None for NULL.
+
+    In the text format of COPY, values are separated by tabs, \\N is NULL and backslash
+    escapes are decoded. In CSV, empty values are NULL, like unquoted empty values of COPY.
+
+    :raises ValueError: if the format is not supported or the CSV is malformed
+    """
+    data_format = data_format or BULK_ROWS_FORMAT_TEXT
+    if data_format == BULK_ROWS_FORMAT_TEXT:
+        rows = _parse_text_rows(data)
+    elif data_format == BULK_ROWS_FORMAT_CSV:
+        rows = _parse_csv_rows(data)
+    else:
+        raise ValueError(f"Unsupported row format: {data_format}")
+
+    return rows[1:] if has_header else rows
+
+
+def _parse_text_rows(data: str) -> list[list[str | None]]:
+    lines = data.split("\n")
+    if lines and lines[-1] == "":
+        lines.pop()
+    return [
+        [_unescape_text_value(value) for value in line.removesuffix("\r").split("\t")]
+        for line in lines
+    ]
+
+
+def _unescape_text_value(value: str) -> str | None:
+    if value == _TEXT_NULL:
+        return None
+    return _TEXT_ESCAPE_PATTERN.sub(
+        lambda match: _TEXT_ESCAPES.get(match.group(1), match.group(1)), value
+    )
+
+
+def _parse_csv_rows(data: str) -> list[list[str | None]]:
+    try:
+        return [
+            [value if value != "" else None for value in row]
+            for row in csv.reader(io.StringIO(data))
+            if row
+        ]
+    except csv.Error as error:
+        raise ValueError(f"Invalid CSV: {error}") from error
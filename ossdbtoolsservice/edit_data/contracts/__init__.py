@@ -27,6 +27,11 @@ from ossdbtoolsservice.edit_data.contracts.create_row_request import (
     CreateRowRequest,
     CreateRowResponse,
 )
+from ossdbtoolsservice.edit_data.contracts.bulk_create_rows_request import (
+    BULK_CREATE_ROWS_REQUEST,
+    BulkCreateRowsRequest,
+    BulkCreateRowsResponse,
+)
 from ossdbtoolsservice.edit_data.contracts.delete_row_request import (
     DELETE_ROW_REQUEST,
     DeleteRowRequest,
@@ -80,6 +85,9 @@ __all__ = [
     "CreateRowRequest",
     "CreateRowResponse",
     "CREATE_ROW_REQUEST",
+    "BulkCreateRowsRequest",
+    "BulkCreateRowsResponse",
+    "BULK_CREATE_ROWS_REQUEST",
     "DELETE_ROW_REQUEST",
     "DeleteRowRequest",
     "DeleteRowResponse",
@@ -0,0 +1,41 @@
+# --------------------------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for license information.
+# --------------------------------------------------------------------------------------------
+
+from ossdbtoolsservice.edit_data.contracts import SessionOperationRequest
+from ossdbtoolsservice.hosting import (
+    IncomingMessageConfiguration,
+    OutgoingMessageRegistration,
+)
+
+
+class BulkCreateRowsRequest(SessionOperationRequest):
+    """Adds a block of rows to the table of an edit session.
+    The rows are in the text format of COPY (tab separated, \\N for NULL) or in CSV,
+    with a value for each of column_names, or for each editable column if not given.
+    """
+
+    data: str | None
+    format: str | None
+    has_header: bool | None
+    column_names: list[str] | None
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.data = None
+        self.format = None
+        self.has_header = None
+        self.column_names = None
+
+
+class BulkCreateRowsResponse:
+    def __init__(self, first_row_id: int, row_count: int) -> None:
+        self.first_row_id = first_row_id
+        self.row_count = row_count
+
+
+BULK_CREATE_ROWS_REQUEST = IncomingMessageConfiguration(
+    "edit/bulkCreateRows", BulkCreateRowsRequest
+)
+OutgoingMessageRegistration.register_outgoing_message(BulkCreateRowsResponse)
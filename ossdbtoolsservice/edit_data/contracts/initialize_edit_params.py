@@ -24,6 +24,8 @@ class InitializeEditParams(Serializable):
     object_name: str | None
     query_string: str | None
     filters: EditInitializerFilter | None
+    # Number of rows to fetch at a time, to page through the table by its key
+    page_size: int | None
 
     @classmethod
     def get_child_serializable_types(cls) -> dict[str, type[EditInitializerFilter]]:
@@ -36,6 +38,7 @@ class InitializeEditParams(Serializable):
         self.object_name = None
         self.query_string = None
         self.filters = None
+        self.page_size = None
 
 
 INITIALIZE_EDIT_REQUEST = IncomingMessageConfiguration(
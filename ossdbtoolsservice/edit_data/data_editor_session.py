@@ -3,30 +3,39 @@
 # Licensed under the MIT License. See License.txt in the project root for license information.
 # --------------------------------------------------------------------------------------------
 
+import threading
+from collections.abc import Hashable, Sequence
 from typing import Callable, Dict, List, Optional, Tuple  # noqa
+
+import psycopg
 from psycopg import sql
-import threading
 
-from ossdbtoolsservice.edit_data.update_management import (
-    RowEdit,
-    RowUpdate,
-    EditScript,
-    RowCreate,
-    RowDelete,
-)  # noqa
-from ossdbtoolsservice.query import ExecutionState, ResultSet, Query  # noqa
+from ossdbtoolsservice.connection import ServerConnection
+from ossdbtoolsservice.edit_data import (
+    EditColumnMetadata,
+    EditTableMetadata,
+    SmoEditTableMetadataFactory,
+)
+from ossdbtoolsservice.edit_data.bulk_rows import parse_bulk_rows
 from ossdbtoolsservice.edit_data.contracts import (
+    CreateRowResponse,
+    EditCell,
     EditCellResponse,
-    InitializeEditParams,
     EditInitializerFilter,
-    RevertCellResponse,
-    CreateRowResponse,
     EditRow,
-    EditCell,
+    InitializeEditParams,
+    RevertCellResponse,
 )
-from ossdbtoolsservice.edit_data import SmoEditTableMetadataFactory, EditTableMetadata
-from ossdbtoolsservice.query.contracts import DbColumn, ResultSetSubset
-from ossdbtoolsservice.connection import ServerConnection
+from ossdbtoolsservice.edit_data.update_management import (
+    CellUpdate,
+    EditScript,
+    RowCreate,
+    RowDelete,
+    RowEdit,
+    RowUpdate,
+)  # noqa
+from ossdbtoolsservice.query import ExecutionState, Query, ResultSet  # noqa
+from ossdbtoolsservice.query.contracts import DbCellValue, DbColumn, ResultSetSubset
 from ossdbtoolsservice.utils import validate
 from ossdbtoolsservice.utils.sql import as_sql
 
@@ -42,21 +51,40 @@ class DataEditorSession:
     the edit session and handle the operations"""
 
     def __init__(self, metadata_factory: SmoEditTableMetadataFactory):
-        self._session_cache: dict[int, RowEdit] = {}
+        # Edits by row id, or by the key of the row for loaded rows of paged sessions
+        self._session_cache: dict[Hashable, RowEdit] = {}
         self._metadata_factory = metadata_factory
         self._last_row_id: int | None = None
         self._is_initialized = False
         self._commit_task: threading.Thread | None = None
+        # Held while the rows of the result set change: by commits for their whole
+        # transaction, and by page fetches
+        self._rows_lock = threading.Lock()
 
         self._result_set: ResultSet | None = None
         self._table_metadata: EditTableMetadata | None = None
 
+        # Paged sessions load the rows of the table by key, a page at a time
+        self._connection: ServerConnection | None = None
+        self._page_size: int | None = None
+        self._row_limit: int | None = None
+        self._keyset_column_indexes: list[int] = []
+        self._last_loaded_key: tuple | None = None
+        self._is_fully_loaded = True
+        # Keys of the rows that the session added, which later pages must not repeat
+        self._added_keys: set[tuple] = set()
+
     @property
     def table_metadata(self) -> EditTableMetadata:
         if self._table_metadata is None:
             raise RuntimeError("Edit session has not been initialized")
         return self._table_metadata
 
+    @property
+    def is_paged(self) -> bool:
+        """Whether the rows of the table are loaded by key, a page at a time"""
+        return self._page_size is not None
+
     def initialize(
         self,
         initialize_edit_params: InitializeEditParams,
@@ -83,10 +111,29 @@ class DataEditorSession:
             initialize_edit_params.object_type,
         )
 
+        self._connection = connection
+        filters = initialize_edit_params.filters
+        page_size = initialize_edit_params.page_size
+        keyset_columns = self.table_metadata.keyset_columns
+
+        if page_size is not None and page_size > 0 and keyset_columns:
+            self._page_size = page_size
+            if filters and filters.limit_results is not None and filters.limit_results > 0:
+                self._row_limit = filters.limit_results
+            self._keyset_column_indexes = [
+                self.table_metadata.columns_metadata.index(column)
+                for column in keyset_columns
+            ]
+            query, _ = self._construct_page_query(None, self._get_page_limit(0))
+            initialize_query = query.as_string(connection.connection)
+        else:
+            # Tables without a key are loaded in full
+            initialize_query = self._construct_initialize_query(
+                connection, self.table_metadata, filters
+            )
+
         query_executer(
-            self._construct_initialize_query(
-                connection, self.table_metadata, initialize_edit_params.filters
-            ),
+            initialize_query,
             self.table_metadata.db_columns,
             lambda execution_state: self.on_query_execution_complete(
                 execution_state, on_success, on_failure
@@ -113,6 +160,8 @@ class DataEditorSession:
             self._result_set.columns_info = self.table_metadata.db_columns
 
             self._last_row_id = self._result_set.row_count - 1
+            if self.is_paged:
+                self._on_page_loaded(self._get_page_limit(0), self._result_set.row_count)
             self._is_initialized = True
 
             on_success()
@@ -130,11 +179,12 @@ class DataEditorSession:
         if row_id > self._last_row_id or row_id < 0:
             raise IndexError(f"Parameter row_id with value {row_id} is out of range")
 
-        edit_row = self._session_cache.get(row_id)
+        cache_key = self._get_cache_key(row_id)
+        edit_row = self._session_cache.get(cache_key)
 
         if edit_row is None:
             edit_row = RowUpdate(row_id, self._result_set, self.table_metadata)
-            self._session_cache[row_id] = edit_row
+            self._session_cache[cache_key] = edit_row
 
         result = edit_row.set_cell_value(column_index, new_value)
 
@@ -164,7 +214,7 @@ class DataEditorSession:
             raise RuntimeError("Edit session has not been initialized")
 
         try:
-            self._session_cache.pop(row_id)
+            self._session_cache.pop(self._get_cache_key(row_id))
         except KeyError as error:
             raise KeyError(
                 "There is no edit pending for the row you selected. "
@@ -175,7 +225,7 @@ class DataEditorSession:
         if not self._is_initialized:
             raise RuntimeError("Edit session has not been initialized")
 
-        edit_row = self._session_cache.get(row_id)
+        edit_row = self._session_cache.get(self._get_cache_key(row_id))
 
         if edit_row is None:
             raise KeyError(
@@ -196,7 +246,7 @@ class DataEditorSession:
 
         row_delete = RowDelete(row_id, self._result_set, self.table_metadata)
 
-        self._session_cache[row_id] = row_delete
+        self._session_cache[self._get_cache_key(row_id)] = row_delete
 
     def create_row(self) -> CreateRowResponse:
         if not self._is_initialized:
@@ -228,10 +278,55 @@ class DataEditorSession:
 
         return CreateRowResponse(self._last_row_id, default_cell_values)
 
+    def bulk_create_rows(
+        self,
+        connection: ServerConnection,
+        data: str,
+        data_format: str | None,
+        has_header: bool,
+        column_names: list[str] | None,
+        success: Callable[[int, int], None],
+        failure: Callable[[str], None],
+    ) -> None:
+        """Validate a block of rows, then add them to the table in the background.
+        The rows are committed right away, rather than with the other edits of the session,
+        and success is called with the row id of the first new row and the number of rows.
+
+        :raises ValueError: if the rows do not match the columns of the table
+        """
+        if not self._is_initialized:
+            raise RuntimeError("Edit session has not been initialized")
+
+        if self._result_set is None:
+            raise RuntimeError("Edit session query has not been initialized")
+
+        validate.is_not_none("connection", connection)
+        validate.is_not_none("data", data)
+
+        if self._commit_task is not None and self._commit_task.is_alive() is True:
+            raise ValueError("Previous commit in progress")
+
+        # The new rows take the row ids after the current rows
+        if self._has_new_rows():
+            raise ValueError("Commit or revert the rows that were added before pasting rows")
+
+        columns = self._get_bulk_columns(column_names)
+        rows = self._get_bulk_values(columns, parse_bulk_rows(data, data_format, has_header))
+
+        thread = threading.Thread(
+            target=self._do_bulk_create, args=(connection, columns, rows, success, failure)
+        )
+        thread.daemon = True
+        self._commit_task = thread
+
+        thread.start()
+
     def get_rows(self, owner_uri: str, start_index: int, end_index: int) -> list[EditRow]:
         if self._result_set is None:
             return []
 
+        self._load_rows(end_index)
+
         if start_index <= self._result_set.row_count:
             subset = ResultSetSubset.from_result_set(self._result_set, start_index, end_index)
         else:
@@ -240,9 +335,9 @@ class DataEditorSession:
         edit_rows = []
         for index, row in enumerate(subset.rows):
             row_id = start_index + index
-            cache = self._session_cache.get(row_id)
+            cache = self._session_cache.get(self._get_cache_key(row_id, row))
             if cache is not None:
-                edit_rows.append(cache.get_edit_row(subset.rows[index]))
+                edit_rows.append(cache.get_edit_row(row))
             else:
                 edit_row = EditRow(row_id, [EditCell(cell, False, row_id) for cell in row])
                 edit_rows.append(edit_row)
@@ -258,36 +353,300 @@ class DataEditorSession:
         if self._result_set is None:
             raise RuntimeError("Edit session query has not been initialized")
 
-        try:
-            edit_operations = self._session_cache.values()
-
-            if any(edit_operations) is True:
-                with connection.cursor() as cursor:
-                    for operation in edit_operations:
-                        # If its a new row that’s being added and tried to delete
-                        # without committing we just clear it from cache
-                        if (
-                            isinstance(operation, RowDelete)
-                            and operation.row_id >= self._result_set.row_count
-                        ):
-                            pass
-                        else:
-                            script: EditScript = operation.get_script()
-                            query_template_sql = as_sql(script.query_template)
-                            morgified = cursor.mogrify(
-                                query_template_sql, (script.query_paramters)
+        with self._rows_lock:
+            try:
+                # If its a new row that’s being added and tried to delete
+                # without committing we just clear it from cache
+                edit_operations = [
+                    operation
+                    for operation in self._session_cache.values()
+                    if not (
+                        isinstance(operation, RowDelete)
+                        and operation.row_id >= self._result_set.row_count
+                    )
+                ]
+
+                if edit_operations:
+                    updated_rows: dict[int, tuple] = {}
+                    added_rows: list[tuple] = []
+                    removed_row_ids: list[int] = []
+
+                    with connection.transaction(), connection.cursor() as cursor:
+                        for operations, scripts in _group_by_shape(edit_operations):
+                            self._execute_edit_group(
+                                cursor,
+                                operations,
+                                scripts,
+                                updated_rows,
+                                added_rows,
+                                removed_row_ids,
                             )
-                            morgified_sql = as_sql(morgified)
-                            cursor.execute(morgified_sql)
-                            operation.apply_changes(cursor)
 
-                    self._session_cache.clear()
-                    self._last_row_id = self._result_set.row_count - 1
+                    # The result set only changes once all of the edits are committed
+                    self._result_set.apply_row_changes(
+                        updated_rows, added_rows, removed_row_ids
+                    )
+                    self._remember_added_rows(added_rows)
 
-            success()
+                self._session_cache.clear()
+                self._last_row_id = self._result_set.row_count - 1
 
-        except Exception as error:
-            failure(str(error))
+                success()
+
+            except Exception as error:
+                failure(str(error))
+
+    def _execute_edit_group(
+        self,
+        cursor: psycopg.Cursor,
+        operations: list[RowEdit],
+        scripts: list[EditScript],
+        updated_rows: dict[int, tuple],
+        added_rows: list[tuple],
+        removed_row_ids: list[int],
+    ) -> None:
+        """Execute edits that share a statement with a single executemany,
+        which pipelines the statements, and collect the rows they return
+        """
+        is_delete = isinstance(operations[0], RowDelete)
+        cursor.executemany(
+            as_sql(scripts[0].query_template),
+            [script.query_paramters for script in scripts],
+            returning=not is_delete,
+        )
+
+        if is_delete:
+            removed_row_ids.extend(operation.row_id for operation in operations)
+            return
+
+        for index, operation in enumerate(operations):
+            if index > 0:
+                cursor.nextset()
+            row = cursor.fetchone()
+            if isinstance(operation, RowCreate):
+                if row is not None:
+                    added_rows.append(row)
+            elif row is None:
+                # The row no longer matches its original values
+                removed_row_ids.append(operation.row_id)
+            else:
+                updated_rows[operation.row_id] = row
+
+    def _get_bulk_columns(self, column_names: list[str] | None) -> list[EditColumnMetadata]:
+        editable_columns = [
+            column
+            for column in self.table_metadata.columns_metadata
+            if column.name and not column.is_calculated
+        ]
+        if column_names is None:
+            return editable_columns
+
+        columns_by_name = {column.name: column for column in editable_columns}
+        columns = []
+        for column_name in column_names:
+            column = columns_by_name.get(column_name)
+            if column is None:
+                raise ValueError(f'Column "{column_name}" is not an editable column')
+            columns.append(column)
+        return columns
+
+    def _get_bulk_values(
+        self, columns: list[EditColumnMetadata], rows: list[list[str | None]]
+    ) -> list[list[object]]:
+        """Parse the values of the rows with the parsers of their columns"""
+        values = []
+        for row_number, row in enumerate(rows, start=1):
+            if len(row) != len(columns):
+                raise ValueError(
+                    f"Row {row_number} has {len(row)} values, but {len(columns)} are expected"
+                )
+            try:
+                values.append(
+                    [
+                        None if value is None else CellUpdate(column.db_column, value).value
+                        for column, value in zip(columns, row, strict=True)
+                    ]
+                )
+            except (AttributeError, ValueError) as error:
+                raise ValueError(f"Row {row_number} has an invalid value: {error}") from error
+        return values
+
+    def _do_bulk_create(
+        self,
+        connection: ServerConnection,
+        columns: list[EditColumnMetadata],
+        rows: list[list[object]],
+        success: Callable[[int, int], None],
+        failure: Callable[[str], None],
+    ) -> None:
+        if self._result_set is None:
+            raise RuntimeError("Edit session query has not been initialized")
+
+        with self._rows_lock:
+            try:
+                # The rows are copied to a staging table, so that they can be inserted
+                # with a single statement that returns them as they are stored
+                staging_table = sql.Identifier("_pgtoolsservice_bulk_create_rows")
+                table = sql.Identifier(
+                    self.table_metadata.schema_name, self.table_metadata.table_name
+                )
+                column_names = sql.SQL(", ").join(
+                    sql.Identifier(column.name) for column in columns if column.name
+                )
+
+                with connection.transaction(), connection.cursor() as cursor:
+                    cursor.execute(
+                        sql.SQL(
+                            "CREATE TEMPORARY TABLE {0} ON COMMIT DROP AS "
+                            "SELECT {1} FROM {2} WITH NO DATA"
+                        ).format(staging_table, column_names, table)
+                    )
+                    with cursor.copy(
+                        sql.SQL("COPY {0} ({1}) FROM STDIN").format(
+                            staging_table, column_names
+                        )
+                    ) as copy:
+                        for row in rows:
+                            copy.write_row(row)
+                    cursor.execute(
+                        sql.SQL(
+                            "INSERT INTO {0} ({1}) SELECT {1} FROM {2} RETURNING *"
+                        ).format(table, column_names, staging_table)
+                    )
+                    new_rows = cursor.fetchall()
+                    cursor.execute(sql.SQL("DROP TABLE {0}").format(staging_table))
+
+                first_row_id = self._result_set.row_count
+                self._result_set.apply_row_changes({}, new_rows, [])
+                self._remember_added_rows(new_rows)
+                self._last_row_id = self._result_set.row_count - 1
+
+                success(first_row_id, len(new_rows))
+
+            except Exception as error:
+                failure(str(error))
+
+    def _get_cache_key(self, row_id: int, row: Sequence | None = None) -> Hashable:
+        """Get the key of the edits of a row: the key of the row for the loaded rows
+        of paged sessions, and the row id otherwise.
+        The row is read from the result set, unless the caller has already read it.
+        """
+        if (
+            not self.is_paged
+            or self._result_set is None
+            or row_id < 0
+            or row_id >= self._result_set.row_count
+        ):
+            return row_id
+        return self._get_row_key(self._result_set.get_row(row_id) if row is None else row)
+
+    def _get_row_key(self, row: Sequence) -> tuple:
+        return tuple(
+            cell.raw_object if isinstance(cell, DbCellValue) else cell
+            for cell in (row[index] for index in self._keyset_column_indexes)
+        )
+
+    def _has_new_rows(self) -> bool:
+        if self._result_set is None:
+            return False
+        row_count = self._result_set.row_count
+        return any(
+            operation.row_id >= row_count for operation in self._session_cache.values()
+        )
+
+    def _get_page_limit(self, row_count: int) -> int:
+        if self._page_size is None:
+            raise RuntimeError("Edit session is not paged")
+        if self._row_limit is None:
+            return self._page_size
+        return min(self._page_size, self._row_limit - row_count)
+
+    def _load_rows(self, end_index: int) -> None:
+        """Fetch pages of rows until end_index rows are loaded or the table is exhausted"""
+        if self._result_set is None:
+            return
+
+        # While a commit is changing the rows, the loaded rows are returned,
+        # and a later request fetches the next pages
+        if not self._rows_lock.acquire(blocking=False):
+            return
+        try:
+            while not self._is_fully_loaded and self._result_set.row_count < end_index:
+                # New rows take the row ids after the loaded rows until they are committed
+                if self._has_new_rows():
+                    return
+                self._fetch_next_page()
+        finally:
+            self._rows_lock.release()
+
+    def _fetch_next_page(self) -> None:
+        if self._result_set is None or self._connection is None:
+            raise RuntimeError("Edit session query has not been initialized")
+
+        limit = self._get_page_limit(self._result_set.row_count)
+        query, parameters = self._construct_page_query(self._last_loaded_key, limit)
+        with self._connection.cursor() as cursor:
+            cursor.execute(query, parameters)
+            rows = cursor.fetchall()
+
+        fetched_row_count = len(rows)
+        if rows:
+            self._last_loaded_key = self._get_row_key(rows[-1])
+        if self._added_keys:
+            rows = [row for row in rows if self._get_row_key(row) not in self._added_keys]
+
+        self._result_set.apply_row_changes({}, rows, [])
+        self._last_row_id = self._result_set.row_count - 1
+        self._on_page_loaded(limit, fetched_row_count)
+
+    def _on_page_loaded(self, limit: int, fetched_row_count: int) -> None:
+        if self._result_set is None:
+            return
+        if self._last_loaded_key is None and self._result_set.row_count > 0:
+            self._last_loaded_key = self._get_row_key(
+                self._result_set.get_row(self._result_set.row_count - 1)
+            )
+        self._is_fully_loaded = fetched_row_count < limit or (
+            self._row_limit is not None and self._result_set.row_count >= self._row_limit
+        )
+
+    def _remember_added_rows(self, rows: list[tuple]) -> None:
+        if self.is_paged and not self._is_fully_loaded:
+            self._added_keys.update(self._get_row_key(row) for row in rows)
+
+    def _construct_page_query(
+        self, after_key: tuple | None, limit: int
+    ) -> tuple[sql.Composed, list]:
+        """Build the query for the page of rows that follows after_key in key order,
+        or for the first page if after_key is None
+        """
+        metadata = self.table_metadata
+        column_names = [
+            sql.Identifier(column.name) for column in metadata.columns_metadata if column.name
+        ]
+        key_names = sql.SQL(", ").join(
+            sql.Identifier(metadata.columns_metadata[index].name or "")
+            for index in self._keyset_column_indexes
+        )
+
+        if after_key is None:
+            where_clause = sql.SQL("")
+            parameters: list = []
+        else:
+            where_clause = sql.SQL("WHERE ({0}) > ({1}) ").format(
+                key_names, sql.SQL(", ").join(sql.Placeholder() * len(after_key))
+            )
+            parameters = list(after_key)
+
+        query = sql.SQL("SELECT {0} FROM {1}.{2} {3}ORDER BY {4} LIMIT {5}").format(
+            sql.SQL(", ").join(column_names),
+            sql.Identifier(metadata.schema_name),
+            sql.Identifier(metadata.table_name),
+            where_clause,
+            key_names,
+            sql.SQL(str(int(limit))),
+        )
+        return query, parameters
 
     def _validate_query_for_session(self, query: Query) -> None:
         if query.execution_state is not ExecutionState.EXECUTED:
@@ -315,3 +674,24 @@ class DataEditorSession:
             as_sql(limit_clause),
         )
         return query.as_string(connection.connection)
+
+
+def _group_by_shape(
+    edit_operations: list[RowEdit],
+) -> list[tuple[list[RowEdit], list[EditScript]]]:
+    """Group consecutive edits that have the same statement, keeping the order of the
+    edits, as a later edit can depend on an earlier one, such as an insert of a key that
+    a delete frees. Statements of inserts, updates and deletes differ, so each group has
+    one kind of edit.
+    """
+    groups: list[tuple[list[RowEdit], list[EditScript]]] = []
+    query_template: str | None = None
+    for operation in edit_operations:
+        script = operation.get_script()
+        if not groups or script.query_template != query_template:
+            groups.append(([], []))
+            query_template = script.query_template
+        operations, scripts = groups[-1]
+        operations.append(operation)
+        scripts.append(script)
+    return groups
@@ -3,7 +3,7 @@
 # Licensed under the MIT License. See License.txt in the project root for license information.
 # --------------------------------------------------------------------------------------------
 
-
+import threading
 from logging import Logger
 from typing import Callable
 
@@ -12,9 +12,11 @@ from ossdbtoolsservice.connection.contracts import ConnectionType
 from ossdbtoolsservice.edit_data import (
     DataEditorSession,
     DataEditSessionExecutionState,
+    EditTableMetadataCache,
     SmoEditTableMetadataFactory,
 )
 from ossdbtoolsservice.edit_data.contracts import (
+    BULK_CREATE_ROWS_REQUEST,
     CREATE_ROW_REQUEST,
     DELETE_ROW_REQUEST,
     DISPOSE_REQUEST,
@@ -25,6 +27,8 @@ from ossdbtoolsservice.edit_data.contracts import (
     REVERT_ROW_REQUEST,
     SESSION_READY_NOTIFICATION,
     UPDATE_CELL_REQUEST,
+    BulkCreateRowsRequest,
+    BulkCreateRowsResponse,
     CreateRowRequest,
     DeleteRowRequest,
     DisposeRequest,
@@ -66,12 +70,15 @@ class EditDataService(Service):
         self._active_sessions: dict[str, DataEditorSession] = {}
         self._logger: Logger | None = None
         self._connection_service: ConnectionService | None = None
+        # Shared by the sessions, so that reopening a table skips its catalog queries
+        self._table_metadata_cache = EditTableMetadataCache()
 
         self._service_action_mapping: dict = {
             INITIALIZE_EDIT_REQUEST: self._edit_initialize,
             EDIT_SUBSET_REQUEST: self._edit_subset,
             UPDATE_CELL_REQUEST: self._update_cell,
             CREATE_ROW_REQUEST: self._create_row,
+            BULK_CREATE_ROWS_REQUEST: self._bulk_create_rows,
             DELETE_ROW_REQUEST: self._delete_row,
             REVERT_CELL_REQUEST: self._revert_cell,
             REVERT_ROW_REQUEST: self._revert_row,
@@ -116,7 +123,7 @@ class EditDataService(Service):
             request_context.send_error("Could not get connection")
             return
 
-        session = DataEditorSession(SmoEditTableMetadataFactory())
+        session = DataEditorSession(SmoEditTableMetadataFactory(self._table_metadata_cache))
         self._active_sessions[owner_uri] = session
 
         if params.query_string is not None:
@@ -206,17 +213,39 @@ class EditDataService(Service):
             request_context.send_error("Edit session not found")
             return
 
-        rows = session.get_rows(
-            owner_uri,
-            row_start_index,
-            row_start_index + row_count,
+        # Paged sessions may fetch the next pages of rows from the server
+        thread = threading.Thread(
+            target=self._send_subset,
+            args=(request_context, session, owner_uri, row_start_index, row_count),
         )
+        thread.daemon = True
+        thread.start()
+
+    def _send_subset(
+        self,
+        request_context: RequestContext,
+        session: DataEditorSession,
+        owner_uri: str,
+        row_start_index: int,
+        row_count: int,
+    ) -> None:
+        try:
+            rows = session.get_rows(
+                owner_uri,
+                row_start_index,
+                row_start_index + row_count,
+            )
 
-        self._handle_create_row_default_values(rows, session)
+            self._handle_create_row_default_values(rows, session)
 
-        edit_subset_result = EditSubsetResponse(len(rows), rows)
+            edit_subset_result = EditSubsetResponse(len(rows), rows)
 
-        request_context.send_response(edit_subset_result)
+            request_context.send_response(edit_subset_result)
+
+        except Exception as ex:
+            request_context.send_error(str(ex))
+            if self._logger:
+                self._logger.error(str(ex))
 
     def _update_cell(
         self, request_context: RequestContext, params: UpdateCellRequest
@@ -234,6 +263,46 @@ class EditDataService(Service):
             params, request_context, lambda edit_session: edit_session.create_row()
         )
 
+    def _bulk_create_rows(
+        self, request_context: RequestContext, params: BulkCreateRowsRequest
+    ) -> None:
+        owner_uri = params.owner_uri
+        if owner_uri is None:
+            request_context.send_error("Owner URI is required")
+            return
+
+        if params.data is None:
+            request_context.send_error("Rows are required")
+            return
+
+        connection = self.connection_service.get_connection(owner_uri, ConnectionType.QUERY)
+
+        if connection is None:
+            request_context.send_error("Connection not found")
+            return
+
+        def on_success(first_row_id: int, row_count: int) -> None:
+            request_context.send_response(BulkCreateRowsResponse(first_row_id, row_count))
+
+        def on_failure(error: str) -> None:
+            request_context.send_error(error)
+
+        try:
+            edit_session = self._get_active_session(owner_uri)
+            edit_session.bulk_create_rows(
+                connection,
+                params.data,
+                params.format,
+                bool(params.has_header),
+                params.column_names,
+                on_success,
+                on_failure,
+            )
+        except Exception as ex:
+            request_context.send_error(str(ex))
+            if self._logger:
+                self._logger.error(str(ex))
+
     def _delete_row(self, request_context: RequestContext, params: DeleteRowRequest) -> None:
         self._handle_session_request(
             params,
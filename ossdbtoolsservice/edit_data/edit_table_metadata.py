@@ -38,6 +38,23 @@ class EditTableMetadata:
     def key_columns(self) -> list[EditColumnMetadata]:
         return self._key_columns
 
+    @property
+    def keyset_columns(self) -> list[EditColumnMetadata]:
+        """The columns that order the rows uniquely, to page through the table by key:
+        the primary key, or else a unique column that cannot be NULL.
+        Empty if the table has neither.
+        """
+        primary_key_columns = [
+            column for column in self.columns_metadata if column.is_key is True
+        ]
+        if primary_key_columns:
+            return primary_key_columns
+
+        for column in self.columns_metadata:
+            if column.db_column.is_unique and column.db_column.allow_db_null is False:
+                return [column]
+        return []
+
     def _get_key_columns(self) -> list[EditColumnMetadata]:
         key_columns = [column for column in self.columns_metadata if column.is_key is True]
 
@@ -0,0 +1,140 @@
+# --------------------------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for license information.
+# --------------------------------------------------------------------------------------------
+
+"""Reuse of the metadata of edited tables across edit sessions.
+
+Building the metadata of a table walks the pgsmo object tree and runs several catalog
+queries. Entries are keyed by the database and OID of the table, and remember the catalog
+version of the table, so that a single round trip tells whether they are still current.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Callable
+from typing import NamedTuple
+
+from ossdbtoolsservice.connection import ServerConnection
+from ossdbtoolsservice.edit_data.edit_table_metadata import EditTableMetadata
+
+DEFAULT_TTL_SECONDS = 300.0
+DEFAULT_MAX_ENTRIES = 256
+
+# Kinds of relations that are edited as tables or views
+_RELATION_KINDS = {
+    "table": ["r", "t", "f", "p"],
+    "view": ["v", "m"],
+}
+
+# The OID of the relation, and a version of its catalog rows that changes with DDL:
+# rows are rewritten by ALTER, which gives them a new xmin, and added or removed by
+# CREATE and DROP, which changes their count
+_TABLE_VERSION_QUERY = """
+SELECT c.oid, concat_ws(':',
+    c.xmin::text,
+    (SELECT count(*) || '.' || coalesce(max(a.xmin::text::bigint), 0)
+        FROM pg_catalog.pg_attribute a WHERE a.attrelid = c.oid),
+    (SELECT count(*) || '.' || coalesce(max(d.xmin::text::bigint), 0)
+        FROM pg_catalog.pg_attrdef d WHERE d.adrelid = c.oid),
+    (SELECT count(*) || '.' || coalesce(max(o.xmin::text::bigint), 0)
+        FROM pg_catalog.pg_constraint o WHERE o.conrelid = c.oid),
+    (SELECT count(*) || '.' || coalesce(max(i.xmin::text::bigint), 0)
+        FROM pg_catalog.pg_index i WHERE i.indrelid = c.oid))
+FROM pg_catalog.pg_class c
+JOIN pg_catalog.pg_namespace n ON n.oid = c.relnamespace
+WHERE n.nspname = %s AND c.relname = %s AND c.relkind::text = ANY(%s)
+"""
+
+
+class EditTableMetadataCacheKey(NamedTuple):
+    host: str
+    port: int
+    database: str
+    table_oid: int
+
+
+class CachedEditTableMetadata:
+    """The metadata of a table, with the catalog version it was built at"""
+
+    def __init__(
+        self, metadata: EditTableMetadata, catalog_version: str, created_time: float
+    ) -> None:
+        self.metadata = metadata
+        self.catalog_version = catalog_version
+        self.created_time = created_time
+
+
+class EditTableMetadataCache:
+    """Cache of the metadata of edited tables, shared by the edit sessions of a database.
+
+    Entries are dropped once the catalog version of their table changes, once they are
+    older than the TTL, and least recently used first beyond max_entries.
+    """
+
+    def __init__(
+        self,
+        ttl_seconds: float = DEFAULT_TTL_SECONDS,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self._lock = threading.Lock()
+        self._clock = clock
+        self._ttl_seconds = ttl_seconds
+        self._max_entries = max_entries
+        self._entries: OrderedDict[EditTableMetadataCacheKey, CachedEditTableMetadata] = (
+            OrderedDict()
+        )
+
+    def get(
+        self,
+        connection: ServerConnection,
+        schema_name: str,
+        object_name: str,
+        object_type: str,
+        create_metadata: Callable[[], EditTableMetadata],
+    ) -> EditTableMetadata:
+        """Get the metadata of the table, or create and cache it if it is not cached
+        or its table has changed since it was cached
+        """
+        relation_kinds = _RELATION_KINDS.get(object_type.lower())
+        row = (
+            connection.fetch_one(
+                _TABLE_VERSION_QUERY, (schema_name, object_name, relation_kinds)
+            )
+            if relation_kinds is not None
+            else None
+        )
+        if row is None:
+            # Unknown objects are left to the metadata factory to report
+            return create_metadata()
+
+        table_oid, catalog_version = row
+        key = EditTableMetadataCacheKey(
+            connection.host_name, connection.port, connection.database_name, table_oid
+        )
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and self._is_valid(entry, catalog_version):
+                self._entries.move_to_end(key)
+                return entry.metadata
+            self._entries.pop(key, None)
+
+        metadata = create_metadata()
+        with self._lock:
+            self._entries[key] = CachedEditTableMetadata(
+                metadata, catalog_version, self._clock()
+            )
+            while len(self._entries) > self._max_entries:
+                self._entries.popitem(last=False)
+        return metadata
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def _is_valid(self, entry: CachedEditTableMetadata, catalog_version: str) -> bool:
+        if self._clock() - entry.created_time > self._ttl_seconds:
+            return False
+        return entry.catalog_version == catalog_version
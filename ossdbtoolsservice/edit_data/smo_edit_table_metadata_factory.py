@@ -6,6 +6,7 @@
 
 from ossdbtoolsservice.connection import ServerConnection
 from ossdbtoolsservice.edit_data import EditColumnMetadata, EditTableMetadata
+from ossdbtoolsservice.edit_data.edit_table_metadata_cache import EditTableMetadataCache
 from ossdbtoolsservice.metadata.contracts.object_metadata import MetadataType, ObjectMetadata
 from ossdbtoolsservice.query.contracts import DbColumn
 from pgsmo import Server
@@ -14,12 +15,32 @@ from pgsmo.objects.table_objects.column import Column
 
 
 class SmoEditTableMetadataFactory:
+    def __init__(self, cache: EditTableMetadataCache | None = None) -> None:
+        self._cache = cache
+
     def get(
         self,
         connection: ServerConnection,
         schema_name: str,
         object_name: str,
         object_type: str,
+    ) -> EditTableMetadata:
+        if self._cache is None:
+            return self._create(connection, schema_name, object_name, object_type)
+        return self._cache.get(
+            connection,
+            schema_name,
+            object_name,
+            object_type,
+            lambda: self._create(connection, schema_name, object_name, object_type),
+        )
+
+    def _create(
+        self,
+        connection: ServerConnection,
+        schema_name: str,
+        object_name: str,
+        object_type: str,
     ) -> EditTableMetadata:
         server = Server(connection)
 
@@ -15,10 +15,17 @@ from typing import Any, Callable
 from prompt_toolkit.completion import Completer
 
 from ossdbtoolsservice.connection import PooledConnection
+from ossdbtoolsservice.connection.contracts import BackgroundQueryCategory
+from ossdbtoolsservice.connection.core.statement_timeouts import is_timeout_error
 from ossdbtoolsservice.language.completion import PGCompleter
 from ossdbtoolsservice.language.metadata_executor import MetadataExecutor
 from pgsmo import Server as PGServer
 
+# Seconds before a refresh that timed out is tried again, doubled at each retry
+REFRESH_RETRY_DELAY_SECONDS = 60
+# Number of times a refresh that timed out is tried again
+MAX_REFRESH_RETRIES = 3
+
 
 class CompletionRefresher:
     """
@@ -33,10 +40,18 @@ class CompletionRefresher:
         pooled_connection: PooledConnection,
         logger: Logger | None = None,
         completer_type: type[Completer] | None = None,
+        get_pooled_connection: Callable[[], PooledConnection | None] | None = None,
+        retry_count: int = 0,
     ) -> None:
+        """
+        get_pooled_connection - A function to get the pooled connection of a retry,
+                    if a refresh timed out. None to not retry.
+        """
         self.pooled_connection = pooled_connection
         self.logger: Logger | None = logger
         self.completer_type = completer_type or PGCompleter
+        self._get_pooled_connection = get_pooled_connection
+        self._retry_count = retry_count
         self._server: PGServer | None = None
         self._completer_thread: threading.Thread | None = None
         self._restart_refresh: threading.Event = threading.Event()
@@ -91,10 +106,25 @@ class CompletionRefresher:
             if callable(callbacks):
                 callbacks = [callbacks]
 
+            # Refreshers that timed out, leaving their part of the metadata out
+            timed_out: list[str] = []
             try:
                 while True:
-                    for do_refresh in self.refreshers.values():
-                        do_refresh(completer, metadata_executor)
+                    timed_out.clear()
+                    for name, do_refresh in self.refreshers.items():
+                        try:
+                            with connection.statement_timeouts(
+                                BackgroundQueryCategory.COMPLETION_METADATA
+                            ):
+                                do_refresh(completer, metadata_executor)
+                        except Exception as e:
+                            if not is_timeout_error(e):
+                                raise
+                            timed_out.append(name)
+                            if self.logger:
+                                self.logger.warning(
+                                    f"Metadata refresh of {name} timed out: {e}"
+                                )
                         if self._restart_refresh.is_set():
                             self._restart_refresh.clear()
                             break
@@ -123,6 +153,39 @@ class CompletionRefresher:
             if self._restart_refresh.is_set():
                 self._restart_refresh.clear()
 
+        if timed_out:
+            self._schedule_retry(callbacks, history, settings)
+
+    def _schedule_retry(
+        self,
+        callbacks: list[Callable[[PGCompleter], None]],
+        history: list[str] | None,
+        settings: dict[str, Any] | None,
+    ) -> None:
+        """Refresh again later, with a new connection, to fill in the metadata
+        that timed out. Catalogs can be busy for a while, such as during a migration.
+        """
+        get_pooled_connection = self._get_pooled_connection
+        if get_pooled_connection is None or self._retry_count >= MAX_REFRESH_RETRIES:
+            return
+
+        def retry() -> None:
+            pooled_connection = get_pooled_connection()
+            if pooled_connection is None:
+                # Disconnected in the meantime
+                return
+            CompletionRefresher(
+                pooled_connection,
+                self.logger,
+                self.completer_type,
+                get_pooled_connection,
+                self._retry_count + 1,
+            ).refresh(callbacks, history, settings)
+
+        timer = threading.Timer(REFRESH_RETRY_DELAY_SECONDS * 2**self._retry_count, retry)
+        timer.daemon = True
+        timer.start()
+
 
 def refresher(
     name: str, refreshers: dict = CompletionRefresher.refreshers
@@ -17,6 +17,7 @@ from ossdbtoolsservice.connection import (
     OwnerConnectionInfo,
     PooledConnection,
 )
+from ossdbtoolsservice.connection.contracts import ConnectionPriority
 from ossdbtoolsservice.hosting import ServiceProvider
 from ossdbtoolsservice.language.completion_refresher import CompletionRefresher
 from ossdbtoolsservice.utils import constants
@@ -34,9 +35,16 @@ class ConnectionContext:
         self.is_connected: bool = False
         self.logger: Logger | None = logger
 
-    def refresh_metadata(self, pooled_connection: PooledConnection) -> None:
-        # Start metadata refresh so operations can be completed
-        completion_refresher = CompletionRefresher(pooled_connection, self.logger)
+    def refresh_metadata(
+        self,
+        pooled_connection: PooledConnection,
+        get_pooled_connection: Callable[[], PooledConnection | None] | None = None,
+    ) -> None:
+        # Start metadata refresh so operations can be completed.
+        # Parts of the metadata that time out are refreshed again later.
+        completion_refresher = CompletionRefresher(
+            pooled_connection, self.logger, get_pooled_connection=get_pooled_connection
+        )
         completion_refresher.refresh(self._on_completions_refreshed)
 
     # IMPLEMENTATION DETAILS ###############################################
@@ -147,7 +155,10 @@ class OperationsQueue:
             pooled_connection = self._create_pooled_connection(conn_info.owner_uri)
             if not pooled_connection:
                 raise RuntimeError("Failed to create connection for intellisense")
-            context.refresh_metadata(pooled_connection)
+            context.refresh_metadata(
+                pooled_connection,
+                lambda: self._create_pooled_connection(conn_info.owner_uri),
+            )
             self._context_map[key] = context
             return context
 
@@ -165,7 +176,11 @@ class OperationsQueue:
 
     def _create_pooled_connection(self, owner_uri: str) -> Optional[PooledConnection]:
         conn_service = self._connection_service
-        connection = conn_service.get_pooled_connection(owner_uri)
+        # Intellisense refreshes run in the background, behind the user's own work,
+        # and read the catalog from a replica if there is one
+        connection = conn_service.get_pooled_connection(
+            owner_uri, ConnectionPriority.BACKGROUND, read_only=True
+        )
         return connection
 
     def _process_operations(self) -> None:
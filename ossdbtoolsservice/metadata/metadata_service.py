@@ -6,6 +6,7 @@
 import threading
 
 from ossdbtoolsservice.connection.connection_service import ConnectionService
+from ossdbtoolsservice.connection.contracts import ConnectionPriority
 from ossdbtoolsservice.hosting import RequestContext, Service, ServiceProvider
 from ossdbtoolsservice.metadata.contracts import (
     METADATA_LIST_REQUEST,
@@ -80,7 +81,9 @@ class MetadataService(Service):
         connection_service = self.service_provider.get(
             constants.CONNECTION_SERVICE_NAME, ConnectionService
         )
-        pooled_connection = connection_service.get_pooled_connection(owner_uri)
+        pooled_connection = connection_service.get_pooled_connection(
+            owner_uri, ConnectionPriority.BACKGROUND, read_only=True
+        )
 
         if pooled_connection is None:
             raise Exception("Connection is required")
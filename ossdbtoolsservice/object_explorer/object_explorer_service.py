@@ -4,6 +4,7 @@
 # --------------------------------------------------------------------------------------------
 
 import threading
+from contextlib import AbstractContextManager, nullcontext
 from logging import Logger
 from typing import Optional
 from urllib.parse import quote, urlparse
@@ -15,10 +16,12 @@ import ossdbtoolsservice.utils.validate as validate
 from ossdbtoolsservice.connection import ServerConnection
 from ossdbtoolsservice.connection.connection_service import ConnectionService
 from ossdbtoolsservice.connection.contracts import (
+    BackgroundQueryCategory,
     ConnectionDetails,
     ConnectionType,
     ConnectRequestParams,
 )
+from ossdbtoolsservice.connection.core.statement_timeouts import is_timeout_error
 from ossdbtoolsservice.hosting import RequestContext, Service, ServiceProvider
 from ossdbtoolsservice.metadata.contracts import ObjectMetadata
 from ossdbtoolsservice.object_explorer.contracts import (
@@ -344,6 +347,13 @@ class ObjectExplorerService(Service):
                     return
                 else:
                     self._expand_node_error(request_context, params, str(e))
+            elif is_timeout_error(e):
+                # The node's children are not cached, so expanding it again reads them again
+                self._expand_node_error(
+                    request_context,
+                    params,
+                    f"Reading the catalog timed out, try again later: {e}",  # TODO: Localize
+                )
             else:
                 self._expand_node_error(request_context, params, str(e))
 
@@ -506,6 +516,19 @@ class ObjectExplorerService(Service):
         # Clean up the session from the session map
         self._session_map.pop(session.id)
 
+    @staticmethod
+    def _catalog_timeouts(session: ObjectExplorerSession) -> AbstractContextManager:
+        """
+        Runs the queries of the block under the catalog timeouts, in a transaction
+        on the connection of the session
+        """
+        if not session.is_ready or not isinstance(
+            session.server.connection, ServerConnection
+        ):
+            # Sessions and mocks for testing without a connection run without timeouts
+            return nullcontext()
+        return session.server.connection.statement_timeouts(BackgroundQueryCategory.CATALOG)
+
     @staticmethod
     def _generate_session_uri(params: ConnectionDetails) -> str:
         # Make sure the required params are provided
@@ -547,10 +570,12 @@ class ObjectExplorerService(Service):
             for route, target in self._routing_table.items():
                 match = route.match(path)
                 if match is not None:
-                    # We have a match!
-                    target_nodes = target.get_nodes(
-                        is_refresh, path, session, match.groupdict()
-                    )
+                    # We have a match! Its queries run under the catalog timeouts,
+                    # set once for the whole expand
+                    with self._catalog_timeouts(session):
+                        target_nodes = target.get_nodes(
+                            is_refresh, path, session, match.groupdict()
+                        )
                     session.cache[path] = target_nodes
                     return target_nodes
 
@@ -8,6 +8,7 @@ from ossdbtoolsservice.query.batch import (
     Batch,
     BatchEvents,
     ResultSetStorageType,
+    SelectBatchEvents,
     create_batch,
     create_result_set,
 )
@@ -29,6 +30,7 @@ __all__ = [
     "ExecutionState",
     "ResultSet",
     "ResultSetStorageType",
+    "SelectBatchEvents",
     "Query",
     "QueryEvents",
     "QueryExecutionSettings",
@@ -2,6 +2,8 @@
 # Copyright (c) Microsoft Corporation. All rights reserved.
 # Licensed under the MIT License. See License.txt in the project root for license information.
 # --------------------------------------------------------------------------------------------
+import contextlib
+import time
 import uuid
 from datetime import datetime
 from enum import Enum
@@ -15,16 +17,45 @@ from psycopg.errors import Diagnostic
 from ossdbtoolsservice.connection import ServerConnection
 from ossdbtoolsservice.query.contracts import (
     BatchSummary,
+    BatchTimings,
+    DbCellValue,
     SaveResultsRequestParams,
     SelectionData,
 )
 from ossdbtoolsservice.query.contracts.result_set_subset import ResultSetSubset
 from ossdbtoolsservice.query.data_storage import FileStreamFactory
+from ossdbtoolsservice.query.execution_plan import ExecutionPlan
 from ossdbtoolsservice.query.file_storage_result_set import FileStorageResultSet
 from ossdbtoolsservice.query.in_memory_result_set import InMemoryResultSet
-from ossdbtoolsservice.query.result_set import ResultSet
+from ossdbtoolsservice.query.result_set import ResultSet, ResultSetEvents
+from ossdbtoolsservice.utils.constants import POOLER_COMPATIBLE_MAX_ROWS
 from ossdbtoolsservice.utils.time import get_elapsed_time_str, get_time_str
 
+# Functions that change or depend on the state of the session they are called in.
+# Batches calling them are not run on other connections in parallel.
+SESSION_STATE_FUNCTIONS = [
+    "currval",
+    "lastval",
+    "nextval",
+    "pg_advisory_lock",
+    "pg_advisory_lock_shared",
+    "pg_advisory_unlock",
+    "pg_advisory_unlock_all",
+    "pg_advisory_unlock_shared",
+    "pg_notify",
+    "pg_try_advisory_lock",
+    "pg_try_advisory_lock_shared",
+    "set_config",
+    "setval",
+]
+
+# Maximum number of notices kept per batch. Later notices are counted, but not kept.
+MAX_BATCH_NOTICES = 1000
+
+# Keywords that make a SELECT statement write, like SELECT INTO,
+# data modifying CTEs and row locking clauses such as FOR UPDATE
+_WRITE_KEYWORDS = ["INTO", "INSERT", "UPDATE", "DELETE", "MERGE", "SHARE"]
+
 
 class ResultSetStorageType(Enum):
     IN_MEMORY = (1,)
@@ -50,11 +81,18 @@ class SelectBatchEvents(BatchEvents):
         on_execution_completed: Callable[["Batch"], None] | None,
         on_result_set_completed: Callable[["Batch"], None] | None,
         on_after_first_fetch: Callable[["Batch"], None] | None,
+        first_fetch_row_count: int = 1,
     ) -> None:
+        """
+        :param on_after_first_fetch: Called as soon as the first first_fetch_row_count
+            rows of the batch's result set can be read, before the result set
+            has been read to the end
+        """
         BatchEvents.__init__(
             self, on_execution_started, on_execution_completed, on_result_set_completed
         )
         self._on_after_first_fetch = on_after_first_fetch
+        self._first_fetch_row_count = first_fetch_row_count
 
     @classmethod
     def from_events(
@@ -80,7 +118,15 @@ class Batch:
         selection: SelectionData,
         batch_events: BatchEvents | None = None,
         storage_type: ResultSetStorageType = ResultSetStorageType.FILE_STORAGE,
+        max_cell_display_size: int | None = None,
+        spill_session_id: str | None = None,
+        capture_execution_plan: bool = False,
     ) -> None:
+        """
+        :param capture_execution_plan: whether the batch is run with
+            EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON), so that the plan in its result set
+            is summarized
+        """
         self.id = ordinal
         self.selection = selection
         self.batch_text = batch_text
@@ -90,10 +136,21 @@ class Batch:
         self._has_error = False
         self._has_executed = False
         self._execution_end_time: datetime | None = None
+        # time.perf_counter() values, for the timings of the batch
+        self._execution_start_counter: float | None = None
+        self._execution_end_counter: float | None = None
+        self._server_execute_seconds: float | None = None
         self._result_set: ResultSet | None = None
         self._notices: list[str] = []
+        self._dropped_notice_count = 0
         self._batch_events = batch_events
         self._storage_type = storage_type
+        self._max_cell_display_size = max_cell_display_size
+        self._spill_session_id = spill_session_id
+        self._capture_execution_plan = capture_execution_plan
+        self._execution_plan: ExecutionPlan | None = None
+        # Rows beyond this are not read into the result set, if set
+        self._max_rows: int | None = None
 
     @property
     def batch_summary(self) -> BatchSummary:
@@ -129,6 +186,32 @@ class Batch:
             return None
         return get_elapsed_time_str(self._execution_start_time, self._execution_end_time)
 
+    @property
+    def timings(self) -> BatchTimings | None:
+        """Where the time of the batch went, once it has executed"""
+        if self._execution_start_counter is None or self._execution_end_counter is None:
+            return None
+
+        elapsed_seconds = self._execution_end_counter - self._execution_start_counter
+        result_set = self._result_set
+        read_timings = result_set.read_timings if result_set is not None else None
+        first_row_time = read_timings.first_row_time if read_timings is not None else None
+        row_count = result_set.row_count if result_set is not None else 0
+
+        return BatchTimings(
+            server_execute_time=(self._server_execute_seconds or 0.0) * 1000,
+            time_to_first_row=(
+                (first_row_time - self._execution_start_counter) * 1000
+                if first_row_time is not None
+                else None
+            ),
+            fetch_time=read_timings.fetch_seconds * 1000 if read_timings else 0.0,
+            spill_time=read_timings.spill_seconds * 1000 if read_timings else 0.0,
+            row_count=row_count,
+            rows_per_second=row_count / elapsed_seconds if elapsed_seconds > 0 else None,
+            bytes_spilled=result_set.bytes_spilled if result_set is not None else 0,
+        )
+
     @property
     def result_set(self) -> ResultSet | None:
         return self._result_set
@@ -137,36 +220,62 @@ class Batch:
     def row_count(self) -> int:
         return self.result_set.row_count if self.result_set is not None else -1
 
+    @property
+    def execution_plan(self) -> ExecutionPlan | None:
+        """The plan captured for the batch, if it was run to capture its plan"""
+        return self._execution_plan
+
     @property
     def notices(self) -> list[str]:
         return self._notices
 
+    @property
+    def dropped_notice_count(self) -> int:
+        """Number of notices that were not kept, once the batch had MAX_BATCH_NOTICES"""
+        return self._dropped_notice_count
+
     @property
     def is_rollback(self) -> bool:
         return self.batch_text.lower().startswith("rollback")
 
+    @property
+    def is_read_only(self) -> bool:
+        """Whether the batch only reads data, without depending on session state,
+        so that it can run on any connection to the database
+        """
+        return is_read_only_statement(self.batch_text)
+
     def get_cursor(self, connection: ServerConnection) -> psycopg.Cursor:
         return connection.cursor()
 
-    def execute(self, conn: ServerConnection) -> None:
+    def execute(self, conn: ServerConnection, fire_events: bool = True) -> None:
         """
         Execute the batch using a cursor retrieved from the given connection
 
+        :param fire_events: whether to fire the execution started and completed events.
+            If not, the caller fires them with notify_execution_started and
+            notify_execution_completed.
         :raises DatabaseError: if an error is encountered while running the batch's query
         """
         self._execution_start_time = datetime.now()
+        self._execution_start_counter = time.perf_counter()
 
         cursor: psycopg.Cursor | None = None
 
-        if self._batch_events and self._batch_events._on_execution_started:
-            self._batch_events._on_execution_started(self)
+        def receive_notice(notice: Diagnostic) -> None:
+            self.notice_handler(notice, conn)
+
+        notice_router = conn.notice_router
+
+        if fire_events:
+            self.notify_execution_started()
         try:
             cursor = self.get_cursor(conn)
 
-            conn.connection.add_notice_handler(lambda msg: self.notice_handler(msg, conn))
+            notice_router.attach(receive_notice)
 
             if self.batch_text.startswith("begin") and conn.transaction_in_trans:
-                self._notices.append("WARNING: there is already a transaction in progress")
+                self._add_notice("WARNING: there is already a transaction in progress")
 
             batch_sql = sql.SQL(self.batch_text)  #  type: ignore
             cursor.execute(batch_sql)
@@ -174,12 +283,14 @@ class Batch:
             # Commit the transaction if autocommit is True
             if conn.autocommit:
                 conn.commit()
+            self._server_execute_seconds = time.perf_counter() - self._execution_start_counter
 
             self.after_execute(cursor)
         except:
             self._has_error = True
             raise
         finally:
+            notice_router.detach(receive_notice)
             if cursor and cursor.statusmessage is not None:
                 self.status_message = cursor.statusmessage
             # We are doing this because when the execute fails for named cursors
@@ -189,23 +300,88 @@ class Batch:
                 cursor.close()
             self._has_executed = True
             self._execution_end_time = datetime.now()
+            self._execution_end_counter = time.perf_counter()
 
-            if self._batch_events and self._batch_events._on_execution_completed:
-                self._batch_events._on_execution_completed(self)
+            if fire_events:
+                self.notify_execution_completed()
+
+    def notify_execution_started(self) -> None:
+        if self._batch_events and self._batch_events._on_execution_started:
+            self._batch_events._on_execution_started(self)
+
+    def notify_execution_completed(self) -> None:
+        if self._batch_events and self._batch_events._on_execution_completed:
+            self._batch_events._on_execution_completed(self)
 
     def after_execute(self, cursor: psycopg.Cursor) -> None:
         if cursor.description is not None:
             self.create_result_set(cursor)
 
     def create_result_set(self, cursor: psycopg.Cursor) -> None:
-        result_set = create_result_set(self._storage_type, 0, self.id)
-        result_set.read_result_to_end(cursor)
+        result_set = create_result_set(
+            self._storage_type,
+            0,
+            self.id,
+            self._get_result_set_events(),
+            self._max_cell_display_size,
+            self._spill_session_id,
+        )
+        # Set before reading, so that the rows read so far can be paged through
+        # and are disposed with the batch while the rest is still being read
         self._result_set = result_set
+        try:
+            result_set.read_result_to_end(cursor, self._max_rows)
+        except Exception:
+            # Don't leave the partially spilled rows behind
+            self._result_set = None
+            result_set.dispose()
+            raise
+        if result_set.has_unread_rows:
+            self._add_notice(
+                f"WARNING: only the first {result_set.row_count} rows were returned"
+            )
+
+        if self._capture_execution_plan:
+            self._execution_plan = self._read_execution_plan(result_set)
+
+    def _read_execution_plan(self, result_set: ResultSet) -> ExecutionPlan | None:
+        if result_set.row_count != 1:
+            return None
+        try:
+            # The plan is read from the result set, since the cell may have been truncated
+            return ExecutionPlan.from_json(result_set.get_cell_value(0, 0).raw_object)
+        except ValueError as e:
+            self._add_notice(f"WARNING: the query plan could not be read: {e}")
+            return None
+
+    def dispose(self) -> None:
+        if self._result_set is not None:
+            self._result_set.dispose()
 
-    def get_subset(self, start_index: int, end_index: int) -> ResultSetSubset:
+    def _get_result_set_events(self) -> ResultSetEvents | None:
+        if not isinstance(self._batch_events, SelectBatchEvents):
+            return None
+
+        on_after_first_fetch = self._batch_events._on_after_first_fetch
+        if on_after_first_fetch is None:
+            return None
+
+        return ResultSetEvents(
+            on_result_set_partially_loaded=lambda _: on_after_first_fetch(self),
+            partially_loaded_row_count=self._batch_events._first_fetch_row_count,
+        )
+
+    def get_subset(
+        self, start_index: int, end_index: int, columns: list[int] | None = None
+    ) -> ResultSetSubset:
         if self._result_set is None:
             raise ValueError("No result set.")
-        return self._result_set.get_subset(start_index, end_index)
+        return self._result_set.get_subset(start_index, end_index, columns)
+
+    def get_cell_value(self, row_id: int, column_index: int) -> DbCellValue:
+        if self._result_set is None:
+            raise ValueError("No result set.")
+        return self._result_set.get_cell_value(row_id, column_index)
 
     def save_as(
         self,
@@ -224,9 +400,15 @@ class Batch:
 
     def notice_handler(self, notice: Diagnostic, conn: ServerConnection) -> None:
         if not conn.user_transaction:
-            self._notices.append(f"{notice.severity}: {notice.message_primary}")
+            self._add_notice(f"{notice.severity}: {notice.message_primary}")
         elif notice.message_primary != "there is already a transaction in progress":
-            self._notices.append(f"WARNING: {notice.message_primary}")
+            self._add_notice(f"WARNING: {notice.message_primary}")
+
+    def _add_notice(self, notice: str) -> None:
+        if len(self._notices) < MAX_BATCH_NOTICES:
+            self._notices.append(notice)
+        else:
+            self._dropped_notice_count += 1
 
 
 class SelectBatch(Batch):
@@ -237,11 +419,37 @@ class SelectBatch(Batch):
         selection: SelectionData,
         batch_events: SelectBatchEvents | None,
         storage_type: ResultSetStorageType,
+        max_cell_display_size: int | None = None,
+        spill_session_id: str | None = None,
+        capture_execution_plan: bool = False,
+        pooler_compatible: bool = False,
     ) -> None:
-        Batch.__init__(self, batch_text, ordinal, selection, batch_events, storage_type)
+        """
+        :param pooler_compatible: whether the connection goes through a transaction
+            pooler, which cannot hold a cursor open between transactions. The rows are
+            then read with a cursor that lives in a transaction, up to
+            POOLER_COMPATIBLE_MAX_ROWS.
+        """
+        Batch.__init__(
+            self,
+            batch_text,
+            ordinal,
+            selection,
+            batch_events,
+            storage_type,
+            max_cell_display_size,
+            spill_session_id,
+            capture_execution_plan,
+        )
+        self._pooler_compatible = pooler_compatible
+        if pooler_compatible:
+            self._max_rows = POOLER_COMPATIBLE_MAX_ROWS
 
     def get_cursor(self, connection: ServerConnection) -> psycopg.Cursor:
         cursor_name = str(uuid.uuid4())
+        if self._pooler_compatible:
+            # Without hold, so that the cursor ends with the transaction it runs in
+            return connection.server_cursor(cursor_name)
         # Named cursors can be created only in the transaction.
         # As our connection has autocommit set to true
         # there is not transaction concept with it so we need to have withhold to true
@@ -249,17 +457,46 @@ class SelectBatch(Batch):
         # and we explicitly close it we are good
         return connection.cursor(name=cursor_name, withhold=True)
 
+    def execute(self, conn: ServerConnection, fire_events: bool = True) -> None:
+        # Inside a transaction of the user, the cursor lives in that transaction
+        if not self._pooler_compatible or not conn.autocommit or not conn.transaction_is_idle:
+            super().execute(conn, fire_events)
+            return
+
+        # A transaction pooler keeps a transaction on one server connection, so the
+        # rows are fetched from the cursor in a transaction, which ends once they are read.
+        # Closing the cursor at the row limit stops the query from producing the rest.
+        conn.autocommit = False
+        try:
+            super().execute(conn, fire_events)
+            conn.commit()
+        except Exception:
+            with contextlib.suppress(Exception):
+                conn.rollback()
+            raise
+        finally:
+            # A broken connection cannot change autocommit. The pool discards it.
+            with contextlib.suppress(Exception):
+                conn.autocommit = True
+
     def after_execute(self, cursor: psycopg.Cursor) -> None:
         super().create_result_set(cursor)
 
 
 def create_result_set(
-    storage_type: ResultSetStorageType, result_set_id: int, batch_id: int
+    storage_type: ResultSetStorageType,
+    result_set_id: int,
+    batch_id: int,
+    events: ResultSetEvents | None = None,
+    max_cell_display_size: int | None = None,
+    spill_session_id: str | None = None,
 ) -> ResultSet:
     if storage_type is ResultSetStorageType.FILE_STORAGE:
-        return FileStorageResultSet(result_set_id, batch_id)
+        return FileStorageResultSet(
+            result_set_id, batch_id, events, max_cell_display_size, spill_session_id
+        )
 
-    return InMemoryResultSet(result_set_id, batch_id)
+    return InMemoryResultSet(result_set_id, batch_id, events)
 
 
 def create_batch(
@@ -268,6 +505,10 @@ def create_batch(
     selection: SelectionData,
     batch_events: BatchEvents | None,
     storage_type: ResultSetStorageType,
+    max_cell_display_size: int | None = None,
+    spill_session_id: str | None = None,
+    capture_execution_plan: bool = False,
+    pooler_compatible: bool = False,
 ) -> Batch:
     sql = sqlparse.parse(batch_text)
     statement = sql[0]
@@ -286,6 +527,37 @@ def create_batch(
                 selection,
                 SelectBatchEvents.from_events(batch_events) if batch_events else None,
                 storage_type,
+                max_cell_display_size,
+                spill_session_id,
+                capture_execution_plan,
+                pooler_compatible,
             )
 
-    return Batch(batch_text, ordinal, selection, batch_events, storage_type)
+    return Batch(
+        batch_text,
+        ordinal,
+        selection,
+        batch_events,
+        storage_type,
+        max_cell_display_size,
+        spill_session_id,
+        capture_execution_plan,
+    )
+
+
+def is_read_only_statement(batch_text: str) -> bool:
+    """Whether a statement is a plain SELECT that neither writes nor locks rows,
+    and does not call functions that use session state
+    """
+    statements = sqlparse.parse(batch_text)
+    if not statements or statements[0].get_type() != "SELECT":
+        return False
+
+    for token in statements[0].flatten():
+        if token.is_keyword and token.normalized in _WRITE_KEYWORDS:
+            return False
+        if token.ttype in sqlparse.tokens.Name and token.value.lower() in (
+            SESSION_STATE_FUNCTIONS
+        ):
+            return False
+    return True
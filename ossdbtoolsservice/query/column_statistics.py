@@ -0,0 +1,185 @@
+# --------------------------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for license information.
+# --------------------------------------------------------------------------------------------
+
+"""Column statistics that are collected in a single pass over the rows of a result set"""
+
+import math
+from collections.abc import Iterable
+from functools import partial
+from typing import Any
+
+from ossdbtoolsservice.parsers import datatypes
+from ossdbtoolsservice.query.contracts import ColumnStatistics, DbColumn
+from ossdbtoolsservice.query.result_set_view import get_value_key
+
+# Data types whose values have a meaningful order, so min and max are reported for them
+ORDERED_DATA_TYPES = [
+    datatypes.DATATYPE_SMALLINT,
+    datatypes.DATATYPE_INTEGER,
+    datatypes.DATATYPE_BIGINT,
+    datatypes.DATATYPE_NUMERIC,
+    datatypes.DATATYPE_REAL,
+    datatypes.DATATYPE_DOUBLE,
+    datatypes.DATATYPE_OID,
+    datatypes.DATATYPE_CHAR,
+    datatypes.DATATYPE_VARCHAR,
+    datatypes.DATATYPE_BPCHAR,
+    datatypes.DATATYPE_TEXT,
+    datatypes.DATATYPE_NAME,
+    datatypes.DATATYPE_UUID,
+    datatypes.DATATYPE_BOOL,
+    datatypes.DATATYPE_DATE,
+    datatypes.DATATYPE_TIME,
+    datatypes.DATATYPE_TIMESTAMP,
+    datatypes.DATATYPE_TIMESTAMP_WITH_TIMEZONE,
+]
+
+_MASK_64 = (1 << 64) - 1
+
+
+class HyperLogLog:
+    """HyperLogLog distinct count estimator.
+    With the default precision it uses 4 KB per column for a standard error of about 1.6%.
+    """
+
+    def __init__(self, precision: int = 12) -> None:
+        self._precision = precision
+        self._register_count = 1 << precision
+        self._registers = bytearray(self._register_count)
+
+    def add(self, value: Any) -> None:
+        self.add_all((value,))
+
+    def add_all(self, values: Iterable[Any]) -> None:
+        """Add values in one loop, which costs less per value than adding them one by one"""
+        registers = self._registers
+        precision = self._precision
+        index_shift = 64 - precision
+        for value in values:
+            hashed = _mix_64(_hash_value(value))
+            remaining_bits = (hashed << precision) & _MASK_64
+            # Position of the leftmost 1 bit in the bits not used for the register index
+            rank = min(64 - remaining_bits.bit_length(), index_shift) + 1
+            register_index = hashed >> index_shift
+            if rank > registers[register_index]:
+                registers[register_index] = rank
+
+    def estimate(self) -> int:
+        register_count = self._register_count
+        alpha = 0.7213 / (1 + 1.079 / register_count)
+        raw_estimate = (
+            alpha
+            * register_count
+            * register_count
+            / sum(2.0**-register for register in self._registers)
+        )
+
+        empty_registers = self._registers.count(0)
+        if raw_estimate <= 2.5 * register_count and empty_registers > 0:
+            # Linear counting is more accurate for small cardinalities
+            return round(register_count * math.log(register_count / empty_registers))
+        return round(raw_estimate)
+
+
+class ColumnStatisticsCollector:
+    """Collects the statistics of one column from its values, a batch at a time"""
+
+    def __init__(self, column_index: int, column: DbColumn) -> None:
+        self._column_index = column_index
+        self._data_type = column.data_type
+        self._is_ordered = column.data_type in ORDERED_DATA_TYPES
+
+        self._null_count = 0
+        self._non_null_count = 0
+        self._total_width = 0
+        self._min_key: tuple | None = None
+        self._min_value: Any = None
+        self._max_key: tuple | None = None
+        self._max_value: Any = None
+        self._distinct = HyperLogLog()
+
+    def add_all(self, values: list[Any]) -> None:
+        non_null_values = [value for value in values if value is not None]
+        self._null_count += len(values) - len(non_null_values)
+        if not non_null_values:
+            return
+
+        self._non_null_count += len(non_null_values)
+        self._total_width += sum(
+            len(value) if isinstance(value, str) else len(str(value))
+            for value in non_null_values
+        )
+        self._distinct.add_all(non_null_values)
+
+        if self._is_ordered:
+            keys = list(map(partial(get_value_key, self._data_type), non_null_values))
+            min_index = min(range(len(keys)), key=keys.__getitem__)
+            if self._min_key is None or keys[min_index] < self._min_key:
+                self._min_key, self._min_value = keys[min_index], non_null_values[min_index]
+            max_index = max(range(len(keys)), key=keys.__getitem__)
+            if self._max_key is None or keys[max_index] > self._max_key:
+                self._max_key, self._max_value = keys[max_index], non_null_values[max_index]
+
+    def get_statistics(self) -> ColumnStatistics:
+        return ColumnStatistics(
+            column_index=self._column_index,
+            null_count=self._null_count,
+            non_null_count=self._non_null_count,
+            min_value=str(self._min_value) if self._min_key is not None else None,
+            max_value=str(self._max_value) if self._max_key is not None else None,
+            average_width=(
+                self._total_width / self._non_null_count if self._non_null_count else None
+            ),
+            distinct_estimate=self._distinct.estimate() if self._non_null_count else 0,
+        )
+
+
+class ResultSetStatisticsCollector:
+    """Collects the statistics of all columns of a result set.
+
+    Rows are only kept as they are added, which is cheap enough to do while the rows
+    are spilled. They are collected a batch at a time, column by column, when the
+    spilled rows are flushed or the statistics are requested.
+    """
+
+    def __init__(self, columns_info: list[DbColumn]) -> None:
+        self._columns = [
+            ColumnStatisticsCollector(index, column)
+            for index, column in enumerate(columns_info)
+        ]
+        self._pending_rows: list[tuple] = []
+
+    def add_row(self, row: tuple) -> None:
+        self._pending_rows.append(row)
+
+    def flush(self) -> None:
+        """Collect the statistics of the rows added since the last flush"""
+        if not self._pending_rows:
+            return
+        for column, values in zip(
+            self._columns, zip(*self._pending_rows, strict=True), strict=False
+        ):
+            column.add_all(list(values))
+        self._pending_rows.clear()
+
+    def get_statistics(self) -> list[ColumnStatistics]:
+        self.flush()
+        return [column.get_statistics() for column in self._columns]
+
+
+def _hash_value(value: Any) -> int:
+    try:
+        return hash(value)
+    except TypeError:
+        # Unhashable values, like arrays read as lists
+        return hash(str(value))
+
+
+def _mix_64(value: int) -> int:
+    """Spread the bits of a hash over 64 bits, since hashes of ints are the ints themselves"""
+    value = (value + 0x9E3779B97F4A7C15) & _MASK_64
+    value = ((value ^ (value >> 30)) * 0xBF58476D1CE4E5B9) & _MASK_64
+    value = ((value ^ (value >> 27)) * 0x94D049BB133111EB) & _MASK_64
+    return value ^ (value >> 31)
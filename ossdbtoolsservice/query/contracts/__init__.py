@@ -6,20 +6,33 @@
 # Import order to avoid circular import
 # ruff:noqa: I001
 
+from ossdbtoolsservice.query.contracts.batch_timings import BatchTimings
 from ossdbtoolsservice.query.contracts.column import DbCellValue, DbColumn
+from ossdbtoolsservice.query.contracts.column_statistics import ColumnStatistics
+from ossdbtoolsservice.query.contracts.execution_plan_summary import (
+    ExecutionPlanSummary,
+    PlanNodeSummary,
+)
 from ossdbtoolsservice.query.contracts.result_set_subset import ResultSetSubset, SubsetResult
 from ossdbtoolsservice.query.contracts.result_set_summary import ResultSetSummary
 from ossdbtoolsservice.query.contracts.save_as_request import SaveResultsRequestParams
 from ossdbtoolsservice.query.contracts.selection_data import SelectionData
+from ossdbtoolsservice.query.contracts.spill_usage import SpillDirectoryUsage, SpillUsage
 from ossdbtoolsservice.query.contracts.batch_summary import BatchSummary
 
 __all__ = [
     "BatchSummary",
+    "BatchTimings",
+    "ColumnStatistics",
     "DbColumn",
     "DbCellValue",
+    "ExecutionPlanSummary",
+    "PlanNodeSummary",
     "ResultSetSummary",
     "ResultSetSubset",
     "SaveResultsRequestParams",
     "SelectionData",
+    "SpillDirectoryUsage",
+    "SpillUsage",
     "SubsetResult",
 ]
@@ -7,7 +7,11 @@
 from typing import TYPE_CHECKING
 
 from ossdbtoolsservice.hosting import OutgoingMessageRegistration
-from ossdbtoolsservice.query.contracts import SelectionData
+from ossdbtoolsservice.query.contracts import (
+    BatchTimings,
+    ExecutionPlanSummary,
+    SelectionData,
+)
 from ossdbtoolsservice.query.contracts.result_set_summary import ResultSetSummary
 
 if TYPE_CHECKING:
@@ -22,6 +26,8 @@ class BatchSummary:
     execution_end: str | None
     execution_elapsed: str | None
     result_set_summaries: list[ResultSetSummary] | None
+    execution_plan_summary: ExecutionPlanSummary | None
+    timings: BatchTimings | None
 
     @classmethod
     def from_batch(cls, batch: "Batch") -> "BatchSummary":
@@ -30,9 +36,12 @@ class BatchSummary:
         if batch.has_executed:
             instance.execution_elapsed = batch.elapsed_time
             instance.execution_end = batch.end_time
+            instance.timings = batch.timings
             instance.result_set_summaries = (
                 [batch.result_set.result_set_summary] if batch.result_set is not None else []
             )
+            if batch.execution_plan is not None:
+                instance.execution_plan_summary = batch.execution_plan.summarize()
 
         return instance
 
@@ -50,6 +59,8 @@ class BatchSummary:
         self.execution_end = None
         self.execution_elapsed = None
         self.result_set_summaries = None
+        self.execution_plan_summary = None
+        self.timings = None
 
 
 OutgoingMessageRegistration.register_outgoing_message(BatchSummary)
@@ -0,0 +1,29 @@
+# --------------------------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for license information.
+# --------------------------------------------------------------------------------------------
+
+from ossdbtoolsservice.core.models import PGTSBaseModel
+from ossdbtoolsservice.hosting import OutgoingMessageRegistration
+
+
+class BatchTimings(PGTSBaseModel):
+    """Where the time of a batch went, in milliseconds.
+    server_execute_time is the time until the server completed the statement, including
+    the commit that materializes the rows of held cursors, or the transfer of the rows
+    for statements that are not run with a server side cursor. fetch_time is the time spent
+    waiting for rows, and spill_time the time spent encoding and writing them to disk.
+    time_to_first_row is measured from the start of the batch, and is None if no rows
+    were returned.
+    """
+
+    server_execute_time: float
+    time_to_first_row: float | None = None
+    fetch_time: float
+    spill_time: float
+    row_count: int
+    rows_per_second: float | None = None
+    bytes_spilled: int
+
+
+OutgoingMessageRegistration.register_outgoing_message(BatchTimings)
@@ -128,14 +128,29 @@ class DbCellValue:
     is_null: bool
     row_id: int | None
     raw_object: Any
+    # Set when only a preview of the value was stored with the result set.
+    # original_length is in characters, or bytes for binary values.
+    # Only set on the cells that are truncated, so that the other cells
+    # are serialized without them.
+    is_truncated: bool = False
+    original_length: int | None = None
 
     def __init__(
-        self, display_value: Any, is_null: bool, raw_object: Any, row_id: int | None
+        self,
+        display_value: Any,
+        is_null: bool,
+        raw_object: Any,
+        row_id: int | None,
+        is_truncated: bool = False,
+        original_length: int | None = None,
     ) -> None:
         self.display_value: str = "" if (display_value is None) else str(display_value)
         self.is_null: bool = is_null
         self.row_id = row_id
         self.raw_object = raw_object
+        if is_truncated:
+            self.is_truncated = is_truncated
+            self.original_length = original_length
 
 
 OutgoingMessageRegistration.register_outgoing_message(DbColumn)
@@ -0,0 +1,26 @@
+# --------------------------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for license information.
+# --------------------------------------------------------------------------------------------
+
+from ossdbtoolsservice.core.models import PGTSBaseModel
+from ossdbtoolsservice.hosting import OutgoingMessageRegistration
+
+
+class ColumnStatistics(PGTSBaseModel):
+    """Statistics of the values of a result set column.
+    min_value and max_value are only set for columns of ordered types.
+    average_width is the average number of characters of the non-null values.
+    distinct_estimate is an approximate count of the distinct non-null values.
+    """
+
+    column_index: int
+    null_count: int
+    non_null_count: int
+    min_value: str | None = None
+    max_value: str | None = None
+    average_width: float | None = None
+    distinct_estimate: int
+
+
+OutgoingMessageRegistration.register_outgoing_message(ColumnStatistics)
@@ -0,0 +1,53 @@
+# --------------------------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for license information.
+# --------------------------------------------------------------------------------------------
+
+from pydantic import Field
+
+from ossdbtoolsservice.core.models import PGTSBaseModel
+from ossdbtoolsservice.hosting import OutgoingMessageRegistration
+
+
+class PlanNodeSummary(PGTSBaseModel):
+    """A node of an executed query plan.
+    node_id is the position of the node in a depth-first walk of the plan, starting at 0.
+    Times are in milliseconds over all loops of the node. exclusive_time leaves out
+    the time spent in the node's children, and so do the exclusive block counts.
+    row_estimate_error is the factor between the estimated and the actual rows,
+    1 when the estimate was exact.
+    """
+
+    node_id: int
+    node_type: str
+    relation_name: str | None = None
+    total_time: float
+    exclusive_time: float
+    loops: int
+    estimated_rows: float
+    actual_rows: float
+    row_estimate_error: float
+    shared_hit_blocks: int
+    shared_read_blocks: int
+    spill_description: str | None = None
+
+
+class ExecutionPlanSummary(PGTSBaseModel):
+    """The hotspots of a query plan captured with EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON).
+    hotspots are the nodes that took the most exclusive time, row_estimate_errors
+    the nodes whose row estimates were off the most, and disk_spills the sorts,
+    hashes and aggregates that spilled to disk.
+    """
+
+    planning_time: float | None = None
+    execution_time: float | None = None
+    shared_hit_blocks: int
+    shared_read_blocks: int
+    buffer_hit_ratio: float | None = None
+    hotspots: list[PlanNodeSummary] = Field(default_factory=list)
+    row_estimate_errors: list[PlanNodeSummary] = Field(default_factory=list)
+    disk_spills: list[PlanNodeSummary] = Field(default_factory=list)
+
+
+OutgoingMessageRegistration.register_outgoing_message(PlanNodeSummary)
+OutgoingMessageRegistration.register_outgoing_message(ExecutionPlanSummary)
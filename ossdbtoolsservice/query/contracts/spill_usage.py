@@ -0,0 +1,38 @@
+# --------------------------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for license information.
+# --------------------------------------------------------------------------------------------
+
+from pydantic import Field
+
+from ossdbtoolsservice.core.models import PGTSBaseModel
+from ossdbtoolsservice.hosting import OutgoingMessageRegistration
+
+
+class SpillDirectoryUsage(PGTSBaseModel):
+    """Disk usage of the result set spill files in one directory.
+    free_bytes is the free space of the directory's volume, if it could be determined.
+    """
+
+    directory: str
+    file_count: int
+    bytes_used: int
+    free_bytes: int | None = None
+
+
+class SpillUsage(PGTSBaseModel):
+    """Disk usage of the result set spill files of the service process.
+    session_bytes_used is only set when the usage of a session was requested.
+    Quotas of None are unlimited.
+    """
+
+    file_count: int
+    bytes_used: int
+    session_bytes_used: int | None = None
+    process_quota_bytes: int | None = None
+    session_quota_bytes: int | None = None
+    directories: list[SpillDirectoryUsage] = Field(default_factory=list)
+
+
+OutgoingMessageRegistration.register_outgoing_message(SpillDirectoryUsage)
+OutgoingMessageRegistration.register_outgoing_message(SpillUsage)
@@ -6,7 +6,10 @@
 # Import order to avoid circular import
 # ruff:noqa: I001
 
-from ossdbtoolsservice.query.data_storage.storage_data_reader import StorageDataReader
+from ossdbtoolsservice.query.data_storage.storage_data_reader import (
+    RowsDataReader,
+    StorageDataReader,
+)
 from ossdbtoolsservice.query.data_storage.service_buffer_file_stream_writer import (
     ServiceBufferFileStreamWriter,
 )
@@ -39,4 +42,5 @@ __all__ = [
     "ServiceBufferFileStreamWriter",
     "ServiceBufferFileStreamReader",
     "StorageDataReader",
+    "RowsDataReader",
 ]
@@ -4,8 +4,6 @@
 # --------------------------------------------------------------------------------------------
 
 import io
-import os
-import tempfile
 
 from ossdbtoolsservice.query.data_storage.service_buffer_file_stream_reader import (
     ServiceBufferFileStreamReader,
@@ -13,10 +11,12 @@ from ossdbtoolsservice.query.data_storage.service_buffer_file_stream_reader impo
 from ossdbtoolsservice.query.data_storage.service_buffer_file_stream_writer import (
     ServiceBufferFileStreamWriter,
 )
+from ossdbtoolsservice.query.data_storage.spill_manager import get_spill_manager
 
 
-def create_file() -> str:
-    return tempfile.mkstemp()[1]
+def create_file(session_id: str | None = None) -> str:
+    """Create a spill file, accounted for to the given session"""
+    return get_spill_manager().create_file(session_id)
 
 
 def get_reader(file_name: str) -> ServiceBufferFileStreamReader:
@@ -29,5 +29,10 @@ def get_writer(file_name: str) -> ServiceBufferFileStreamWriter:
     return ServiceBufferFileStreamWriter(io.open(file_name, "wb"))  # noqa: UP020
 
 
+def get_appending_writer(file_name: str) -> ServiceBufferFileStreamWriter:
+    """Get a writer for an existing file that keeps its content, to append rows to it"""
+    return ServiceBufferFileStreamWriter(io.open(file_name, "r+b"))  # noqa: UP020
+
+
 def delete_file(file_name: str) -> None:
-    os.remove(file_name)
+    get_spill_manager().delete_file(file_name)
@@ -49,15 +49,32 @@ class ServiceBufferFileStreamReader(ServiceBufferFileStream):
             raise OSError(ServiceBufferFileStreamReader.READER_DATA_READ_ERROR) from exc
         return read_bytes_result
 
+    def read_bytes(self, file_offset: int, length_to_read: int) -> bytes:
+        """Read raw bytes from the file"""
+        return self._read_bytes_from_file(file_offset, length_to_read)
+
     def read_row(
-        self, file_offset: int, row_id: int, columns_info: list[DbColumn]
+        self,
+        file_offset: int,
+        row_id: int,
+        columns_info: list[DbColumn],
+        columns: list[int] | None = None,
     ) -> list[DbCellValue]:
-        """Read a row from a file"""
+        """Read a row from a file.
+
+        If columns is set, only the cells of those column indexes are returned, in that
+        order. The cells of the other columns are skipped using their length prefixes,
+        without being read or decoded, and the cells after the last requested one are
+        not visited at all.
+        """
         self._file_stream.seek(file_offset)
 
-        len_columns_info = len(columns_info)
+        requested_columns = None if columns is None else set(columns)
+        len_columns_info = (
+            len(columns_info) if columns is None else max(columns, default=-1) + 1
+        )
         current_file_offset = file_offset
-        results = []  # list of DbCellValue as return
+        cells: dict[int, DbCellValue] = {}  # DbCellValue by column index
 
         for index in range(0, len_columns_info):
             column = columns_info[index]
@@ -69,11 +86,7 @@ class ServiceBufferFileStreamReader(ServiceBufferFileStream):
                 value = DbCellValue(
                     display_value="NULL", is_null=True, raw_object=None, row_id=row_id
                 )
-                results.append(value)
-                continue
-
-            # Read the object from the temp file
-            if type_value == datatypes.DATATYPE_NULL:
+            elif type_value == datatypes.DATATYPE_NULL:
                 # wrap the NULL value as a DbCellValue
                 value = DbCellValue(
                     display_value=None, is_null=True, raw_object=None, row_id=row_id
@@ -92,6 +105,11 @@ class ServiceBufferFileStreamReader(ServiceBufferFileStream):
                     bytes_length_to_read = struct.unpack("i", raw_bytes_length_to_read)[0]
                     current_file_offset += 4
 
+                    if requested_columns is not None and index not in requested_columns:
+                        # skip the data content of a column that was not requested
+                        current_file_offset += bytes_length_to_read
+                        continue
+
                     # read the data content based on the length of data
                     read_bytes_result = self._read_bytes_from_file(
                         current_file_offset, bytes_length_to_read
@@ -113,6 +131,8 @@ class ServiceBufferFileStreamReader(ServiceBufferFileStream):
                         row_id=row_id,
                     )
 
-            results.append(value)
+            cells[index] = value
 
-        return results
+        if columns is None:
+            return list(cells.values())
+        return [cells[index] for index in columns]
@@ -8,6 +8,7 @@ import struct
 from typing import Any, Callable  # noqa
 
 from ossdbtoolsservice.converters import get_any_to_bytes_converter
+from ossdbtoolsservice.parsers import datatypes
 from ossdbtoolsservice.query.data_storage import StorageDataReader
 
 
@@ -19,7 +20,7 @@ class ServiceBufferFileStreamWriter:
     WRITER_DATA_WRITE_ERROR = "Data write error"
     CONVERTER_DATA_TYPE_NOT_EXIST_ERROR = "Convert to bytes not supported"
 
-    def __init__(self, stream: io.BufferedWriter) -> None:
+    def __init__(self, stream: io.BufferedWriter | io.BufferedRandom) -> None:
         if stream is None:
             raise ValueError(ServiceBufferFileStreamWriter.WRITER_STREAM_NONE_ERROR)
 
@@ -29,6 +30,8 @@ class ServiceBufferFileStreamWriter:
             )
 
         self._file_stream = stream
+        # Column index to original length of the values truncated in the last written row
+        self.truncated_cells: dict[int, int] = {}
 
     def __enter__(self) -> "ServiceBufferFileStreamWriter":
         return self
@@ -40,7 +43,7 @@ class ServiceBufferFileStreamWriter:
         val_byte_array = bytearray(b"\xff\xff\xff\xff")
         return self._write_to_file(val_byte_array)
 
-    def _write_to_file(self, byte_array: bytes) -> int:
+    def _write_to_file(self, byte_array: bytes | bytearray) -> int:
         try:
             written_byte_number = self._file_stream.write(byte_array)
         except Exception as exc:
@@ -48,11 +51,22 @@ class ServiceBufferFileStreamWriter:
 
         return written_byte_number
 
-    def write_row(self, reader: StorageDataReader) -> int | Any:
-        """Write a row to a file"""
+    def write_bytes(self, byte_array: bytes | bytearray) -> int:
+        """Write raw bytes to the file"""
+        return self._write_to_file(byte_array)
+
+    def write_row(
+        self, reader: StorageDataReader, max_cell_display_size: int | None = None
+    ) -> int | Any:
+        """Write a row to a file.
+
+        If max_cell_display_size is set, text and binary values longer than it are
+        truncated, and their original lengths are recorded in truncated_cells.
+        """
         # Define a object list to store multiple columns in a row
         len_columns_info = len(reader.columns_info)
         values = []
+        self.truncated_cells = {}
 
         # Loop over all the columns and write the values to the temp file
         row_bytes = 0
@@ -62,6 +76,12 @@ class ServiceBufferFileStreamWriter:
             values.append(reader.get_value(index))
             type_value = column.data_type
 
+            if max_cell_display_size:
+                preview = self._get_preview(reader, index, type_value, max_cell_display_size)
+                if preview is not None:
+                    self.truncated_cells[index] = len(values[index])
+                    values[index] = preview
+
             # Write the object into the temp file
             if reader.is_none(index):
                 row_bytes += self._write_null()
@@ -80,5 +100,30 @@ class ServiceBufferFileStreamWriter:
 
         return row_bytes
 
+    @staticmethod
+    def _get_preview(
+        reader: StorageDataReader, index: int, type_value: str | None, max_size: int
+    ) -> str | bytearray | None:
+        """Get a truncated preview of the value, or None if it does not need truncating"""
+        value = reader.get_value(index)
+
+        if isinstance(value, str):
+            if len(value) <= max_size:
+                return None
+            if type_value == datatypes.DATATYPE_XML:
+                return reader.get_xml_with_max_capacity(index, max_size)
+            return reader.get_chars_with_max_capacity(index, max_size)
+
+        if isinstance(value, (bytes, bytearray, memoryview)):
+            if len(value) <= max_size:
+                return None
+            return reader.get_bytes_with_max_capacity(index, max_size)
+
+        return None
+
+    def flush(self) -> None:
+        """Flush buffered rows to the file so they can be read by other streams"""
+        self._file_stream.flush()
+
     def seek(self, offset: int) -> None:
         self._file_stream.seek(offset, io.SEEK_SET)
@@ -0,0 +1,338 @@
+# --------------------------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for license information.
+# --------------------------------------------------------------------------------------------
+
+"""Placement, accounting and cleanup of the files that result sets spill to disk"""
+
+import contextlib
+import logging
+import os
+import queue
+import shutil
+import tempfile
+import threading
+import time
+from collections.abc import Iterable
+from logging import Logger
+
+from ossdbtoolsservice.query.contracts import SpillDirectoryUsage, SpillUsage
+
+# Spill file names are "<prefix><pid>-<random>", so that the startup sweep can tell
+# the files of running service processes from the ones left behind by crashed processes
+SPILL_FILE_PREFIX = "pgts-spill-"
+
+# Spill files of other processes are considered orphaned after this many seconds
+# on platforms where it cannot be checked whether the owning process is still running
+ORPHANED_FILE_MAX_AGE_SECONDS = 24 * 60 * 60
+
+
+class SpillQuotaExceededError(Exception):
+    """Raised when spilling more data would exceed the process or session quota"""
+
+    def __init__(self, message: str, setting_name: str, quota_bytes: int) -> None:
+        super().__init__(message)
+        self.setting_name = setting_name
+        self.quota_bytes = quota_bytes
+
+
+class _SpillFile:
+    def __init__(self, session_id: str | None) -> None:
+        self.session_id = session_id
+        self.byte_count = 0
+
+
+class SpillManager:
+    """Creates spill files round-robin across the configured directories, accounts for
+    the bytes written to them per process and per session, and deletes them.
+
+    A session is the owner of the result sets, usually the owner URI of a query.
+    Quotas of 0 or None are unlimited.
+    """
+
+    def __init__(
+        self,
+        directories: list[str] | None = None,
+        process_quota_bytes: int | None = None,
+        session_quota_bytes: int | None = None,
+        logger: Logger | None = None,
+    ) -> None:
+        self._lock = threading.Lock()
+        self._logger = logger or logging.getLogger(__name__)
+        self._directories: list[str] = []
+        self._next_directory_index = 0
+        self._process_quota_bytes: int | None = None
+        self._session_quota_bytes: int | None = None
+
+        self._files: dict[str, _SpillFile] = {}
+        self._process_bytes = 0
+        self._session_bytes: dict[str | None, int] = {}
+
+        # Files are deleted in the background by a single thread, started on first use
+        self._files_to_delete: queue.Queue[str] = queue.Queue()
+        self._delete_thread: threading.Thread | None = None
+
+        self.configure(directories, process_quota_bytes, session_quota_bytes)
+
+    def set_logger(self, logger: Logger) -> None:
+        self._logger = logger
+
+    @property
+    def directories(self) -> list[str]:
+        return list(self._directories)
+
+    def configure(
+        self,
+        directories: list[str] | None,
+        process_quota_bytes: int | None,
+        session_quota_bytes: int | None,
+    ) -> list[str]:
+        """Set the spill directories and quotas. Files that were already created stay
+        where they are, and count towards the new quotas.
+
+        :return: the directories that were not used before
+        """
+        directories = [os.path.abspath(directory) for directory in directories or []]
+        if not directories:
+            directories = [tempfile.gettempdir()]
+
+        with self._lock:
+            new_directories = [
+                directory for directory in directories if directory not in self._directories
+            ]
+            self._directories = directories
+            self._next_directory_index = 0
+            self._process_quota_bytes = process_quota_bytes or None
+            self._session_quota_bytes = session_quota_bytes or None
+
+        for directory in new_directories:
+            os.makedirs(directory, exist_ok=True)
+        return new_directories
+
+    def create_file(self, session_id: str | None = None) -> str:
+        """Create an empty spill file in the next directory, round-robin.
+
+        :raises SpillQuotaExceededError: the process or session quota is used up
+        """
+        with self._lock:
+            # Reject new files once a quota is used up, rather than failing on first write
+            self._check_quota(session_id, 1)
+            directory = self._directories[self._next_directory_index]
+            self._next_directory_index = (self._next_directory_index + 1) % len(
+                self._directories
+            )
+
+        file_descriptor, file_name = tempfile.mkstemp(
+            prefix=f"{SPILL_FILE_PREFIX}{os.getpid()}-", dir=directory
+        )
+        os.close(file_descriptor)
+
+        with self._lock:
+            self._files[file_name] = _SpillFile(session_id)
+        return file_name
+
+    def add_bytes(self, file_name: str, byte_count: int) -> None:
+        """Account for bytes written to a spill file.
+
+        :raises SpillQuotaExceededError: the bytes exceed the process or session quota.
+        They are not accounted for, and the caller is expected to stop writing.
+        """
+        with self._lock:
+            spill_file = self._files.get(file_name)
+            if spill_file is None:
+                return
+
+            self._check_quota(spill_file.session_id, byte_count)
+            spill_file.byte_count += byte_count
+            self._process_bytes += byte_count
+            self._session_bytes[spill_file.session_id] = (
+                self._session_bytes.get(spill_file.session_id, 0) + byte_count
+            )
+
+    def delete_file(self, file_name: str) -> None:
+        """Delete a spill file and release the bytes accounted for it"""
+        with self._lock:
+            spill_file = self._files.pop(file_name, None)
+            if spill_file is not None:
+                self._process_bytes -= spill_file.byte_count
+                session_bytes = self._session_bytes.get(spill_file.session_id, 0)
+                session_bytes -= spill_file.byte_count
+                if session_bytes > 0:
+                    self._session_bytes[spill_file.session_id] = session_bytes
+                else:
+                    self._session_bytes.pop(spill_file.session_id, None)
+
+        with contextlib.suppress(FileNotFoundError):
+            os.remove(file_name)
+
+    def delete_files_in_background(self, file_names: Iterable[str]) -> None:
+        """Delete spill files on a background thread, so that disposing of large
+        result sets does not block the caller
+        """
+        with self._lock:
+            if self._delete_thread is None:
+                self._delete_thread = threading.Thread(
+                    target=self._delete_queued_files, name="SpillFileDelete", daemon=True
+                )
+                self._delete_thread.start()
+        for file_name in file_names:
+            self._files_to_delete.put(file_name)
+
+    def wait_for_deletes(self) -> None:
+        """Wait until the files queued for deletion in the background are deleted"""
+        self._files_to_delete.join()
+
+    def _delete_queued_files(self) -> None:
+        while True:
+            file_name = self._files_to_delete.get()
+            try:
+                self.delete_file(file_name)
+            except OSError as e:
+                self._logger.warning(f"Could not delete spill file {file_name}: {e}")
+            finally:
+                self._files_to_delete.task_done()
+
+    def sweep_orphaned_files(self, directories: list[str] | None = None) -> int:
+        """Delete spill files left behind by service processes that are no longer running.
+
+        :param directories: the directories to sweep, all configured ones by default
+        :return: the number of deleted files
+        """
+        now = time.time()
+        deleted_count = 0
+        for directory in directories or self.directories:
+            try:
+                entries = list(os.scandir(directory))
+            except OSError:
+                continue
+
+            for entry in entries:
+                pid = _get_owner_pid(entry.name)
+                if pid is None or pid == os.getpid():
+                    continue
+                try:
+                    if not _is_orphaned(pid, entry.stat().st_mtime, now):
+                        continue
+                    os.remove(entry.path)
+                    deleted_count += 1
+                except OSError as e:
+                    self._logger.warning(f"Could not delete spill file {entry.path}: {e}")
+
+        if deleted_count:
+            self._logger.info(f"Deleted {deleted_count} orphaned spill files")
+        return deleted_count
+
+    def sweep_orphaned_files_in_background(
+        self, directories: list[str] | None = None
+    ) -> threading.Thread:
+        thread = threading.Thread(
+            target=self.sweep_orphaned_files, args=(directories,), daemon=True
+        )
+        thread.start()
+        return thread
+
+    def get_usage(self, session_id: str | None = None) -> SpillUsage:
+        """Get the disk usage of the spill files of this process, per directory"""
+        with self._lock:
+            directories = list(self._directories)
+            file_bytes = [
+                (file_name, spill_file.byte_count)
+                for file_name, spill_file in self._files.items()
+            ]
+            usage = SpillUsage(
+                file_count=len(self._files),
+                bytes_used=self._process_bytes,
+                session_bytes_used=(
+                    self._session_bytes.get(session_id, 0) if session_id is not None else None
+                ),
+                process_quota_bytes=self._process_quota_bytes,
+                session_quota_bytes=self._session_quota_bytes,
+            )
+
+        # Files in directories that are no longer configured are reported as well
+        for file_name, _ in file_bytes:
+            directory = os.path.dirname(file_name)
+            if directory not in directories:
+                directories.append(directory)
+
+        for directory in directories:
+            directory_files = [
+                byte_count
+                for file_name, byte_count in file_bytes
+                if os.path.dirname(file_name) == directory
+            ]
+            try:
+                free_bytes: int | None = shutil.disk_usage(directory).free
+            except OSError:
+                free_bytes = None
+            usage.directories.append(
+                SpillDirectoryUsage(
+                    directory=directory,
+                    file_count=len(directory_files),
+                    bytes_used=sum(directory_files),
+                    free_bytes=free_bytes,
+                )
+            )
+        return usage
+
+    def _check_quota(self, session_id: str | None, byte_count: int) -> None:
+        # Must be called with the lock held
+        if (
+            self._process_quota_bytes is not None
+            and self._process_bytes + byte_count > self._process_quota_bytes
+        ):
+            raise SpillQuotaExceededError(
+                f"Result spill quota of {_format_megabytes(self._process_quota_bytes)} "
+                "for all queries was exceeded. Dispose of other query results or increase "
+                "the pgsql.spillProcessQuotaMb setting.",
+                "pgsql.spillProcessQuotaMb",
+                self._process_quota_bytes,
+            )
+
+        session_bytes = self._session_bytes.get(session_id, 0)
+        if (
+            session_id is not None
+            and self._session_quota_bytes is not None
+            and session_bytes + byte_count > self._session_quota_bytes
+        ):
+            raise SpillQuotaExceededError(
+                f"Result spill quota of {_format_megabytes(self._session_quota_bytes)} "
+                "per query was exceeded. Limit the number of rows returned or increase "
+                "the pgsql.spillSessionQuotaMb setting.",
+                "pgsql.spillSessionQuotaMb",
+                self._session_quota_bytes,
+            )
+
+
+def _format_megabytes(byte_count: int) -> str:
+    return f"{byte_count / (1024 * 1024):g} MB"
+
+
+def _get_owner_pid(file_name: str) -> int | None:
+    if not file_name.startswith(SPILL_FILE_PREFIX):
+        return None
+    pid, _, _ = file_name[len(SPILL_FILE_PREFIX) :].partition("-")
+    return int(pid) if pid.isdigit() else None
+
+
+def _is_orphaned(pid: int, modified_time: float, now: float) -> bool:
+    if os.name == "nt":
+        # os.kill terminates processes on Windows rather than checking them
+        return now - modified_time > ORPHANED_FILE_MAX_AGE_SECONDS
+
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return True
+    except PermissionError:
+        # The process exists, but belongs to another user
+        return False
+    return False
+
+
+_spill_manager = SpillManager()
+
+
+def get_spill_manager() -> SpillManager:
+    """Get the spill manager shared by all result sets of this process"""
+    return _spill_manager
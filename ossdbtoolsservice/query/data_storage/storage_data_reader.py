@@ -4,6 +4,7 @@
 # --------------------------------------------------------------------------------------------
 
 
+from collections.abc import Iterable, Iterator
 from typing import Any
 
 import psycopg
@@ -15,6 +16,9 @@ from ossdbtoolsservice.query.contracts import DbColumn
 class StorageDataReader:
     def __init__(self, cursor: psycopg.Cursor) -> None:
         self._cursor = cursor
+        # A single iteration over the cursor, as each new iteration of a server-side
+        # cursor fetches the next chunk of rows and drops what the previous one held
+        self._cursor_rows: Iterator[tuple] | None = None
         self._current_row: tuple | None = None
         self._columns_info: list[DbColumn] = []
 
@@ -27,12 +31,13 @@ class StorageDataReader:
         read_row uses the cursor to iterate over. It iterates over the cursor one at a time
         and returns True if it finds the row and False if it doesn’t
         """
-        row_found = False
+        if self._cursor_rows is None:
+            self._cursor_rows = iter(self._cursor)
 
-        for row in self._cursor:
+        row = next(self._cursor_rows, None)
+        row_found = row is not None
+        if row is not None:
             self._current_row = row
-            row_found = True
-            break
 
         if self._current_row is None or len(self._columns_info) == 0:
             self._columns_info = get_columns_info(self._cursor)
@@ -93,3 +98,18 @@ class StorageDataReader:
         column_value = self._current_row[column_index]
 
         return column_value[0:max_chars_to_return]
+
+
+class RowsDataReader(StorageDataReader):
+    """Reads rows that were already fetched, such as the rows returned by edit statements,
+    with the columns of the result set they are added to
+    """
+
+    def __init__(self, rows: Iterable[tuple], columns_info: list[DbColumn]) -> None:
+        self._rows = iter(rows)
+        self._current_row = None
+        self._columns_info = columns_info
+
+    def read_row(self) -> bool:
+        self._current_row = next(self._rows, None)
+        return self._current_row is not None
@@ -0,0 +1,194 @@
+# --------------------------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for license information.
+# --------------------------------------------------------------------------------------------
+
+"""Query plans captured with EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON), and their hotspots"""
+
+import json
+from collections.abc import Iterator
+from typing import Any
+
+from ossdbtoolsservice.query.contracts import ExecutionPlanSummary, PlanNodeSummary
+
+# Number of nodes reported in each list of the summary
+HOTSPOT_COUNT = 5
+
+# Row estimates that are off by at least this factor are reported
+ROW_ESTIMATE_ERROR_THRESHOLD = 10.0
+
+
+class PlanNode:
+    """A node of an executed query plan, with its child nodes.
+    Actual times and rows are averages per loop, like in the EXPLAIN output.
+    """
+
+    def __init__(self, node_id: int, properties: dict[str, Any]) -> None:
+        self.node_id = node_id
+        self.node_type: str = properties.get("Node Type", "")
+        self.relation_name: str | None = properties.get("Relation Name")
+        self.actual_total_time: float = properties.get("Actual Total Time", 0.0)
+        self.loops: int = properties.get("Actual Loops", 0)
+        self.estimated_rows: float = properties.get("Plan Rows", 0)
+        self.actual_rows: float = properties.get("Actual Rows", 0)
+        self.shared_hit_blocks: int = properties.get("Shared Hit Blocks", 0)
+        self.shared_read_blocks: int = properties.get("Shared Read Blocks", 0)
+
+        self.sort_method: str | None = properties.get("Sort Method")
+        self.sort_space_type: str | None = properties.get("Sort Space Type")
+        self.sort_space_used: int | None = properties.get("Sort Space Used")
+        self.hash_batches: int | None = properties.get("Hash Batches")
+        # Hash aggregates spill to disk since PostgreSQL 13
+        self.disk_usage: int | None = properties.get("Disk Usage")
+        self.hash_agg_batches: int | None = properties.get("HashAgg Batches")
+
+        self.children: list[PlanNode] = []
+
+    @property
+    def total_time(self) -> float:
+        """Milliseconds spent in the node and its children over all loops.
+        Nodes run by parallel workers count the time of each worker.
+        """
+        return self.actual_total_time * self.loops
+
+    @property
+    def exclusive_time(self) -> float:
+        """Milliseconds spent in the node itself over all loops"""
+        return max(0.0, self.total_time - sum(child.total_time for child in self.children))
+
+    @property
+    def exclusive_shared_hit_blocks(self) -> int:
+        return max(
+            0,
+            self.shared_hit_blocks - sum(child.shared_hit_blocks for child in self.children),
+        )
+
+    @property
+    def exclusive_shared_read_blocks(self) -> int:
+        return max(
+            0,
+            self.shared_read_blocks
+            - sum(child.shared_read_blocks for child in self.children),
+        )
+
+    @property
+    def row_estimate_error(self) -> float:
+        """The factor between the estimated and the actual rows per loop, at least 1.
+        Nodes that were never executed have no error.
+        """
+        if self.loops == 0:
+            return 1.0
+        estimated_rows = max(self.estimated_rows, 1)
+        actual_rows = max(self.actual_rows, 1)
+        return max(estimated_rows, actual_rows) / min(estimated_rows, actual_rows)
+
+    @property
+    def spill_description(self) -> str | None:
+        """How the node spilled to disk, or None if it did not"""
+        if self.sort_space_type == "Disk":
+            return f"{self.sort_method} sort using {self.sort_space_used} kB of disk"
+        if self.hash_batches is not None and self.hash_batches > 1:
+            return f"hash in {self.hash_batches} batches"
+        if self.disk_usage:
+            return (
+                f"hash aggregate in {self.hash_agg_batches} batches "
+                f"using {self.disk_usage} kB of disk"
+            )
+        return None
+
+    def walk(self) -> Iterator["PlanNode"]:
+        """Iterate over the node and its descendants, depth first"""
+        yield self
+        for child in self.children:
+            yield from child.walk()
+
+    def to_summary(self) -> PlanNodeSummary:
+        return PlanNodeSummary(
+            node_id=self.node_id,
+            node_type=self.node_type,
+            relation_name=self.relation_name,
+            total_time=self.total_time,
+            exclusive_time=self.exclusive_time,
+            loops=self.loops,
+            estimated_rows=self.estimated_rows,
+            actual_rows=self.actual_rows,
+            row_estimate_error=self.row_estimate_error,
+            shared_hit_blocks=self.exclusive_shared_hit_blocks,
+            shared_read_blocks=self.exclusive_shared_read_blocks,
+            spill_description=self.spill_description,
+        )
+
+
+class ExecutionPlan:
+    """A query plan captured with EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON)"""
+
+    def __init__(
+        self,
+        root: PlanNode,
+        planning_time: float | None = None,
+        execution_time: float | None = None,
+    ) -> None:
+        self.root = root
+        self.planning_time = planning_time
+        self.execution_time = execution_time
+
+    @classmethod
+    def from_json(cls, value: Any) -> "ExecutionPlan":
+        """Parse the output of EXPLAIN (FORMAT JSON), either as text or as parsed JSON
+
+        :raises ValueError: if the value is not a query plan
+        """
+        if isinstance(value, str):
+            value = json.loads(value)
+        if isinstance(value, list) and len(value) == 1:
+            value = value[0]
+        if not isinstance(value, dict) or not isinstance(value.get("Plan"), dict):
+            raise ValueError("The value is not a query plan in JSON format")
+
+        next_node_id = 0
+
+        def parse_node(properties: dict[str, Any]) -> PlanNode:
+            nonlocal next_node_id
+            node = PlanNode(next_node_id, properties)
+            next_node_id += 1
+            node.children = [parse_node(child) for child in properties.get("Plans", [])]
+            return node
+
+        return cls(
+            parse_node(value["Plan"]),
+            value.get("Planning Time"),
+            value.get("Execution Time"),
+        )
+
+    def summarize(self, top_count: int = HOTSPOT_COUNT) -> ExecutionPlanSummary:
+        nodes = list(self.root.walk())
+
+        hotspots = sorted(nodes, key=lambda node: node.exclusive_time, reverse=True)
+        row_estimate_errors = sorted(
+            (
+                node
+                for node in nodes
+                if node.row_estimate_error >= ROW_ESTIMATE_ERROR_THRESHOLD
+            ),
+            key=lambda node: node.row_estimate_error,
+            reverse=True,
+        )
+        disk_spills = [node for node in nodes if node.spill_description is not None]
+
+        # Block counts of a node include the ones of its children
+        hit_blocks = self.root.shared_hit_blocks
+        read_blocks = self.root.shared_read_blocks
+        return ExecutionPlanSummary(
+            planning_time=self.planning_time,
+            execution_time=self.execution_time,
+            shared_hit_blocks=hit_blocks,
+            shared_read_blocks=read_blocks,
+            buffer_hit_ratio=(
+                hit_blocks / (hit_blocks + read_blocks) if hit_blocks + read_blocks else None
+            ),
+            hotspots=[node.to_summary() for node in hotspots[:top_count]],
+            row_estimate_errors=[
+                node.to_summary() for node in row_estimate_errors[:top_count]
+            ],
+            disk_spills=[node.to_summary() for node in disk_spills[:top_count]],
+        )
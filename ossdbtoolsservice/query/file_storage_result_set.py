@@ -3,20 +3,51 @@
 # Licensed under the MIT License. See License.txt in the project root for license information.
 # --------------------------------------------------------------------------------------------
 
-
+import time
+from collections.abc import Iterator
+from contextlib import ExitStack
 from typing import Callable
 
 import psycopg
 
+from ossdbtoolsservice.converters import (
+    get_any_to_bytes_converter,
+    get_bytes_to_any_converter,
+)
+from ossdbtoolsservice.query.column_statistics import ResultSetStatisticsCollector
 from ossdbtoolsservice.query.contracts import (
     DbCellValue,
     ResultSetSubset,
 )
-from ossdbtoolsservice.query.data_storage import FileStreamFactory, StorageDataReader
+from ossdbtoolsservice.query.data_storage import (
+    FileStreamFactory,
+    RowsDataReader,
+    ServiceBufferFileStreamWriter,
+    StorageDataReader,
+)
 from ossdbtoolsservice.query.data_storage import service_buffer_file_stream as file_stream
+from ossdbtoolsservice.query.data_storage.spill_manager import get_spill_manager
 from ossdbtoolsservice.query.result_set import ResultSet, ResultSetEvents
 from ossdbtoolsservice.utils import validate
 
+# Rows spilled between two flushes of the output file while a result set is read.
+# Rows only become visible to readers of the result set once they are flushed.
+SPILL_FLUSH_ROW_COUNT = 1000
+
+# Bytes spilled between two updates of the spill quotas while a result set is read,
+# so that reading does not take the spill manager's lock for every row.
+# A read can go over its quota by up to this many bytes before it is stopped.
+SPILL_ACCOUNTING_BYTES = 1024 * 1024
+
+
+class TruncatedCell:
+    """Location of the full value of a cell that was stored truncated"""
+
+    def __init__(self, original_length: int, overflow_offset: int, overflow_length: int):
+        self.original_length = original_length
+        self.overflow_offset = overflow_offset
+        self.overflow_length = overflow_length
+
 
 class FileStorageResultSet(ResultSet):
     RESULT_SET_NOT_READ_ERROR = "Result set not read"
@@ -24,19 +55,42 @@ class FileStorageResultSet(ResultSet):
     RESULT_SET_ROW_COUNT_OF_RANGE_ERROR = "Result set row count out of range"
 
     def __init__(
-        self, result_set_id: int, batch_id: int, events: ResultSetEvents | None = None
+        self,
+        result_set_id: int,
+        batch_id: int,
+        events: ResultSetEvents | None = None,
+        max_cell_display_size: int | None = None,
+        spill_session_id: str | None = None,
     ) -> None:
         ResultSet.__init__(self, result_set_id, batch_id, events)
 
+        self._spill_session_id = spill_session_id
         self._total_bytes_written = 0
-        self._output_file_name = file_stream.create_file()
+        self._output_file_name = file_stream.create_file(spill_session_id)
         self._file_offsets: list[int] = []
 
+        # Values longer than max_cell_display_size are stored as a preview in the
+        # output file, and in full in the overflow file, which is created on first use.
+        self._max_cell_display_size = max_cell_display_size
+        self._overflow_file_name: str | None = None
+        self._overflow_bytes_written = 0
+        # Row file offset to the truncated cells of the row, by column index
+        self._truncated_cells: dict[int, dict[int, TruncatedCell]] = {}
+
+        # Set once the files are deleted. A read in progress then stops.
+        self._disposed = False
+
     @property
     def row_count(self) -> int:
         return len(self._file_offsets)
 
-    def get_subset(self, start_index: int, end_index: int) -> ResultSetSubset:
+    @property
+    def bytes_spilled(self) -> int:
+        return self._total_bytes_written + self._overflow_bytes_written
+
+    def get_subset(
+        self, start_index: int, end_index: int, columns: list[int] | None = None
+    ) -> ResultSetSubset:
         if not self._has_been_read:
             raise ValueError(FileStorageResultSet.RESULT_SET_NOT_READ_ERROR)
 
@@ -46,14 +100,20 @@ class FileStorageResultSet(ResultSet):
         if end_index < 0:
             raise KeyError(FileStorageResultSet.RESULT_SET_ROW_COUNT_OF_RANGE_ERROR)
 
+        self._validate_columns(columns)
         rows = []
 
         with file_stream.get_reader(self._output_file_name) as reader:
             rows_offsets = [
-                self._file_offsets[index] for index in range(start_index, end_index)
+                self._file_offsets[self.get_row_id(index)]
+                for index in range(start_index, end_index)
             ]
             rows = [
-                reader.read_row(offset, index, self.columns_info)
+                self._mark_truncated_cells(
+                    offset,
+                    reader.read_row(offset, index, self.columns_info, columns),
+                    columns,
+                )
                 for index, offset in enumerate(rows_offsets)
             ]
 
@@ -67,16 +127,40 @@ class FileStorageResultSet(ResultSet):
     def add_row(self, cursor: psycopg.Cursor) -> None:
         new_offset = self._append_row_to_buffer(cursor)
         self._file_offsets.append(new_offset)
+        self._statistics = None
+        self.clear_view()
 
     def remove_row(self, row_id: int) -> None:
         if not self._has_been_read:
             raise ValueError(FileStorageResultSet.RESULT_SET_NOT_READ_ERROR)
 
         del self._file_offsets[row_id]
+        self._statistics = None
+        self.clear_view()
 
     def update_row(self, row_id: int, cursor: psycopg.Cursor) -> None:
         new_offset = self._append_row_to_buffer(cursor)
         self._file_offsets[row_id] = new_offset
+        self._statistics = None
+        self.clear_view()
+
+    def apply_row_changes(
+        self,
+        updated_rows: dict[int, tuple],
+        added_rows: list[tuple],
+        removed_row_ids: list[int],
+    ) -> None:
+        if not self._has_been_read:
+            raise ValueError(FileStorageResultSet.RESULT_SET_NOT_READ_ERROR)
+
+        new_offsets = self._append_rows_to_buffer([*updated_rows.values(), *added_rows])
+        for row_id, new_offset in zip(updated_rows, new_offsets, strict=False):
+            self._file_offsets[row_id] = new_offset
+        self._file_offsets.extend(new_offsets[len(updated_rows) :])
+        for row_id in sorted(set(removed_row_ids), reverse=True):
+            del self._file_offsets[row_id]
+        self._statistics = None
+        self.clear_view()
 
     def get_row(self, row_id: int) -> list[DbCellValue]:
         if not self._has_been_read:
@@ -85,21 +169,135 @@ class FileStorageResultSet(ResultSet):
         if row_id >= self.row_count:
             raise KeyError(FileStorageResultSet.RESULT_SET_START_OUT_OF_RANGE_ERROR)
 
+        row_offset = self._file_offsets[row_id]
         with file_stream.get_reader(self._output_file_name) as reader:
-            return reader.read_row(self._file_offsets[row_id], row_id, self.columns_info)
+            row = reader.read_row(row_offset, row_id, self.columns_info)
+        return self._mark_truncated_cells(row_offset, row)
 
-    def read_result_to_end(self, cursor: psycopg.Cursor) -> None:
+    def get_cell_value(self, row_id: int, column_index: int) -> DbCellValue:
+        if not self._has_been_read:
+            raise ValueError(FileStorageResultSet.RESULT_SET_NOT_READ_ERROR)
+
+        if row_id < 0 or row_id >= self.view_row_count:
+            raise KeyError(FileStorageResultSet.RESULT_SET_START_OUT_OF_RANGE_ERROR)
+
+        row_offset = self._file_offsets[self.get_row_id(row_id)]
+        truncated_cell = self._truncated_cells.get(row_offset, {}).get(column_index)
+        if truncated_cell is None:
+            return ResultSet.get_cell_value(self, row_id, column_index)
+
+        value = self._read_overflow_value(truncated_cell, column_index)
+        return DbCellValue(value, False, value, row_id)
+
+    def read_result_to_end(self, cursor: psycopg.Cursor, max_rows: int | None = None) -> None:
         validate.is_not_none("cursor", cursor)
 
         self._has_been_read = True
         storage_data_reader = StorageDataReader(cursor)
 
-        with file_stream.get_writer(self._output_file_name) as writer:
-            while storage_data_reader.read_row():
-                self._file_offsets.append(self._total_bytes_written)
-                self._total_bytes_written += writer.write_row(storage_data_reader)
-
+        events = self.events
+        on_partially_loaded = events._on_result_set_partially_loaded if events else None
+        spill_manager = get_spill_manager()
+        timings = self.read_timings
+
+        # Offsets of the rows written since the last flush, not yet visible to readers
+        pending_offsets: list[int] = []
+        # Bytes written to the output file that the spill quotas do not account for yet
+        unaccounted_byte_count = 0
+        # Column statistics, collected from the full values of the rows as they are read
+        statistics: ResultSetStatisticsCollector | None = None
+
+        with ExitStack() as stack:
+            writer = stack.enter_context(file_stream.get_writer(self._output_file_name))
+            overflow_writer: ServiceBufferFileStreamWriter | None = None
+
+            fetch_start = time.perf_counter()
+            while not self._disposed and storage_data_reader.read_row():
+                if max_rows is not None and self.row_count + len(pending_offsets) >= max_rows:
+                    # The row after the first max_rows is not stored
+                    self.has_unread_rows = True
+                    break
+
+                spill_start = time.perf_counter()
+                timings.fetch_seconds += spill_start - fetch_start
+                if timings.first_row_time is None:
+                    timings.first_row_time = spill_start
+
+                row_offset = self._total_bytes_written
+                row_byte_count = writer.write_row(
+                    storage_data_reader, self._max_cell_display_size
+                )
+                self._total_bytes_written += row_byte_count
+                unaccounted_byte_count += row_byte_count
+                if unaccounted_byte_count >= SPILL_ACCOUNTING_BYTES:
+                    spill_manager.add_bytes(self._output_file_name, unaccounted_byte_count)
+                    unaccounted_byte_count = 0
+
+                if writer.truncated_cells:
+                    if overflow_writer is None:
+                        self._overflow_file_name = file_stream.create_file(
+                            self._spill_session_id
+                        )
+                        overflow_writer = stack.enter_context(
+                            file_stream.get_writer(self._overflow_file_name)
+                        )
+                    self._write_overflow_cells(
+                        row_offset,
+                        storage_data_reader,
+                        writer.truncated_cells,
+                        overflow_writer,
+                    )
+                if statistics is None:
+                    statistics = ResultSetStatisticsCollector(
+                        storage_data_reader.columns_info
+                    )
+                statistics.add_row(storage_data_reader.get_values())
+                timings.spill_seconds += time.perf_counter() - spill_start
+
+                pending_offsets.append(row_offset)
+
+                partially_loaded = (
+                    on_partially_loaded is not None
+                    and events is not None
+                    and self.row_count + len(pending_offsets)
+                    >= events._partially_loaded_row_count
+                )
+                if partially_loaded or len(pending_offsets) >= SPILL_FLUSH_ROW_COUNT:
+                    # Only publish the offsets once the rows are in the file,
+                    # so that readers never see a row that is not in the file yet
+                    writer.flush()
+                    if overflow_writer is not None:
+                        overflow_writer.flush()
+                    self.columns_info = storage_data_reader.columns_info
+                    self._file_offsets.extend(pending_offsets)
+                    pending_offsets.clear()
+                    statistics.flush()
+                if partially_loaded and on_partially_loaded is not None:
+                    on_partially_loaded(self)
+                    on_partially_loaded = None
+
+                fetch_start = time.perf_counter()
+
+            timings.fetch_seconds += time.perf_counter() - fetch_start
             self.columns_info = storage_data_reader.columns_info
+            if unaccounted_byte_count:
+                spill_manager.add_bytes(self._output_file_name, unaccounted_byte_count)
+
+        # The writers flushed the remaining rows as they were closed
+        self._file_offsets.extend(pending_offsets)
+        if statistics is not None:
+            self._statistics = statistics.get_statistics()
+
+        if self._disposed:
+            # Disposed while it was read. Delete the files created since.
+            self.dispose()
+
+    def dispose(self) -> None:
+        self._disposed = True
+        file_names = [self._output_file_name]
+        if self._overflow_file_name is not None:
+            file_names.append(self._overflow_file_name)
+        get_spill_manager().delete_files_in_background(file_names)
 
     def do_save_as(
         self,
@@ -116,9 +314,16 @@ class FileStorageResultSet(ResultSet):
                 file_factory.get_reader(self._output_file_name) as reader,
             ):
                 for row_index in range(row_start_index, row_end_index):
-                    row = reader.read_row(
-                        self._file_offsets[row_index], row_index, self.columns_info
-                    )
+                    row_offset = self._file_offsets[self.get_row_id(row_index)]
+                    row = reader.read_row(row_offset, row_index, self.columns_info)
+
+                    # Save the full values rather than their previews
+                    for column_index, truncated_cell in self._truncated_cells.get(
+                        row_offset, {}
+                    ).items():
+                        value = self._read_overflow_value(truncated_cell, column_index)
+                        row[column_index] = DbCellValue(value, False, value, row_index)
+
                     writer.write_row(row, self.columns_info)
 
                 writer.complete_write()
@@ -140,5 +345,100 @@ class FileStorageResultSet(ResultSet):
         with file_stream.get_writer(self._output_file_name) as writer:
             current_file_offset = self._total_bytes_written
             writer.seek(current_file_offset)
-            self._total_bytes_written += writer.write_row(storage_data_reader)
+            row_byte_count = writer.write_row(storage_data_reader)
+            get_spill_manager().add_bytes(self._output_file_name, row_byte_count)
+            self._total_bytes_written += row_byte_count
             return current_file_offset
+
+    def _append_rows_to_buffer(self, rows: list[tuple]) -> list[int]:
+        """Append rows to the output file with a single writer, and return their offsets"""
+        storage_data_reader = RowsDataReader(rows, self.columns_info)
+        offsets = []
+
+        with file_stream.get_appending_writer(self._output_file_name) as writer:
+            writer.seek(self._total_bytes_written)
+            start_byte_count = self._total_bytes_written
+            while storage_data_reader.read_row():
+                offsets.append(self._total_bytes_written)
+                self._total_bytes_written += writer.write_row(storage_data_reader)
+            get_spill_manager().add_bytes(
+                self._output_file_name, self._total_bytes_written - start_byte_count
+            )
+        return offsets
+
+    def _iter_rows(self) -> Iterator[tuple[int, list[DbCellValue]]]:
+        # Read the whole file with a single reader rather than one per row.
+        # Truncated cells are read as their previews.
+        with file_stream.get_reader(self._output_file_name) as reader:
+            for row_id in range(self.row_count):
+                yield (
+                    row_id,
+                    reader.read_row(self._file_offsets[row_id], row_id, self.columns_info),
+                )
+
+    def _get_statistics_values(self, row_id: int, row: list[DbCellValue]) -> tuple:
+        # Statistics are collected from the full values of truncated cells
+        values = [None if cell.is_null else cell.raw_object for cell in row]
+        truncated_cells = self._truncated_cells.get(self._file_offsets[row_id], {})
+        for column_index, truncated_cell in truncated_cells.items():
+            values[column_index] = self._read_overflow_value(truncated_cell, column_index)
+        return tuple(values)
+
+    def _write_overflow_cells(
+        self,
+        row_offset: int,
+        storage_data_reader: StorageDataReader,
+        truncated_cells: dict[int, int],
+        overflow_writer: ServiceBufferFileStreamWriter,
+    ) -> None:
+        """Write the full values of the truncated cells of a row to the overflow file"""
+        row_truncated_cells: dict[int, TruncatedCell] = {}
+
+        for column_index, original_length in truncated_cells.items():
+            column = storage_data_reader.columns_info[column_index]
+            bytes_converter = get_any_to_bytes_converter(
+                column.data_type, provider=column.provider
+            )
+            value_bytes = bytes_converter(storage_data_reader.get_value(column_index))
+
+            overflow_offset = self._overflow_bytes_written
+            value_byte_count = overflow_writer.write_bytes(value_bytes)
+            if self._overflow_file_name is not None:
+                get_spill_manager().add_bytes(self._overflow_file_name, value_byte_count)
+            self._overflow_bytes_written += value_byte_count
+            row_truncated_cells[column_index] = TruncatedCell(
+                original_length, overflow_offset, len(value_bytes)
+            )
+
+        self._truncated_cells[row_offset] = row_truncated_cells
+
+    def _read_overflow_value(self, truncated_cell: TruncatedCell, column_index: int) -> str:
+        if self._overflow_file_name is None:
+            raise ValueError("Result set has no truncated values")
+
+        column = self.columns_info[column_index]
+        object_converter = get_bytes_to_any_converter(
+            column.data_type, provider=column.provider
+        )
+
+        with file_stream.get_reader(self._overflow_file_name) as reader:
+            value_bytes = reader.read_bytes(
+                truncated_cell.overflow_offset, truncated_cell.overflow_length
+            )
+        return str(object_converter(value_bytes))
+
+    def _mark_truncated_cells(
+        self, row_offset: int, row: list[DbCellValue], columns: list[int] | None = None
+    ) -> list[DbCellValue]:
+        """Mark the truncated cells of a row read from the output file.
+        If columns is set, the row only has the cells of those column indexes, in order.
+        """
+        truncated_cells = self._truncated_cells.get(row_offset)
+        if not truncated_cells:
+            return row
+        for position, column_index in enumerate(columns or range(len(row))):
+            truncated_cell = truncated_cells.get(column_index)
+            if truncated_cell is not None:
+                row[position].is_truncated = True
+                row[position].original_length = truncated_cell.original_length
+        return row
@@ -3,13 +3,15 @@
 # Licensed under the MIT License. See License.txt in the project root for license information.
 # --------------------------------------------------------------------------------------------
 
-
+import time
 from typing import Callable
 
 import psycopg
 
 from ossdbtoolsservice.query.column_info import get_columns_info
+from ossdbtoolsservice.query.column_statistics import ResultSetStatisticsCollector
 from ossdbtoolsservice.query.contracts import (
+    ColumnStatistics,
     DbCellValue,
     ResultSetSubset,
 )
@@ -28,24 +30,62 @@ class InMemoryResultSet(ResultSet):
     def row_count(self) -> int:
         return len(self.rows)
 
-    def get_subset(self, start_index: int, end_index: int) -> ResultSetSubset:
-        return ResultSetSubset.from_result_set(self, start_index, end_index)
+    @property
+    def column_statistics(self) -> list[ColumnStatistics]:
+        # The rows are already in memory, so statistics are only collected when requested
+        statistics = ResultSetStatisticsCollector(self.columns_info)
+        for row in self.rows:
+            statistics.add_row(row)
+        return statistics.get_statistics()
+
+    def get_subset(
+        self, start_index: int, end_index: int, columns: list[int] | None = None
+    ) -> ResultSetSubset:
+        self._validate_columns(columns)
+        if self._view_index is None:
+            subset = ResultSetSubset.from_result_set(self, start_index, end_index)
+        else:
+            subset = ResultSetSubset()
+            subset.rows = [
+                self.get_row(row_id) for row_id in self._view_index[start_index:end_index]
+            ]
+            subset.row_count = len(subset.rows)
+
+        if columns is not None:
+            subset.rows = [[row[index] for index in columns] for row in subset.rows]
+        return subset
 
     def add_row(self, cursor: psycopg.Cursor) -> None:
         row = cursor.fetchone()
         if row is not None:
             self.rows.append(row)
+            self.clear_view()
 
     def remove_row(self, row_id: int) -> None:
         del self.rows[row_id]
+        self.clear_view()
 
     def update_row(self, row_id: int, cursor: psycopg.Cursor) -> None:
         row = cursor.fetchone()
         if row is not None:
             self.rows[row_id] = row
+            self.clear_view()
         else:
             self.remove_row(row_id)
 
+    def apply_row_changes(
+        self,
+        updated_rows: dict[int, tuple],
+        added_rows: list[tuple],
+        removed_row_ids: list[int],
+    ) -> None:
+        for row_id, row in updated_rows.items():
+            self.rows[row_id] = row
+        self.rows.extend(added_rows)
+        for row_id in sorted(set(removed_row_ids), reverse=True):
+            del self.rows[row_id]
+        self.clear_view()
+
     def get_row(self, row_id: int) -> list[DbCellValue]:
         row = self.rows[row_id]
         return [
@@ -53,8 +93,17 @@ class InMemoryResultSet(ResultSet):
             for cell_value in list(row)
         ]
 
-    def read_result_to_end(self, cursor: psycopg.Cursor) -> None:
-        rows = cursor.fetchall()
+    def read_result_to_end(self, cursor: psycopg.Cursor, max_rows: int | None = None) -> None:
+        fetch_start = time.perf_counter()
+        # One row more than max_rows tells whether rows are left
+        rows = cursor.fetchall() if max_rows is None else cursor.fetchmany(max_rows + 1)
+        fetch_end = time.perf_counter()
+        if max_rows is not None and len(rows) > max_rows:
+            self.has_unread_rows = True
+            rows = rows[:max_rows]
+        self.read_timings.fetch_seconds += fetch_end - fetch_start
+        if rows:
+            self.read_timings.first_row_time = fetch_end
         self.rows.extend(rows or [])
 
         self.columns_info = get_columns_info(cursor)
@@ -72,7 +121,7 @@ class InMemoryResultSet(ResultSet):
     ) -> None:
         with file_factory.get_writer(file_path) as writer:
             for index in range(row_start_index, row_end_index):
-                row = self.get_row(index)
+                row = self.get_row(self.get_row_id(index))
                 writer.write_row(row, self.columns_info)
 
             writer.complete_write()
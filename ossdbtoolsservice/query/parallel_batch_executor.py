@@ -0,0 +1,145 @@
+# --------------------------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for license information.
+# --------------------------------------------------------------------------------------------
+
+import logging
+import threading
+from collections.abc import Callable
+
+from ossdbtoolsservice.connection import PooledConnection, ServerConnection
+from ossdbtoolsservice.connection.core.errors import GetConnectionTimeout
+from ossdbtoolsservice.query.batch import Batch
+
+
+class ParallelBatchExecutor:
+    """Executes independent batches on several connections at once.
+
+    Each connection takes the next batch that has not been started, in batch order.
+    The started and completed events of a batch are fired once all earlier batches
+    have completed, so that notifications are sent in the same order as when
+    the batches are executed one after another.
+
+    If a batch fails, no further batches are started, and the error of the failed batch
+    with the lowest index is raised once the running batches have completed.
+    """
+
+    def __init__(
+        self,
+        batches: list[Batch],
+        is_canceled: Callable[[], bool],
+        logger: logging.Logger | None = None,
+    ) -> None:
+        self._batches = batches
+        self._is_canceled = is_canceled
+        self._logger = logger or logging.getLogger(__name__)
+
+        self._lock = threading.Lock()
+        self._next_batch_index = 0
+        self._backend_pids: list[int] = []
+        self._error: tuple[int, Exception] | None = None
+
+        # Batches are notified in order, under their own lock
+        self._events_lock = threading.Lock()
+        self._completed_batch_indexes: set[int] = set()
+        self._next_event_index = 0
+
+    @property
+    def backend_pids(self) -> list[int]:
+        """The backend process ids of the connections that are executing batches"""
+        with self._lock:
+            return list(self._backend_pids)
+
+    @property
+    def failed_batch_index(self) -> int | None:
+        return self._error[0] if self._error is not None else None
+
+    def execute(
+        self,
+        connection: ServerConnection,
+        get_connection: Callable[[], PooledConnection],
+        max_connections: int,
+    ) -> None:
+        """
+        Execute the batches on the given connection and on up to max_connections - 1
+        additional connections returned by get_connection. As the batches complete only
+        once the additional connections are given back, get_connection should not wait
+        long for a free connection. If there is none, the batches run on fewer connections.
+
+        :raises Exception: the error of the first batch that failed
+        """
+        worker_count = min(max_connections, len(self._batches)) - 1
+        workers = [
+            threading.Thread(
+                target=self._execute_on_additional_connection,
+                args=(get_connection,),
+                daemon=True,
+            )
+            for _ in range(worker_count)
+        ]
+        for worker in workers:
+            worker.start()
+
+        self._execute_batches(connection)
+
+        for worker in workers:
+            worker.join()
+
+        if self._error is not None:
+            raise self._error[1]
+
+    def _execute_on_additional_connection(
+        self, get_connection: Callable[[], PooledConnection]
+    ) -> None:
+        # Batch errors are recorded by _execute_batches. If the connection can't be
+        # checked out, the remaining batches run on the other connections.
+        try:
+            with get_connection() as connection:
+                self._execute_batches(connection)
+        except GetConnectionTimeout:
+            self._logger.info(
+                "Not executing batches on an additional connection: no connection is free"
+            )
+        except Exception as e:
+            self._logger.warning(
+                f"Could not execute batches on an additional connection: {e}"
+            )
+
+    def _execute_batches(self, connection: ServerConnection) -> None:
+        backend_pid = connection.backend_pid
+        with self._lock:
+            self._backend_pids.append(backend_pid)
+
+        try:
+            while (batch_index := self._take_next_batch_index()) is not None:
+                try:
+                    self._batches[batch_index].execute(connection, fire_events=False)
+                except Exception as e:
+                    with self._lock:
+                        if self._error is None or batch_index < self._error[0]:
+                            self._error = (batch_index, e)
+                self._complete_batch(batch_index)
+        finally:
+            with self._lock:
+                self._backend_pids.remove(backend_pid)
+
+    def _take_next_batch_index(self) -> int | None:
+        with self._lock:
+            if (
+                self._error is not None
+                or self._is_canceled()
+                or self._next_batch_index >= len(self._batches)
+            ):
+                return None
+            batch_index = self._next_batch_index
+            self._next_batch_index += 1
+            return batch_index
+
+    def _complete_batch(self, batch_index: int) -> None:
+        with self._events_lock:
+            self._completed_batch_indexes.add(batch_index)
+            while self._next_event_index in self._completed_batch_indexes:
+                batch = self._batches[self._next_event_index]
+                batch.notify_execution_started()
+                batch.notify_execution_completed()
+                self._next_event_index += 1
@@ -8,11 +8,16 @@ from typing import TYPE_CHECKING, Callable, Dict, List, Optional  # noqa
 
 import sqlparse
 
-from ossdbtoolsservice.connection import ServerConnection
+from ossdbtoolsservice.connection import PooledConnection, ServerConnection
 from ossdbtoolsservice.query import Batch, BatchEvents, ResultSetStorageType, create_batch
-from ossdbtoolsservice.query.contracts import SaveResultsRequestParams, SelectionData
+from ossdbtoolsservice.query.contracts import (
+    DbCellValue,
+    SaveResultsRequestParams,
+    SelectionData,
+)
 from ossdbtoolsservice.query.contracts.result_set_subset import ResultSetSubset
 from ossdbtoolsservice.query.data_storage import FileStreamFactory
+from ossdbtoolsservice.query.parallel_batch_executor import ParallelBatchExecutor
 
 if TYPE_CHECKING:
     from ossdbtoolsservice.query_execution.contracts.execute_request import (
@@ -43,9 +48,13 @@ class QueryExecutionSettings:
         self,
         execution_plan_options: "ExecutionPlanOptions",
         result_set_storage_type: ResultSetStorageType = ResultSetStorageType.FILE_STORAGE,
+        max_cell_display_size: int | None = None,
+        pooler_compatible: bool = False,
     ) -> None:
         self._execution_plan_options = execution_plan_options
         self._result_set_storage_type = result_set_storage_type
+        self._max_cell_display_size = max_cell_display_size
+        self._pooler_compatible = pooler_compatible
 
     @property
     def execution_plan_options(self) -> "ExecutionPlanOptions":
@@ -55,12 +64,24 @@ class QueryExecutionSettings:
     def result_set_storage_type(self) -> ResultSetStorageType:
         return self._result_set_storage_type
 
+    @property
+    def max_cell_display_size(self) -> int | None:
+        return self._max_cell_display_size
+
+    @property
+    def pooler_compatible(self) -> bool:
+        """Whether the connection goes through a transaction pooler, so that
+        no cursor may be held open between transactions
+        """
+        return self._pooler_compatible
+
 
 class Query:
     """Object representing a single query, consisting of one or more batches"""
 
     EXPLAIN_QUERY_TEMPLATE = "EXPLAIN {0}"
     EXPLAIN_ANALYZE_QUERY_TEMPLATE = "EXPLAIN ANALYZE {0}"
+    EXPLAIN_ANALYZE_JSON_QUERY_TEMPLATE = "EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) {0}"
 
     def __init__(
         self,
@@ -78,6 +99,7 @@ class Query:
         self._batches: list[Batch] = []
         self._execution_plan_options = query_execution_settings.execution_plan_options
         self._connection_backend_pid: Optional[int] = None
+        self._parallel_batch_executor: ParallelBatchExecutor | None = None
 
         self.is_canceled = False
 
@@ -92,11 +114,18 @@ class Query:
                 continue
 
             sql_statement_text = batch_text
+            capture_execution_plan = False
 
             # Create and save the batch
             if bool(self._execution_plan_options):
                 # TODO: These options are unused in VSCode.
-                if self._execution_plan_options.include_estimated_execution_plan_xml:
+                if self._execution_plan_options.include_execution_plan_summary:
+                    self._disable_auto_commit = True
+                    capture_execution_plan = True
+                    sql_statement_text = Query.EXPLAIN_ANALYZE_JSON_QUERY_TEMPLATE.format(
+                        sql_statement_text
+                    )
+                elif self._execution_plan_options.include_estimated_execution_plan_xml:
                     sql_statement_text = Query.EXPLAIN_QUERY_TEMPLATE.format(
                         sql_statement_text
                     )
@@ -117,6 +146,10 @@ class Query:
                 selection_data[index],
                 query_events.batch_events,
                 query_execution_settings.result_set_storage_type,
+                query_execution_settings.max_cell_display_size,
+                owner_uri,
+                capture_execution_plan,
+                query_execution_settings.pooler_compatible,
             )
 
             self._batches.append(batch)
@@ -145,6 +178,27 @@ class Query:
     def connection_backend_pid(self) -> Optional[int]:
         return self._connection_backend_pid
 
+    @property
+    def connection_backend_pids(self) -> list[int]:
+        """The backend process ids of all connections that are executing the query"""
+        executor = self._parallel_batch_executor
+        if executor is not None:
+            return executor.backend_pids
+        if self._connection_backend_pid is None:
+            return []
+        return [self._connection_backend_pid]
+
+    @property
+    def can_execute_in_parallel(self) -> bool:
+        """Whether the query consists of several read-only batches that don't control
+        transactions, so that they can be executed on separate connections
+        """
+        return (
+            len(self._batches) > 1
+            and not self._disable_auto_commit
+            and all(batch.is_read_only for batch in self._batches)
+        )
+
     def execute(self, connection: ServerConnection, retry_state: bool = False) -> None:
         """
         Execute the query using the given connection
@@ -197,6 +251,47 @@ class Query:
             self._execution_state = ExecutionState.EXECUTED
             self._connection_backend_pid = None
 
+    def execute_in_parallel(
+        self,
+        connection: ServerConnection,
+        get_connection: Callable[[], PooledConnection],
+        max_connections: int,
+        retry_state: bool = False,
+    ) -> None:
+        """
+        Execute the batches of the query on up to max_connections connections at once,
+        the given one and additional ones returned by get_connection.
+        Queries that can't be executed in parallel, or that would run in the open
+        transaction of the connection, are executed sequentially on the given connection.
+
+        :raises RuntimeError: If the query was already executed
+        """
+        if (
+            max_connections <= 1
+            or retry_state
+            or not self.can_execute_in_parallel
+            or not connection.transaction_is_idle
+        ):
+            self.execute(connection, retry_state)
+            return
+
+        if self._execution_state is ExecutionState.EXECUTED:
+            raise RuntimeError("Cannot execute a query multiple times")
+
+        self._execution_state = ExecutionState.EXECUTING
+        self._connection_backend_pid = connection.backend_pid
+        executor = ParallelBatchExecutor(self._batches, lambda: self.is_canceled)
+        self._parallel_batch_executor = executor
+
+        try:
+            executor.execute(connection, get_connection, max_connections)
+        finally:
+            if executor.failed_batch_index is not None:
+                self._current_batch_index = executor.failed_batch_index
+            self._execution_state = ExecutionState.EXECUTED
+            self._connection_backend_pid = None
+            self._parallel_batch_executor = None
+
     @property
     def is_rollback(self) -> bool:
         """
@@ -208,14 +303,26 @@ class Query:
         return bool(self.batches) and self.batches[0].is_rollback
 
     def get_subset(
-        self, batch_index: int, start_index: int, end_index: int
+        self,
+        batch_index: int,
+        start_index: int,
+        end_index: int,
+        columns: list[int] | None = None,
     ) -> ResultSetSubset:
         if batch_index < 0 or batch_index >= len(self._batches):
             raise IndexError(
                 "Batch index cannot be less than 0 or greater than the number of batches"
             )
 
-        return self._batches[batch_index].get_subset(start_index, end_index)
+        return self._batches[batch_index].get_subset(start_index, end_index, columns)
+
+    def get_cell_value(self, batch_index: int, row_id: int, column_index: int) -> DbCellValue:
+        if batch_index < 0 or batch_index >= len(self._batches):
+            raise IndexError(
+                "Batch index cannot be less than 0 or greater than the number of batches"
+            )
+
+        return self._batches[batch_index].get_cell_value(row_id, column_index)
 
     def save_as(
         self,
@@ -235,6 +342,11 @@ class Query:
 
         self.batches[batch_index].save_as(params, file_factory, on_success, on_failure)
 
+    def dispose(self) -> None:
+        """Delete the spill files of the query's result sets in the background"""
+        for batch in self._batches:
+            batch.dispose()
+
 
 def compute_selection_data_for_batches(
     batches: list[str], full_text: str
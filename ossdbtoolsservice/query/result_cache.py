@@ -0,0 +1,278 @@
+# --------------------------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for license information.
+# --------------------------------------------------------------------------------------------
+
+"""Reuse of the results of identical read-only queries.
+
+Cached results keep their query, and so the spill file of its result set, alive.
+Entries are shared by the readers that acquired them, and the query is disposed
+once the entry has been evicted and released by all of its readers.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Callable
+from typing import NamedTuple
+
+import sqlparse
+
+from ossdbtoolsservice.query.query import Query
+
+RESULT_CACHE_INVALIDATION_NONE = "none"
+RESULT_CACHE_INVALIDATION_TRANSACTIONS = "transactions"
+RESULT_CACHE_INVALIDATION_WAL_LSN = "walLsn"
+
+RESULT_CACHE_INVALIDATIONS = [
+    RESULT_CACHE_INVALIDATION_NONE,
+    RESULT_CACHE_INVALIDATION_TRANSACTIONS,
+    RESULT_CACHE_INVALIDATION_WAL_LSN,
+]
+
+_CONTEXT_QUERY = (
+    "SELECT current_database(), pg_catalog.current_setting('search_path'), current_user"
+)
+
+# The position of the database, as a number that grows as the database changes
+_SNAPSHOT_QUERIES = {
+    RESULT_CACHE_INVALIDATION_TRANSACTIONS: (
+        "(SELECT xact_commit + xact_rollback FROM pg_catalog.pg_stat_database "
+        "WHERE datname = current_database())"
+    ),
+    RESULT_CACHE_INVALIDATION_WAL_LSN: "pg_catalog.pg_current_wal_lsn() - '0/0'::pg_lsn",
+}
+
+
+class ResultCacheKey(NamedTuple):
+    """Identity of a cached result. Databases and roles are only unique within a server,
+    so the key includes the server and the connection details the query ran with.
+    """
+
+    host: str
+    port: int
+    details_hash: int
+    database: str
+    query_text: str
+    search_path: str
+    role: str
+
+
+class CachedResult:
+    """The executed query of a cached result, with the readers that are using it"""
+
+    def __init__(
+        self,
+        key: ResultCacheKey,
+        query: Query,
+        byte_count: int,
+        snapshot: int | None,
+        created_time: float,
+    ) -> None:
+        self.key = key
+        self.query = query
+        self.byte_count = byte_count
+        self.snapshot = snapshot
+        self.created_time = created_time
+        self.reader_count = 0
+        self.is_evicted = False
+
+
+class ResultCache:
+    """Cache of query results, with TTL and byte budget eviction.
+
+    With transaction or WAL LSN invalidation, each entry remembers the snapshot
+    of the database it was executed at, and is dropped once the database has moved on by
+    more than invalidation_threshold transactions or WAL bytes.
+    """
+
+    def __init__(
+        self,
+        enabled: bool = False,
+        ttl_seconds: float = 0,
+        max_bytes: int = 0,
+        invalidation: str = RESULT_CACHE_INVALIDATION_NONE,
+        invalidation_threshold: int = 0,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self._lock = threading.Lock()
+        self._clock = clock
+        self._entries: OrderedDict[ResultCacheKey, CachedResult] = OrderedDict()
+        self._byte_count = 0
+
+        self._enabled = False
+        self._ttl_seconds = 0.0
+        self._max_bytes = 0
+        self._invalidation = RESULT_CACHE_INVALIDATION_NONE
+        self._invalidation_threshold = 0
+        self.configure(enabled, ttl_seconds, max_bytes, invalidation, invalidation_threshold)
+
+    @property
+    def enabled(self) -> bool:
+        return self._enabled
+
+    @property
+    def byte_count(self) -> int:
+        """Number of bytes of the cached results"""
+        return self._byte_count
+
+    def configure(
+        self,
+        enabled: bool,
+        ttl_seconds: float,
+        max_bytes: int,
+        invalidation: str,
+        invalidation_threshold: int,
+    ) -> None:
+        """Change the cache settings. Disabling the cache drops all entries.
+
+        :raises ValueError: if the invalidation is not one of RESULT_CACHE_INVALIDATIONS
+        """
+        if invalidation not in RESULT_CACHE_INVALIDATIONS:
+            raise ValueError(f"Unsupported result cache invalidation: {invalidation}")
+
+        with self._lock:
+            self._enabled = enabled and ttl_seconds > 0 and max_bytes > 0
+            self._ttl_seconds = ttl_seconds
+            self._max_bytes = max_bytes
+            self._invalidation = invalidation
+            self._invalidation_threshold = invalidation_threshold
+            evicted = self._evict_all() if not self._enabled else self._evict_to_budget()
+            unused = _get_unused(evicted)
+        _dispose(unused)
+
+    def get_context_query(self) -> str:
+        """Get the query that returns the database, search path and role of a connection,
+        and the snapshot of its database if entries are invalidated by snapshot
+        """
+        snapshot_query = _SNAPSHOT_QUERIES.get(self._invalidation)
+        if snapshot_query is None:
+            return _CONTEXT_QUERY
+        return f"{_CONTEXT_QUERY}, {snapshot_query}"
+
+    def acquire(self, key: ResultCacheKey, snapshot: int | None) -> CachedResult | None:
+        """Get the cached result for the key, if it is still valid.
+        The caller must release the returned result once it is done with it.
+        """
+        evicted: list[CachedResult] = []
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and not self._is_valid(entry, snapshot):
+                evicted.append(self._evict(entry))
+                entry = None
+            if entry is not None:
+                self._entries.move_to_end(key)
+                entry.reader_count += 1
+            unused = _get_unused(evicted)
+        _dispose(unused)
+        return entry
+
+    def add(
+        self, key: ResultCacheKey, query: Query, byte_count: int, snapshot: int | None
+    ) -> CachedResult | None:
+        """Cache the executed query for the key, replacing the current entry.
+        The caller is the first reader of the returned result, and must release it.
+
+        :return: the cached result, or None if it is not cached,
+            because the cache is disabled or the result exceeds the byte budget
+        """
+        with self._lock:
+            if not self._enabled or byte_count > self._max_bytes:
+                return None
+
+            entry = CachedResult(key, query, byte_count, snapshot, self._clock())
+            entry.reader_count = 1
+            evicted = []
+            current_entry = self._entries.get(key)
+            if current_entry is not None:
+                evicted.append(self._evict(current_entry))
+            evicted.extend(self._evict_expired())
+            evicted.extend(self._evict_to_budget(self._max_bytes - byte_count))
+
+            self._entries[key] = entry
+            self._byte_count += byte_count
+            unused = _get_unused(evicted)
+        _dispose(unused)
+        return entry
+
+    def release(self, entry: CachedResult) -> None:
+        """Release a cached result acquired or added by the caller"""
+        with self._lock:
+            entry.reader_count -= 1
+            unused = _get_unused([entry])
+        _dispose(unused)
+
+    def clear(self) -> None:
+        with self._lock:
+            unused = _get_unused(self._evict_all())
+        _dispose(unused)
+
+    def _is_valid(self, entry: CachedResult, snapshot: int | None) -> bool:
+        if self._clock() - entry.created_time > self._ttl_seconds:
+            return False
+        if self._invalidation == RESULT_CACHE_INVALIDATION_NONE:
+            return True
+        if snapshot is None or entry.snapshot is None:
+            return False
+        return snapshot - entry.snapshot <= self._invalidation_threshold
+
+    def _evict(self, entry: CachedResult) -> CachedResult:
+        # Must be called with the lock held
+        del self._entries[entry.key]
+        self._byte_count -= entry.byte_count
+        entry.is_evicted = True
+        return entry
+
+    def _evict_expired(self) -> list[CachedResult]:
+        # Must be called with the lock held
+        now = self._clock()
+        return [
+            self._evict(entry)
+            for entry in list(self._entries.values())
+            if now - entry.created_time > self._ttl_seconds
+        ]
+
+    def _evict_to_budget(self, max_bytes: int | None = None) -> list[CachedResult]:
+        """Evict the least recently used entries until the cached results fit in max_bytes,
+        the configured budget by default. Must be called with the lock held.
+        """
+        if max_bytes is None:
+            max_bytes = self._max_bytes
+        evicted = []
+        while self._entries and self._byte_count > max_bytes:
+            evicted.append(self._evict(next(iter(self._entries.values()))))
+        return evicted
+
+    def _evict_all(self) -> list[CachedResult]:
+        # Must be called with the lock held
+        return [self._evict(entry) for entry in list(self._entries.values())]
+
+
+def normalize_query_text(query_text: str) -> str:
+    """Normalize the text of a query for use in a cache key.
+    Comments are removed, whitespace outside of literals is collapsed,
+    and keywords are upper-cased.
+    """
+    statement = sqlparse.format(query_text, strip_comments=True).strip().rstrip(";").strip()
+    tokens: list[str] = []
+    for token in sqlparse.parse(statement)[0].flatten() if statement else []:
+        if token.is_whitespace:
+            if tokens and tokens[-1] != " ":
+                tokens.append(" ")
+        elif token.is_keyword:
+            tokens.append(token.normalized)
+        else:
+            tokens.append(token.value)
+    return "".join(tokens).strip()
+
+
+def _get_unused(entries: list[CachedResult]) -> list[CachedResult]:
+    """Get the evicted entries that no reader uses, so that their query can be disposed.
+    Must be called with the lock held, so that each entry is disposed once.
+    """
+    return [entry for entry in entries if entry.is_evicted and entry.reader_count == 0]
+
+
+def _dispose(entries: list[CachedResult]) -> None:
+    for entry in entries:
+        entry.query.dispose()
@@ -5,11 +5,15 @@
 
 import threading
 from abc import ABCMeta, abstractmethod
+from array import array
+from collections.abc import Iterator
 from typing import Callable
 
 import psycopg
 
+from ossdbtoolsservice.query.column_statistics import ResultSetStatisticsCollector
 from ossdbtoolsservice.query.contracts import (
+    ColumnStatistics,
     DbCellValue,
     DbColumn,
     ResultSetSummary,
@@ -17,17 +21,42 @@ from ossdbtoolsservice.query.contracts import (
 )
 from ossdbtoolsservice.query.contracts.result_set_subset import ResultSetSubset
 from ossdbtoolsservice.query.data_storage import FileStreamFactory
+from ossdbtoolsservice.query.result_set_view import (
+    ResultSetFilter,
+    ResultSetSort,
+    build_view_index,
+)
 
 
-# This class seems unused.
 class ResultSetEvents:
     def __init__(
         self,
         on_result_set_completed: Callable | None = None,
         on_result_set_partially_loaded: Callable | None = None,
+        partially_loaded_row_count: int = 1,
     ) -> None:
+        """
+        :param on_result_set_completed: Unused.
+        :param on_result_set_partially_loaded: Called once, with the result set, as soon
+            as partially_loaded_row_count rows can be read while the rest of the
+            result is still being loaded
+        :param partially_loaded_row_count: Number of rows to load before
+            on_result_set_partially_loaded is fired
+        """
         self._on_result_set_completed = on_result_set_completed
         self._on_result_set_partially_loaded = on_result_set_partially_loaded
+        self._partially_loaded_row_count = partially_loaded_row_count
+
+
+class ResultSetReadTimings:
+    """Where the time went while a result set was read from its cursor.
+    Times are in seconds, first_row_time is a time.perf_counter() value.
+    """
+
+    def __init__(self) -> None:
+        self.first_row_time: float | None = None
+        self.fetch_seconds = 0.0
+        self.spill_seconds = 0.0
 
 
 class ResultSet(metaclass=ABCMeta):
@@ -42,6 +71,21 @@ class ResultSet(metaclass=ABCMeta):
         self._columns_info: list[DbColumn] = []
         self._save_as_threads: dict[str, threading.Thread] = {}
 
+        # Sorted and/or filtered view over the rows. When set, row indexes of subset
+        # and cell requests are positions in the view index rather than row ids.
+        self._view_sort: ResultSetSort | None = None
+        self._view_filter: ResultSetFilter | None = None
+        self._view_index: array | None = None
+        # Session whose spill quota the files of the result set count towards, if any
+        self._spill_session_id: str | None = None
+
+        # Column statistics, kept until the rows change
+        self._statistics: list[ColumnStatistics] | None = None
+
+        self.read_timings = ResultSetReadTimings()
+        # Whether the cursor had rows beyond the max_rows that were read
+        self.has_unread_rows = False
+
     @property
     def columns_info(self) -> list[DbColumn]:
         return self._columns_info if self._columns_info is not None else []
@@ -50,6 +94,25 @@ class ResultSet(metaclass=ABCMeta):
     def columns_info(self, columns_info: list[DbColumn]) -> None:
         self._columns_info = columns_info
 
+    @property
+    def column_statistics(self) -> list[ColumnStatistics]:
+        """Statistics of each column of the rows read from the query.
+        Result sets that collect them while they are read keep them until their rows
+        change. They are otherwise computed in a pass over the rows on first request.
+        """
+        statistics = self._statistics
+        if statistics is None:
+            collector = ResultSetStatisticsCollector(self.columns_info)
+            for row_id, row in self._iter_rows():
+                collector.add_row(self._get_statistics_values(row_id, row))
+            statistics = collector.get_statistics()
+            self._statistics = statistics
+        return statistics
+
+    def _get_statistics_values(self, row_id: int, row: list[DbCellValue]) -> tuple:
+        """Get the values of a row that column statistics are collected from"""
+        return tuple(None if cell.is_null else cell.raw_object for cell in row)
+
     @property
     def result_set_summary(self) -> ResultSetSummary:
         return ResultSetSummary(
@@ -65,10 +128,89 @@ class ResultSet(metaclass=ABCMeta):
     def row_count(self) -> int:
         pass
 
+    @property
+    def bytes_spilled(self) -> int:
+        """Number of bytes of the result set that were written to disk"""
+        return 0
+
+    @property
+    def view_row_count(self) -> int:
+        """Number of rows in the current view, or in the result set if there is no view"""
+        view_index = self._view_index
+        return len(view_index) if view_index is not None else self.row_count
+
+    def sort(self, result_set_sort: ResultSetSort | None) -> int:
+        """Sort the view over the result set, or clear its sort if None.
+        Returns the number of rows in the view.
+        """
+        return self._update_view(result_set_sort, self._view_filter)
+
+    def filter(self, result_set_filter: ResultSetFilter | None) -> int:
+        """Filter the view over the result set, or clear its filter if None.
+        Returns the number of rows in the view.
+        """
+        return self._update_view(self._view_sort, result_set_filter)
+
+    def clear_view(self) -> None:
+        self._view_sort = None
+        self._view_filter = None
+        self._view_index = None
+
+    def get_row_id(self, view_row_index: int) -> int:
+        """Get the id of the row at a position in the current view"""
+        view_index = self._view_index
+        if view_index is None:
+            return view_row_index
+        if view_row_index < 0 or view_row_index >= len(view_index):
+            raise KeyError("Row index out of range of the result set view")
+        return view_index[view_row_index]
+
+    def _update_view(
+        self, result_set_sort: ResultSetSort | None, result_set_filter: ResultSetFilter | None
+    ) -> int:
+        if not self._has_been_read:
+            raise ValueError("Result set not read")
+
+        if result_set_sort is None and result_set_filter is None:
+            self.clear_view()
+            return self.row_count
+
+        view_index = build_view_index(
+            self._iter_rows(),
+            self.columns_info,
+            result_set_sort,
+            result_set_filter,
+            spill_session_id=self._spill_session_id,
+        )
+
+        # Readers see either the old view or the new one, never a partial one
+        self._view_sort = result_set_sort
+        self._view_filter = result_set_filter
+        self._view_index = view_index
+        return len(view_index)
+
+    def _iter_rows(self) -> Iterator[tuple[int, list[DbCellValue]]]:
+        """Iterate over the (row id, row) pairs of the result set in row id order"""
+        for row_id in range(self.row_count):
+            yield row_id, self.get_row(row_id)
+
     @abstractmethod
-    def get_subset(self, start_index: int, end_index: int) -> ResultSetSubset:
+    def get_subset(
+        self, start_index: int, end_index: int, columns: list[int] | None = None
+    ) -> ResultSetSubset:
+        """Get the rows of the view from start_index to end_index.
+        If columns is set, the rows only have the cells of those column indexes, in order.
+        """
         pass
 
+    def _validate_columns(self, columns: list[int] | None) -> None:
+        """Raise IndexError if any of the requested column indexes is out of range"""
+        if columns is None:
+            return
+        column_count = len(self.columns_info)
+        if any(index < 0 or index >= column_count for index in columns):
+            raise IndexError("Column index out of range")
+
     @abstractmethod
     def add_row(self, cursor: psycopg.Cursor) -> None:
         """Add row accepts cursor which will be iterated over to get the current row to add"""
@@ -84,12 +226,41 @@ class ResultSet(metaclass=ABCMeta):
         to get the current row to be updated"""
         pass
 
+    @abstractmethod
+    def apply_row_changes(
+        self,
+        updated_rows: dict[int, tuple],
+        added_rows: list[tuple],
+        removed_row_ids: list[int],
+    ) -> None:
+        """Apply the changes of a committed set of edits in one pass.
+        Rows are replaced by row id, then added rows are appended, and then rows are removed,
+        so that all row ids refer to the rows before the changes.
+        """
+        pass
+
     @abstractmethod
     def get_row(self, row_id: int) -> list[DbCellValue]:
         pass
 
+    def get_cell_value(self, row_id: int, column_index: int) -> DbCellValue:
+        """Get the full value of a single cell, even if it was truncated when stored.
+        row_id is a position in the current view.
+        """
+        row = self.get_row(self.get_row_id(row_id))
+        if column_index < 0 or column_index >= len(row):
+            raise IndexError("Column index out of range")
+        return row[column_index]
+
     @abstractmethod
-    def read_result_to_end(self, cursor: psycopg.Cursor) -> None:
+    def read_result_to_end(self, cursor: psycopg.Cursor, max_rows: int | None = None) -> None:
+        """Read the rows of the cursor into the result set, or the first max_rows if set.
+        If the cursor has more rows than that, has_unread_rows is set.
+        """
+        pass
+
+    def dispose(self) -> None:  # noqa: B027
+        """Release the storage of the result set. Default implementation does nothing."""
         pass
 
     @abstractmethod
@@ -118,8 +289,8 @@ class ResultSet(metaclass=ABCMeta):
         if file_path is None:
             raise ValueError("File path cannot be None")
 
-        # Validate is_save_selection
-        row_end_index = self.row_count
+        # Validate is_save_selection. Rows are saved in the order of the current view.
+        row_end_index = self.view_row_count
         row_start_index = 0
 
         if params.is_save_selection:
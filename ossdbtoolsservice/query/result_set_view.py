@@ -0,0 +1,294 @@
+# --------------------------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for license information.
+# --------------------------------------------------------------------------------------------
+
+"""Sorting and filtering of result sets without loading them into memory.
+
+A view over a result set is a permutation index: the list of the result set's row ids
+in the order they should be presented, leaving out rows that do not match the filter.
+"""
+
+import contextlib
+import heapq
+import math
+import pickle
+from array import array
+from collections.abc import Callable, Iterable, Iterator
+from datetime import date
+from decimal import Decimal, InvalidOperation
+from operator import itemgetter
+from typing import IO, Any
+
+from dateutil import parser as date_parser
+
+from ossdbtoolsservice.parsers import datatypes
+from ossdbtoolsservice.query.contracts import DbCellValue, DbColumn
+from ossdbtoolsservice.query.data_storage.spill_manager import get_spill_manager
+
+# Maximum number of sort keys held in memory at once.
+# Larger result sets are sorted in runs of this size that are spilled to disk and merged.
+SORT_RUN_SIZE = 100000
+
+# Number of sort keys pickled together when a run is spilled to disk
+_RUN_PICKLE_BATCH_SIZE = 1000
+
+FILTER_OPERATOR_EQUALS = "equals"
+FILTER_OPERATOR_NOT_EQUALS = "notEquals"
+FILTER_OPERATOR_GREATER_THAN = "greaterThan"
+FILTER_OPERATOR_LESS_THAN = "lessThan"
+FILTER_OPERATOR_CONTAINS = "contains"
+FILTER_OPERATOR_STARTS_WITH = "startsWith"
+FILTER_OPERATOR_IS_NULL = "isNull"
+FILTER_OPERATOR_IS_NOT_NULL = "isNotNull"
+
+FILTER_OPERATORS = [
+    FILTER_OPERATOR_EQUALS,
+    FILTER_OPERATOR_NOT_EQUALS,
+    FILTER_OPERATOR_GREATER_THAN,
+    FILTER_OPERATOR_LESS_THAN,
+    FILTER_OPERATOR_CONTAINS,
+    FILTER_OPERATOR_STARTS_WITH,
+    FILTER_OPERATOR_IS_NULL,
+    FILTER_OPERATOR_IS_NOT_NULL,
+]
+
+_INTEGER_DATA_TYPES = [
+    datatypes.DATATYPE_SMALLINT,
+    datatypes.DATATYPE_INTEGER,
+    datatypes.DATATYPE_BIGINT,
+    datatypes.DATATYPE_OID,
+]
+_FLOAT_DATA_TYPES = [datatypes.DATATYPE_REAL, datatypes.DATATYPE_DOUBLE]
+_DATETIME_DATA_TYPES = [
+    datatypes.DATATYPE_TIMESTAMP,
+    datatypes.DATATYPE_TIMESTAMP_WITH_TIMEZONE,
+]
+
+# Sort keys are (rank, value) tuples, so values of different ranks are never compared.
+# Like PostgreSQL, NULLs sort after all other values in ascending order.
+_TYPED_RANK = 0
+_UNTYPED_RANK = 1
+_NULL_RANK = 2
+
+
+class ResultSetSort:
+    """Sorts a result set by the values of one column"""
+
+    def __init__(self, column_index: int, descending: bool = False) -> None:
+        self.column_index = column_index
+        self.descending = descending
+
+
+class ResultSetFilter:
+    """Keeps the rows of a result set whose value in one column matches a condition"""
+
+    def __init__(self, column_index: int, operator: str, value: str | None = None) -> None:
+        if operator not in FILTER_OPERATORS:
+            raise ValueError(f"Unsupported filter operator: {operator}")
+        if value is None and operator not in [
+            FILTER_OPERATOR_IS_NULL,
+            FILTER_OPERATOR_IS_NOT_NULL,
+        ]:
+            raise ValueError(f"Filter operator {operator} requires a value")
+
+        self.column_index = column_index
+        self.operator = operator
+        self.value = value
+
+
+def get_sort_key(column: DbColumn) -> Callable[[DbCellValue], tuple]:
+    """Get a function that returns the sort key of a cell of the column.
+    Values are compared by their column's data type where it is known, and as text otherwise.
+    """
+
+    def sort_key(cell: DbCellValue) -> tuple:
+        if cell.is_null:
+            return (_NULL_RANK,)
+        return get_value_key(column.data_type, cell.raw_object)
+
+    return sort_key
+
+
+def get_filter_predicate(
+    column: DbColumn, result_set_filter: ResultSetFilter
+) -> Callable[[DbCellValue], bool]:
+    """Get a function that returns whether a cell of the column matches the filter"""
+    operator = result_set_filter.operator
+
+    if operator == FILTER_OPERATOR_IS_NULL:
+        return lambda cell: cell.is_null
+    if operator == FILTER_OPERATOR_IS_NOT_NULL:
+        return lambda cell: not cell.is_null
+
+    value = result_set_filter.value or ""
+    if operator in [FILTER_OPERATOR_CONTAINS, FILTER_OPERATOR_STARTS_WITH]:
+        text = value.lower()
+        if operator == FILTER_OPERATOR_CONTAINS:
+            return lambda cell: not cell.is_null and text in cell.display_value.lower()
+        return lambda cell: not cell.is_null and cell.display_value.lower().startswith(text)
+
+    sort_key = get_sort_key(column)
+    value_key = get_value_key(column.data_type, value)
+
+    if operator == FILTER_OPERATOR_EQUALS:
+        return lambda cell: sort_key(cell) == value_key
+    if operator == FILTER_OPERATOR_NOT_EQUALS:
+        return lambda cell: not cell.is_null and sort_key(cell) != value_key
+
+    def compare(cell: DbCellValue) -> bool:
+        cell_key = sort_key(cell)
+        # Values that could not be read as the column's type only compare to each other
+        if cell_key[0] != value_key[0]:
+            return False
+        if operator == FILTER_OPERATOR_GREATER_THAN:
+            return cell_key > value_key
+        return cell_key < value_key
+
+    return compare
+
+
+def build_view_index(
+    rows: Iterable[tuple[int, list[DbCellValue]]],
+    columns_info: list[DbColumn],
+    result_set_sort: ResultSetSort | None,
+    result_set_filter: ResultSetFilter | None,
+    run_size: int = SORT_RUN_SIZE,
+    spill_session_id: str | None = None,
+) -> array:
+    """Build the permutation index of a view over a result set.
+
+    :param rows: the (row id, row) pairs of the result set, in row id order
+    :param spill_session_id: the session whose spill quota the sort runs count towards
+    :return: the row ids of the rows in the view, in the order they are presented
+    """
+    if result_set_filter is not None:
+        _validate_column_index(result_set_filter.column_index, columns_info)
+        filter_index = result_set_filter.column_index
+        predicate = get_filter_predicate(columns_info[filter_index], result_set_filter)
+        rows = (row for row in rows if predicate(row[1][filter_index]))
+
+    if result_set_sort is None:
+        return array("q", (row_id for row_id, _ in rows))
+
+    _validate_column_index(result_set_sort.column_index, columns_info)
+    sort_index = result_set_sort.column_index
+    sort_key = get_sort_key(columns_info[sort_index])
+    keyed_rows = ((sort_key(row[sort_index]), row_id) for row_id, row in rows)
+
+    return array(
+        "q",
+        _external_sort(keyed_rows, result_set_sort.descending, run_size, spill_session_id),
+    )
+
+
+def _validate_column_index(column_index: int, columns_info: list[DbColumn]) -> None:
+    if column_index < 0 or column_index >= len(columns_info):
+        raise IndexError("Column index out of range")
+
+
+def get_value_key(data_type: str | None, value: Any) -> tuple:
+    """Get the sort key of a non-null value of the given data type"""
+    if not isinstance(value, str):
+        # Values already converted by the result set, like int and bool
+        if isinstance(value, float) and math.isnan(value):
+            return (_UNTYPED_RANK, str(value))
+        return (_TYPED_RANK, value)
+
+    try:
+        if data_type in _INTEGER_DATA_TYPES:
+            return (_TYPED_RANK, int(value))
+        if data_type == datatypes.DATATYPE_NUMERIC:
+            decimal_value = Decimal(value)
+            if not decimal_value.is_nan():
+                return (_TYPED_RANK, decimal_value)
+        elif data_type in _FLOAT_DATA_TYPES:
+            float_value = float(value)
+            if not math.isnan(float_value):
+                return (_TYPED_RANK, float_value)
+        elif data_type == datatypes.DATATYPE_BOOL:
+            return (_TYPED_RANK, value.lower() in ["true", "t", "yes", "y", "on", "1"])
+        elif data_type in _DATETIME_DATA_TYPES:
+            # datetime.fromisoformat only reads PostgreSQL's format, with offsets
+            # like +00 and fractions like .12, from Python 3.11
+            return (_TYPED_RANK, date_parser.isoparse(value))
+        elif data_type == datatypes.DATATYPE_DATE:
+            return (_TYPED_RANK, date.fromisoformat(value))
+        else:
+            return (_TYPED_RANK, value)
+    except (ValueError, InvalidOperation):
+        pass
+
+    # Values like NaN or infinity sort after the values of the column's type
+    return (_UNTYPED_RANK, value)
+
+
+def _external_sort(
+    keyed_rows: Iterable[tuple[tuple, int]],
+    descending: bool,
+    run_size: int,
+    spill_session_id: str | None = None,
+) -> Iterator[int]:
+    """Sort (key, row id) pairs, keeping at most run_size of them in memory.
+    The sort is stable, so rows with equal keys keep their original order.
+    Runs are spilled to files of the spill manager, so they count towards its quotas.
+    """
+    runs: list[IO[bytes]] = []
+    run: list[tuple[tuple, int]] = []
+    sort_key = itemgetter(0)
+
+    try:
+        for keyed_row in keyed_rows:
+            run.append(keyed_row)
+            if len(run) >= run_size:
+                run.sort(key=sort_key, reverse=descending)
+                runs.append(_write_run(run, spill_session_id))
+                run = []
+
+        run.sort(key=sort_key, reverse=descending)
+        if not runs:
+            yield from (row_id for _, row_id in run)
+            return
+
+        # Runs are ordered by row id, and merge favors earlier runs on ties
+        merged = heapq.merge(
+            *[_read_run(run_file) for run_file in runs],
+            run,
+            key=sort_key,
+            reverse=descending,
+        )
+        yield from (row_id for _, row_id in merged)
+    finally:
+        for run_file in runs:
+            _delete_run(run_file)
+
+
+def _write_run(run: list[tuple[tuple, int]], spill_session_id: str | None) -> IO[bytes]:
+    # Deleted by _external_sort once the runs are merged
+    spill_manager = get_spill_manager()
+    run_file_name = spill_manager.create_file(spill_session_id)
+    run_file = open(run_file_name, "w+b")  # noqa: SIM115
+    try:
+        for start in range(0, len(run), _RUN_PICKLE_BATCH_SIZE):
+            byte_count = run_file.tell()
+            pickle.dump(run[start : start + _RUN_PICKLE_BATCH_SIZE], run_file)
+            spill_manager.add_bytes(run_file_name, run_file.tell() - byte_count)
+    except BaseException:
+        _delete_run(run_file)
+        raise
+    return run_file
+
+
+def _delete_run(run_file: IO[bytes]) -> None:
+    with contextlib.suppress(OSError):
+        run_file.close()
+    get_spill_manager().delete_file(run_file.name)
+
+
+def _read_run(run_file: IO[bytes]) -> Iterator[tuple[tuple, int]]:
+    run_file.seek(0)
+    while True:
+        try:
+            yield from pickle.load(run_file)
+        except EOFError:
+            return
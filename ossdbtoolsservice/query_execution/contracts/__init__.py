@@ -39,8 +39,14 @@ from ossdbtoolsservice.query_execution.contracts.query_execution_plan_request im
 )
 from ossdbtoolsservice.query_execution.contracts.query_request import (
     CANCEL_REQUEST,
+    CELL_VALUE_REQUEST,
+    COLUMN_STATISTICS_REQUEST,
     DISPOSE_REQUEST,
     SUBSET_REQUEST,
+    CellValueParams,
+    CellValueResult,
+    ColumnStatisticsParams,
+    ColumnStatisticsResult,
     QueryCancelParams,
     QueryCancelResult,
     QueryDisposeParams,
@@ -52,6 +58,13 @@ from ossdbtoolsservice.query_execution.contracts.result_set_notification import
     RESULT_SET_UPDATED_NOTIFICATION,
     ResultSetNotificationParams,
 )
+from ossdbtoolsservice.query_execution.contracts.result_set_view_request import (
+    FILTER_RESULT_SET_REQUEST,
+    SORT_RESULT_SET_REQUEST,
+    FilterResultSetParams,
+    ResultSetViewResult,
+    SortResultSetParams,
+)
 from ossdbtoolsservice.query_execution.contracts.save_result_as_request import (
     SAVE_AS_CSV_REQUEST,
     SAVE_AS_EXCEL_REQUEST,
@@ -63,10 +76,16 @@ from ossdbtoolsservice.query_execution.contracts.save_result_as_request import (
     SaveResultsAsJsonRequestParams,
 )
 from ossdbtoolsservice.query_execution.contracts.simple_execute_request import (
+    SIMPLE_EXECUTE_PAGE_REQUEST,
     SIMPLE_EXECUTE_REQUEST,
+    SimpleExecutePageRequest,
     SimpleExecuteRequest,
     SimpleExecuteResponse,
 )
+from ossdbtoolsservice.query_execution.contracts.spill_diagnostics_request import (
+    SPILL_DIAGNOSTICS_REQUEST,
+    SpillDiagnosticsParams,
+)
 
 __all__ = [
     "BatchNotificationParams",
@@ -93,8 +112,19 @@ __all__ = [
     "RESULT_SET_AVAILABLE_NOTIFICATION",
     "RESULT_SET_COMPLETE_NOTIFICATION",
     "RESULT_SET_UPDATED_NOTIFICATION",
+    "FILTER_RESULT_SET_REQUEST",
+    "FilterResultSetParams",
+    "ResultSetViewResult",
+    "SORT_RESULT_SET_REQUEST",
+    "SortResultSetParams",
     "SubsetParams",
     "SUBSET_REQUEST",
+    "CellValueParams",
+    "CellValueResult",
+    "CELL_VALUE_REQUEST",
+    "ColumnStatisticsParams",
+    "ColumnStatisticsResult",
+    "COLUMN_STATISTICS_REQUEST",
     "CANCEL_REQUEST",
     "QueryCancelResult",
     "QueryCancelParams",
@@ -103,8 +133,12 @@ __all__ = [
     "QueryExecutionPlanRequest",
     "DISPOSE_REQUEST",
     "SIMPLE_EXECUTE_REQUEST",
+    "SIMPLE_EXECUTE_PAGE_REQUEST",
     "SimpleExecuteRequest",
+    "SimpleExecutePageRequest",
     "SimpleExecuteResponse",
+    "SPILL_DIAGNOSTICS_REQUEST",
+    "SpillDiagnosticsParams",
     "EXECUTE_DOCUMENT_STATEMENT_REQUEST",
     "ExecuteDocumentStatementParams",
     "SAVE_AS_CSV_REQUEST",
@@ -13,10 +13,14 @@ from ossdbtoolsservice.serialization import Serializable
 class ExecutionPlanOptions(Serializable):
     include_actual_execution_plan_xml: bool
     include_estimated_execution_plan_xml: bool
+    include_execution_plan_summary: bool
 
     def __init__(self) -> None:
         self.include_actual_execution_plan_xml: bool = False
         self.include_estimated_execution_plan_xml: bool = False
+        # Run the batches with EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON),
+        # and report the hotspots of their plans in the batch summaries
+        self.include_execution_plan_summary: bool = False
 
 
 class ExecuteRequestParamsBase(Serializable):
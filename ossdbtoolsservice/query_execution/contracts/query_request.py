@@ -8,15 +8,24 @@ from ossdbtoolsservice.hosting import (
     IncomingMessageConfiguration,
     OutgoingMessageRegistration,
 )
+from ossdbtoolsservice.query.contracts import ColumnStatistics, DbCellValue
 from ossdbtoolsservice.serialization import Serializable
 
 
 class SubsetParams(Serializable):
+    """Parameters for fetching a window of rows of a result set.
+    Either a column range or a list of column indexes can be given to fetch only some of
+    the columns of the rows, in which case the cells of each row are in the requested order.
+    """
+
     owner_uri: str | None
     batch_index: int | None
     result_set_index: int | None
     rows_start_index: int | None
     rows_count: int | None
+    column_start_index: int | None
+    column_count: int | None
+    column_indexes: list[int] | None
 
     def __init__(self) -> None:
         self.owner_uri = None
@@ -24,11 +33,87 @@ class SubsetParams(Serializable):
         self.result_set_index = None
         self.rows_start_index = None
         self.rows_count = None
+        self.column_start_index = None
+        self.column_count = None
+        self.column_indexes = None
+
+    def get_columns(self) -> list[int] | None:
+        """Get the indexes of the requested columns, or None if all columns are requested"""
+        if self.column_indexes is not None:
+            return list(self.column_indexes)
+        if self.column_start_index is None and self.column_count is None:
+            return None
+        column_start_index = self.column_start_index or 0
+        if self.column_count is None:
+            raise ValueError("Missing column count")
+        return list(range(column_start_index, column_start_index + self.column_count))
 
 
 SUBSET_REQUEST = IncomingMessageConfiguration("query/subset", SubsetParams)
 
 
+class CellValueParams(Serializable):
+    """Parameters for fetching the full value of a single result set cell"""
+
+    owner_uri: str | None
+    batch_index: int | None
+    result_set_index: int | None
+    row_index: int | None
+    column_index: int | None
+
+    def __init__(self) -> None:
+        self.owner_uri = None
+        self.batch_index = None
+        self.result_set_index = None
+        self.row_index = None
+        self.column_index = None
+
+
+CELL_VALUE_REQUEST = IncomingMessageConfiguration("query/cellValue", CellValueParams)
+
+
+class CellValueResult:
+    """Result of a query/cellValue request"""
+
+    cell: DbCellValue
+
+    def __init__(self, cell: DbCellValue) -> None:
+        self.cell = cell
+
+
+OutgoingMessageRegistration.register_outgoing_message(CellValueResult)
+
+
+class ColumnStatisticsParams(Serializable):
+    """Parameters for getting the column statistics of a result set"""
+
+    owner_uri: str | None
+    batch_index: int | None
+    result_set_index: int | None
+
+    def __init__(self) -> None:
+        self.owner_uri = None
+        self.batch_index = None
+        self.result_set_index = None
+
+
+COLUMN_STATISTICS_REQUEST = IncomingMessageConfiguration(
+    "query/columnStatistics", ColumnStatisticsParams
+)
+
+
+class ColumnStatisticsResult:
+    """Result of a query/columnStatistics request, with one entry per column"""
+
+    column_statistics: list[ColumnStatistics]
+
+    def __init__(self, column_statistics: list[ColumnStatistics]) -> None:
+        self.column_statistics = column_statistics
+
+
+OutgoingMessageRegistration.register_outgoing_message(ColumnStatisticsResult)
+
+
 class QueryCancelParams(Serializable):
     owner_uri: str | None
 
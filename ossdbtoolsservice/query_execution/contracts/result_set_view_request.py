@@ -0,0 +1,75 @@
+# --------------------------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for license information.
+# --------------------------------------------------------------------------------------------
+
+
+from ossdbtoolsservice.hosting import (
+    IncomingMessageConfiguration,
+    OutgoingMessageRegistration,
+)
+from ossdbtoolsservice.serialization import Serializable
+
+
+class SortResultSetParams(Serializable):
+    """Parameters for sorting a result set by a column.
+    A column_index of None clears the sort.
+    """
+
+    owner_uri: str | None
+    batch_index: int | None
+    result_set_index: int | None
+    column_index: int | None
+    descending: bool | None
+
+    def __init__(self) -> None:
+        self.owner_uri = None
+        self.batch_index = None
+        self.result_set_index = None
+        self.column_index = None
+        self.descending = None
+
+
+SORT_RESULT_SET_REQUEST = IncomingMessageConfiguration(
+    "query/sortResultSet", SortResultSetParams
+)
+
+
+class FilterResultSetParams(Serializable):
+    """Parameters for filtering a result set by the values of a column.
+    An operator of None clears the filter.
+    """
+
+    owner_uri: str | None
+    batch_index: int | None
+    result_set_index: int | None
+    column_index: int | None
+    operator: str | None
+    value: str | None
+
+    def __init__(self) -> None:
+        self.owner_uri = None
+        self.batch_index = None
+        self.result_set_index = None
+        self.column_index = None
+        self.operator = None
+        self.value = None
+
+
+FILTER_RESULT_SET_REQUEST = IncomingMessageConfiguration(
+    "query/filterResultSet", FilterResultSetParams
+)
+
+
+class ResultSetViewResult:
+    """Result of a sort or filter request. Subsequent query/subset requests for the
+    result set return the rows of the view, and row_count is the number of rows in it.
+    """
+
+    row_count: int
+
+    def __init__(self, row_count: int) -> None:
+        self.row_count = row_count
+
+
+OutgoingMessageRegistration.register_outgoing_message(ResultSetViewResult)
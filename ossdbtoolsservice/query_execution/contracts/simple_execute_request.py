@@ -15,27 +15,60 @@ from ossdbtoolsservice.serialization import Serializable
 class SimpleExecuteRequest(Serializable):
     owner_uri: str | None
     query_string: str | None
+    max_rows: int | None
+    """Maximum number of rows to return per page.
+    Capped by the server at SIMPLE_EXECUTE_MAX_PAGE_SIZE."""
+
+    def __init__(
+        self,
+        owner_uri: str | None = None,
+        query_string: str | None = None,
+        max_rows: int | None = None,
+    ) -> None:
+        self.owner_uri = owner_uri
+        self.query_string = query_string
+        self.max_rows = max_rows
 
-    def __init__(self, owner_uri: str | None = None, query_string: str | None = None) -> None:
-        self.owner_uri = None
-        self.query_string = None
+
+class SimpleExecutePageRequest(Serializable):
+    continuation_token: str | None
+    max_rows: int | None
+
+    def __init__(
+        self, continuation_token: str | None = None, max_rows: int | None = None
+    ) -> None:
+        self.continuation_token = continuation_token
+        self.max_rows = max_rows
 
 
 class SimpleExecuteResponse(Serializable):
     rows: list[list[DbCellValue]]
     row_count: int
     column_info: list[DbColumn]
+    continuation_token: str | None
+    """Token to pass to query/simpleexecutePage to fetch the next page.
+    None if this is the last page of the result set."""
 
     def __init__(
-        self, rows: list[list[DbCellValue]], row_count: int, column_info: list[DbColumn]
+        self,
+        rows: list[list[DbCellValue]],
+        row_count: int,
+        column_info: list[DbColumn],
+        continuation_token: str | None = None,
     ) -> None:
         self.rows = rows
         self.row_count = row_count
         self.column_info = column_info
+        self.continuation_token = continuation_token
 
 
 SIMPLE_EXECUTE_REQUEST_METHOD = "query/simpleexecute"
 SIMPLE_EXECUTE_REQUEST = IncomingMessageConfiguration(
     SIMPLE_EXECUTE_REQUEST_METHOD, SimpleExecuteRequest
 )
+
+SIMPLE_EXECUTE_PAGE_REQUEST_METHOD = "query/simpleexecutePage"
+SIMPLE_EXECUTE_PAGE_REQUEST = IncomingMessageConfiguration(
+    SIMPLE_EXECUTE_PAGE_REQUEST_METHOD, SimpleExecutePageRequest
+)
 OutgoingMessageRegistration.register_outgoing_message(SimpleExecuteResponse)
@@ -0,0 +1,25 @@
+# --------------------------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for license information.
+# --------------------------------------------------------------------------------------------
+
+
+from ossdbtoolsservice.hosting import IncomingMessageConfiguration
+from ossdbtoolsservice.serialization import Serializable
+
+
+class SpillDiagnosticsParams(Serializable):
+    """Parameters for getting the disk usage of spilled result sets.
+    If owner_uri is set, the usage of the results of that query is included.
+    The response is a SpillUsage.
+    """
+
+    owner_uri: str | None
+
+    def __init__(self) -> None:
+        self.owner_uri = None
+
+
+SPILL_DIAGNOSTICS_REQUEST = IncomingMessageConfiguration(
+    "query/spillDiagnostics", SpillDiagnosticsParams
+)
@@ -17,6 +17,7 @@ from ossdbtoolsservice.connection import (
     ConnectionService,
     PooledConnection,
 )
+from ossdbtoolsservice.connection.contracts import ConnectionPriority
 from ossdbtoolsservice.connection.core.server_connection import ServerConnection
 from ossdbtoolsservice.hosting import RequestContext, Service, ServiceProvider
 from ossdbtoolsservice.query import (
@@ -26,11 +27,15 @@ from ossdbtoolsservice.query import (
     Query,
     QueryEvents,
     QueryExecutionSettings,
+    ResultSet,
     ResultSetStorageType,
+    SelectBatchEvents,
 )
 from ossdbtoolsservice.query import compute_selection_data_for_batches as compute_batches
+from ossdbtoolsservice.query.batch import is_read_only_statement
 from ossdbtoolsservice.query.contracts import (
     BatchSummary,
+    DbCellValue,
     SaveResultsRequestParams,
     SelectionData,
     SubsetResult,
@@ -41,10 +46,23 @@ from ossdbtoolsservice.query.data_storage import (
     SaveAsExcelFileStreamFactory,
     SaveAsJsonFileStreamFactory,
 )
+from ossdbtoolsservice.query.data_storage.spill_manager import (
+    SpillQuotaExceededError,
+    get_spill_manager,
+)
+from ossdbtoolsservice.query.result_cache import (
+    CachedResult,
+    ResultCache,
+    ResultCacheKey,
+    normalize_query_text,
+)
+from ossdbtoolsservice.query.result_set_view import ResultSetFilter, ResultSetSort
 from ossdbtoolsservice.query_execution.contracts import (
     BATCH_COMPLETE_NOTIFICATION,
     BATCH_START_NOTIFICATION,
     CANCEL_REQUEST,
+    CELL_VALUE_REQUEST,
+    COLUMN_STATISTICS_REQUEST,
     DEPLOY_BATCH_COMPLETE_NOTIFICATION,
     DEPLOY_BATCH_START_NOTIFICATION,
     DEPLOY_COMPLETE_NOTIFICATION,
@@ -54,6 +72,7 @@ from ossdbtoolsservice.query_execution.contracts import (
     EXECUTE_DOCUMENT_SELECTION_REQUEST,
     EXECUTE_DOCUMENT_STATEMENT_REQUEST,
     EXECUTE_STRING_REQUEST,
+    FILTER_RESULT_SET_REQUEST,
     MESSAGE_NOTIFICATION,
     QUERY_COMPLETE_NOTIFICATION,
     QUERY_EXECUTION_PLAN_REQUEST,
@@ -61,13 +80,21 @@ from ossdbtoolsservice.query_execution.contracts import (
     SAVE_AS_CSV_REQUEST,
     SAVE_AS_EXCEL_REQUEST,
     SAVE_AS_JSON_REQUEST,
+    SIMPLE_EXECUTE_PAGE_REQUEST,
     SIMPLE_EXECUTE_REQUEST,
+    SORT_RESULT_SET_REQUEST,
+    SPILL_DIAGNOSTICS_REQUEST,
     SUBSET_REQUEST,
     BatchNotificationParams,
+    CellValueParams,
+    CellValueResult,
+    ColumnStatisticsParams,
+    ColumnStatisticsResult,
     ExecuteDocumentSelectionParams,
     ExecuteDocumentStatementParams,
     ExecuteRequestParamsBase,
     ExecuteStringParams,
+    FilterResultSetParams,
     MessageNotificationParams,
     QueryCancelParams,
     QueryCancelResult,
@@ -76,20 +103,29 @@ from ossdbtoolsservice.query_execution.contracts import (
     QueryExecutionPlanRequest,
     ResultMessage,
     ResultSetNotificationParams,
+    ResultSetViewResult,
     SaveResultRequestResult,
     SaveResultsAsCsvRequestParams,
     SaveResultsAsExcelRequestParams,
     SaveResultsAsJsonRequestParams,
+    SimpleExecutePageRequest,
     SimpleExecuteRequest,
     SimpleExecuteResponse,
+    SortResultSetParams,
+    SpillDiagnosticsParams,
     SubsetParams,
 )
 from ossdbtoolsservice.utils import constants, time
 from ossdbtoolsservice.utils.connection import get_db_error_message
+from ossdbtoolsservice.workspace.contracts import Configuration
 from ossdbtoolsservice.workspace.workspace_service import WorkspaceService
 
 NO_QUERY_MESSAGE = "QueryServiceRequestsNoQuery"
 
+# Seconds between two checks of whether the rows of a simple execute page
+# that is still being read are available
+SIMPLE_EXECUTE_PAGE_POLL_SECONDS = 0.1
+
 T = TypeVar("T")
 
 
@@ -106,6 +142,10 @@ class ExecuteRequestWorkerArgs:
         on_resultset_complete: Callable[[ResultSetNotificationParams], None] | None = None,
         on_batch_complete: Callable[[BatchNotificationParams], None] | None = None,
         on_query_complete: Callable[[QueryCompleteNotificationParams], None] | None = None,
+        on_first_fetch: Callable[[Batch], None] | None = None,
+        first_fetch_row_count: int = 1,
+        max_parallel_batches: int = 1,
+        serve_from_cache: Callable[[], bool] | None = None,
     ) -> None:
         self.owner_uri = owner_uri
         self.connection = connection
@@ -117,6 +157,35 @@ class ExecuteRequestWorkerArgs:
         self.on_resultset_complete = on_resultset_complete
         self.on_batch_complete = on_batch_complete
         self.on_query_complete = on_query_complete
+        # Fired once the first first_fetch_row_count rows of a batch's result set
+        # are readable, while the rest of the result set is still being read
+        self.on_first_fetch = on_first_fetch
+        self.first_fetch_row_count = first_fetch_row_count
+        # Maximum number of connections that execute read-only batches at once.
+        # 1 executes all batches sequentially on the connection.
+        self.max_parallel_batches = max_parallel_batches
+        # Called on the worker thread before the query is executed. Returns whether
+        # the result was served from the result cache, and the query is not executed.
+        self.serve_from_cache = serve_from_cache
+
+
+class SimpleExecuteContinuation:
+    """Tracks the paging state of a query/simpleexecute result set.
+
+    The continuation token handed to the client is the owner URI of the
+    internal query that holds the result set.
+    """
+
+    def __init__(self, owner_uri: str) -> None:
+        self.owner_uri = owner_uri
+        self.next_row_index = 0
+        self.has_error = False
+        self.query_complete = threading.Event()
+        # Whether a page request waits for its rows to be read
+        self.page_pending = False
+        # The cache entry whose query holds the result set, if the result is cached.
+        # It is released rather than disposed once paging is done.
+        self.cached_result: CachedResult | None = None
 
 
 class QueryExecutionService(Service):
@@ -127,6 +196,10 @@ class QueryExecutionService(Service):
         # Dictionary mapping uri to a list of batches
         self.query_results: dict[str, Query] = {}
         self.owner_to_thread_map: dict = {}  # Only used for testing
+        # Dictionary mapping continuation tokens to simple execute paging state
+        self._simple_execute_continuations: dict[str, SimpleExecuteContinuation] = {}
+        # Results of read-only simple execute requests, when enabled
+        self._result_cache = ResultCache()
 
         self._service_action_mapping: dict = {
             EXECUTE_STRING_REQUEST: self._handle_execute_query_request,
@@ -134,8 +207,14 @@ class QueryExecutionService(Service):
             EXECUTE_DOCUMENT_SELECTION_REQUEST: self._handle_execute_query_request,
             EXECUTE_DOCUMENT_STATEMENT_REQUEST: self._handle_execute_query_request,
             SUBSET_REQUEST: self._handle_subset_request,
+            CELL_VALUE_REQUEST: self._handle_cell_value_request,
+            SORT_RESULT_SET_REQUEST: self._handle_sort_result_set_request,
+            FILTER_RESULT_SET_REQUEST: self._handle_filter_result_set_request,
+            COLUMN_STATISTICS_REQUEST: self._handle_column_statistics_request,
+            SPILL_DIAGNOSTICS_REQUEST: self._handle_spill_diagnostics_request,
             CANCEL_REQUEST: self._handle_cancel_query_request,
             SIMPLE_EXECUTE_REQUEST: self._handle_simple_execute_request,
+            SIMPLE_EXECUTE_PAGE_REQUEST: self._handle_simple_execute_page_request,
             DISPOSE_REQUEST: self._handle_dispose_request,
             QUERY_EXECUTION_PLAN_REQUEST: self._handle_query_execution_plan_request,
             SAVE_AS_CSV_REQUEST: self._handle_save_as_csv_request,
@@ -152,11 +231,55 @@ class QueryExecutionService(Service):
                 action, self._service_action_mapping[action]
             )
 
+        spill_manager = get_spill_manager()
+        if self._service_provider.logger is not None:
+            spill_manager.set_logger(self._service_provider.logger)
+
+        try:
+            workspace_service = self._service_provider.get(
+                constants.WORKSPACE_SERVICE_NAME, WorkspaceService
+            )
+            workspace_service.register_config_change_callback(self._handle_config_change)
+        except (KeyError, RuntimeError, TypeError):
+            # Without a workspace service the default spill settings are used
+            pass
+
+        # Clean up after service processes that exited without deleting their spill files
+        spill_manager.sweep_orphaned_files_in_background()
+
         if self._service_provider.logger is not None:
             self._service_provider.logger.info(
                 "Query execution service successfully initialized"
             )
 
+    def _handle_config_change(self, config: Configuration) -> None:
+        """Apply the spill directory, quota and result cache settings"""
+        pgsql_config = config.pgsql
+        try:
+            self._result_cache.configure(
+                pgsql_config.result_cache_enabled,
+                pgsql_config.result_cache_ttl_seconds,
+                pgsql_config.result_cache_max_mb * 1024 * 1024,
+                pgsql_config.result_cache_invalidation,
+                pgsql_config.result_cache_invalidation_threshold,
+            )
+        except ValueError as e:
+            self._log_exception(e)
+
+        spill_manager = get_spill_manager()
+        try:
+            new_directories = spill_manager.configure(
+                pgsql_config.spill_directories,
+                pgsql_config.spill_process_quota_mb * 1024 * 1024,
+                pgsql_config.spill_session_quota_mb * 1024 * 1024,
+            )
+        except OSError as e:
+            self._log_exception(e)
+            return
+
+        if new_directories:
+            spill_manager.sweep_orphaned_files_in_background(new_directories)
+
     def get_query(self, owner_uri: str | None) -> Query:
         if owner_uri is None:
             raise ValueError("owner_uri cannot be None")
@@ -210,42 +333,81 @@ class QueryExecutionService(Service):
             request_context.send_error("Could not get connection info")
             return
 
+        page_size = _get_simple_execute_page_size(params.max_rows)
+        continuation = SimpleExecuteContinuation(new_owner_uri)
+        cache_context: tuple[ResultCacheKey, int | None] | None = None
+
+        def serve_from_cache() -> bool:
+            # Looking the query up runs a query, so it is done on the worker thread
+            nonlocal cache_context
+            cache_context = self._get_result_cache_context(owner_uri, params.query_string)
+            if cache_context is None:
+                return False
+            cached_result = self._result_cache.acquire(*cache_context)
+            if cached_result is None:
+                return False
+
+            # Page through the spilled result set of the cached query
+            continuation.cached_result = cached_result
+            continuation.query_complete.set()
+            query = self.query_results.get(new_owner_uri)
+            self.query_results[new_owner_uri] = cached_result.query
+            if query is not None:
+                query.dispose()
+            response = self._get_simple_execute_page(request_context, continuation, page_size)
+            if response is not None:
+                request_context.send_response(response)
+            return True
+
         execute_params = ExecuteStringParams()
         execute_params.query = params.query_string
         execute_params.owner_uri = new_owner_uri
 
-        def on_query_complete(query_complete_params: QueryCompleteNotificationParams) -> None:
-            subset_params = SubsetParams()
-            subset_params.owner_uri = new_owner_uri
-            subset_params.batch_index = 0
-            subset_params.result_set_index = 0
-            subset_params.rows_start_index = 0
+        self._simple_execute_continuations[new_owner_uri] = continuation
 
-            if not query_complete_params.batch_summaries:
-                request_context.send_error("Unable to get batch summaries")
-                return
+        # The first page is sent either as soon as it has been fetched,
+        # or when the query completes, whichever happens first.
+        first_page_lock = threading.Lock()
+        first_page_sent = False
 
-            resut_set_sumaries = query_complete_params.batch_summaries[0].result_set_summaries
-            if not resut_set_sumaries:
-                request_context.send_error("Unable to get result set summaries")
-                return
+        def send_first_page() -> None:
+            nonlocal first_page_sent
+            with first_page_lock:
+                if first_page_sent:
+                    return
+                first_page_sent = True
 
-            resultset_summary = resut_set_sumaries[0]
+            response = self._get_simple_execute_page(request_context, continuation, page_size)
+            if response is not None:
+                request_context.send_response(response)
 
-            subset_params.rows_count = resultset_summary.row_count
+        def on_first_fetch(batch: Batch) -> None:
+            if batch.id == 0:
+                send_first_page()
 
-            subset = self._get_result_subset(request_context, subset_params)
+        def on_query_complete(query_complete_params: QueryCompleteNotificationParams) -> None:
+            batch_summaries = query_complete_params.batch_summaries
+            continuation.has_error = any(summary.has_error for summary in batch_summaries)
+            if cache_context is not None and not continuation.has_error:
+                continuation.cached_result = self._add_to_result_cache(
+                    new_owner_uri, *cache_context
+                )
+            continuation.query_complete.set()
 
-            if subset is None:
-                request_context.send_error("Unable to get result subset")
+            if first_page_sent:
                 return
 
-            simple_execute_response = SimpleExecuteResponse(
-                subset.result_subset.rows,
-                subset.result_subset.row_count,
-                resultset_summary.column_info,
-            )
-            request_context.send_response(simple_execute_response)
+            if not batch_summaries:
+                self._dispose_simple_execute(continuation)
+                request_context.send_error("Unable to get batch summaries")
+                return
+
+            if not batch_summaries[0].result_set_summaries:
+                self._dispose_simple_execute(continuation)
+                request_context.send_error("Unable to get result set summaries")
+                return
+
+            send_first_page()
 
         worker_args = ExecuteRequestWorkerArgs(
             new_owner_uri,
@@ -253,10 +415,216 @@ class QueryExecutionService(Service):
             request_context,
             ResultSetStorageType.FILE_STORAGE,
             on_query_complete=on_query_complete,
+            on_first_fetch=on_first_fetch,
+            first_fetch_row_count=page_size,
+            serve_from_cache=serve_from_cache,
         )
 
         self._start_query_execution_thread(request_context, execute_params, worker_args)
 
+    def _handle_simple_execute_page_request(
+        self, request_context: RequestContext, params: SimpleExecutePageRequest
+    ) -> None:
+        """Sends the next page of a query/simpleexecute result set"""
+        token = params.continuation_token
+        if token is None:
+            request_context.send_error("Missing continuationToken")
+            return
+
+        continuation = self._simple_execute_continuations.get(token)
+        if continuation is None:
+            request_context.send_error(f"Unknown or expired continuation token: {token}")
+            return
+
+        if continuation.page_pending:
+            request_context.send_error(
+                f"A page of continuation token {token} is already being fetched"
+            )
+            return
+
+        page_size = _get_simple_execute_page_size(params.max_rows)
+
+        if self._is_simple_execute_page_available(continuation, page_size):
+            self._send_simple_execute_page(request_context, continuation, page_size)
+            return
+
+        # Rows beyond the first page might still be spilling to disk.
+        # Wait for them in the background, so that other requests,
+        # such as cancel and dispose, are not held up.
+        continuation.page_pending = True
+        threading.Thread(
+            target=self._send_simple_execute_page_when_available,
+            args=(request_context, continuation, page_size),
+            name="SimpleExecutePage",
+            daemon=True,
+        ).start()
+
+    def _is_simple_execute_page_available(
+        self, continuation: SimpleExecuteContinuation, page_size: int
+    ) -> bool:
+        """Whether the query completed, or has read all the rows of the next page"""
+        if continuation.query_complete.is_set():
+            return True
+        query = self.query_results.get(continuation.owner_uri)
+        result_set = query.batches[0].result_set if query and query.batches else None
+        return (
+            result_set is not None
+            and result_set.row_count >= continuation.next_row_index + page_size
+        )
+
+    def _send_simple_execute_page_when_available(
+        self,
+        request_context: RequestContext,
+        continuation: SimpleExecuteContinuation,
+        page_size: int,
+    ) -> None:
+        try:
+            while not continuation.query_complete.wait(SIMPLE_EXECUTE_PAGE_POLL_SECONDS):
+                if (
+                    continuation.owner_uri not in self._simple_execute_continuations
+                    or continuation.owner_uri not in self.query_results
+                ):
+                    # The query was disposed while the page waited
+                    request_context.send_error(
+                        f"Unknown or expired continuation token: {continuation.owner_uri}"
+                    )
+                    return
+                if self._is_simple_execute_page_available(continuation, page_size):
+                    break
+            self._send_simple_execute_page(request_context, continuation, page_size)
+        finally:
+            continuation.page_pending = False
+
+    def _send_simple_execute_page(
+        self,
+        request_context: RequestContext,
+        continuation: SimpleExecuteContinuation,
+        page_size: int,
+    ) -> None:
+        if continuation.has_error:
+            self._dispose_simple_execute(continuation)
+            request_context.send_error("Query execution failed")
+            return
+
+        response = self._get_simple_execute_page(request_context, continuation, page_size)
+        if response is not None:
+            request_context.send_response(response)
+
+    def _get_simple_execute_page(
+        self,
+        request_context: RequestContext,
+        continuation: SimpleExecuteContinuation,
+        page_size: int,
+    ) -> SimpleExecuteResponse | None:
+        """Builds the next page of a simple execute result set
+        and advances the continuation. Disposes the underlying query once
+        the last page has been built.
+        """
+        query = self.query_results.get(continuation.owner_uri)
+        result_set = query.batches[0].result_set if query and query.batches else None
+        if result_set is None:
+            self._dispose_simple_execute(continuation)
+            request_context.send_error("Unable to get result set")
+            return None
+
+        start_index = continuation.next_row_index
+        end_index = min(start_index + page_size, result_set.row_count)
+
+        rows: list[list[DbCellValue]] = []
+        if end_index > start_index:
+            subset_params = SubsetParams()
+            subset_params.owner_uri = continuation.owner_uri
+            subset_params.batch_index = 0
+            subset_params.result_set_index = 0
+            subset_params.rows_start_index = start_index
+            subset_params.rows_count = end_index - start_index
+
+            subset = self._get_result_subset(request_context, subset_params)
+
+            if subset is None:
+                self._dispose_simple_execute(continuation)
+                request_context.send_error("Unable to get result subset")
+                return None
+            rows = subset.result_subset.rows
+
+        continuation.next_row_index = start_index + len(rows)
+
+        has_more = not continuation.query_complete.is_set() or (
+            continuation.next_row_index < result_set.row_count
+        )
+        if not has_more:
+            self._dispose_simple_execute(continuation)
+
+        return SimpleExecuteResponse(
+            rows,
+            len(rows),
+            result_set.columns_info,
+            continuation.owner_uri if has_more else None,
+        )
+
+    def _dispose_simple_execute(self, continuation: SimpleExecuteContinuation) -> None:
+        self._simple_execute_continuations.pop(continuation.owner_uri, None)
+        query = self.query_results.pop(continuation.owner_uri, None)
+        if continuation.cached_result is not None:
+            self._result_cache.release(continuation.cached_result)
+        elif query is not None:
+            query.dispose()
+
+    def _get_result_cache_context(
+        self, owner_uri: str, query_text: str | None
+    ) -> tuple[ResultCacheKey, int | None] | None:
+        """Get the cache key of a simple execute query, and the snapshot of the database
+        it runs against. Returns None if the cache is disabled or the query is not
+        a single read-only statement.
+        """
+        if not self._result_cache.enabled or not query_text:
+            return None
+        statements = sqlparse.split(query_text)
+        if len(statements) != 1 or not is_read_only_statement(statements[0]):
+            return None
+
+        connection_service = self.service_provider.get(
+            constants.CONNECTION_SERVICE_NAME, ConnectionService
+        )
+        connection_info = connection_service.get_connection_info(owner_uri)
+        if connection_info is None:
+            return None
+
+        try:
+            with self._get_pooled_connection(owner_uri) as connection:
+                host, port = connection.host_name, connection.port
+                row = connection.fetch_one(self._result_cache.get_context_query())
+        except (psycopg.Error, ValueError) as e:
+            # For example pg_current_wal_lsn() on a standby. The query is not cached.
+            self._log_warning(f"Could not get the result cache context: {e}")
+            return None
+        if row is None:
+            return None
+
+        database, search_path, role = row[:3]
+        snapshot = int(row[3]) if len(row) > 3 and row[3] is not None else None
+        key = ResultCacheKey(
+            host,
+            port,
+            connection_info.connection_details.to_hash(),
+            database,
+            normalize_query_text(query_text),
+            search_path,
+            role,
+        )
+        return key, snapshot
+
+    def _add_to_result_cache(
+        self, owner_uri: str, key: ResultCacheKey, snapshot: int | None
+    ) -> CachedResult | None:
+        query = self.query_results.get(owner_uri)
+        if query is None or len(query.batches) != 1:
+            return None
+        result_set = query.batches[0].result_set
+        if result_set is None:
+            return None
+        return self._result_cache.add(key, query, result_set.bytes_spilled, snapshot)
+
     def _handle_execute_query_request(
         self, request_context: RequestContext, params: ExecuteRequestParamsBase
     ) -> None:
@@ -317,6 +685,7 @@ class QueryExecutionService(Service):
             on_resultset_complete,
             on_batch_complete,
             on_query_complete,
+            max_parallel_batches=self._get_max_parallel_batches(),
         )
 
         self._start_query_execution_thread(request_context, params, worker_args)
@@ -406,6 +775,11 @@ class QueryExecutionService(Service):
             # Send back notices as a separate message to
             # avoid error coloring / highlighting of text
             notices = batch.notices
+            if batch.dropped_notice_count:
+                notices = [
+                    *notices,
+                    f"{batch.dropped_notice_count} more notices were not shown.",
+                ]
             if notices:
                 notice_messages = "\n".join(notices)
                 notice_message_params = self.build_message_params(
@@ -446,15 +820,28 @@ class QueryExecutionService(Service):
                 return
 
             execution_settings = QueryExecutionSettings(
-                params.execution_plan_options, worker_args.result_set_storage_type
+                params.execution_plan_options,
+                worker_args.result_set_storage_type,
+                self._get_max_cell_display_size(),
+                self._is_pooler_compatible(params.owner_uri),
             )
-            query_events = QueryEvents(
-                None,
-                None,
-                BatchEvents(
+            batch_events: BatchEvents
+            if worker_args.on_first_fetch is not None:
+                batch_events = SelectBatchEvents(
+                    _batch_execution_started_callback,
+                    _batch_execution_finished_callback,
+                    None,
+                    worker_args.on_first_fetch,
+                    worker_args.first_fetch_row_count,
+                )
+            else:
+                batch_events = BatchEvents(
                     _batch_execution_started_callback, _batch_execution_finished_callback
-                ),
-            )
+                )
+            query_events = QueryEvents(None, None, batch_events)
+            previous_query = self.query_results.get(params.owner_uri)
+            if previous_query is not None:
+                previous_query.dispose()
             self.query_results[params.owner_uri] = Query(
                 params.owner_uri, query_text, execution_settings, query_events
             )
@@ -479,6 +866,174 @@ class QueryExecutionService(Service):
         if result is not None:
             request_context.send_response(result)
 
+    def _handle_cell_value_request(
+        self, request_context: RequestContext, params: CellValueParams
+    ) -> None:
+        """Sends the full value of a single cell back to the query/cellValue request"""
+        try:
+            query: Query = self.get_query(params.owner_uri)
+
+            if query is None:
+                request_context.send_error(NO_QUERY_MESSAGE)
+                return
+
+            if params.batch_index is None:
+                request_context.send_error("Missing batch index")
+                return
+            if params.row_index is None:
+                request_context.send_error("Missing row index")
+                return
+            if params.column_index is None:
+                request_context.send_error("Missing column index")
+                return
+
+            cell = query.get_cell_value(
+                params.batch_index, params.row_index, params.column_index
+            )
+            request_context.send_response(CellValueResult(cell))
+        except Exception as e:
+            request_context.send_unhandled_error_response(e)
+
+    def _handle_sort_result_set_request(
+        self, request_context: RequestContext, params: SortResultSetParams
+    ) -> None:
+        """Sorts the view over a result set for the query/sortResultSet request"""
+        result_set_sort = (
+            ResultSetSort(params.column_index, bool(params.descending))
+            if params.column_index is not None
+            else None
+        )
+        self._update_result_set_view(
+            request_context,
+            params.owner_uri,
+            params.batch_index,
+            params.result_set_index,
+            lambda result_set: result_set.sort(result_set_sort),
+        )
+
+    def _handle_filter_result_set_request(
+        self, request_context: RequestContext, params: FilterResultSetParams
+    ) -> None:
+        """Filters the view over a result set for the query/filterResultSet request"""
+        try:
+            result_set_filter = None
+            if params.operator is not None:
+                if params.column_index is None:
+                    request_context.send_error("Missing column index")
+                    return
+                result_set_filter = ResultSetFilter(
+                    params.column_index, params.operator, params.value
+                )
+        except ValueError as e:
+            request_context.send_error(str(e))
+            return
+
+        self._update_result_set_view(
+            request_context,
+            params.owner_uri,
+            params.batch_index,
+            params.result_set_index,
+            lambda result_set: result_set.filter(result_set_filter),
+        )
+
+    def _update_result_set_view(
+        self,
+        request_context: RequestContext,
+        owner_uri: str | None,
+        batch_index: int | None,
+        result_set_index: int | None,
+        update_view: Callable[[ResultSet], int],
+    ) -> None:
+        """Updates the view over a result set on a separate thread, since building it
+        reads the whole result set, and responds with the number of rows in the view
+        """
+        continuation = self._simple_execute_continuations.get(owner_uri or "")
+        if continuation is not None and continuation.cached_result is not None:
+            # The view would change the pages of all readers of the cached result
+            request_context.send_error("Cached results cannot be sorted or filtered")
+            return
+
+        result_set = self._get_executed_result_set(
+            request_context, owner_uri, batch_index, result_set_index
+        )
+        if owner_uri is None or result_set is None:
+            return
+
+        def _update_view() -> None:
+            try:
+                row_count = update_view(result_set)
+                request_context.send_response(ResultSetViewResult(row_count))
+            except Exception as e:
+                request_context.send_unhandled_error_response(e)
+
+        thread = threading.Thread(target=_update_view, daemon=True)
+        self.owner_to_thread_map[owner_uri] = thread
+        thread.start()
+
+    def _handle_column_statistics_request(
+        self, request_context: RequestContext, params: ColumnStatisticsParams
+    ) -> None:
+        """Sends the column statistics of a result set for query/columnStatistics.
+        They are computed on a separate thread, since that reads the whole result set.
+        """
+        result_set = self._get_executed_result_set(
+            request_context, params.owner_uri, params.batch_index, params.result_set_index
+        )
+        if params.owner_uri is None or result_set is None:
+            return
+
+        def _send_column_statistics() -> None:
+            try:
+                request_context.send_response(
+                    ColumnStatisticsResult(result_set.column_statistics)
+                )
+            except Exception as e:
+                request_context.send_unhandled_error_response(e)
+
+        thread = threading.Thread(target=_send_column_statistics, daemon=True)
+        self.owner_to_thread_map[params.owner_uri] = thread
+        thread.start()
+
+    def _handle_spill_diagnostics_request(
+        self, request_context: RequestContext, params: SpillDiagnosticsParams
+    ) -> None:
+        """Sends the disk usage of spilled result sets for query/spillDiagnostics"""
+        try:
+            request_context.send_response(get_spill_manager().get_usage(params.owner_uri))
+        except Exception as e:
+            request_context.send_unhandled_error_response(e)
+
+    def _get_executed_result_set(
+        self,
+        request_context: RequestContext,
+        owner_uri: str | None,
+        batch_index: int | None,
+        result_set_index: int | None,
+    ) -> ResultSet | None:
+        """Gets a result set of a query that has finished executing,
+        or sends an error and returns None
+        """
+        if owner_uri is None or owner_uri not in self.query_results:
+            request_context.send_error(NO_QUERY_MESSAGE)
+            return None
+
+        query = self.query_results[owner_uri]
+        if query.execution_state is not ExecutionState.EXECUTED:
+            request_context.send_error("Query execution has not completed")
+            return None
+
+        if batch_index is None or batch_index < 0 or batch_index >= len(query.batches):
+            request_context.send_error("Invalid batch index")
+            return None
+        if result_set_index != 0:
+            request_context.send_error("Result set index should be always 0")
+            return None
+
+        result_set = query.batches[batch_index].result_set
+        if result_set is None:
+            request_context.send_error("No result set.")
+        return result_set
+
     def _get_result_subset(
         self, request_context: RequestContext, params: SubsetParams
     ) -> SubsetResult | None:
@@ -502,10 +1057,17 @@ class QueryExecutionService(Service):
                 request_context.send_error("Missing rows count")
                 return None
 
+            try:
+                columns = params.get_columns()
+            except ValueError as e:
+                request_context.send_error(str(e))
+                return None
+
             result_set_subset = query.get_subset(
                 params.batch_index,
                 params.rows_start_index,
                 params.rows_start_index + params.rows_count,
+                columns,
             )
 
             return SubsetResult(result_set_subset)
@@ -564,6 +1126,11 @@ class QueryExecutionService(Service):
             if query.execution_state is not ExecutionState.EXECUTED:
                 self.cancel_query(owner_uri, query)
             del self.query_results[owner_uri]
+            continuation = self._simple_execute_continuations.pop(owner_uri, None)
+            if continuation is not None and continuation.cached_result is not None:
+                self._result_cache.release(continuation.cached_result)
+            else:
+                query.dispose()
             request_context.send_response({})
         except Exception as e:
             request_context.send_unhandled_error_response(e)
@@ -573,17 +1140,27 @@ class QueryExecutionService(Service):
         if pooled_connection is None:
             raise LookupError("Could not find associated connection")  # TODO: Localize
 
-        if query.connection_backend_pid is None:
+        backend_pids = query.connection_backend_pids
+        if not backend_pids:
             return  # Query is no longer running
 
         with pooled_connection as conn:
-            conn.execute_query(f"SELECT pg_cancel_backend ({query.connection_backend_pid})")
+            for backend_pid in backend_pids:
+                conn.execute_query(f"SELECT pg_cancel_backend ({backend_pid})")
 
     def _execute_query_request_worker(
         self, worker_args: ExecuteRequestWorkerArgs, retry_state: bool = False
     ) -> None:
         """Worker method for 'handle execute query request' thread"""
 
+        if not retry_state and worker_args.serve_from_cache is not None:
+            try:
+                if worker_args.serve_from_cache():
+                    return
+            except Exception as e:
+                # The query is executed as if it was not cached
+                self._log_warning(f"Could not look up the result cache: {e}")
+
         _check_and_fire(worker_args.before_query_initialize, {})
 
         query: Query = self.query_results[worker_args.owner_uri]
@@ -591,7 +1168,16 @@ class QueryExecutionService(Service):
         # Wrap execution in a try/except block so that we can send an error if it fails
         try:
             if isinstance(worker_args.connection, ServerConnection):
-                query.execute(worker_args.connection, retry_state)
+                query.execute_in_parallel(
+                    worker_args.connection,
+                    lambda: self._get_pooled_connection(
+                        worker_args.owner_uri,
+                        ConnectionPriority.BULK,
+                        constants.PARALLEL_BATCH_CHECKOUT_TIMEOUT_SECONDS,
+                    ),
+                    worker_args.max_parallel_batches,
+                    retry_state,
+                )
             else:
                 # PooledConnection, use as context manager.
                 with worker_args.connection as connection:
@@ -607,11 +1193,19 @@ class QueryExecutionService(Service):
             )
             _check_and_fire(worker_args.on_query_complete, query_complete_params)
 
-    def _get_pooled_connection(self, owner_uri: str) -> PooledConnection:
+    def _get_pooled_connection(
+        self,
+        owner_uri: str,
+        priority: ConnectionPriority = ConnectionPriority.INTERACTIVE,
+        checkout_timeout: float | None = None,
+    ) -> PooledConnection:
         """
         Get a pooled connection for the given owner URI from the connection service
 
         :param owner_uri: the URI to get the connection for
+        :param priority: the priority class to check the connection out with
+        :param checkout_timeout: seconds to wait at most for a free connection,
+            None to wait up to the connect timeout
         :returns: a PooledConnection object
         :raises LookupError: if there is no connection service
         :raises ValueError: if there is no pooled connection
@@ -620,7 +1214,9 @@ class QueryExecutionService(Service):
         connection_service = self.service_provider.get(
             constants.CONNECTION_SERVICE_NAME, ConnectionService
         )
-        connection = connection_service.get_pooled_connection(owner_uri)
+        connection = connection_service.get_pooled_connection(
+            owner_uri, priority, checkout_timeout=checkout_timeout
+        )
         if connection is None:
             raise ValueError(f"No connection for owner URI: {owner_uri}")
         return connection
@@ -666,6 +1262,42 @@ class QueryExecutionService(Service):
         )
         return MessageNotificationParams(owner_uri=owner_uri, message=result_message)
 
+    def _get_max_parallel_batches(self) -> int:
+        """Get the number of connections that may execute the batches of a query at once"""
+        try:
+            workspace_service = self.service_provider.get(
+                constants.WORKSPACE_SERVICE_NAME, WorkspaceService
+            )
+        except (KeyError, TypeError):
+            return 1
+        pgsql_config = workspace_service.configuration.pgsql
+        if not pgsql_config.parallel_batch_execution:
+            return 1
+        return max(1, pgsql_config.max_parallel_batches)
+
+    def _is_pooler_compatible(self, owner_uri: str) -> bool:
+        """Whether the connection of the owner URI goes through a transaction pooler"""
+        try:
+            connection_service = self.service_provider.get(
+                constants.CONNECTION_SERVICE_NAME, ConnectionService
+            )
+        except (KeyError, TypeError):
+            return False
+        connection_info = connection_service.get_connection_info(owner_uri)
+        if connection_info is None:
+            return False
+        return connection_info.connection_details.pooler_compatible
+
+    def _get_max_cell_display_size(self) -> int:
+        """Get the configured maximum size of a cell value stored with a result set"""
+        try:
+            workspace_service = self.service_provider.get(
+                constants.WORKSPACE_SERVICE_NAME, WorkspaceService
+            )
+        except (KeyError, TypeError):
+            return constants.DEFAULT_MAX_CELL_DISPLAY_SIZE
+        return workspace_service.configuration.pgsql.max_cell_display_size
+
     def _get_query_text_from_execute_params(
         self, params: ExecuteRequestParamsBase
     ) -> str | None:
@@ -760,6 +1392,14 @@ class QueryExecutionService(Service):
             # get_error_message may return None so ensure error_message is str type
             error_message = str(get_db_error_message(e))
 
+        elif isinstance(e, SpillQuotaExceededError):
+            # The quota is configured, so this is expected and has no useful stack trace
+            error_message = str(e)
+            self._log_warning(
+                f"Query results of {query.owner_uri} exceeded the spill quota of "
+                f"{e.quota_bytes} bytes ({e.setting_name})"
+            )
+
         elif isinstance(e, RuntimeError):
             error_message = str(e)
 
@@ -836,6 +1476,13 @@ def _create_rows_affected_message(batch: Batch) -> str:
         return "Commands completed successfully"  # TODO: Localize
 
 
+def _get_simple_execute_page_size(max_rows: int | None) -> int:
+    """Get the page size for a simple execute request, enforcing the server maximum"""
+    if max_rows is None or max_rows <= 0:
+        return constants.SIMPLE_EXECUTE_MAX_PAGE_SIZE
+    return min(max_rows, constants.SIMPLE_EXECUTE_MAX_PAGE_SIZE)
+
+
 def _check_and_fire(action: Callable[[T], None] | None, params: T) -> None:
     if action is not None:
         action(params)
@@ -50,6 +50,8 @@ class TableSchema(PGTSBaseModel):
 class GetSchemaModelResponseParams(PGTSBaseModel):
     session_id: str
     tables: list[TableSchema]
+    # Some tables are listed without their details, as reading them timed out
+    is_partial: bool = False
 
 GET_SCHEMA_MODEL_COMPLETE = "schemaDesigner/getSchemaModelComplete"
 
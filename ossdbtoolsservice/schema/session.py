@@ -9,6 +9,11 @@ from typing import Optional
 import psycopg
 
 from ossdbtoolsservice.connection import ServerConnection
+from ossdbtoolsservice.connection.contracts import BackgroundQueryCategory
+from ossdbtoolsservice.connection.core.statement_timeouts import (
+    get_statement_timeouts,
+    is_timeout_error,
+)
 from ossdbtoolsservice.hosting.context import RequestContext
 from ossdbtoolsservice.schema.contracts import (
     GetSchemaModelResponseParams,
@@ -80,17 +85,40 @@ class SchemaEditorSession:
         self, request_context: RequestContext, connection: ServerConnection
     ) -> None:
         try:
-            self._schema = self.get_schema_json(connection._conn)
+            schema = self.get_schema_json(connection._conn)
+            # A partial schema is not kept, so that the next request reads it again
+            if not schema.is_partial:
+                self._schema = schema
             request_context.send_notification(
-                GET_SCHEMA_MODEL_COMPLETE, self._schema)
+                GET_SCHEMA_MODEL_COMPLETE, schema)
         except Exception as e:
             request_context.send_error(f"Error fetching db context: {e}")
+        finally:
+            self.get_schema_task = None
         return
 
     def get_schema_json(self, conn: psycopg.Connection) -> GetSchemaModelResponseParams:
         schema_resp = GetSchemaModelResponseParams(
             session_id=self.id, tables=[])
 
+        # The schema is read in one transaction, under the schema editor timeouts.
+        # If the details of a table time out, the remaining tables are listed without
+        # their details, and the schema is read again on the next request.
+        try:
+            with get_statement_timeouts().apply(
+                conn, BackgroundQueryCategory.SCHEMA_EDITOR
+            ):
+                self._read_schema(conn, schema_resp)
+        except Exception as e:
+            if not is_timeout_error(e) or not schema_resp.tables:
+                raise
+            schema_resp.is_partial = True
+
+        return schema_resp
+
+    def _read_schema(
+        self, conn: psycopg.Connection, schema_resp: GetSchemaModelResponseParams
+    ) -> None:
         # First, query for all user tables (exclude system schemas)
         with conn.cursor() as cur:
             cur.execute("""
@@ -157,108 +185,117 @@ class SchemaEditorSession:
                 primary_keys=[],
                 relationships=[]
             )
+            schema_resp.tables.append(table_dict)
 
-            # Query columns for this table
-            with conn.cursor() as cur:
-                cur.execute("""
-                    SELECT
-                        column_name,
-                        ordinal_position,
-                        data_type,
-                        is_nullable,
-                        column_default,
-                        character_maximum_length
-                    FROM information_schema.columns
-                    WHERE table_schema = %s AND table_name = %s
-                    ORDER BY ordinal_position;
-                """, (schema_name, table_name))
-                columns = cur.fetchall()
-
-            if columns:
-                table_dict.columns = []
-                for col in columns:
-                    (col_name, ordinal_position, data_type,
-                     is_nullable, col_default, char_max_length) = col
-                    col_obj = ColumnSchema(
-                        name=col_name,
-                        ordinal_position=ordinal_position,
-                        data_type=data_type,
-                        is_nullable=is_nullable == 'YES',
-                        default=col_default,
-                        character_maximum_length=char_max_length,
-                    )
-                    table_dict.columns.append(col_obj)
+        # Then read the details of each table
+        for table_dict in schema_resp.tables:
+            self._add_table_details(
+                conn, table_dict, table_dict.schema, table_dict.name)
 
-            # Query primary key columns for this table
-            with conn.cursor() as cur:
-                cur.execute("""
-                    SELECT a.attname AS column_name
-                    FROM pg_index i
-                    JOIN pg_attribute a
-                        ON a.attrelid = i.indrelid
-                        AND a.attnum = ANY(i.indkey)
-                    JOIN pg_class c
-                        ON c.oid = i.indrelid
-                    JOIN pg_namespace n
-                        ON n.oid = c.relnamespace
-                    WHERE i.indisprimary
-                    AND n.nspname = %s
-                    AND c.relname = %s
-                    ORDER BY a.attnum;
-                """, (schema_name, table_name))
-                pk_rows = cur.fetchall()
-            table_dict.primary_keys = [row[0] for row in pk_rows]
+    def _add_table_details(
+        self,
+        conn: psycopg.Connection,
+        table_dict: TableSchema,
+        schema_name: str,
+        table_name: str,
+    ) -> None:
+        # Query columns for this table
+        with conn.cursor() as cur:
+            cur.execute("""
+                SELECT
+                    column_name,
+                    ordinal_position,
+                    data_type,
+                    is_nullable,
+                    column_default,
+                    character_maximum_length
+                FROM information_schema.columns
+                WHERE table_schema = %s AND table_name = %s
+                ORDER BY ordinal_position;
+            """, (schema_name, table_name))
+            columns = cur.fetchall()
 
-            # Query foreign key relationships for this table
-            with conn.cursor() as cur:
-                cur.execute("""
-                    SELECT
-                        src_col.attname AS current_column,
-                        tgt_ns.nspname AS foreign_schema,
-                        tgt_tbl.relname AS foreign_table,
-                        tgt_col.attname AS foreign_column
-                    FROM
-                        pg_constraint c
-                        JOIN pg_class src_tbl
-                            ON c.conrelid = src_tbl.oid
-                        JOIN pg_namespace src_ns
-                            ON src_tbl.relnamespace = src_ns.oid
-                        JOIN pg_class tgt_tbl
-                            ON c.confrelid = tgt_tbl.oid
-                        JOIN pg_namespace tgt_ns
-                            ON tgt_tbl.relnamespace = tgt_ns.oid
-                        JOIN LATERAL unnest(c.conkey)
-                            WITH ORDINALITY AS src(attnum, ord) ON TRUE
-                        JOIN LATERAL unnest(c.confkey)
-                            WITH ORDINALITY AS tgt(attnum, ord) ON src.ord = tgt.ord
-                        JOIN pg_attribute src_col
-                            ON src_col.attrelid = src_tbl.oid
-                            AND src_col.attnum = src.attnum
-                        JOIN pg_attribute tgt_col
-                            ON tgt_col.attrelid = tgt_tbl.oid
-                            AND tgt_col.attnum = tgt.attnum
-                    WHERE
-                        c.contype = 'f'
-                        AND src_ns.nspname = %s
-                        AND src_tbl.relname = %s
-                    ORDER BY
-                        src_col.attname, tgt_ns.nspname, tgt_tbl.relname, tgt_col.attname;
-                """, (schema_name, table_name))
-                fk_rows = cur.fetchall()
-            table_dict.relationships = []
-            for fk in fk_rows:
-                col_name, foreign_schema, foreign_table, foreign_column = fk
-                rel_obj = RelationshipSchema(
-                    column=col_name,
-                    foreign_table_schema=foreign_schema,
-                    foreign_table_name=foreign_table,
-                    foreign_column=foreign_column,
+        if columns:
+            table_dict.columns = []
+            for col in columns:
+                (col_name, ordinal_position, data_type,
+                 is_nullable, col_default, char_max_length) = col
+                col_obj = ColumnSchema(
+                    name=col_name,
+                    ordinal_position=ordinal_position,
+                    data_type=data_type,
+                    is_nullable=is_nullable == 'YES',
+                    default=col_default,
+                    character_maximum_length=char_max_length,
                 )
-                table_dict.relationships.append(rel_obj)
+                table_dict.columns.append(col_obj)
 
-            schema_resp.tables.append(table_dict)
+        # Query primary key columns for this table
+        with conn.cursor() as cur:
+            cur.execute("""
+                SELECT a.attname AS column_name
+                FROM pg_index i
+                JOIN pg_attribute a
+                    ON a.attrelid = i.indrelid
+                    AND a.attnum = ANY(i.indkey)
+                JOIN pg_class c
+                    ON c.oid = i.indrelid
+                JOIN pg_namespace n
+                    ON n.oid = c.relnamespace
+                WHERE i.indisprimary
+                AND n.nspname = %s
+                AND c.relname = %s
+                ORDER BY a.attnum;
+            """, (schema_name, table_name))
+            pk_rows = cur.fetchall()
+        table_dict.primary_keys = [row[0] for row in pk_rows]
 
-        return schema_resp
+        # Query foreign key relationships for this table
+        with conn.cursor() as cur:
+            cur.execute("""
+                SELECT
+                    src_col.attname AS current_column,
+                    tgt_ns.nspname AS foreign_schema,
+                    tgt_tbl.relname AS foreign_table,
+                    tgt_col.attname AS foreign_column
+                FROM
+                    pg_constraint c
+                    JOIN pg_class src_tbl
+                        ON c.conrelid = src_tbl.oid
+                    JOIN pg_namespace src_ns
+                        ON src_tbl.relnamespace = src_ns.oid
+                    JOIN pg_class tgt_tbl
+                        ON c.confrelid = tgt_tbl.oid
+                    JOIN pg_namespace tgt_ns
+                        ON tgt_tbl.relnamespace = tgt_ns.oid
+                    JOIN LATERAL unnest(c.conkey)
+                        WITH ORDINALITY AS src(attnum, ord) ON TRUE
+                    JOIN LATERAL unnest(c.confkey)
+                        WITH ORDINALITY AS tgt(attnum, ord) ON src.ord = tgt.ord
+                    JOIN pg_attribute src_col
+                        ON src_col.attrelid = src_tbl.oid
+                        AND src_col.attnum = src.attnum
+                    JOIN pg_attribute tgt_col
+                        ON tgt_col.attrelid = tgt_tbl.oid
+                        AND tgt_col.attnum = tgt.attnum
+                WHERE
+                    c.contype = 'f'
+                    AND src_ns.nspname = %s
+                    AND src_tbl.relname = %s
+                ORDER BY
+                    src_col.attname, tgt_ns.nspname, tgt_tbl.relname, tgt_col.attname;
+            """, (schema_name, table_name))
+            fk_rows = cur.fetchall()
+        table_dict.relationships = []
+        for fk in fk_rows:
+            col_name, foreign_schema, foreign_table, foreign_column = fk
+            rel_obj = RelationshipSchema(
+                column=col_name,
+                foreign_table_schema=foreign_schema,
+                foreign_table_name=foreign_table,
+                foreign_column=foreign_column,
+            )
+            table_dict.relationships.append(rel_obj)
 
     def close_session(self) -> None:
         # TODO: Nothing to clean really?
@@ -25,6 +25,58 @@ DEFAULT_CONNECT_TIMEOUT = 10
 # Default maximum connections per ConnectionDetails (server+db+params)
 DEFAULT_MAX_CONNECTIONS = 10
 
+# Default background maintenance of connection pools: seconds between the checks
+# of idle connections, idle connections kept open beyond the ones in use,
+# and seconds after which connections are replaced
+DEFAULT_POOL_CHECK_INTERVAL_SECONDS = 30
+DEFAULT_POOL_WARM_SPARES = 0
+DEFAULT_POOL_MAX_LIFETIME_SECONDS = 60 * 30
+
+# Default adaptive sizing of connection pools: most connections a pool grows to while
+# its checkouts wait (0 to keep max_connections as the cap), p95 checkout wait time in
+# milliseconds at which it grows, seconds without such waits after which it shrinks back
+# to max_connections, and most connections all the pools can grow to together
+# (0 for no limit)
+DEFAULT_POOL_ADAPTIVE_MAX_CONNECTIONS = 0
+DEFAULT_POOL_GROW_WAIT_THRESHOLD_MS = 100
+DEFAULT_POOL_SHRINK_COOLDOWN_SECONDS = 60 * 5
+DEFAULT_POOL_GLOBAL_MAX_CONNECTIONS = 100
+
+# Default timeouts in milliseconds of the catalog queries the service runs on its own
+# behalf. The lock timeout keeps them from queueing behind DDL that locks the catalog.
+# Reading the whole schema, for the schema editor and chat, gets a longer statement timeout.
+DEFAULT_BACKGROUND_STATEMENT_TIMEOUT_MS = 30 * 1000
+DEFAULT_BACKGROUND_LOCK_TIMEOUT_MS = 2 * 1000
+DEFAULT_SCHEMA_STATEMENT_TIMEOUT_MS = 60 * 1000
+
+# Read-only service traffic is only sent to replicas lagging less than this
+DEFAULT_MAX_REPLICA_LAG_SECONDS = 30
+
+# Maximum number of rows read into the result set of a query on a connection that goes
+# through a transaction pooler. Such connections cannot hold a cursor open after its
+# transaction, so the rows are read while the transaction of the query is open.
+POOLER_COMPATIBLE_MAX_ROWS = 100000
+
+# Maximum number of rows returned in a single query/simpleexecute response page.
+# Clients may request smaller pages, but never larger ones.
+SIMPLE_EXECUTE_MAX_PAGE_SIZE = 1000
+
+# Default maximum number of characters (or bytes for binary values) of a single cell
+# that are stored with a spilled result set row. Longer values are truncated to a preview
+# and their full value can be fetched on demand. 0 disables truncation.
+DEFAULT_MAX_CELL_DISPLAY_SIZE = 65535
+
+# Default maximum number of connections of an owner URI that execute the batches of a
+# query at once, when parallel execution of read-only batches is enabled
+DEFAULT_MAX_PARALLEL_BATCHES = 4
+# Seconds that parallel batch execution waits for each additional connection. Without
+# a free connection the batches run on fewer connections instead of waiting for one.
+PARALLEL_BATCH_CHECKOUT_TIMEOUT_SECONDS = 0.5
+
+# Default time to live and size of the cache of query/simpleexecute results, when enabled
+DEFAULT_RESULT_CACHE_TTL_SECONDS = 30
+DEFAULT_RESULT_CACHE_MAX_MB = 256
+
 # Service names
 ADMIN_SERVICE_NAME = "admin"
 CAPABILITIES_SERVICE_NAME = "capabilities"
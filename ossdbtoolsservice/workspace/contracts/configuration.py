@@ -36,6 +36,44 @@ class PGSQLConfiguration(Serializable):
         self.format: FormatterConfiguration = FormatterConfiguration()
         self.intellisense: IntellisenseConfiguration = IntellisenseConfiguration()
         self.max_connections: int = constants.DEFAULT_MAX_CONNECTIONS
+        # Background maintenance of the connection pools. A check interval of 0 checks
+        # connections each time they are checked out instead.
+        self.pool_check_interval_seconds: int = constants.DEFAULT_POOL_CHECK_INTERVAL_SECONDS
+        self.pool_warm_spares: int = constants.DEFAULT_POOL_WARM_SPARES
+        self.pool_max_lifetime_seconds: int = constants.DEFAULT_POOL_MAX_LIFETIME_SECONDS
+        # Adaptive sizing of the connection pools, beyond max_connections while checkouts
+        # wait, within a budget of connections for all the pools together. Off unless
+        # pool_adaptive_max_connections is set above max_connections.
+        self.pool_adaptive_max_connections: int = (
+            constants.DEFAULT_POOL_ADAPTIVE_MAX_CONNECTIONS
+        )
+        self.pool_grow_wait_threshold_ms: int = constants.DEFAULT_POOL_GROW_WAIT_THRESHOLD_MS
+        self.pool_shrink_cooldown_seconds: int = (
+            constants.DEFAULT_POOL_SHRINK_COOLDOWN_SECONDS
+        )
+        self.pool_global_max_connections: int = constants.DEFAULT_POOL_GLOBAL_MAX_CONNECTIONS
+        # Timeouts of the catalog queries the service runs on its own behalf, by category,
+        # e.g. {"Catalog": {"statementTimeoutMs": 30000, "lockTimeoutMs": 2000}}
+        self.background_query_timeouts: dict[str, dict[str, int]] = {}
+        self.max_cell_display_size: int = constants.DEFAULT_MAX_CELL_DISPLAY_SIZE
+        # Directories that result sets are spilled to, round-robin. Empty for the temp dir.
+        self.spill_directories: list[str] = []
+        # Spill quotas for all queries, and for the results of a single query. 0 for none.
+        self.spill_process_quota_mb: int = 0
+        self.spill_session_quota_mb: int = 0
+        # Run scripts of read-only batches on several pooled connections at once.
+        # The batches don't share the session state of the editor's connection.
+        self.parallel_batch_execution: bool = False
+        self.max_parallel_batches: int = constants.DEFAULT_MAX_PARALLEL_BATCHES
+        # Reuse the results of identical read-only query/simpleexecute requests
+        self.result_cache_enabled: bool = False
+        self.result_cache_ttl_seconds: int = constants.DEFAULT_RESULT_CACHE_TTL_SECONDS
+        self.result_cache_max_mb: int = constants.DEFAULT_RESULT_CACHE_MAX_MB
+        # Also drop cached results once the database has moved on by more than
+        # the threshold: "none", "transactions" (committed and rolled back transactions
+        # in pg_stat_database) or "walLsn" (bytes of WAL since pg_current_wal_lsn())
+        self.result_cache_invalidation: str = "none"
+        self.result_cache_invalidation_threshold: int = 0
 
 
 class Case(Enum):
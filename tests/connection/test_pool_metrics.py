@@ -0,0 +1,171 @@
+# --------------------------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for license information.
+# --------------------------------------------------------------------------------------------
+
+import unittest
+from unittest import mock
+
+from psycopg_pool import PoolTimeout
+
+from ossdbtoolsservice.connection import ConnectionService
+from ossdbtoolsservice.connection.contracts import (
+    ConnectionDetails,
+    ConnectionPriority,
+    PoolStatsParams,
+)
+from ossdbtoolsservice.connection.core.connection_manager import ConnectionManager
+from ossdbtoolsservice.connection.core.errors import GetConnectionTimeout
+from ossdbtoolsservice.connection.core.pool_metrics import PoolMetrics, percentile
+from tests.utils import MockRequestContext
+
+
+class TestPoolMetrics(unittest.TestCase):
+    def setUp(self):
+        self.now = 0.0
+        self.metrics = PoolMetrics(clock=lambda: self.now)
+
+    def test_percentile(self):
+        values = list(range(1, 101))
+
+        self.assertEqual(percentile(values, 50), 50)
+        self.assertEqual(percentile(values, 99), 99)
+        self.assertEqual(percentile([7.0], 95), 7.0)
+        self.assertEqual(percentile([], 50), 0.0)
+
+    def test_records_waits_and_checkouts(self):
+        connection = object()
+        wait_start = self.metrics.start_wait()
+        self.assertEqual(self.metrics.get_stats()["requests_waiting"], 1)
+
+        self.now = 0.25
+        self.metrics.end_wait(wait_start, connection)
+        self.now = 1.25
+        self.metrics.record_return(connection)
+
+        stats = self.metrics.get_stats()
+        self.assertEqual(stats["requests_waiting"], 0)
+        self.assertEqual(stats["checkout_count"], 1)
+        self.assertEqual(stats["wait_time_p99_ms"], 250)
+        self.assertEqual(stats["checkout_duration_max_ms"], 1000)
+
+    def test_records_waits_by_priority(self):
+        wait_start = self.metrics.start_wait()
+        self.now = 0.5
+        self.metrics.end_wait(wait_start, object(), ConnectionPriority.BACKGROUND)
+        self.metrics.end_wait(self.metrics.start_wait(), None, ConnectionPriority.BULK)
+
+        background = self.metrics.get_lane_stats(ConnectionPriority.BACKGROUND)
+        self.assertEqual(background["checkout_count"], 1)
+        self.assertEqual(background["wait_time_p50_ms"], 500)
+        self.assertEqual(
+            self.metrics.get_lane_stats(ConnectionPriority.BULK)["checkout_timeouts"], 1
+        )
+        self.assertEqual(
+            self.metrics.get_lane_stats(ConnectionPriority.INTERACTIVE)["checkout_count"], 0
+        )
+        self.assertEqual(self.metrics.get_stats()["checkout_count"], 1)
+
+    def test_records_resets(self):
+        self.metrics.record_reset(None)
+        self.metrics.record_reset(None)
+        self.metrics.record_reset("UNLISTEN *")
+        self.metrics.record_reset("DISCARD ALL")
+        self.now = 1800
+
+        stats = self.metrics.get_stats()
+        self.assertEqual(stats["reset_count"], 4)
+        self.assertEqual(stats["reset_skipped_count"], 2)
+        self.assertEqual(stats["discard_all_count"], 1)
+        self.assertEqual(stats["reset_round_trips_saved_per_hour"], 4)
+
+    def test_records_timeouts_and_errors(self):
+        self.metrics.end_wait(self.metrics.start_wait(), None)
+        self.metrics.record_connection_error()
+
+        stats = self.metrics.get_stats()
+        self.assertEqual(stats["checkout_timeouts"], 1)
+        self.assertEqual(stats["checkout_count"], 0)
+        self.assertEqual(stats["connection_errors"], 1)
+
+
+class TestConnectionManagerPoolStats(unittest.TestCase):
+    def setUp(self):
+        self.manager = ConnectionManager(pool_stats_log_interval=None)
+        self.details = ConnectionDetails.from_data({"host": "localhost", "dbname": "db"})
+        self.details_hash = self.details.to_hash()
+        self.pool = mock.MagicMock()
+        self.pool.name = str(self.details_hash)
+        self.pool.get_stats.return_value = {
+            "pool_size": 3,
+            "pool_max": 10,
+            "pool_available": 1,
+        }
+        self.manager._details_to_pools[self.details_hash] = self.pool
+        self.manager._details_to_owner_uri[self.details_hash] = {"owner"}
+        self.manager._owner_uri_to_details["owner"] = (self.details, self.pool)
+
+    def test_get_pool_stats(self):
+        with mock.patch(
+            "ossdbtoolsservice.connection.core.connection_manager.ServerConnection"
+        ) as server_connection:
+            server_connection.return_value.transaction_in_trans = False
+            server_connection.return_value.transaction_in_error = False
+            server_connection.return_value.connection = self.pool.getconn.return_value
+            conn = self.manager._get_connection(self.pool, self.details)
+            self.manager._put_connection(conn, self.pool, "owner")
+
+        stats = self.manager.get_pool_stats_summary()
+
+        self.assertEqual(len(stats), 1)
+        self.assertEqual(stats[0].name, str(self.details_hash))
+        self.assertEqual(stats[0].owner_uri_count, 1)
+        self.assertEqual((stats[0].idle_count, stats[0].busy_count), (1, 2))
+        self.assertEqual(stats[0].checkout_count, 1)
+        self.assertEqual(
+            [lane.priority for lane in stats[0].lanes],
+            [
+                ConnectionPriority.INTERACTIVE,
+                ConnectionPriority.BACKGROUND,
+                ConnectionPriority.BULK,
+            ],
+        )
+        self.assertEqual(self.manager.get_pool_stats_summary("other"), [])
+        self.pool.putconn.assert_called_once_with(self.pool.getconn.return_value)
+        self.assertEqual(self.manager.get_pool_stats()[self.pool.name]["checkout_count"], 1)
+
+    def test_get_connection_timeout_is_counted(self):
+        self.pool.getconn.side_effect = PoolTimeout()
+
+        with self.assertRaises(GetConnectionTimeout):
+            self.manager._get_connection(self.pool, self.details)
+
+        stats = self.manager.get_pool_stats_summary("owner")[0]
+        self.assertEqual(stats.checkout_timeouts, 1)
+        self.assertEqual(stats.requests_waiting, 0)
+
+    def test_get_connection_error_ends_wait(self):
+        type(self.pool.getconn.return_value).autocommit = mock.PropertyMock(
+            side_effect=OSError("connection lost")
+        )
+
+        with self.assertRaises(OSError):
+            self.manager._get_connection(self.pool, self.details)
+
+        stats = self.manager.get_pool_stats_summary("owner")[0]
+        self.assertEqual(stats.requests_waiting, 0)
+        self.assertEqual(stats.checkout_timeouts, 0)
+
+    def test_handle_pool_stats_request(self):
+        service = ConnectionService(self.manager)
+        request_context = MockRequestContext()
+
+        service.handle_pool_stats_request(request_context, PoolStatsParams(owner_uri="owner"))
+
+        response = request_context.last_response_params
+        self.assertEqual([pool.pool_max for pool in response.pools], [10])
+        self.assertEqual(response.azure_token_cache.fetch_count, 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
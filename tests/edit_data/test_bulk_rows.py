@@ -0,0 +1,39 @@
+# --------------------------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for license information.
+# --------------------------------------------------------------------------------------------
+
+import unittest
+
+from ossdbtoolsservice.edit_data.bulk_rows import (
+    BULK_ROWS_FORMAT_CSV,
+    BULK_ROWS_FORMAT_TEXT,
+    parse_bulk_rows,
+)
+
+
+class TestBulkRows(unittest.TestCase):
+    def test_parse_text_rows(self):
+        data = "id\tname\r\n1\tline\\none\n2\t\\N\n3\t\n"
+
+        rows = parse_bulk_rows(data, BULK_ROWS_FORMAT_TEXT, has_header=True)
+
+        self.assertEqual(rows, [["1", "line\none"], ["2", None], ["3", ""]])
+
+    def test_parse_csv_rows(self):
+        data = 'id,name\n1,"a, b"\n2,\n3,"say ""hi"""\n'
+
+        rows = parse_bulk_rows(data, BULK_ROWS_FORMAT_CSV, has_header=True)
+
+        self.assertEqual(rows, [["1", "a, b"], ["2", None], ["3", 'say "hi"']])
+
+    def test_parse_defaults_to_text(self):
+        self.assertEqual(parse_bulk_rows("1\t2"), [["1", "2"]])
+
+    def test_parse_unsupported_format(self):
+        with self.assertRaises(ValueError):
+            parse_bulk_rows("1", "binary")
+
+
+if __name__ == "__main__":
+    unittest.main()
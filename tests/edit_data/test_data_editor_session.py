@@ -6,6 +6,7 @@
 import unittest
 from unittest import mock
 
+import psycopg
 from psycopg import sql
 
 from ossdbtoolsservice.edit_data import (
@@ -19,7 +20,7 @@ from ossdbtoolsservice.edit_data.contracts import (
     EditInitializerFilter,
     InitializeEditParams,
 )  # noqa
-from ossdbtoolsservice.edit_data.update_management import RowDelete
+from ossdbtoolsservice.edit_data.update_management import RowCreate, RowDelete, RowUpdate
 from ossdbtoolsservice.edit_data.update_management.row_edit import EditScript
 from ossdbtoolsservice.query import (
     Batch,
@@ -371,6 +372,7 @@ class TestDataEditorSession(unittest.TestCase):
         self._data_editor_session._session_cache[row_id] = mock_edit
 
         self._data_editor_session._result_set = self.get_result_set([(1, False)])
+        self._mock_cursor._query_results = [(1, True)]
 
         self._data_editor_session._is_initialized = True
         self._data_editor_session.commit_edit(
@@ -384,13 +386,98 @@ class TestDataEditorSession(unittest.TestCase):
 
         mock_edit.get_script.assert_called_once()
 
-        self._mock_cursor.mogrify.assert_called_once()
+        self._connection.transaction.assert_called_once()
+        self._mock_cursor.executemany.assert_called_once_with(
+            sql.SQL(script_template), [query_params], returning=True
+        )
+
+        self.assertEqual(self._data_editor_session._result_set.rows, [(1, True)])
+
+    @staticmethod
+    def _create_edit(edit_type: type, row_id: int, query_template: str) -> mock.MagicMock:
+        edit = mock.MagicMock(spec=edit_type)
+        edit.row_id = row_id
+        edit.get_script = mock.Mock(return_value=EditScript(query_template, [row_id]))
+        return edit
+
+    def test_commit_edit_groups_consecutive_edits_by_shape(self) -> None:
+        result_set = self.get_result_set([(1,), (2,), (3,)])
+
+        self._data_editor_session._session_cache = {
+            0: self._create_edit(RowUpdate, 0, "UPDATE"),
+            2: self._create_edit(RowUpdate, 2, "UPDATE"),
+            1: self._create_edit(RowDelete, 1, "DELETE"),
+            3: self._create_edit(RowCreate, 3, "INSERT"),
+        }
+        self._data_editor_session._result_set = result_set
+        self._mock_cursor._query_results = [(10,), (30,), (4,)]
 
-        self._mock_cursor.execute.assert_called_once_with(
-            sql.SQL(self._mock_cursor.mogrified_value)
+        self._data_editor_session._is_initialized = True
+        self._data_editor_session.commit_edit(
+            self._connection, mock.MagicMock(), mock.MagicMock()
         )
+        self._data_editor_session._commit_task.join()
 
-        mock_edit.apply_changes.assert_called_once()
+        # One statement per run of edits of the same shape
+        self.assertEqual(
+            self._mock_cursor.executemany.call_args_list,
+            [
+                mock.call(sql.SQL("UPDATE"), [[0], [2]], returning=True),
+                mock.call(sql.SQL("DELETE"), [[1]], returning=False),
+                mock.call(sql.SQL("INSERT"), [[3]], returning=True),
+            ],
+        )
+        self.assertEqual(result_set.rows, [(10,), (30,), (4,)])
+        self.assertEqual(self._data_editor_session._last_row_id, 2)
+        self.assertFalse(bool(self._data_editor_session._session_cache))
+
+    def test_commit_edit_keeps_order_of_interleaved_edits(self) -> None:
+        result_set = self.get_result_set([(6,), (7,), (9,)])
+
+        # Inserting a key that a delete before it frees
+        self._data_editor_session._session_cache = {
+            3: self._create_edit(RowCreate, 3, "INSERT"),
+            1: self._create_edit(RowDelete, 1, "DELETE"),
+            4: self._create_edit(RowCreate, 4, "INSERT"),
+        }
+        self._data_editor_session._result_set = result_set
+        self._mock_cursor._query_results = [(8,), (7,)]
+
+        self._data_editor_session._is_initialized = True
+        self._data_editor_session.commit_edit(
+            self._connection, mock.MagicMock(), mock.MagicMock()
+        )
+        self._data_editor_session._commit_task.join()
+
+        self.assertEqual(
+            self._mock_cursor.executemany.call_args_list,
+            [
+                mock.call(sql.SQL("INSERT"), [[3]], returning=True),
+                mock.call(sql.SQL("DELETE"), [[1]], returning=False),
+                mock.call(sql.SQL("INSERT"), [[4]], returning=True),
+            ],
+        )
+        self.assertEqual(result_set.rows, [(6,), (9,), (8,), (7,)])
+        self.assertFalse(bool(self._data_editor_session._session_cache))
+
+    def test_commit_edit_failure_keeps_edits(self) -> None:
+        result_set = self.get_result_set([(1,), (2,)])
+        row_delete = RowDelete(0, result_set, self._edit_table_metadata)
+        row_delete.get_script = mock.Mock(return_value=EditScript("DELETE", []))
+        self._data_editor_session._session_cache[0] = row_delete
+        self._data_editor_session._result_set = result_set
+        self._mock_cursor.executemany = mock.Mock(side_effect=psycopg.Error("failed"))
+        failure_callback = mock.MagicMock()
+
+        self._data_editor_session._is_initialized = True
+        self._data_editor_session.commit_edit(
+            self._connection, mock.MagicMock(), failure_callback
+        )
+        self._data_editor_session._commit_task.join()
+
+        failure_callback.assert_called_once_with("failed")
+        self.assertEqual(result_set.rows, [(1,), (2,)])
+        self.assertIn(0, self._data_editor_session._session_cache)
 
     def test_commit_edit_not_initialized(self):
         with self.assertRaises(RuntimeError):
@@ -542,6 +629,201 @@ class TestDataEditorSession(unittest.TestCase):
         row_delete.get_script.assert_called_once()
         self.assertFalse(bool(self._data_editor_session._session_cache))
 
+    def _initialize_bulk_session(self, rows: list[tuple]) -> ResultSet:
+        id_column = DbColumn(column_name="id", data_type="int4", is_auto_increment=True)
+        name_column = DbColumn(column_name="name", data_type="varchar", is_updatable=True)
+        count_column = DbColumn(column_name="count", data_type="int4", is_updatable=True)
+        self._data_editor_session._table_metadata = EditTableMetadata(
+            self._schema_name,
+            self._table_name,
+            [
+                EditColumnMetadata(id_column, None),
+                EditColumnMetadata(name_column, None),
+                EditColumnMetadata(count_column, None),
+            ],
+        )
+        result_set = self.get_result_set(rows)
+        self._data_editor_session._result_set = result_set
+        self._data_editor_session._last_row_id = result_set.row_count - 1
+        self._data_editor_session._is_initialized = True
+        return result_set
+
+    def test_bulk_create_rows(self) -> None:
+        result_set = self._initialize_bulk_session([(1, "a", 1)])
+        cursor = mock.MagicMock()
+        cursor.__enter__.return_value = cursor
+        cursor.fetchall.return_value = [(2, "b", 2), (3, None, 3)]
+        self._connection.cursor = mock.Mock(return_value=cursor)
+        success_callback = mock.MagicMock()
+
+        self._data_editor_session.bulk_create_rows(
+            self._connection,
+            "name\tcount\nb\t2\n\\N\t3\n",
+            "text",
+            True,
+            None,
+            success_callback,
+            mock.MagicMock(),
+        )
+        self._data_editor_session._commit_task.join()
+
+        copy = cursor.copy.return_value.__enter__.return_value
+        self.assertEqual(
+            copy.write_row.call_args_list, [mock.call(["b", 2]), mock.call([None, 3])]
+        )
+        self._connection.transaction.assert_called_once()
+        success_callback.assert_called_once_with(1, 2)
+        self.assertEqual(result_set.rows, [(1, "a", 1), (2, "b", 2), (3, None, 3)])
+        self.assertEqual(self._data_editor_session._last_row_id, 2)
+
+    def test_bulk_create_rows_validates_rows(self) -> None:
+        self._initialize_bulk_session([])
+
+        def bulk_create_rows(data: str, column_names: list[str] | None = None) -> None:
+            self._data_editor_session.bulk_create_rows(
+                self._connection,
+                data,
+                "csv",
+                False,
+                column_names,
+                mock.MagicMock(),
+                mock.MagicMock(),
+            )
+
+        with self.assertRaisesRegex(ValueError, "Row 2 has 1 values, but 2 are expected"):
+            bulk_create_rows("a,1\nb\n")
+        with self.assertRaisesRegex(ValueError, "Row 1 has an invalid value"):
+            bulk_create_rows("a,one\n")
+        with self.assertRaisesRegex(ValueError, '"id" is not an editable column'):
+            bulk_create_rows("1\n", ["id"])
+
+        # Rows that are not committed yet would share row ids with the pasted rows
+        self._data_editor_session.create_row()
+        with self.assertRaises(ValueError):
+            bulk_create_rows("a,1\n")
+        self._connection.cursor.assert_not_called()
+
+    def _initialize_paged_session(self, rows: list[tuple], page_size: int) -> mock.MagicMock:
+        id_column = DbColumn(column_name="id", data_type="int4", is_key=True)
+        name_column = DbColumn(column_name="name", data_type="varchar", is_updatable=True)
+        self._metadata_factory.get.return_value = EditTableMetadata(
+            self._schema_name,
+            self._table_name,
+            [EditColumnMetadata(id_column, None), EditColumnMetadata(name_column, None)],
+        )
+        query = Query("owner", "", QueryExecutionSettings(None, None), QueryEvents())
+        query._execution_state = ExecutionState.EXECUTED
+        batch = Batch("", 1, None)
+        batch._result_set = self.get_result_set(rows)
+        query._batches = [batch]
+
+        connection = mock.MagicMock()
+        connection.connection = None
+        self._initialize_edit_request.page_size = page_size
+        self._data_editor_session.initialize(
+            self._initialize_edit_request,
+            connection,
+            self._query_executer,
+            self._on_success,
+            self._on_failure,
+        )
+        on_query_complete = self._query_executer.call_args[0][2]
+        on_query_complete(DataEditSessionExecutionState(query))
+        return connection
+
+    def test_initialize_paged_session_loads_first_page_by_key(self) -> None:
+        self._initialize_paged_session([(1, "a"), (2, "b")], 2)
+
+        self.assertEqual(
+            self._query_executer.call_args[0][0],
+            'SELECT "id", "name" FROM "public"."table" ORDER BY "id" LIMIT 2',
+        )
+        self.assertTrue(self._data_editor_session.is_paged)
+        self._on_success.assert_called_once()
+
+    def test_initialize_without_key_loads_whole_table(self) -> None:
+        self._initialize_edit_request.page_size = 2
+
+        self._data_editor_session.initialize(
+            self._initialize_edit_request,
+            self._connection,
+            self._query_executer,
+            self._on_success,
+            self._on_failure,
+        )
+
+        self.assertEqual(self._query_executer.call_args[0][0], self._query)
+        self.assertFalse(self._data_editor_session.is_paged)
+
+    def test_get_rows_fetches_next_pages(self) -> None:
+        connection = self._initialize_paged_session([(1, "a"), (2, "b")], 2)
+        cursor = connection.cursor.return_value.__enter__.return_value
+        cursor.fetchall.side_effect = [[(3, "c"), (4, "d")], [(5, "e")]]
+
+        rows = self._data_editor_session.get_rows("owner", 0, 5)
+
+        self.assertEqual(
+            [row.cells[0].display_value for row in rows], ["1", "2", "3", "4", "5"]
+        )
+        self.assertEqual(
+            cursor.execute.call_args_list[0][0][0].as_string(None),
+            'SELECT "id", "name" FROM "public"."table" WHERE ("id") > (%s) '
+            'ORDER BY "id" LIMIT 2',
+        )
+        self.assertEqual(cursor.execute.call_args_list[0][0][1], [2])
+        self.assertEqual(cursor.execute.call_args_list[1][0][1], [4])
+        self.assertEqual(self._data_editor_session._last_row_id, 4)
+
+        # The last page was short, so the table is fully loaded
+        self._data_editor_session.get_rows("owner", 0, 20)
+        self.assertEqual(cursor.execute.call_count, 2)
+
+    def test_get_rows_waits_for_new_rows_before_fetching_pages(self) -> None:
+        connection = self._initialize_paged_session([(1, "a"), (2, "b")], 2)
+        self._data_editor_session.create_row()
+
+        self._data_editor_session.get_rows("owner", 0, 10)
+
+        connection.cursor.assert_not_called()
+
+    def test_get_rows_does_not_fetch_pages_while_committing(self) -> None:
+        connection = self._initialize_paged_session([(1, "a"), (2, "b")], 2)
+
+        # A commit holds the lock for its whole transaction
+        with self._data_editor_session._rows_lock:
+            self._data_editor_session.get_rows("owner", 0, 10)
+        connection.cursor.assert_not_called()
+
+        # The next request fetches the pages
+        cursor = connection.cursor.return_value.__enter__.return_value
+        cursor.fetchall.return_value = [(3, "c")]
+        self._data_editor_session.get_rows("owner", 0, 10)
+        self.assertEqual(self._data_editor_session._last_row_id, 2)
+
+    def test_paged_session_keys_edits_by_row_key(self) -> None:
+        self._initialize_paged_session([(1, "a"), (2, "b")], 2)
+
+        self._data_editor_session.update_cell(1, 1, "c")
+
+        self.assertEqual(list(self._data_editor_session._session_cache), [(2,)])
+        self._data_editor_session.revert_row(1)
+        self.assertFalse(self._data_editor_session._session_cache)
+
+    def test_keyset_columns(self) -> None:
+        unique_column = DbColumn(column_name="code", is_unique=True, allow_db_null=False)
+        nullable_column = DbColumn(column_name="email", is_unique=True, allow_db_null=True)
+        metadata = EditTableMetadata(
+            self._schema_name,
+            self._table_name,
+            [
+                EditColumnMetadata(nullable_column, None),
+                EditColumnMetadata(unique_column, None),
+            ],
+        )
+
+        self.assertEqual([column.name for column in metadata.keyset_columns], ["code"])
+        self.assertEqual(self._edit_table_metadata.keyset_columns, [])
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -11,6 +11,7 @@ from unittest.mock import patch
 import tests.utils as utils
 from ossdbtoolsservice.connection import ConnectionService
 from ossdbtoolsservice.edit_data.contracts import (
+    BulkCreateRowsRequest,
     CreateRowRequest,
     DeleteRowRequest,
     DisposeRequest,
@@ -259,6 +260,29 @@ class TestEditDataService(unittest.TestCase):
 
         self.assertEqual(error_message, request_context.last_error_message)
 
+    def test_bulk_create_rows(self) -> None:
+        request_context = utils.MockRequestContext()
+
+        request = BulkCreateRowsRequest.from_dict(
+            {"owner_uri": "owner_uri", "data": "a,1", "format": "csv"}
+        )
+
+        edit_session = mock.MagicMock()
+        self._service_under_test._active_sessions[request.owner_uri] = edit_session
+
+        self._service_under_test._bulk_create_rows(request_context, request)
+
+        args = edit_session.bulk_create_rows.call_args[0]
+        self.assertEqual(args[1:5], ("a,1", "csv", False, None))
+
+        args[5](3, 2)
+        response = request_context.last_response_params
+        self.assertEqual((response.first_row_id, response.row_count), (3, 2))
+
+        edit_session.bulk_create_rows.side_effect = ValueError("Invalid rows")
+        self._service_under_test._bulk_create_rows(request_context, request)
+        self.assertEqual(request_context.last_error_message, "Invalid rows")
+
     def _validate_row_operations(
         self,
         handler,
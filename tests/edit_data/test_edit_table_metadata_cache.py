@@ -0,0 +1,107 @@
+# --------------------------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for license information.
+# --------------------------------------------------------------------------------------------
+
+import unittest
+from unittest import mock
+
+from ossdbtoolsservice.edit_data import (
+    EditTableMetadata,
+    EditTableMetadataCache,
+    SmoEditTableMetadataFactory,
+)
+
+
+class TestEditTableMetadataCache(unittest.TestCase):
+    def setUp(self):
+        self.now = 0.0
+        self.cache = EditTableMetadataCache(10, 2, clock=lambda: self.now)
+        self.connection = mock.MagicMock()
+        self.connection.host_name = "localhost"
+        self.connection.port = 5432
+        self.connection.database_name = "postgres"
+        self.connection.fetch_one.return_value = (16384, "1:2")
+
+    def _get(self, object_name: str = "employee", object_type: str = "table"):
+        create_metadata = mock.Mock(
+            side_effect=lambda: EditTableMetadata("public", object_name, [])
+        )
+        metadata = self.cache.get(
+            self.connection, "public", object_name, object_type, create_metadata
+        )
+        return metadata, create_metadata
+
+    def test_reuses_metadata_of_unchanged_table(self):
+        first, _ = self._get()
+        second, create_metadata = self._get()
+
+        self.assertIs(second, first)
+        create_metadata.assert_not_called()
+        self.assertEqual(
+            self.connection.fetch_one.call_args[0][1],
+            ("public", "employee", ["r", "t", "f", "p"]),
+        )
+
+    def test_ddl_invalidates_metadata(self):
+        first, _ = self._get()
+
+        self.connection.fetch_one.return_value = (16384, "1:3")
+        second, create_metadata = self._get()
+
+        self.assertIsNot(second, first)
+        create_metadata.assert_called_once()
+
+    def test_entries_expire(self):
+        self._get()
+
+        self.now = 11
+        _, create_metadata = self._get()
+
+        create_metadata.assert_called_once()
+
+    def test_tables_of_other_databases_are_not_shared(self):
+        first, _ = self._get()
+
+        self.connection.database_name = "other"
+        second, _ = self._get()
+
+        self.assertIsNot(second, first)
+
+    def test_least_recently_used_entries_are_evicted(self):
+        for table_oid in [1, 2, 3]:
+            self.connection.fetch_one.return_value = (table_oid, "1")
+            self._get()
+
+        self.connection.fetch_one.return_value = (1, "1")
+        _, create_metadata = self._get()
+
+        create_metadata.assert_called_once()
+
+    def test_unknown_objects_are_not_cached(self):
+        self.connection.fetch_one.return_value = None
+        self._get()
+
+        _, create_metadata = self._get()
+        create_metadata.assert_called_once()
+
+        _, create_metadata = self._get(object_type="other")
+        create_metadata.assert_called_once()
+
+    def test_factory_uses_cache(self):
+        factory = SmoEditTableMetadataFactory(self.cache)
+        metadata = EditTableMetadata("public", "employee", [])
+
+        with mock.patch.object(factory, "_create", return_value=metadata) as create:
+            self.assertIs(
+                factory.get(self.connection, "public", "employee", "TABLE"), metadata
+            )
+            self.assertIs(
+                factory.get(self.connection, "public", "employee", "TABLE"), metadata
+            )
+
+        create.assert_called_once()
+
+
+if __name__ == "__main__":
+    unittest.main()
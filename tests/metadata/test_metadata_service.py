@@ -7,6 +7,7 @@ import unittest
 import unittest.mock as mock
 
 from ossdbtoolsservice.connection import ConnectionService, PooledConnection
+from ossdbtoolsservice.connection.contracts import ConnectionPriority
 from ossdbtoolsservice.metadata import MetadataService
 from ossdbtoolsservice.metadata.contracts import (
     METADATA_LIST_REQUEST,
@@ -97,7 +98,9 @@ class TestMetadataService(unittest.TestCase):
             self.assertEqual(mock_thread.target, self.metadata_service._metadata_list_worker)
             mock_thread.start.assert_called_once()
         # And the worker retrieved the correct connection and executed a query on it
-        self.connection_service.get_pooled_connection.assert_called_once_with(self.test_uri)
+        self.connection_service.get_pooled_connection.assert_called_once_with(
+            self.test_uri, ConnectionPriority.BACKGROUND, read_only=True
+        )
         mock_cursor.execute.assert_called_once()
         # And the handler responded with the expected results
         self.assertIsNone(request_context.last_error_message)
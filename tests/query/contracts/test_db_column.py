@@ -6,7 +6,8 @@
 import unittest
 
 import ossdbtoolsservice.parsers.datatypes as datatypes
-from ossdbtoolsservice.query.contracts import DbColumn
+from ossdbtoolsservice.query.contracts import DbCellValue, DbColumn
+from ossdbtoolsservice.utils.serialization import convert_to_dict
 
 
 class TestDbColumn(unittest.TestCase):
@@ -96,3 +97,19 @@ class TestDbColumn(unittest.TestCase):
 
 if __name__ == "__main__":
     unittest.main()
+
+
+class TestDbCellValue(unittest.TestCase):
+    def test_truncation_is_only_serialized_for_truncated_cells(self):
+        cell = DbCellValue("value", False, "value", 0)
+        self.assertFalse(cell.is_truncated)
+        self.assertIsNone(cell.original_length)
+        self.assertEqual(
+            convert_to_dict(cell),
+            {"displayValue": "value", "isNull": False, "rowId": 0, "rawObject": "value"},
+        )
+
+        truncated_cell = DbCellValue("val", False, "val", 0, True, 5)
+        truncated_dict = convert_to_dict(truncated_cell)
+        self.assertTrue(truncated_dict["isTruncated"])
+        self.assertEqual(truncated_dict["originalLength"], 5)
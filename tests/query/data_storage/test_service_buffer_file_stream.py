@@ -18,14 +18,14 @@ class TestServiceBufferFileStream(unittest.TestCase):
         self._file_name = "testFile"
 
     def test_get_file_name(self):
-        tempfile_mock = mock.MagicMock()
-        tempfile_mock.mkstemp = mock.Mock(return_value=(1, self._file_name))
+        spill_manager_mock = mock.MagicMock()
+        spill_manager_mock.create_file = mock.Mock(return_value=self._file_name)
         with mock.patch(
-            "ossdbtoolsservice.query.data_storage.service_buffer_file_stream.tempfile",
-            new=tempfile_mock,
+            "ossdbtoolsservice.query.data_storage.service_buffer_file_stream.get_spill_manager",
+            new=mock.Mock(return_value=spill_manager_mock),
         ):
-            stream.create_file()
-            tempfile_mock.mkstemp.assert_called_once()
+            self.assertEqual(stream.create_file("session"), self._file_name)
+            spill_manager_mock.create_file.assert_called_once_with("session")
 
     def test_get_reader(self):
         io_mock = mock.MagicMock()
@@ -7,7 +7,9 @@ import io
 import json
 import struct
 import unittest
+from unittest import mock
 
+from ossdbtoolsservice.converters import get_bytes_to_any_converter
 from ossdbtoolsservice.parsers import datatypes
 from ossdbtoolsservice.query.contracts.column import DbColumn
 from ossdbtoolsservice.query.data_storage.service_buffer_file_stream_reader import (
@@ -339,6 +341,36 @@ class TestServiceBufferFileStreamReader(unittest.TestCase):
         self.assertEqual(self._str_test_value, res[2].raw_object)
         self.assertEqual(self._float_test_value2, res[3].raw_object)
 
+    def test_read_column_window(self):
+        test_columns_info = []
+        for data_type in [
+            datatypes.DATATYPE_REAL,
+            datatypes.DATATYPE_INTEGER,
+            datatypes.DATATYPE_TEXT,
+            datatypes.DATATYPE_REAL,
+        ]:
+            column = DbColumn()
+            column.data_type = data_type
+            test_columns_info.append(column)
+
+        with mock.patch(
+            "ossdbtoolsservice.query.data_storage.service_buffer_file_stream_reader"
+            ".get_bytes_to_any_converter",
+            wraps=get_bytes_to_any_converter,
+        ) as converter_mock:
+            res = self._multiple_cols_reader.read_row(0, 1, test_columns_info, [2, 0])
+
+        # Only the requested cells are decoded, and they are returned in requested order
+        self.assertEqual(
+            [cell.raw_object for cell in res],
+            [self._str_test_value, self._float_test_value1],
+        )
+        self.assertEqual(converter_mock.call_count, 2)
+
+        res = self._multiple_cols_reader.read_row(0, 1, test_columns_info, [3])
+        self.assertEqual(self._float_test_value2, res[0].raw_object)
+        self.assertEqual(self._multiple_cols_reader.read_row(0, 1, test_columns_info, []), [])
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -159,6 +159,32 @@ class TestServiceBufferFileStreamWriter(unittest.TestCase):
             self.get_expected_length_with_additional_buffer_for_size(len(test_value)), res
         )
 
+    def test_write_str_truncated_to_max_cell_display_size(self):
+        test_value = "TestStringThatIsTooLong"
+        test_columns_info = []
+        col = DbColumn()
+        col.data_type = datatypes.DATATYPE_TEXT
+
+        test_columns_info.append(col)
+        mock_storage_data_reader = MockStorageDataReader(self._cursor, test_columns_info)
+        mock_storage_data_reader.get_value = mock.MagicMock(return_value=test_value)
+        mock_storage_data_reader.get_chars_with_max_capacity = mock.MagicMock(
+            return_value=test_value[0:4]
+        )
+
+        res = self._writer.write_row(mock_storage_data_reader, 4)
+
+        mock_storage_data_reader.get_chars_with_max_capacity.assert_called_once_with(0, 4)
+        self.assertEqual(self.get_expected_length_with_additional_buffer_for_size(4), res)
+        self.assertEqual(self._writer.truncated_cells, {0: len(test_value)})
+
+        # Values within the limit are written in full
+        res = self._writer.write_row(mock_storage_data_reader, len(test_value))
+        self.assertEqual(
+            self.get_expected_length_with_additional_buffer_for_size(len(test_value)), res
+        )
+        self.assertEqual(self._writer.truncated_cells, {})
+
     def test_write_date(self):
         test_value = datetime.date(2004, 10, 19).isoformat()
         test_columns_info = []
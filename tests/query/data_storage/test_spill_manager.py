@@ -0,0 +1,182 @@
+# --------------------------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for license information.
+# --------------------------------------------------------------------------------------------
+
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+import tests.utils as utils
+from ossdbtoolsservice.query.contracts import DbColumn
+from ossdbtoolsservice.query.data_storage.spill_manager import (
+    SPILL_FILE_PREFIX,
+    SpillManager,
+    SpillQuotaExceededError,
+)
+from ossdbtoolsservice.query.file_storage_result_set import FileStorageResultSet
+from ossdbtoolsservice.query.result_set import ResultSetEvents
+
+
+class TestSpillManager(unittest.TestCase):
+    def setUp(self):
+        self._directories = [tempfile.mkdtemp(), tempfile.mkdtemp()]
+
+    def tearDown(self):
+        for directory in self._directories:
+            for file_name in os.listdir(directory):
+                os.remove(os.path.join(directory, file_name))
+            os.rmdir(directory)
+
+    def test_create_files_round_robin(self):
+        spill_manager = SpillManager(self._directories)
+
+        file_names = [spill_manager.create_file("session") for _ in range(3)]
+
+        self.assertEqual(
+            [os.path.dirname(file_name) for file_name in file_names],
+            [self._directories[0], self._directories[1], self._directories[0]],
+        )
+        for file_name in file_names:
+            self.assertTrue(os.path.basename(file_name).startswith(SPILL_FILE_PREFIX))
+
+    def test_quotas(self):
+        spill_manager = SpillManager(
+            self._directories, process_quota_bytes=100, session_quota_bytes=60
+        )
+        first_file = spill_manager.create_file("first")
+        second_file = spill_manager.create_file("second")
+
+        spill_manager.add_bytes(first_file, 60)
+        with self.assertRaises(SpillQuotaExceededError):
+            spill_manager.add_bytes(first_file, 1)
+        # New spills are rejected once the session quota is used up
+        with self.assertRaises(SpillQuotaExceededError):
+            spill_manager.create_file("first")
+
+        spill_manager.add_bytes(second_file, 40)
+        with self.assertRaises(SpillQuotaExceededError):
+            spill_manager.add_bytes(second_file, 1)
+
+        # Deleting files releases their bytes
+        spill_manager.delete_file(first_file)
+        spill_manager.add_bytes(second_file, 20)
+        self.assertFalse(os.path.exists(first_file))
+        self.assertEqual(spill_manager.get_usage("first").session_bytes_used, 0)
+
+    def test_get_usage(self):
+        spill_manager = SpillManager(self._directories)
+        first_file = spill_manager.create_file("session")
+        second_file = spill_manager.create_file("session")
+        spill_manager.add_bytes(first_file, 10)
+        spill_manager.add_bytes(second_file, 5)
+
+        usage = spill_manager.get_usage("session")
+
+        self.assertEqual(usage.file_count, 2)
+        self.assertEqual(usage.bytes_used, 15)
+        self.assertEqual(usage.session_bytes_used, 15)
+        self.assertIsNone(usage.process_quota_bytes)
+        self.assertEqual(
+            [(directory.file_count, directory.bytes_used) for directory in usage.directories],
+            [(1, 10), (1, 5)],
+        )
+
+        spill_manager.delete_files_in_background([first_file, second_file])
+        spill_manager.wait_for_deletes()
+        self.assertEqual(spill_manager.get_usage().file_count, 0)
+
+    def test_sweep_orphaned_files(self):
+        spill_manager = SpillManager(self._directories)
+        own_file = spill_manager.create_file()
+        orphaned_file = os.path.join(self._directories[1], f"{SPILL_FILE_PREFIX}123-abc")
+        other_file = os.path.join(self._directories[1], "unrelated")
+        for file_name in [orphaned_file, other_file]:
+            with open(file_name, "wb"):
+                pass
+
+        with mock.patch(
+            "ossdbtoolsservice.query.data_storage.spill_manager._is_orphaned",
+            new=mock.Mock(return_value=True),
+        ):
+            self.assertEqual(spill_manager.sweep_orphaned_files(), 1)
+
+        self.assertTrue(os.path.exists(own_file))
+        self.assertTrue(os.path.exists(other_file))
+        self.assertFalse(os.path.exists(orphaned_file))
+
+    def test_result_set_spills_to_session(self):
+        spill_manager = SpillManager(self._directories, session_quota_bytes=1024)
+        column = DbColumn()
+        column.data_type = "text"
+
+        with (
+            mock.patch(
+                "ossdbtoolsservice.query.data_storage.service_buffer_file_stream.get_spill_manager",
+                new=mock.Mock(return_value=spill_manager),
+            ),
+            mock.patch(
+                "ossdbtoolsservice.query.file_storage_result_set.get_spill_manager",
+                new=mock.Mock(return_value=spill_manager),
+            ),
+            mock.patch(
+                "ossdbtoolsservice.query.data_storage.storage_data_reader.get_columns_info",
+                new=mock.Mock(return_value=[column]),
+            ),
+        ):
+            result_set = FileStorageResultSet(0, 0, spill_session_id="session")
+            result_set.read_result_to_end(utils.MockCursor([("a" * 100,)] * 5))
+            self.assertEqual(spill_manager.get_usage("session").session_bytes_used, 520)
+
+            large_result_set = FileStorageResultSet(0, 1, spill_session_id="session")
+            with self.assertRaises(SpillQuotaExceededError):
+                large_result_set.read_result_to_end(utils.MockCursor([("a" * 100,)] * 10))
+
+            result_set.dispose()
+            large_result_set.dispose()
+
+        # Files are deleted in the background
+        spill_manager.wait_for_deletes()
+        self.assertEqual(spill_manager.get_usage().file_count, 0)
+
+    def test_result_set_disposed_while_read_deletes_its_files(self):
+        spill_manager = SpillManager(self._directories)
+        column = DbColumn()
+        column.data_type = "text"
+
+        with (
+            mock.patch(
+                "ossdbtoolsservice.query.data_storage.service_buffer_file_stream.get_spill_manager",
+                new=mock.Mock(return_value=spill_manager),
+            ),
+            mock.patch(
+                "ossdbtoolsservice.query.file_storage_result_set.get_spill_manager",
+                new=mock.Mock(return_value=spill_manager),
+            ),
+            mock.patch(
+                "ossdbtoolsservice.query.data_storage.storage_data_reader.get_columns_info",
+                new=mock.Mock(return_value=[column]),
+            ),
+        ):
+            # The query is disposed once the first row, with a truncated value, was read
+            result_set = FileStorageResultSet(
+                0,
+                0,
+                ResultSetEvents(
+                    on_result_set_partially_loaded=lambda rs: rs.dispose(),
+                    partially_loaded_row_count=1,
+                ),
+                max_cell_display_size=10,
+                spill_session_id="session",
+            )
+            result_set.read_result_to_end(utils.MockCursor([("a" * 100,), ("b",), ("c",)]))
+
+        # The read stopped, and the output and overflow files are deleted
+        self.assertEqual(result_set.row_count, 1)
+        spill_manager.wait_for_deletes()
+        self.assertEqual(spill_manager.get_usage().file_count, 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -17,9 +17,14 @@ from ossdbtoolsservice.query.batch import (
     create_batch,
     create_result_set,
 )
-from ossdbtoolsservice.query.contracts import SaveResultsRequestParams, SelectionData
+from ossdbtoolsservice.query.contracts import (
+    DbColumn,
+    SaveResultsRequestParams,
+    SelectionData,
+)
 from ossdbtoolsservice.query.file_storage_result_set import FileStorageResultSet
 from ossdbtoolsservice.query.in_memory_result_set import InMemoryResultSet
+from ossdbtoolsservice.utils.constants import POOLER_COMPATIBLE_MAX_ROWS
 from tests.pgsmo_tests.utils import MockPGServerConnection
 
 
@@ -38,6 +43,7 @@ class TestBatch(unittest.TestCase):
         self._batch_events = BatchEvents()
         self._selection_data = SelectionData()
         self._result_set = mock.MagicMock()
+        self._result_set.has_unread_rows = False
 
     def create_batch_with(self, batch, storage_type: ResultSetStorageType):
         return batch(
@@ -70,7 +76,7 @@ class TestBatch(unittest.TestCase):
         batch = self.create_and_execute_batch(Batch)
 
         self.assertEqual(batch._result_set, self._result_set)
-        self._result_set.read_result_to_end.assert_called_once_with(self._cursor)
+        self._result_set.read_result_to_end.assert_called_once_with(self._cursor, None)
 
     def test_execute_sets_has_executed(self):
         batch = self.create_and_execute_batch(Batch)
@@ -84,6 +90,48 @@ class TestBatch(unittest.TestCase):
 
         self._connection.cursor.assert_called_once_with(name=cursor_name, withhold=True)
 
+    def test_pooler_compatible_select_batch_caps_rows(self):
+        self._cursor = utils.MockCursor([("a",), ("b",), ("c",)], ["column"])
+        self._mock_psycopg_connection = utils.MockPsycopgConnection(
+            cursor=self._cursor, dsn_parameters="host=test dbname=test"
+        )
+        self._cursor.connection = self._mock_psycopg_connection
+        self._connection = MockPGServerConnection(
+            cur=self._cursor, connection=self._mock_psycopg_connection
+        )
+        batch = SelectBatch(
+            self._batch_text,
+            self._batch_id,
+            self._selection_data,
+            self._batch_events,
+            ResultSetStorageType.FILE_STORAGE,
+            pooler_compatible=True,
+        )
+        self.assertEqual(batch._max_rows, POOLER_COMPATIBLE_MAX_ROWS)
+        batch._max_rows = 2
+
+        try:
+            with (
+                mock.patch(
+                    "ossdbtoolsservice.query.data_storage.storage_data_reader.get_columns_info",
+                    new=mock.Mock(return_value=[DbColumn()]),
+                ),
+                mock.patch("uuid.uuid4", new=mock.Mock(return_value="Test")),
+            ):
+                batch.execute(self._connection)
+
+            # The cursor lives in a transaction that ends once the rows are read
+            self._mock_psycopg_connection.cursor.assert_called_once_with(name="Test")
+            self._connection.cursor.assert_not_called()
+            self._mock_psycopg_connection.commit.assert_called_once()
+            self.assertTrue(self._connection.autocommit)
+            self.assertEqual(batch.result_set.row_count, 2)
+            # The row after the cap is fetched to tell that rows were cut off
+            self.assertEqual(self._cursor._fetched_count, 3)
+            self.assertIn("WARNING: only the first 2 rows were returned", batch.notices)
+        finally:
+            batch.dispose()
+
     def test_prop_batch_summary(self):
         batch_summary = mock.MagicMock()
 
@@ -99,6 +147,52 @@ class TestBatch(unittest.TestCase):
     def test_prop_has_executed(self):
         self.assert_properties("has_executed", True)
 
+    def test_notices_are_routed_to_executing_batch(self):
+        first_batch = self.create_and_execute_batch(Batch)
+        second_batch = self.create_and_execute_batch(Batch)
+
+        # A single handler is registered on the connection, however many batches run on it
+        self.assertEqual(len(self._mock_psycopg_connection.notice_handlers), 1)
+        self.assertEqual(first_batch.notices, ["NOTICE: foo", "DEBUG: bar"])
+        self.assertEqual(second_batch.notices, ["NOTICE: foo", "DEBUG: bar"])
+
+        # Notices that arrive between batches are not sent to finished batches
+        self._mock_psycopg_connection.notice_handlers[0](utils.MockNotice("baz", "NOTICE"))
+        self.assertEqual(len(first_batch.notices), 2)
+
+    def test_notices_are_bounded(self):
+        with mock.patch("ossdbtoolsservice.query.batch.MAX_BATCH_NOTICES", 1):
+            batch = self.create_and_execute_batch(Batch)
+
+        self.assertEqual(batch.notices, ["NOTICE: foo"])
+        self.assertEqual(batch.dropped_notice_count, 1)
+
+    def test_prop_timings(self):
+        self._cursor = utils.MockCursor([("a",), ("b",)], ["column"])
+        self._cursor.connection = self._mock_psycopg_connection
+        self._connection = MockPGServerConnection(
+            cur=self._cursor, connection=self._mock_psycopg_connection
+        )
+        batch = self.create_batch_with(Batch, ResultSetStorageType.FILE_STORAGE)
+
+        self.assertIsNone(batch.timings)
+        try:
+            with mock.patch(
+                "ossdbtoolsservice.query.data_storage.storage_data_reader.get_columns_info",
+                new=mock.Mock(return_value=[DbColumn()]),
+            ):
+                batch.execute(self._connection)
+        finally:
+            batch.dispose()
+
+        timings = batch.timings
+        self.assertIsNotNone(timings)
+        self.assertEqual(timings.row_count, 2)
+        self.assertGreater(timings.bytes_spilled, 0)
+        self.assertGreaterEqual(timings.time_to_first_row, timings.server_execute_time)
+        self.assertGreater(timings.rows_per_second, 0)
+        self.assertEqual(batch.batch_summary.timings, timings)
+
     def test_create_result_set_with_type_in_memory(self):
         result_set = create_result_set(ResultSetStorageType.IN_MEMORY, 1, 1)
 
@@ -180,7 +274,7 @@ class TestBatch(unittest.TestCase):
         subset = batch.get_subset(0, 10)
 
         self.assertEqual(expected_subset, subset)
-        self._result_set.get_subset.assert_called_once_with(0, 10)
+        self._result_set.get_subset.assert_called_once_with(0, 10, None)
 
     def test_batch_calls_close_on_cursor_when_executed(self):
         self.create_and_execute_batch(Batch)
@@ -0,0 +1,115 @@
+# --------------------------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for license information.
+# --------------------------------------------------------------------------------------------
+
+import unittest
+from unittest import mock
+
+import tests.utils as utils
+from ossdbtoolsservice.parsers import datatypes
+from ossdbtoolsservice.query.column_statistics import (
+    HyperLogLog,
+    ResultSetStatisticsCollector,
+)
+from ossdbtoolsservice.query.contracts import DbColumn
+from ossdbtoolsservice.query.file_storage_result_set import FileStorageResultSet
+
+
+def _column(data_type: str) -> DbColumn:
+    column = DbColumn()
+    column.data_type = data_type
+    return column
+
+
+class TestColumnStatistics(unittest.TestCase):
+    def test_hyperloglog_estimate(self):
+        for distinct_count in [0, 10, 1000, 50000]:
+            hyperloglog = HyperLogLog()
+            for value in range(distinct_count):
+                # Each value is added twice, duplicates must not be counted
+                hyperloglog.add(value)
+                hyperloglog.add(value)
+
+            self.assertAlmostEqual(
+                hyperloglog.estimate(), distinct_count, delta=max(1, distinct_count * 0.05)
+            )
+
+    def test_hyperloglog_strings(self):
+        hyperloglog = HyperLogLog()
+        for value in range(20000):
+            hyperloglog.add(f"value {value % 5000}")
+
+        self.assertAlmostEqual(hyperloglog.estimate(), 5000, delta=250)
+
+    def test_collect_statistics(self):
+        collector = ResultSetStatisticsCollector(
+            [_column(datatypes.DATATYPE_NUMERIC), _column(datatypes.DATATYPE_JSON)]
+        )
+        # Numerics are read as text, but compared as numbers
+        for row in [("10", '{"a": 1}'), ("9", None), (None, "[]"), ("9", "{}")]:
+            collector.add_row(row)
+
+        numeric_statistics, json_statistics = collector.get_statistics()
+
+        self.assertEqual(numeric_statistics.column_index, 0)
+        self.assertEqual(numeric_statistics.null_count, 1)
+        self.assertEqual(numeric_statistics.non_null_count, 3)
+        self.assertEqual(numeric_statistics.min_value, "9")
+        self.assertEqual(numeric_statistics.max_value, "10")
+        self.assertAlmostEqual(numeric_statistics.average_width, 4 / 3)
+        self.assertEqual(numeric_statistics.distinct_estimate, 2)
+
+        # JSON values have no meaningful order
+        self.assertEqual(json_statistics.null_count, 1)
+        self.assertIsNone(json_statistics.min_value)
+        self.assertIsNone(json_statistics.max_value)
+        self.assertEqual(json_statistics.distinct_estimate, 3)
+
+    def test_collect_statistics_of_null_column(self):
+        collector = ResultSetStatisticsCollector([_column(datatypes.DATATYPE_TEXT)])
+        collector.add_row((None,))
+
+        statistics = collector.get_statistics()[0]
+
+        self.assertEqual(statistics.null_count, 1)
+        self.assertIsNone(statistics.average_width)
+        self.assertEqual(statistics.distinct_estimate, 0)
+
+    def test_file_storage_result_set_collects_statistics_while_reading(self):
+        result_set = FileStorageResultSet(0, 0, max_cell_display_size=3)
+        cursor = utils.MockCursor([("b",), ("a",), (None,), ("abcdef",)])
+
+        try:
+            with (
+                mock.patch(
+                    "ossdbtoolsservice.query.data_storage.storage_data_reader.get_columns_info",
+                    new=mock.Mock(return_value=[_column(datatypes.DATATYPE_TEXT)]),
+                ),
+                mock.patch(
+                    "ossdbtoolsservice.query.file_storage_result_set.SPILL_FLUSH_ROW_COUNT", 2
+                ),
+            ):
+                result_set.read_result_to_end(cursor)
+
+            # The spilled rows are not read again for the statistics
+            with mock.patch.object(result_set, "_iter_rows") as iter_rows:
+                statistics = result_set.column_statistics[0]
+            iter_rows.assert_not_called()
+
+            # Statistics are kept until the rows change
+            self.assertIs(result_set.column_statistics[0], statistics)
+            result_set.remove_row(3)
+            self.assertAlmostEqual(result_set.column_statistics[0].average_width, 1)
+        finally:
+            result_set.dispose()
+
+        self.assertEqual(statistics.null_count, 1)
+        self.assertEqual(statistics.min_value, "a")
+        # Truncated values count with their full value
+        self.assertEqual(statistics.max_value, "b")
+        self.assertAlmostEqual(statistics.average_width, 8 / 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,204 @@
+# --------------------------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for license information.
+# --------------------------------------------------------------------------------------------
+
+import json
+import unittest
+from unittest import mock
+
+import tests.utils as utils
+from ossdbtoolsservice.parsers import datatypes
+from ossdbtoolsservice.query.batch import Batch, ResultSetStorageType
+from ossdbtoolsservice.query.contracts import BatchSummary, DbColumn, SelectionData
+from ossdbtoolsservice.query.execution_plan import ExecutionPlan
+from tests.pgsmo_tests.utils import MockPGServerConnection
+
+# Output of EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) for a join with a sort that spilled
+PLAN = [
+    {
+        "Plan": {
+            "Node Type": "Sort",
+            "Actual Total Time": 50.0,
+            "Actual Loops": 1,
+            "Plan Rows": 1000,
+            "Actual Rows": 1000,
+            "Shared Hit Blocks": 90,
+            "Shared Read Blocks": 10,
+            "Sort Method": "external merge",
+            "Sort Space Used": 2048,
+            "Sort Space Type": "Disk",
+            "Plans": [
+                {
+                    "Node Type": "Hash Join",
+                    "Actual Total Time": 30.0,
+                    "Actual Loops": 1,
+                    "Plan Rows": 10,
+                    "Actual Rows": 1000,
+                    "Shared Hit Blocks": 90,
+                    "Shared Read Blocks": 10,
+                    "Plans": [
+                        {
+                            "Node Type": "Seq Scan",
+                            "Relation Name": "orders",
+                            "Actual Total Time": 2.0,
+                            "Actual Loops": 5,
+                            "Plan Rows": 200,
+                            "Actual Rows": 200,
+                            "Shared Hit Blocks": 80,
+                            "Shared Read Blocks": 0,
+                        },
+                        {
+                            "Node Type": "Hash",
+                            "Actual Total Time": 15.0,
+                            "Actual Loops": 1,
+                            "Plan Rows": 100,
+                            "Actual Rows": 100,
+                            "Shared Hit Blocks": 10,
+                            "Shared Read Blocks": 10,
+                            "Hash Batches": 4,
+                            "Plans": [
+                                {
+                                    "Node Type": "Seq Scan",
+                                    "Relation Name": "customers",
+                                    "Actual Total Time": 0.0,
+                                    "Actual Loops": 0,
+                                    "Plan Rows": 100,
+                                    "Actual Rows": 0,
+                                }
+                            ],
+                        },
+                    ],
+                }
+            ],
+        },
+        "Planning Time": 0.5,
+        "Execution Time": 51.0,
+    }
+]
+
+
+def _json_column() -> DbColumn:
+    column = DbColumn()
+    column.data_type = datatypes.DATATYPE_JSON
+    return column
+
+
+class TestExecutionPlan(unittest.TestCase):
+    def _create_connection(self, rows) -> MockPGServerConnection:
+        psycopg_connection = utils.MockPsycopgConnection(
+            dsn_parameters="host=test dbname=test"
+        )
+        cursor = utils.MockCursor(rows, ["QUERY PLAN"])
+        cursor.connection = psycopg_connection
+        return MockPGServerConnection(cur=cursor, connection=psycopg_connection)
+
+    def test_parse_plan(self):
+        plan = ExecutionPlan.from_json(json.dumps(PLAN))
+
+        self.assertEqual(plan.planning_time, 0.5)
+        self.assertEqual(plan.execution_time, 51.0)
+        nodes = list(plan.root.walk())
+        self.assertEqual([node.node_id for node in nodes], [0, 1, 2, 3, 4])
+        self.assertEqual(
+            [node.node_type for node in nodes],
+            ["Sort", "Hash Join", "Seq Scan", "Hash", "Seq Scan"],
+        )
+
+        sort, join, orders_scan, hash_node, _ = nodes
+        # Times of nodes that loop are per loop
+        self.assertEqual(orders_scan.total_time, 10.0)
+        self.assertEqual(join.exclusive_time, 5.0)
+        self.assertEqual(sort.exclusive_time, 20.0)
+        self.assertEqual(join.row_estimate_error, 100.0)
+        self.assertEqual(hash_node.exclusive_shared_read_blocks, 10)
+        self.assertEqual(sort.spill_description, "external merge sort using 2048 kB of disk")
+        self.assertEqual(hash_node.spill_description, "hash in 4 batches")
+
+    def test_summarize_plan(self):
+        summary = ExecutionPlan.from_json(PLAN).summarize(top_count=2)
+
+        self.assertEqual(summary.shared_hit_blocks, 90)
+        self.assertEqual(summary.shared_read_blocks, 10)
+        self.assertAlmostEqual(summary.buffer_hit_ratio, 0.9)
+        self.assertEqual([node.node_type for node in summary.hotspots], ["Sort", "Hash"])
+        # Nodes that were never executed have no estimate error
+        self.assertEqual([node.node_id for node in summary.row_estimate_errors], [1])
+        self.assertEqual([node.node_id for node in summary.disk_spills], [0, 3])
+
+    def test_parse_invalid_plan(self):
+        for value in ["not json", "[]", [{"Query Text": "SELECT 1"}], 1]:
+            with self.assertRaises(ValueError):
+                ExecutionPlan.from_json(value)
+
+    def test_batch_summary_includes_plan_summary(self):
+        connection = self._create_connection([(json.dumps(PLAN),)])
+        batch = Batch(
+            "EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) SELECT 1",
+            0,
+            SelectionData(),
+            None,
+            ResultSetStorageType.FILE_STORAGE,
+            capture_execution_plan=True,
+        )
+
+        try:
+            with mock.patch(
+                "ossdbtoolsservice.query.data_storage.storage_data_reader.get_columns_info",
+                new=mock.Mock(return_value=[_json_column()]),
+            ):
+                batch.execute(connection)
+        finally:
+            batch.dispose()
+
+        summary = BatchSummary.from_batch(batch)
+        self.assertIsNotNone(batch.execution_plan)
+        self.assertEqual(summary.execution_plan_summary.execution_time, 51.0)
+
+    def test_unreadable_plan_notice_is_bounded(self):
+        connection = self._create_connection([("not json",)])
+        batch = Batch(
+            "EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) SELECT 1",
+            0,
+            SelectionData(),
+            None,
+            ResultSetStorageType.FILE_STORAGE,
+            capture_execution_plan=True,
+        )
+
+        try:
+            with (
+                mock.patch(
+                    "ossdbtoolsservice.query.data_storage.storage_data_reader.get_columns_info",
+                    new=mock.Mock(return_value=[_json_column()]),
+                ),
+                mock.patch("ossdbtoolsservice.query.batch.MAX_BATCH_NOTICES", 2),
+            ):
+                batch.execute(connection)
+        finally:
+            batch.dispose()
+
+        # The warning is dropped once the batch has the notices of the connection
+        self.assertIsNone(batch.execution_plan)
+        self.assertEqual(batch.notices, ["NOTICE: foo", "DEBUG: bar"])
+        self.assertEqual(batch.dropped_notice_count, 1)
+
+    def test_batch_does_not_capture_plan_by_default(self):
+        connection = self._create_connection([(json.dumps(PLAN),)])
+        batch = Batch("SELECT 1", 0, SelectionData(), None, ResultSetStorageType.FILE_STORAGE)
+
+        try:
+            with mock.patch(
+                "ossdbtoolsservice.query.data_storage.storage_data_reader.get_columns_info",
+                new=mock.Mock(return_value=[_json_column()]),
+            ):
+                batch.execute(connection)
+        finally:
+            batch.dispose()
+
+        self.assertIsNone(batch.execution_plan)
+        self.assertIsNone(BatchSummary.from_batch(batch).execution_plan_summary)
+
+
+if __name__ == "__main__":
+    unittest.main()
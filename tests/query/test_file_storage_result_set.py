@@ -3,14 +3,21 @@
 # Licensed under the MIT License. See License.txt in the project root for license information.
 # --------------------------------------------------------------------------------------------
 
+import os
 import unittest
 from typing import Callable
 from unittest import mock
 
 import tests.utils as utils
-from ossdbtoolsservice.query.contracts import DbCellValue, SaveResultsRequestParams
+from ossdbtoolsservice.parsers import datatypes
+from ossdbtoolsservice.query.contracts import (
+    DbCellValue,
+    DbColumn,
+    SaveResultsRequestParams,
+)
 from ossdbtoolsservice.query.file_storage_result_set import FileStorageResultSet
 from ossdbtoolsservice.query.result_set import ResultSetEvents
+from ossdbtoolsservice.query.result_set_view import ResultSetSort
 
 
 class TestFileStorageResultSet(unittest.TestCase):
@@ -230,6 +237,25 @@ class TestFileStorageResultSet(unittest.TestCase):
 
         self.execute_with_patch(test)
 
+    def test_read_result_to_end_fires_partially_loaded_once(self):
+        on_partially_loaded = mock.Mock()
+        self._events = ResultSetEvents(
+            on_result_set_partially_loaded=on_partially_loaded, partially_loaded_row_count=1
+        )
+
+        def test():
+            on_partially_loaded.side_effect = lambda result_set: self.assertEqual(
+                result_set.row_count, 1
+            )
+
+            self._result_set.read_result_to_end(self._cursor)
+
+            on_partially_loaded.assert_called_once_with(self._result_set)
+            self._writer.flush.assert_called_once()
+            self.assertEqual(self._result_set.row_count, 2)
+
+        self.execute_with_patch(test)
+
     def test_save_as(self):
         def test():
             params = SaveResultsRequestParams()
@@ -266,6 +292,102 @@ class TestFileStorageResultSet(unittest.TestCase):
         self.execute_with_patch(test)
 
 
+class TestFileStorageResultSetTruncation(unittest.TestCase):
+    """Tests truncation of oversized cells against real spill files"""
+
+    def setUp(self) -> None:
+        self._long_value = "x" * 20
+        self._cursor = utils.MockCursor([("short", self._long_value), ("tiny", "small")])
+
+        column = DbColumn()
+        column.data_type = datatypes.DATATYPE_TEXT
+        self._columns_info = [column, column]
+
+        self._result_set = FileStorageResultSet(0, 0, max_cell_display_size=8)
+        with mock.patch(
+            "ossdbtoolsservice.query.data_storage.storage_data_reader.get_columns_info",
+            new=mock.Mock(return_value=self._columns_info),
+        ):
+            self._result_set.read_result_to_end(self._cursor)
+
+    def tearDown(self) -> None:
+        for file_name in (
+            self._result_set._output_file_name,
+            self._result_set._overflow_file_name,
+        ):
+            if file_name is not None and os.path.exists(file_name):
+                os.remove(file_name)
+
+    def test_get_subset_returns_preview_of_truncated_cells(self):
+        rows = self._result_set.get_subset(0, 2).rows
+
+        self.assertEqual(rows[0][1].display_value, self._long_value[0:8])
+        self.assertTrue(rows[0][1].is_truncated)
+        self.assertEqual(rows[0][1].original_length, len(self._long_value))
+
+        self.assertEqual(rows[0][0].display_value, "short")
+        self.assertFalse(rows[0][0].is_truncated)
+        self.assertEqual(rows[1][1].display_value, "small")
+        self.assertFalse(rows[1][1].is_truncated)
+
+    def test_get_subset_with_columns_marks_truncated_cells(self):
+        rows = self._result_set.get_subset(0, 2, [1]).rows
+
+        self.assertEqual([len(row) for row in rows], [1, 1])
+        self.assertEqual(rows[0][0].display_value, self._long_value[0:8])
+        self.assertTrue(rows[0][0].is_truncated)
+        self.assertEqual(rows[1][0].display_value, "small")
+        self.assertFalse(rows[1][0].is_truncated)
+
+        rows = self._result_set.get_subset(0, 1, [1, 0]).rows
+        self.assertEqual([cell.display_value for cell in rows[0]], ["x" * 8, "short"])
+
+        with self.assertRaises(IndexError):
+            self._result_set.get_subset(0, 1, [2])
+
+    def test_apply_row_changes_appends_rows_to_spill_file(self):
+        self._result_set.apply_row_changes({1: ("updated", "row")}, [("added", "row")], [])
+
+        # Rows that did not change are still read from the same file
+        self.assertEqual(self._result_set.row_count, 3)
+        self.assertEqual(self._result_set.get_row(0)[0].display_value, "short")
+        self.assertEqual(self._result_set.get_row(1)[0].display_value, "updated")
+        self.assertEqual(self._result_set.get_row(2)[0].display_value, "added")
+
+        self._result_set.apply_row_changes({}, [], [0, 1])
+        self.assertEqual(self._result_set.row_count, 1)
+        self.assertEqual(self._result_set.get_row(0)[0].display_value, "added")
+
+    def test_get_cell_value_returns_full_value(self):
+        cell = self._result_set.get_cell_value(0, 1)
+
+        self.assertEqual(cell.display_value, self._long_value)
+        self.assertFalse(cell.is_truncated)
+        self.assertEqual(self._result_set.get_cell_value(1, 1).display_value, "small")
+
+    def test_sorted_view_reads_rows_through_index(self):
+        self.assertEqual(self._result_set.sort(ResultSetSort(0, descending=True)), 2)
+
+        rows = self._result_set.get_subset(0, 2).rows
+        self.assertEqual([row[0].display_value for row in rows], ["tiny", "short"])
+
+        # Cell requests address rows by their position in the view
+        self.assertEqual(
+            self._result_set.get_cell_value(1, 1).display_value, self._long_value
+        )
+
+    def test_no_overflow_file_without_truncation(self):
+        result_set = FileStorageResultSet(0, 0, max_cell_display_size=100)
+        with mock.patch(
+            "ossdbtoolsservice.query.data_storage.storage_data_reader.get_columns_info",
+            new=mock.Mock(return_value=self._columns_info),
+        ):
+            result_set.read_result_to_end(utils.MockCursor([("short", self._long_value)]))
+
+        os.remove(result_set._output_file_name)
+        self.assertIsNone(result_set._overflow_file_name)
+
+
 class MockType:
     def __enter__(cls):
         return cls
@@ -283,6 +405,8 @@ class MockWriter(MockType):
     def __init__(self, bytes_written: int) -> None:
         self.write_row = mock.Mock(return_value=bytes_written)
         self.seek = mock.MagicMock()
+        self.flush = mock.MagicMock()
+        self.truncated_cells: dict[int, int] = {}
         self.complete_write = mock.MagicMock()
 
 
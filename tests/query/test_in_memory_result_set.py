@@ -7,7 +7,7 @@ import unittest
 from unittest import mock
 
 import tests.utils as utils
-from ossdbtoolsservice.query.contracts import SaveResultsRequestParams
+from ossdbtoolsservice.query.contracts import DbColumn, SaveResultsRequestParams
 from ossdbtoolsservice.query.in_memory_result_set import InMemoryResultSet
 from ossdbtoolsservice.query.result_set import ResultSetEvents
 from tests.query.test_file_storage_result_set import MockWriter
@@ -59,6 +59,25 @@ class TestInMemoryResultSet(unittest.TestCase):
         for index, column_value in enumerate(row):
             self.assertEqual(column_value.raw_object, self._second_row[index])
 
+    def test_get_subset_with_columns(self):
+        self._result_set.rows.extend([self._first_row, self._second_row])
+        self._result_set.columns_info = [DbColumn(), DbColumn(), DbColumn()]
+
+        subset = self._result_set.get_subset(0, 2, [2, 0])
+
+        self.assertEqual(
+            [[cell.raw_object for cell in row] for row in subset.rows], [[3, 1], [7, 5]]
+        )
+        with self.assertRaises(IndexError):
+            self._result_set.get_subset(0, 2, [3])
+
+    def test_apply_row_changes(self):
+        self._result_set.rows.extend([self._first_row, self._second_row])
+
+        self._result_set.apply_row_changes({1: (8, 9, 10)}, [(11, 12, 13)], [0])
+
+        self.assertEqual(self._result_set.rows, [(8, 9, 10), (11, 12, 13)])
+
     def test_read_result_to_end(self):
         get_column_info_mock = mock.Mock()
         with mock.patch(
@@ -73,6 +92,19 @@ class TestInMemoryResultSet(unittest.TestCase):
 
         get_column_info_mock.assert_called_once_with(self._cursor)
 
+    def test_read_result_to_end_with_max_rows(self):
+        self._cursor.fetchmany = mock.Mock(return_value=[self._first_row, self._second_row])
+        with mock.patch(
+            "ossdbtoolsservice.query.in_memory_result_set.get_columns_info",
+            new=mock.Mock(),
+        ):
+            self._result_set.read_result_to_end(self._cursor, 1)
+
+        # One more row is fetched to tell whether rows are left
+        self._cursor.fetchmany.assert_called_once_with(2)
+        self.assertEqual(self._result_set.rows, [self._first_row])
+        self.assertTrue(self._result_set.has_unread_rows)
+
     def test_save_as_result_set_when_not_read(self):
         params = SaveResultsRequestParams()
 
@@ -3,13 +3,17 @@
 # Licensed under the MIT License. See License.txt in the project root for license information.
 # --------------------------------------------------------------------------------------------
 
+import contextlib
+import threading
 import unittest
 from unittest import mock
 
 import psycopg
 from psycopg import sql
 
+from ossdbtoolsservice.connection.core.errors import GetConnectionTimeout
 from ossdbtoolsservice.query import (
+    BatchEvents,
     ExecutionState,
     Query,
     QueryEvents,
@@ -113,6 +117,115 @@ class TestQuery(unittest.TestCase):
         # And the query is marked as executed
         self.assertIs(self.query.execution_state, ExecutionState.EXECUTED)
 
+    def test_can_execute_in_parallel(self) -> None:
+        """Test that only queries of several read-only batches can execute in parallel"""
+
+        def create_query(query_text: str) -> Query:
+            return Query(
+                self.query_uri,
+                query_text,
+                QueryExecutionSettings(ExecutionPlanOptions(), None),
+                QueryEvents(),
+            )
+
+        self.assertTrue(self.query.can_execute_in_parallel)
+        self.assertFalse(create_query("select 1;").can_execute_in_parallel)
+        self.assertFalse(
+            create_query("select 1; insert into t values (1);").can_execute_in_parallel
+        )
+        self.assertFalse(create_query("begin; select 1; commit;").can_execute_in_parallel)
+        self.assertFalse(
+            create_query("select 1; select * from t for update;").can_execute_in_parallel
+        )
+        self.assertFalse(
+            create_query("select 1; select nextval('s');").can_execute_in_parallel
+        )
+
+    def test_execute_in_parallel(self) -> None:
+        """Test that read-only batches are spread across connections,
+        and that their events are fired in batch order"""
+        statements = [f"select {index};" for index in range(4)]
+        fired_events: list[tuple[str, int]] = []
+        query = Query(
+            self.query_uri,
+            "".join(statements),
+            QueryExecutionSettings(ExecutionPlanOptions(), ResultSetStorageType.FILE_STORAGE),
+            QueryEvents(
+                batch_events=BatchEvents(
+                    lambda batch: fired_events.append(("started", batch.id)),
+                    lambda batch: fired_events.append(("completed", batch.id)),
+                )
+            ),
+        )
+
+        # The first batch doesn't complete until the second connection executed a batch
+        second_connection_used = threading.Event()
+        second_cursor = MockCursor(self.mock_query_results)
+        second_cursor.execute.side_effect = lambda *args: second_connection_used.set()
+        second_connection = MockPGServerConnection(cur=second_cursor)
+        self.cursor.execute.side_effect = lambda *args: second_connection_used.wait(5)
+
+        with mock.patch(
+            "ossdbtoolsservice.query.data_storage.storage_data_reader.get_columns_info",
+            new=self.get_columns_info_mock,
+        ):
+            query.execute_in_parallel(
+                self.connection, lambda: contextlib.nullcontext(second_connection), 2
+            )
+
+        executed = [call.args[0] for call in self.cursor.execute.mock_calls] + [
+            call.args[0] for call in second_cursor.execute.mock_calls
+        ]
+        self.assertCountEqual(executed, [sql.SQL(statement) for statement in statements])
+        self.assertGreaterEqual(len(second_cursor.execute.mock_calls), 1)
+        self.assertEqual(
+            fired_events,
+            [(event, index) for index in range(4) for event in ["started", "completed"]],
+        )
+        self.assertIs(query.execution_state, ExecutionState.EXECUTED)
+
+    def test_execute_in_parallel_without_free_connection(self) -> None:
+        """Test that the batches run on the given connection if no other one is free"""
+        query = Query(
+            self.query_uri,
+            "select 1; select 2;",
+            QueryExecutionSettings(ExecutionPlanOptions(), ResultSetStorageType.FILE_STORAGE),
+            QueryEvents(),
+        )
+        get_connection = mock.Mock(side_effect=GetConnectionTimeout(1, 1, 0, ""))
+
+        with (
+            mock.patch(
+                "ossdbtoolsservice.query.data_storage.storage_data_reader.get_columns_info",
+                new=self.get_columns_info_mock,
+            ),
+            self.assertLogs("ossdbtoolsservice.query.parallel_batch_executor", "INFO"),
+        ):
+            query.execute_in_parallel(self.connection, get_connection, 2)
+
+        get_connection.assert_called_once()
+        self.assertEqual(len(self.cursor.execute.mock_calls), 2)
+        self.assertIs(query.execution_state, ExecutionState.EXECUTED)
+
+    def test_execute_in_parallel_falls_back_to_sequential(self) -> None:
+        """Test that queries that can't execute in parallel use only the given connection"""
+        query = Query(
+            self.query_uri,
+            "select 1; insert into t values (1);",
+            QueryExecutionSettings(ExecutionPlanOptions(), ResultSetStorageType.FILE_STORAGE),
+            QueryEvents(),
+        )
+        get_connection = mock.Mock()
+
+        with mock.patch(
+            "ossdbtoolsservice.query.data_storage.storage_data_reader.get_columns_info",
+            new=self.get_columns_info_mock,
+        ):
+            query.execute_in_parallel(self.connection, get_connection, 4)
+
+        get_connection.assert_not_called()
+        self.assertEqual(len(self.cursor.execute.mock_calls), 2)
+
     def test_batch_selections(self) -> None:
         """Test that the query sets up batch objects with correct selection information"""
         full_query = """select * from
@@ -269,7 +382,7 @@ select * from t1;"""
         subset = query.get_subset(0, 0, 10)
 
         self.assertEqual(expected_subset, subset)
-        mock_batch.get_subset.assert_called_once_with(0, 10)
+        mock_batch.get_subset.assert_called_once_with(0, 10, None)
 
     def test_save_as_with_invalid_batch_index(self) -> None:
         def execute_with_batch_index(index: int) -> None:
@@ -0,0 +1,109 @@
+# --------------------------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for license information.
+# --------------------------------------------------------------------------------------------
+
+import unittest
+from unittest import mock
+
+from ossdbtoolsservice.query.result_cache import (
+    RESULT_CACHE_INVALIDATION_NONE,
+    RESULT_CACHE_INVALIDATION_TRANSACTIONS,
+    RESULT_CACHE_INVALIDATION_WAL_LSN,
+    ResultCache,
+    ResultCacheKey,
+    normalize_query_text,
+)
+
+
+def _key(query_text: str = "SELECT 1") -> ResultCacheKey:
+    return ResultCacheKey(
+        "localhost", 5432, 1, "postgres", query_text, '"$user", public', "postgres"
+    )
+
+
+class TestResultCache(unittest.TestCase):
+    def setUp(self):
+        self.now = 0.0
+        self.cache = ResultCache(True, 10, 100, clock=lambda: self.now)
+
+    def test_normalize_query_text(self):
+        self.assertEqual(
+            normalize_query_text("select  a,\n\tb -- comment\nfrom t where c = 'x  y';"),
+            "SELECT a, b FROM t WHERE c = 'x  y'",
+        )
+
+    def test_acquire_and_release(self):
+        query = mock.Mock()
+        added = self.cache.add(_key(), query, 10, None)
+        self.cache.release(added)
+
+        cached = self.cache.acquire(_key(), None)
+
+        self.assertIs(cached, added)
+        self.assertIsNone(self.cache.acquire(_key("SELECT 2"), None))
+        self.cache.release(cached)
+        query.dispose.assert_not_called()
+
+    def test_entries_expire(self):
+        query = mock.Mock()
+        self.cache.release(self.cache.add(_key(), query, 10, None))
+
+        self.now = 11
+        self.assertIsNone(self.cache.acquire(_key(), None))
+        query.dispose.assert_called_once()
+
+    def test_byte_budget_evicts_least_recently_used(self):
+        first_query, second_query, third_query = mock.Mock(), mock.Mock(), mock.Mock()
+        self.cache.release(self.cache.add(_key("SELECT 1"), first_query, 40, None))
+        self.cache.release(self.cache.add(_key("SELECT 2"), second_query, 40, None))
+        # Using the first entry makes the second one the least recently used
+        self.cache.release(self.cache.acquire(_key("SELECT 1"), None))
+
+        self.cache.release(self.cache.add(_key("SELECT 3"), third_query, 40, None))
+
+        second_query.dispose.assert_called_once()
+        first_query.dispose.assert_not_called()
+        self.assertEqual(self.cache.byte_count, 80)
+        # Results larger than the whole budget are not cached
+        self.assertIsNone(self.cache.add(_key("SELECT 4"), mock.Mock(), 101, None))
+
+    def test_evicted_entries_are_disposed_once_released(self):
+        query = mock.Mock()
+        entry = self.cache.add(_key(), query, 10, None)
+
+        self.cache.clear()
+        query.dispose.assert_not_called()
+
+        self.cache.release(entry)
+        query.dispose.assert_called_once()
+
+    def test_snapshot_invalidation(self):
+        for invalidation in [
+            RESULT_CACHE_INVALIDATION_TRANSACTIONS,
+            RESULT_CACHE_INVALIDATION_WAL_LSN,
+        ]:
+            self.cache.configure(True, 10, 100, invalidation, 5)
+            self.assertIn(", ", self.cache.get_context_query())
+            self.cache.release(self.cache.add(_key(), mock.Mock(), 10, 100))
+
+            cached = self.cache.acquire(_key(), 105)
+            self.assertIsNotNone(cached)
+            self.cache.release(cached)
+            self.assertIsNone(self.cache.acquire(_key(), 106))
+
+    def test_disabling_drops_entries(self):
+        query = mock.Mock()
+        self.cache.release(self.cache.add(_key(), query, 10, None))
+
+        self.cache.configure(False, 10, 100, RESULT_CACHE_INVALIDATION_NONE, 0)
+
+        self.assertFalse(self.cache.enabled)
+        query.dispose.assert_called_once()
+        self.assertIsNone(self.cache.add(_key(), mock.Mock(), 10, None))
+        with self.assertRaises(ValueError):
+            self.cache.configure(True, 10, 100, "unknown", 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
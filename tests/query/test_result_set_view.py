@@ -0,0 +1,189 @@
+# --------------------------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for license information.
+# --------------------------------------------------------------------------------------------
+
+import os
+import tempfile
+import unittest
+from typing import Any
+from unittest import mock
+
+import tests.utils as utils
+from ossdbtoolsservice.parsers import datatypes
+from ossdbtoolsservice.query import ResultSetStorageType, create_result_set
+from ossdbtoolsservice.query.contracts import DbCellValue, DbColumn
+from ossdbtoolsservice.query.data_storage.spill_manager import (
+    SpillManager,
+    SpillQuotaExceededError,
+)
+from ossdbtoolsservice.query.result_set_view import (
+    FILTER_OPERATOR_CONTAINS,
+    FILTER_OPERATOR_EQUALS,
+    FILTER_OPERATOR_GREATER_THAN,
+    FILTER_OPERATOR_IS_NULL,
+    ResultSetFilter,
+    ResultSetSort,
+    build_view_index,
+)
+
+
+def _column(data_type: str) -> DbColumn:
+    column = DbColumn()
+    column.data_type = data_type
+    return column
+
+
+def _rows(values: list[Any]) -> list[tuple[int, list[DbCellValue]]]:
+    return [
+        (row_id, [DbCellValue(value, value is None, value, row_id)])
+        for row_id, value in enumerate(values)
+    ]
+
+
+class TestResultSetView(unittest.TestCase):
+    def test_sort_numeric_strings_by_value(self):
+        # Numeric values are read from the spill file as strings
+        rows = _rows(["10", "9", None, "-1.5", "NaN", "100"])
+        columns = [_column(datatypes.DATATYPE_NUMERIC)]
+
+        index = build_view_index(rows, columns, ResultSetSort(0), None)
+
+        # NaN sorts after numbers, and NULL after everything else
+        self.assertEqual(list(index), [3, 1, 0, 5, 4, 2])
+
+    def test_sort_descending_is_stable(self):
+        rows = _rows(["b", "a", "b", "c", "a"])
+        columns = [_column(datatypes.DATATYPE_TEXT)]
+
+        index = build_view_index(rows, columns, ResultSetSort(0, descending=True), None)
+
+        self.assertEqual(list(index), [3, 0, 2, 1, 4])
+
+    def test_external_sort_matches_in_memory_sort(self):
+        values = [str((i * 7919) % 1000) for i in range(1000)]
+        columns = [_column(datatypes.DATATYPE_INTEGER)]
+
+        # A small run size forces sorted runs to be spilled to disk and merged
+        external = build_view_index(_rows(values), columns, ResultSetSort(0), None, 64)
+        in_memory = build_view_index(_rows(values), columns, ResultSetSort(0), None)
+
+        self.assertEqual(list(external), list(in_memory))
+        self.assertEqual(
+            list(external), sorted(range(1000), key=lambda row_id: int(values[row_id]))
+        )
+
+    def test_external_sort_spills_runs_through_spill_manager(self):
+        values = [str(i % 100) for i in range(1000)]
+        columns = [_column(datatypes.DATATYPE_INTEGER)]
+        directory = tempfile.mkdtemp()
+        spill_manager = SpillManager([directory])
+        run_file_counts = []
+
+        def counting_rows():
+            for row_id, row in _rows(values):
+                run_file_counts.append(spill_manager.get_usage().file_count)
+                yield row_id, row
+
+        try:
+            with mock.patch(
+                "ossdbtoolsservice.query.result_set_view.get_spill_manager",
+                new=mock.Mock(return_value=spill_manager),
+            ):
+                build_view_index(
+                    counting_rows(), columns, ResultSetSort(0), None, 64, "session"
+                )
+
+                # Runs are accounted for to the session, and deleted once merged
+                self.assertGreater(max(run_file_counts), 0)
+                self.assertEqual(spill_manager.get_usage().file_count, 0)
+                self.assertEqual(os.listdir(directory), [])
+
+                spill_manager.configure([directory], None, 1)
+                with self.assertRaises(SpillQuotaExceededError):
+                    build_view_index(
+                        _rows(values), columns, ResultSetSort(0), None, 64, "session"
+                    )
+                self.assertEqual(os.listdir(directory), [])
+        finally:
+            os.rmdir(directory)
+
+    def test_sort_timestamps_with_time_zones(self):
+        rows = _rows(["2024-01-01 10:00:00+02:00", "2024-01-01 09:00:00+00:00"])
+        columns = [_column(datatypes.DATATYPE_TIMESTAMP_WITH_TIMEZONE)]
+
+        index = build_view_index(rows, columns, ResultSetSort(0), None)
+
+        self.assertEqual(list(index), [0, 1])
+
+    def test_sort_timestamps_in_postgresql_format(self):
+        rows = _rows(["2024-01-01 10:00:00.12+00", "2024-01-01 09:00:00+00", "infinity"])
+        columns = [_column(datatypes.DATATYPE_TIMESTAMP_WITH_TIMEZONE)]
+
+        index = build_view_index(rows, columns, ResultSetSort(0), None)
+
+        self.assertEqual(list(index), [1, 0, 2])
+
+    def test_filter(self):
+        rows = _rows(["10", "9", None, "11"])
+        columns = [_column(datatypes.DATATYPE_INTEGER)]
+
+        def filtered(operator: str, value: str | None) -> list[int]:
+            result_set_filter = ResultSetFilter(0, operator, value)
+            return list(build_view_index(rows, columns, None, result_set_filter))
+
+        self.assertEqual(filtered(FILTER_OPERATOR_GREATER_THAN, "9"), [0, 3])
+        self.assertEqual(filtered(FILTER_OPERATOR_EQUALS, "09"), [1])
+        self.assertEqual(filtered(FILTER_OPERATOR_CONTAINS, "1"), [0, 3])
+        self.assertEqual(filtered(FILTER_OPERATOR_IS_NULL, None), [2])
+
+    def test_filter_and_sort(self):
+        rows = _rows(["10", "9", None, "11"])
+        columns = [_column(datatypes.DATATYPE_INTEGER)]
+
+        index = build_view_index(
+            rows,
+            columns,
+            ResultSetSort(0, descending=True),
+            ResultSetFilter(0, FILTER_OPERATOR_GREATER_THAN, "9"),
+        )
+
+        self.assertEqual(list(index), [3, 0])
+
+    def test_invalid_filter(self):
+        with self.assertRaises(ValueError):
+            ResultSetFilter(0, "like", "a")
+        with self.assertRaises(ValueError):
+            ResultSetFilter(0, FILTER_OPERATOR_EQUALS)
+        with self.assertRaises(IndexError):
+            build_view_index(_rows(["a"]), [_column("text")], ResultSetSort(1), None)
+
+    def test_result_set_subset_goes_through_view(self):
+        result_set = create_result_set(ResultSetStorageType.IN_MEMORY, 0, 0)
+        with mock.patch(
+            "ossdbtoolsservice.query.in_memory_result_set.get_columns_info",
+            new=mock.Mock(return_value=[_column(datatypes.DATATYPE_INTEGER)]),
+        ):
+            result_set.read_result_to_end(utils.MockCursor([(3,), (1,), (2,)]))
+
+        self.assertEqual(result_set.sort(ResultSetSort(0)), 3)
+        subset = result_set.get_subset(0, 3)
+        self.assertEqual([row[0].raw_object for row in subset.rows], [1, 2, 3])
+        self.assertEqual(result_set.get_cell_value(0, 0).raw_object, 1)
+
+        # Filtering keeps the current sort
+        self.assertEqual(
+            result_set.filter(ResultSetFilter(0, FILTER_OPERATOR_GREATER_THAN, "1")), 2
+        )
+        subset = result_set.get_subset(0, 2)
+        self.assertEqual([row[0].raw_object for row in subset.rows], [2, 3])
+
+        # Clearing both restores the original rows
+        result_set.sort(None)
+        self.assertEqual(result_set.filter(None), 3)
+        self.assertEqual(result_set.view_row_count, 3)
+        self.assertEqual(result_set.get_subset(0, 1).rows[0][0].raw_object, 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
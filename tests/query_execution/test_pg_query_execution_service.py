@@ -6,6 +6,8 @@
 """Module for testing the query execution service"""
 
 import os
+import threading
+import time
 import unittest
 import uuid
 from os import listdir
@@ -38,6 +40,7 @@ from ossdbtoolsservice.query.contracts import (
     DbColumn,
     ResultSetSubset,
     SelectionData,
+    SpillUsage,
     SubsetResult,
 )
 from ossdbtoolsservice.query.data_storage import (
@@ -45,6 +48,7 @@ from ossdbtoolsservice.query.data_storage import (
     SaveAsExcelFileStreamFactory,
     SaveAsJsonFileStreamFactory,
 )
+from ossdbtoolsservice.query.data_storage.spill_manager import SpillQuotaExceededError
 from ossdbtoolsservice.query_execution.contracts import (
     BATCH_COMPLETE_NOTIFICATION,
     BATCH_START_NOTIFICATION,
@@ -55,24 +59,32 @@ from ossdbtoolsservice.query_execution.contracts import (
     MESSAGE_NOTIFICATION,
     QUERY_COMPLETE_NOTIFICATION,
     RESULT_SET_COMPLETE_NOTIFICATION,
+    CellValueParams,
+    ColumnStatisticsParams,
     ExecuteDocumentSelectionParams,
     ExecuteDocumentStatementParams,
     ExecuteRequestParamsBase,
     ExecuteStringParams,
     ExecutionPlanOptions,
+    FilterResultSetParams,
     QueryCancelResult,
     QueryDisposeParams,
     SaveResultRequestResult,
     SaveResultsAsCsvRequestParams,
     SaveResultsAsExcelRequestParams,
     SaveResultsAsJsonRequestParams,
+    SimpleExecutePageRequest,
     SimpleExecuteRequest,
+    SortResultSetParams,
+    SpillDiagnosticsParams,
     SubsetParams,
 )
 from ossdbtoolsservice.query_execution.query_execution_service import (
     NO_QUERY_MESSAGE,
     ExecuteRequestWorkerArgs,
     QueryExecutionService,
+    SimpleExecuteContinuation,
+    _get_simple_execute_page_size,
 )
 from ossdbtoolsservice.utils import constants
 from tests.integration import get_connection_details, integration_test
@@ -281,6 +293,40 @@ class TestQueryService(unittest.TestCase):
         for call_params in call_params_list:
             self.assertTrue(call_params.message.is_error)
 
+    def test_query_request_spill_quota_error_handling(self) -> None:
+        """Test that exceeding a spill quota is reported as such, not as an unhandled error"""
+        error = SpillQuotaExceededError(
+            "Result spill quota of 1 MB per query was exceeded.",
+            "pgsql.spillSessionQuotaMb",
+            1024 * 1024,
+        )
+        self.cursor.execute = mock.Mock(side_effect=error)
+        logger = mock.MagicMock()
+        self.service_provider._logger = logger
+        params = get_execute_string_params()
+
+        self.query_execution_service._handle_execute_query_request(
+            self.request_context, params
+        )
+        self.query_execution_service.owner_to_thread_map[params.owner_uri].join()
+
+        messages = [
+            call[1][1].message
+            for call in self.request_context.send_notification.mock_calls
+            if call[1][0] == MESSAGE_NOTIFICATION
+        ]
+        self.assertEqual(
+            [(message.message, message.is_error) for message in messages],
+            [("Result spill quota of 1 MB per query was exceeded.", True)],
+        )
+        logger.exception.assert_not_called()
+        self.assertTrue(
+            any(
+                "pgsql.spillSessionQuotaMb" in call.args[0]
+                for call in logger.warning.mock_calls
+            )
+        )
+
     def test_query_request_response(self) -> None:
         """Test that a response is sent when handling a query request"""
         params = get_execute_string_params()
@@ -946,6 +992,201 @@ class TestQueryService(unittest.TestCase):
         self.assertEqual(result_subset.rows[1][0].display_value, str(batch_rows[2][0]))
         self.assertEqual(result_subset.rows[1][1].display_value, str(batch_rows[2][1]))
 
+    def test_handle_subset_request_with_column_window(self) -> None:
+        """Test that subset requests can fetch a range or a list of columns"""
+        batch = Batch("", 0, SelectionData())
+        batch._result_set = create_result_set(ResultSetStorageType.IN_MEMORY, 0, 0)
+        with mock.patch(
+            "ossdbtoolsservice.query.in_memory_result_set.get_columns_info",
+            new=mock.Mock(return_value=[DbColumn(), DbColumn(), DbColumn()]),
+        ):
+            batch._result_set.read_result_to_end(utils.MockCursor([(1, 2, 3), (4, 5, 6)]))
+        test_query = Query(
+            "test_uri",
+            "",
+            QueryExecutionSettings(ExecutionPlanOptions(), None),
+            QueryEvents(),
+        )
+        test_query._batches = [batch]
+        self.query_execution_service.query_results = {"test_uri": test_query}
+        subset_params = {
+            "owner_uri": "test_uri",
+            "batch_index": 0,
+            "result_set_index": 0,
+            "rows_start_index": 0,
+            "rows_count": 2,
+        }
+
+        params = SubsetParams.from_dict(
+            {**subset_params, "column_start_index": 1, "column_count": 2}
+        )
+        self.query_execution_service._handle_subset_request(self.request_context, params)
+        rows = self.request_context.last_response_params.result_subset.rows
+        self.assertEqual(
+            [[cell.raw_object for cell in row] for row in rows], [[2, 3], [5, 6]]
+        )
+
+        params = SubsetParams.from_dict({**subset_params, "column_indexes": [2, 0]})
+        self.query_execution_service._handle_subset_request(self.request_context, params)
+        rows = self.request_context.last_response_params.result_subset.rows
+        self.assertEqual(
+            [[cell.raw_object for cell in row] for row in rows], [[3, 1], [6, 4]]
+        )
+
+        params = SubsetParams.from_dict({**subset_params, "column_start_index": 1})
+        self.query_execution_service._handle_subset_request(self.request_context, params)
+        self.assertEqual(self.request_context.last_error_message, "Missing column count")
+
+    def test_handle_sort_and_filter_result_set_requests(self) -> None:
+        """Test that sorting and filtering a result set changes the rows of later subsets"""
+        batch = Batch("", 0, SelectionData())
+        batch._result_set = create_result_set(ResultSetStorageType.IN_MEMORY, 0, 0)
+        column = DbColumn()
+        column.data_type = "int4"
+
+        with mock.patch(
+            "ossdbtoolsservice.query.in_memory_result_set.get_columns_info",
+            new=mock.Mock(return_value=[column]),
+        ):
+            batch._result_set.read_result_to_end(utils.MockCursor([(2,), (3,), (1,)]))
+
+        test_query = Query(
+            "test_uri",
+            "",
+            QueryExecutionSettings(ExecutionPlanOptions(), None),
+            QueryEvents(),
+        )
+        test_query._batches = [batch]
+        test_query._execution_state = ExecutionState.EXECUTED
+        self.query_execution_service.query_results = {test_query.owner_uri: test_query}
+
+        sort_params = SortResultSetParams.from_dict(
+            {
+                "owner_uri": "test_uri",
+                "batch_index": 0,
+                "result_set_index": 0,
+                "column_index": 0,
+                "descending": True,
+            }
+        )
+        self.query_execution_service._handle_sort_result_set_request(
+            self.request_context, sort_params
+        )
+        self.query_execution_service.owner_to_thread_map["test_uri"].join()
+        self.assertEqual(self.request_context.last_response_params.row_count, 3)
+
+        filter_params = FilterResultSetParams.from_dict(
+            {
+                "owner_uri": "test_uri",
+                "batch_index": 0,
+                "result_set_index": 0,
+                "column_index": 0,
+                "operator": "lessThan",
+                "value": "3",
+            }
+        )
+        self.query_execution_service._handle_filter_result_set_request(
+            self.request_context, filter_params
+        )
+        self.query_execution_service.owner_to_thread_map["test_uri"].join()
+        self.assertEqual(self.request_context.last_response_params.row_count, 2)
+
+        subset = test_query.get_subset(0, 0, 2)
+        self.assertEqual([row[0].raw_object for row in subset.rows], [2, 1])
+
+        # Unsupported operators are rejected up front
+        filter_params.operator = "like"
+        self.query_execution_service._handle_filter_result_set_request(
+            self.request_context, filter_params
+        )
+        self.assertEqual(
+            self.request_context.last_error_message, "Unsupported filter operator: like"
+        )
+
+    def test_handle_column_statistics_request(self) -> None:
+        """Test that the query execution service returns column statistics of a result set"""
+        batch = Batch("", 0, SelectionData())
+        batch._result_set = create_result_set(ResultSetStorageType.IN_MEMORY, 0, 0)
+        column = DbColumn()
+        column.data_type = "int4"
+
+        with mock.patch(
+            "ossdbtoolsservice.query.in_memory_result_set.get_columns_info",
+            new=mock.Mock(return_value=[column]),
+        ):
+            batch._result_set.read_result_to_end(utils.MockCursor([(2,), (None,), (10,)]))
+
+        test_query = Query(
+            "test_uri",
+            "",
+            QueryExecutionSettings(ExecutionPlanOptions(), None),
+            QueryEvents(),
+        )
+        test_query._batches = [batch]
+        test_query._execution_state = ExecutionState.EXECUTED
+        self.query_execution_service.query_results = {test_query.owner_uri: test_query}
+
+        params = ColumnStatisticsParams.from_dict(
+            {"owner_uri": "test_uri", "batch_index": 0, "result_set_index": 0}
+        )
+        self.query_execution_service._handle_column_statistics_request(
+            self.request_context, params
+        )
+        self.query_execution_service.owner_to_thread_map["test_uri"].join()
+
+        statistics = self.request_context.last_response_params.column_statistics[0]
+        self.assertEqual(statistics.null_count, 1)
+        self.assertEqual(statistics.min_value, "2")
+        self.assertEqual(statistics.max_value, "10")
+
+        # Requests for a batch that does not exist are rejected
+        params.batch_index = 1
+        self.query_execution_service._handle_column_statistics_request(
+            self.request_context, params
+        )
+        self.assertIsNotNone(self.request_context.last_error_message)
+
+    def test_handle_cell_value_request(self) -> None:
+        """Test that the query execution service returns the value of a single cell"""
+        params = CellValueParams.from_dict(
+            {
+                "owner_uri": "test_uri",
+                "batch_index": 0,
+                "result_set_index": 0,
+                "row_index": 1,
+                "column_index": 1,
+            }
+        )
+        batch = Batch("", 0, SelectionData())
+        batch._result_set = create_result_set(ResultSetStorageType.IN_MEMORY, 0, 0)
+
+        with mock.patch(
+            "ossdbtoolsservice.query.in_memory_result_set.get_columns_info",
+            new=mock.Mock(),
+        ):
+            batch._result_set.read_result_to_end(utils.MockCursor([(1, 2), (3, 4)]))
+
+        test_query = Query(
+            params.owner_uri,
+            "",
+            QueryExecutionSettings(ExecutionPlanOptions(), None),
+            QueryEvents(),
+        )
+        test_query._batches = [batch]
+        self.query_execution_service.query_results = {test_query.owner_uri: test_query}
+
+        # If I call the cell value request handler
+        self.query_execution_service._handle_cell_value_request(self.request_context, params)
+
+        # Then the response should contain the requested cell
+        response = self.request_context.last_response_params
+        self.assertEqual(response.cell.display_value, "4")
+
+        # And an out of range column is reported as an error
+        params.column_index = 2
+        self.query_execution_service._handle_cell_value_request(self.request_context, params)
+        self.request_context.send_unhandled_error_response.assert_called_once()
+
     def test_time(self) -> None:
         """Test to see that the start, end, and execution times are properly set"""
 
@@ -1069,6 +1310,8 @@ class TestQueryService(unittest.TestCase):
         self.query_execution_service.query_results[
             uri
         ]._execution_state = ExecutionState.EXECUTED
+        query_dispose = mock.Mock()
+        self.query_execution_service.query_results[uri].dispose = query_dispose
         params = QueryDisposeParams()
         params.owner_uri = uri
 
@@ -1078,10 +1321,25 @@ class TestQueryService(unittest.TestCase):
 
         # Then the uri key should no longer be in the results, and we sent an empty response
         self.assertTrue(uri not in self.query_execution_service.query_results)
+        # ... and the spill files of the query should be deleted
+        query_dispose.assert_called_once()
         self.request_context.send_response.assert_called_once_with({})
         self.request_context.send_error.assert_not_called()
         self.cursor_cancel.execute.assert_not_called()
 
+    def test_handle_spill_diagnostics_request(self) -> None:
+        """Test that the query execution service returns the disk usage of spill files"""
+        params = SpillDiagnosticsParams.from_dict({"owner_uri": str(uuid.uuid4())})
+
+        self.query_execution_service._handle_spill_diagnostics_request(
+            self.request_context, params
+        )
+
+        usage = self.request_context.last_response_params
+        self.assertIsInstance(usage, SpillUsage)
+        self.assertEqual(usage.session_bytes_used, 0)
+        self.assertGreaterEqual(len(usage.directories), 1)
+
     def test_query_disposal_failure(self) -> None:
         """Test for handling query/dispose request in case where disposal is not possible"""
         # Note that query_results[uri] is never populated
@@ -1304,6 +1562,31 @@ class TestQueryService(unittest.TestCase):
 
         self.assertEqual("EXPLAIN ANALYZE Test Query", query._batches[0].batch_text)
 
+    def test_start_query_execution_thread_captures_plan_when_plan_summary_is_enabled(
+        self,
+    ) -> None:
+        request = ExecuteStringParams()
+        request.execution_plan_options = ExecutionPlanOptions()
+        request.execution_plan_options.include_execution_plan_summary = True
+        request.owner_uri = "Test Owner Uri"
+        request.query = "Test Query"
+
+        worker_args = ExecuteRequestWorkerArgs(
+            request.owner_uri, self.connection, self.request_context, None
+        )
+
+        self.query_execution_service._start_query_execution_thread(
+            self.request_context, request, worker_args
+        )
+
+        query = self.query_execution_service.get_query(request.owner_uri)
+
+        self.assertEqual(
+            "EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) Test Query",
+            query._batches[0].batch_text,
+        )
+        self.assertTrue(query._batches[0]._capture_execution_plan)
+
     def test_handle_simple_execute_request(self) -> None:
         """Test for _handle_simple_execute_request to make sure it returns required details
         from the first batch"""
@@ -1369,6 +1652,226 @@ class TestQueryService(unittest.TestCase):
                 self.request_context, simple_execution_request
             )
 
+    def test_handle_simple_execute_request_pages_results(self) -> None:
+        """Test that simple execute returns at most max_rows rows per page, and that the
+        remaining rows can be fetched with the continuation token"""
+        simple_execution_request = SimpleExecuteRequest("test_uri", "Select something", 2)
+
+        mock_rows = [("Result1", 53), ("Result2", None), ("Result3", 7)]
+        new_owner_uri = str(uuid.uuid4())
+        query = Query(
+            new_owner_uri,
+            "",
+            QueryExecutionSettings(ExecutionPlanOptions(), None),
+            QueryEvents(),
+        )
+        batch = Batch("", 0, SelectionData())
+        result_set = create_result_set(ResultSetStorageType.IN_MEMORY, 0, 0)
+
+        with mock.patch(
+            "ossdbtoolsservice.query.in_memory_result_set.get_columns_info",
+            new=mock.Mock(return_value=[]),
+        ):
+            result_set.read_result_to_end(utils.MockCursor(mock_rows))
+
+        batch._result_set = result_set
+        batch._has_executed = True
+        query._batches = [batch]
+        query.execute = mock.MagicMock()
+        self.query_execution_service.query_results = {new_owner_uri: query}
+
+        with mock.patch("uuid.uuid4", new=mock.Mock(return_value=new_owner_uri)):
+            self.query_execution_service._handle_simple_execute_request(
+                self.request_context, simple_execution_request
+            )
+            self.query_execution_service.owner_to_thread_map[new_owner_uri].join()
+
+        first_page = self.request_context.last_response_params
+        self.assertEqual(first_page.row_count, 2)
+        self.assertEqual(first_page.continuation_token, new_owner_uri)
+
+        page_request = SimpleExecutePageRequest(first_page.continuation_token, 2)
+        self.query_execution_service._handle_simple_execute_page_request(
+            self.request_context, page_request
+        )
+
+        second_page = self.request_context.last_response_params
+        self.assertEqual(second_page.row_count, 1)
+        self.assertEqual(second_page.rows[0][0].display_value, "Result3")
+        self.assertIsNone(second_page.continuation_token)
+
+        # The result set is released once the last page has been sent
+        self.assertNotIn(new_owner_uri, self.query_execution_service.query_results)
+        self.query_execution_service._handle_simple_execute_page_request(
+            self.request_context, page_request
+        )
+        self.assertIsNotNone(self.request_context.last_error_message)
+
+    def test_handle_simple_execute_request_pages_streamed_result_set(self) -> None:
+        """Test that simple execute sends the first page while the batch reads its
+        result set into file storage, and pages through the rest"""
+        rows = [(f"Text {index}",) for index in range(5)]
+        self.cursor = utils.MockCursor(rows)
+        self.cursor.connection = self.mock_psycopg_connection
+        self.connection.cursor = mock.MagicMock(return_value=self.cursor)
+        column = DbColumn()
+        column.data_type = "text"
+
+        with mock.patch(
+            "ossdbtoolsservice.query.data_storage.storage_data_reader.get_columns_info",
+            new=mock.Mock(return_value=[column]),
+        ):
+            self.query_execution_service._handle_simple_execute_request(
+                self.request_context, SimpleExecuteRequest("test_uri", "SELECT * FROM t", 2)
+            )
+            for thread in self.query_execution_service.owner_to_thread_map.values():
+                thread.join()
+
+        self.assertIsNone(self.request_context.last_error_message)
+        first_page = self.request_context.last_response_params
+        self.assertEqual(
+            [row[0].display_value for row in first_page.rows], ["Text 0", "Text 1"]
+        )
+
+        page_request = SimpleExecutePageRequest(first_page.continuation_token, 2)
+        values = []
+        while page_request.continuation_token is not None:
+            self.query_execution_service._handle_simple_execute_page_request(
+                self.request_context, page_request
+            )
+            page = self.request_context.last_response_params
+            values.extend(row[0].display_value for row in page.rows)
+            page_request = SimpleExecutePageRequest(page.continuation_token, 2)
+
+        self.assertIsNone(self.request_context.last_error_message)
+        self.assertEqual(values, ["Text 2", "Text 3", "Text 4"])
+
+    def test_simple_execute_page_request_does_not_wait_for_rows(self) -> None:
+        """Test that a page whose rows are still being read is sent once they are,
+        without holding up the request"""
+        owner_uri = str(uuid.uuid4())
+        query = Query(
+            owner_uri, "", QueryExecutionSettings(ExecutionPlanOptions(), None), QueryEvents()
+        )
+        batch = Batch("", 0, SelectionData())
+        result_set = create_result_set(ResultSetStorageType.IN_MEMORY, 0, 0)
+        with mock.patch(
+            "ossdbtoolsservice.query.in_memory_result_set.get_columns_info",
+            new=mock.Mock(return_value=[]),
+        ):
+            result_set.read_result_to_end(utils.MockCursor([("Result1",), ("Result2",)]))
+        batch._result_set = result_set
+        query._batches = [batch]
+        self.query_execution_service.query_results = {owner_uri: query}
+        continuation = SimpleExecuteContinuation(owner_uri)
+        continuation.next_row_index = 1
+        self.query_execution_service._simple_execute_continuations[owner_uri] = continuation
+
+        self.query_execution_service._handle_simple_execute_page_request(
+            self.request_context, SimpleExecutePageRequest(owner_uri, 2)
+        )
+        self.assertIsNone(self.request_context.last_response_params)
+
+        continuation.query_complete.set()
+        deadline = time.monotonic() + 5
+        while (
+            self.request_context.last_response_params is None and time.monotonic() < deadline
+        ):
+            time.sleep(0.01)
+
+        page = self.request_context.last_response_params
+        self.assertEqual(page.rows[0][0].display_value, "Result2")
+        self.assertIsNone(page.continuation_token)
+
+    def test_handle_simple_execute_request_reuses_cached_result(self) -> None:
+        """Test that identical read-only simple execute requests reuse the executed query
+        while the result cache is enabled"""
+        self.query_execution_service._result_cache.configure(True, 30, 1024, "none", 0)
+        self.connection_service.get_pooled_connection = mock.Mock(
+            side_effect=lambda *_, **__: PooledConnection(
+                lambda _: self.connection, lambda _: None
+            )
+        )
+        context_query_threads: list[threading.Thread] = []
+
+        def fetch_one(*args: Any) -> tuple:
+            context_query_threads.append(threading.current_thread())
+            return ("test", "public", "postgres")
+
+        self.connection.fetch_one = mock.Mock(side_effect=fetch_one)
+        connection_info = mock.Mock()
+        connection_info.connection_details.to_hash.return_value = 1
+        self.connection_service.get_connection_info = mock.Mock(return_value=connection_info)
+
+        owner_uri = str(uuid.uuid4())
+        query = Query(
+            owner_uri, "", QueryExecutionSettings(ExecutionPlanOptions(), None), QueryEvents()
+        )
+        batch = Batch("", 0, SelectionData())
+        result_set = create_result_set(ResultSetStorageType.IN_MEMORY, 0, 0)
+        with mock.patch(
+            "ossdbtoolsservice.query.in_memory_result_set.get_columns_info",
+            new=mock.Mock(return_value=[]),
+        ):
+            result_set.read_result_to_end(utils.MockCursor([("Result1",)]))
+        batch._result_set = result_set
+        batch._has_executed = True
+        query._batches = [batch]
+        query.execute = mock.MagicMock()
+        query.dispose = mock.MagicMock()
+        self.query_execution_service.query_results = {owner_uri: query}
+
+        with mock.patch("uuid.uuid4", new=mock.Mock(return_value=owner_uri)):
+            self.query_execution_service._handle_simple_execute_request(
+                self.request_context, SimpleExecuteRequest("test_uri", "SELECT  1")
+            )
+            self.query_execution_service.owner_to_thread_map[owner_uri].join()
+        self.assertEqual(self.request_context.last_response_params.row_count, 1)
+
+        # The same query, formatted differently, is served from the cache
+        cached_owner_uri = str(uuid.uuid4())
+        with mock.patch("uuid.uuid4", new=mock.Mock(return_value=cached_owner_uri)):
+            self.query_execution_service._handle_simple_execute_request(
+                self.request_context, SimpleExecuteRequest("test_uri", "select 1;")
+            )
+            self.query_execution_service.owner_to_thread_map[cached_owner_uri].join()
+
+        query.execute.assert_called_once()
+        # The cache is looked up on the worker threads, not on the dispatch thread
+        self.assertEqual(len(context_query_threads), 2)
+        self.assertNotIn(threading.current_thread(), context_query_threads)
+        response = self.request_context.last_response_params
+        self.assertEqual(response.rows[0][0].display_value, "Result1")
+        self.assertIsNone(response.continuation_token)
+        # The cached query is kept for later requests
+        query.dispose.assert_not_called()
+
+        # Another server with the same database and role names does not share the entry
+        key, _ = self.query_execution_service._get_result_cache_context(
+            "test_uri", "SELECT 1"
+        )
+        connection_info.connection_details.to_hash.return_value = 2
+        other_key, _ = self.query_execution_service._get_result_cache_context(
+            "other_uri", "SELECT 1"
+        )
+        self.assertEqual((key.host, key.port), ("test", 5432))
+        self.assertNotEqual(key, other_key)
+
+        # Statements that write are not cached
+        self.assertIsNone(
+            self.query_execution_service._get_result_cache_context(
+                "test_uri", "DELETE FROM t"
+            )
+        )
+
+    def test_simple_execute_page_size_is_capped(self) -> None:
+        """Test that clients cannot request pages above the server maximum"""
+        max_page_size = constants.SIMPLE_EXECUTE_MAX_PAGE_SIZE
+        self.assertEqual(_get_simple_execute_page_size(None), max_page_size)
+        self.assertEqual(_get_simple_execute_page_size(0), max_page_size)
+        self.assertEqual(_get_simple_execute_page_size(10), 10)
+        self.assertEqual(_get_simple_execute_page_size(max_page_size + 1), max_page_size)
+
     def test_handle_save_as_csv_request(self) -> None:
         request_params = SaveResultsAsCsvRequestParams()
         request_params.owner_uri = "testOwner_uri"
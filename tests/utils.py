@@ -131,6 +131,7 @@ class MockPsycopgConnection:
         self.cursor = mock.MagicMock(return_value=cursor)
         self.autocommit = True
         self.commit = mock.Mock()
+        self.transaction = mock.MagicMock()
         self.pgconn = mock.Mock()
         self.info = MockConnectionInfo(dsn_parameters, self.server_version)
         self.broken = False
@@ -199,6 +200,8 @@ class MockCursor:
         if columns_names is None:
             columns_names = []
         self.execute = mock.Mock(side_effect=self.execute_success_side_effects)
+        self.executemany = mock.Mock(side_effect=self.execute_success_side_effects)
+        self.nextset = mock.Mock(return_value=None)
         self.fetchall = mock.Mock(return_value=query_results)
         self.fetchone = mock.Mock(side_effect=self.execute_fetch_one_side_effects)
         self.close = mock.Mock()
@@ -55,11 +55,21 @@ def pytest_addoption(parser: pytest.Parser) -> None:
         help="Run playback tests.",
     )
 
+    parser.addoption(
+        "--benchmark",
+        action="store_true",
+        default=False,
+        help="Run benchmarks, which assert on wall-clock times.",
+    )
+
 
 def pytest_configure(config: pytest.Config) -> None:
     config.addinivalue_line(
         "markers", "playback: mark test to run only if --playback is specified"
     )
+    config.addinivalue_line(
+        "markers", "benchmark: mark test to run only if --benchmark is specified"
+    )
 
 
 def pytest_collection_modifyitems(config: pytest.Config, items: list[pytest.Item]) -> None:
@@ -70,6 +80,13 @@ def pytest_collection_modifyitems(config: pytest.Config, items: list[pytest.Item
         for item in items:
             if "playback" in item.keywords:
                 item.add_marker(skip_marker)
+    if not config.getoption("--benchmark"):
+        skip_marker = pytest.mark.skip(
+            reason="Benchmarks are skipped unless --benchmark is specified."
+        )
+        for item in items:
+            if "benchmark" in item.keywords:
+                item.add_marker(skip_marker)
 
 
 @pytest.fixture
@@ -0,0 +1,97 @@
+import threading
+import time
+from unittest import mock
+
+import pytest
+
+from ossdbtoolsservice.connection.contracts import AzureToken
+from ossdbtoolsservice.connection.core.azure_token_cache import AzureTokenCache
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = time.time()
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def get_token(expires_in: float, token: str = "token") -> AzureToken:
+    return AzureToken(token=token, expiry=int(time.time() + expires_in))
+
+
+def test_valid_token_is_a_cache_hit() -> None:
+    fetch = mock.Mock()
+    cache = AzureTokenCache(fetch, clock=FakeClock())
+    token = get_token(3600)
+
+    assert cache.get_token("account", "tenant", token) == token
+    assert cache.get_token("account", "tenant") == token
+
+    fetch.assert_not_called()
+    stats = cache.get_stats()
+    assert (stats["hit_count"], stats["miss_count"]) == (2, 0)
+
+
+def test_expired_token_is_fetched_once() -> None:
+    fresh_token = get_token(3600, "fresh")
+    fetch = mock.Mock(return_value=fresh_token)
+    cache = AzureTokenCache(fetch, clock=FakeClock())
+
+    assert cache.get_token("account", "tenant", get_token(-10)) == fresh_token
+    # The stale token of other connection details does not replace the fresh one
+    assert cache.get_token("account", "tenant", get_token(-10)) == fresh_token
+
+    fetch.assert_called_once_with("account", "tenant")
+    stats = cache.get_stats()
+    assert (stats["hit_count"], stats["miss_count"], stats["fetch_count"]) == (1, 1, 1)
+
+
+def test_fetch_errors_are_counted_and_raised() -> None:
+    cache = AzureTokenCache(mock.Mock(side_effect=TimeoutError()), clock=FakeClock())
+
+    with pytest.raises(TimeoutError):
+        cache.get_token("account", None, get_token(-10))
+
+    assert cache.get_stats()["fetch_errors"] == 1
+
+
+def test_tokens_in_use_are_refreshed_before_they_expire() -> None:
+    clock = FakeClock()
+    fresh_token = get_token(3600, "fresh")
+    refreshed = threading.Event()
+
+    def fetch(account_id: str, tenant_id: str | None) -> AzureToken:
+        refreshed.set()
+        return fresh_token
+
+    cache = AzureTokenCache(fetch, refresh_margin=300, clock=clock)
+    try:
+        # The token expires within the refresh margin
+        cache.add_user("account", "tenant", get_token(200))
+
+        assert refreshed.wait(5)
+        deadline = time.monotonic() + 5
+        while cache.get_stats()["refresh_count"] < 1 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert cache.get_stats()["refresh_count"] == 1
+
+        # Connections opened afterwards do not wait on a fetch
+        assert cache.get_token("account", "tenant") == fresh_token
+        assert cache.get_stats()["miss_count"] == 0
+    finally:
+        cache.close()
+
+
+def test_tokens_without_users_are_dropped() -> None:
+    cache = AzureTokenCache(mock.Mock(), clock=FakeClock())
+    try:
+        cache.add_user("account", "tenant", get_token(3600))
+        cache.add_user("account", "tenant", get_token(3600))
+
+        cache.remove_user("account", "tenant")
+        assert cache.get_stats()["token_count"] == 1
+        cache.remove_user("account", "tenant")
+        assert cache.get_stats()["token_count"] == 0
+    finally:
+        cache.close()
@@ -0,0 +1,96 @@
+"""Benchmark of connects to several servers while one server is slow to respond.
+
+Each server is a local stub that delays its startup handshake, so the connection manager
+makes real client connections without a database. The assertions are on wall-clock times,
+so the benchmark only runs with --benchmark.
+"""
+
+import threading
+import time
+from contextlib import ExitStack
+
+import pytest
+
+from ossdbtoolsservice.connection.contracts import ConnectionDetails
+from ossdbtoolsservice.connection.core.connection_manager import ConnectionManager
+from ossdbtoolsservice.workspace.contracts.configuration import Configuration
+from tests_v2.test_utils.stub_pg_server import StubPGServer
+
+SLOW_HANDSHAKE_DELAY = 1.0
+FAST_SERVER_COUNT = 4
+
+
+def get_stub_connection_details(server: StubPGServer) -> ConnectionDetails:
+    return ConnectionDetails(
+        options={
+            "host": "127.0.0.1",
+            "port": server.port,
+            "user": "test_user",
+            "dbname": "test_db",
+            "sslmode": "disable",
+            "connectTimeout": 10,
+        }
+    )
+
+
+def connect_while_slow_server_connects(max_connection_workers: int) -> float:
+    """Connect to the fast servers while a connect to the slow server is in progress.
+    Returns the seconds the fast connects took.
+    """
+    connection_manager = ConnectionManager(
+        max_connection_workers=max_connection_workers, pool_stats_log_interval=None
+    )
+    with ExitStack() as stack:
+        slow_server = stack.enter_context(StubPGServer(SLOW_HANDSHAKE_DELAY))
+        fast_servers = [stack.enter_context(StubPGServer()) for _ in range(FAST_SERVER_COUNT)]
+
+        slow_connect = threading.Thread(
+            target=connection_manager.connect,
+            args=("slow_owner", get_stub_connection_details(slow_server), Configuration()),
+            daemon=True,
+        )
+        slow_connect.start()
+        # Let the slow connect reach the handshake before the others are requested
+        deadline = time.monotonic() + 5
+        while slow_server.connection_count == 0 and time.monotonic() < deadline:
+            time.sleep(0.01)
+
+        start = time.monotonic()
+        fast_connects = [
+            threading.Thread(
+                target=connection_manager.connect,
+                args=(
+                    f"fast_owner_{index}",
+                    get_stub_connection_details(server),
+                    Configuration(),
+                ),
+                daemon=True,
+            )
+            for index, server in enumerate(fast_servers)
+        ]
+        for thread in fast_connects:
+            thread.start()
+        for thread in fast_connects:
+            thread.join(timeout=30)
+        elapsed = time.monotonic() - start
+
+        slow_connect.join(timeout=30)
+        for index in range(FAST_SERVER_COUNT):
+            assert connection_manager.get_connection_info(f"fast_owner_{index}") is not None
+        assert connection_manager.get_connection_info("slow_owner") is not None
+        connection_manager.close()
+    return elapsed
+
+
+@pytest.mark.benchmark
+@pytest.mark.parametrize("max_connection_workers", [1, 8])
+def test_connects_are_not_held_up_by_slow_server(max_connection_workers: int) -> None:
+    """Benchmark: with a single worker, as before, the fast connects wait for the slow
+    handshake. With several workers, they finish while the slow server is still connecting.
+    """
+    elapsed = connect_while_slow_server_connects(max_connection_workers)
+
+    if max_connection_workers == 1:
+        assert elapsed >= SLOW_HANDSHAKE_DELAY * 0.5
+    else:
+        assert elapsed < SLOW_HANDSHAKE_DELAY * 0.5
@@ -5,23 +5,63 @@ def test_connection_details_hash_with_azure() -> None:
     """
     Test the hash function of ConnectionDetails with Azure.
     """
-    details = ConnectionDetails.from_data( {
-        "host": "localhost",
-        "port": 5432,
-        "dbname": "testdb",
-        "user": "testuser",
-        "azureAccountToken": "testtoken",
-        "azureTokenExpiry": 1234567890,
-    })
+    details = ConnectionDetails.from_data(
+        {
+            "host": "localhost",
+            "port": 5432,
+            "dbname": "testdb",
+            "user": "testuser",
+            "azureAccountToken": "testtoken",
+            "azureTokenExpiry": 1234567890,
+        }
+    )
 
     # Represents the connection after a token refresh
-    details_after_refresh = ConnectionDetails.from_data({
-        "host": "localhost",
-        "port": 5432,
-        "dbname": "testdb",
-        "user": "testuser",
-        "azureAccountToken": "testtoken2",
-        "azureTokenExpiry": 1234567891,
-    })
-    
-    assert details.to_hash() == details_after_refresh.to_hash()
\ No newline at end of file
+    details_after_refresh = ConnectionDetails.from_data(
+        {
+            "host": "localhost",
+            "port": 5432,
+            "dbname": "testdb",
+            "user": "testuser",
+            "azureAccountToken": "testtoken2",
+            "azureTokenExpiry": 1234567891,
+        }
+    )
+
+    assert details.to_hash() == details_after_refresh.to_hash()
+
+
+def test_replica_details() -> None:
+    """
+    Test that replicas are connected to with the details of the primary.
+    """
+    details = ConnectionDetails.from_data(
+        {
+            "host": "primary",
+            "port": 5432,
+            "dbname": "testdb",
+            "user": "testuser",
+            "replicaHosts": "replica1, replica2:5433,[::1]:5434",
+        }
+    )
+
+    assert details.replica_hosts == ["replica1", "replica2:5433", "[::1]:5434"]
+    replicas = [details.get_replica_details(host) for host in details.replica_hosts]
+    assert [(r.server_name, r.port) for r in replicas] == [
+        ("replica1", 5432),
+        ("replica2", 5433),
+        ("::1", 5434),
+    ]
+    assert replicas[0].database_name == "testdb"
+    assert replicas[0].replica_hosts == []
+    assert details.to_hash() != replicas[0].to_hash()
+
+
+def test_pooler_compatible() -> None:
+    """
+    Test that the pooler compatible option is read from JSON and string values.
+    """
+    assert not ConnectionDetails.from_data({"host": "localhost"}).pooler_compatible
+    assert ConnectionDetails.from_data({"poolerCompatible": True}).pooler_compatible
+    assert ConnectionDetails.from_data({"poolerCompatible": "true"}).pooler_compatible
+    assert not ConnectionDetails.from_data({"poolerCompatible": "false"}).pooler_compatible
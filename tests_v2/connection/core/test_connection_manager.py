@@ -15,6 +15,7 @@ from ossdbtoolsservice.connection.core.connection_manager import ConnectionManag
 from ossdbtoolsservice.connection.core.errors import GetConnectionTimeout
 from ossdbtoolsservice.workspace.contracts.configuration import Configuration
 from tests_v2.connection.conftest import MockConnectionClassFactory, StubConnectionManager
+from tests_v2.test_utils.stub_pg_server import StubPGServer
 from tests_v2.test_utils.utils import is_debugger_active
 
 
@@ -386,3 +387,29 @@ def test_two_threads_against_expired_token_refreshes_once(
     # Assert that the token was fetched only once
     assert mock_fetch_token.called
     assert mock_fetch_token.call_count == 1
+
+
+def test_pooler_compatible_connections_keep_no_session_state() -> None:
+    """Test that connections behind a transaction pooler do not prepare statements
+    or change session settings."""
+    connection_manager = ConnectionManager(pool_stats_log_interval=None)
+    with StubPGServer() as server:
+        details = ConnectionDetails(
+            options={
+                "host": "127.0.0.1",
+                "port": server.port,
+                "user": "test_user",
+                "dbname": "test_db",
+                "sslmode": "disable",
+                "poolerCompatible": True,
+            }
+        )
+        connection_manager.connect("owner_uri", details, config=Configuration())
+
+        pool = connection_manager._details_to_pools[details.to_hash()]
+        assert pool.kwargs["prepare_threshold"] is None
+
+        conn = connection_manager.get_long_lived_connection("owner_uri", "Query")
+        assert conn is not None
+        assert not any(query.startswith("SET") for query in server.queries)
+        connection_manager.close()
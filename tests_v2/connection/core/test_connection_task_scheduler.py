@@ -0,0 +1,79 @@
+import threading
+import time
+
+import pytest
+
+from ossdbtoolsservice.connection.core.connection_task_scheduler import (
+    ConnectionTaskScheduler,
+)
+
+
+def run_in_thread(
+    scheduler: ConnectionTaskScheduler, task: object, keys: frozenset
+) -> threading.Thread:
+    thread = threading.Thread(target=scheduler.run, args=(task, (), keys), daemon=True)
+    thread.start()
+    return thread
+
+
+def wait_for_pending(scheduler: ConnectionTaskScheduler, count: int) -> None:
+    deadline = time.monotonic() + 5
+    while len(scheduler._pending) < count and time.monotonic() < deadline:
+        time.sleep(0.001)
+
+
+def test_tasks_without_shared_keys_run_in_parallel() -> None:
+    """Test that a blocked task does not hold up tasks with other keys."""
+    scheduler = ConnectionTaskScheduler(max_workers=2)
+    release = threading.Event()
+    slow_thread = run_in_thread(scheduler, release.wait, frozenset({"slow_server"}))
+
+    result = scheduler.run(lambda: "fast", (), frozenset({"fast_server"}))
+
+    assert result == "fast"
+    assert slow_thread.is_alive()
+    release.set()
+    slow_thread.join(timeout=5)
+
+
+def test_tasks_with_shared_keys_run_in_order() -> None:
+    """Test that tasks sharing a key run one at a time, in submission order."""
+    scheduler = ConnectionTaskScheduler(max_workers=4)
+    release = threading.Event()
+    order: list[str] = []
+    started = threading.Event()
+
+    def first() -> None:
+        started.set()
+        release.wait()
+        order.append("first")
+
+    first_thread = run_in_thread(scheduler, first, frozenset({"owner", "pool_a"}))
+    started.wait(timeout=5)
+    # Shares the pool with the first task only, and the owner with the third task
+    second_thread = run_in_thread(
+        scheduler, lambda: order.append("second"), frozenset({"pool_a", "other_owner"})
+    )
+    wait_for_pending(scheduler, 1)
+    third_thread = run_in_thread(
+        scheduler, lambda: order.append("third"), frozenset({"other_owner"})
+    )
+    wait_for_pending(scheduler, 2)
+
+    assert order == []
+    release.set()
+    for thread in [first_thread, second_thread, third_thread]:
+        thread.join(timeout=5)
+    assert order == ["first", "second", "third"]
+
+
+def test_errors_are_raised_to_the_caller() -> None:
+    """Test that the error of a task is raised by run, and the worker keeps going."""
+    scheduler = ConnectionTaskScheduler(max_workers=1)
+
+    def fail() -> None:
+        raise ValueError("connect failed")
+
+    with pytest.raises(ValueError):
+        scheduler.run(fail, (), frozenset({"owner"}))
+    assert scheduler.run(lambda: 1, (), frozenset({"owner"})) == 1
@@ -0,0 +1,199 @@
+import threading
+import time
+from unittest import mock
+
+import pytest
+from psycopg_pool import PoolTimeout
+
+from ossdbtoolsservice.connection.contracts import ConnectionDetails, ConnectionPriority
+from ossdbtoolsservice.connection.core.pool_lanes import (
+    LaneLimits,
+    PoolLanes,
+    get_default_lane_limits,
+)
+from ossdbtoolsservice.workspace.contracts.configuration import Configuration
+from tests_v2.connection.conftest import StubConnectionManager
+
+INTERACTIVE = ConnectionPriority.INTERACTIVE
+BACKGROUND = ConnectionPriority.BACKGROUND
+BULK = ConnectionPriority.BULK
+
+
+def wait_for_waiters(lanes: PoolLanes, priority: ConnectionPriority, count: int) -> None:
+    deadline = time.monotonic() + 5
+    while (
+        lanes.get_lane_stats()[priority]["requests_waiting"] < count
+        and time.monotonic() < deadline
+    ):
+        time.sleep(0.001)
+
+
+def test_default_lane_limits() -> None:
+    """Test that a quarter of the pool is reserved for interactive work,
+    and background and bulk work are capped."""
+    limits = get_default_lane_limits(10)
+
+    assert limits[INTERACTIVE] == LaneLimits(reserved=2, cap=10)
+    assert limits[BACKGROUND] == LaneLimits(reserved=0, cap=5)
+    assert limits[BULK] == LaneLimits(reserved=0, cap=2)
+    # Small pools reserve nothing, so every class can get a connection
+    assert get_default_lane_limits(1)[INTERACTIVE].reserved == 0
+
+
+def test_class_cannot_exceed_its_cap() -> None:
+    lanes = PoolLanes(4)
+    lanes.acquire(BACKGROUND, timeout=1)
+    lanes.acquire(BACKGROUND, timeout=1)
+
+    with pytest.raises(PoolTimeout):
+        lanes.acquire(BACKGROUND, timeout=0.01)
+    # Other classes are not held up by the capped one
+    lanes.acquire(BULK, timeout=0.01)
+    lanes.acquire(INTERACTIVE, timeout=0.01)
+
+
+def test_reserved_slots_are_kept_for_their_class() -> None:
+    lanes = PoolLanes(
+        2,
+        {
+            INTERACTIVE: LaneLimits(reserved=1, cap=2),
+            BACKGROUND: LaneLimits(reserved=0, cap=2),
+            BULK: LaneLimits(reserved=0, cap=2),
+        },
+    )
+    lanes.acquire(BACKGROUND, timeout=1)
+
+    with pytest.raises(PoolTimeout):
+        lanes.acquire(BACKGROUND, timeout=0.01)
+    lanes.acquire(INTERACTIVE, timeout=0.01)
+    assert lanes.get_lane_stats()[INTERACTIVE]["in_use_count"] == 1
+
+
+def test_waiters_are_served_by_priority() -> None:
+    """Test that a freed slot goes to the interactive waiter,
+    even though the background waiter came first."""
+    lanes = PoolLanes(
+        1,
+        {
+            INTERACTIVE: LaneLimits(reserved=0, cap=1),
+            BACKGROUND: LaneLimits(reserved=0, cap=1),
+            BULK: LaneLimits(reserved=0, cap=1),
+        },
+    )
+    connection = object()
+    lanes.acquire(BULK, timeout=1)
+    lanes.add_connection(connection, BULK)
+    order: list[ConnectionPriority] = []
+
+    def acquire_and_release(priority: ConnectionPriority) -> None:
+        lanes.acquire(priority, timeout=5)
+        order.append(priority)
+        lanes.release(priority)
+
+    background = threading.Thread(target=acquire_and_release, args=(BACKGROUND,))
+    background.start()
+    wait_for_waiters(lanes, BACKGROUND, 1)
+    interactive = threading.Thread(target=acquire_and_release, args=(INTERACTIVE,))
+    interactive.start()
+    wait_for_waiters(lanes, INTERACTIVE, 1)
+
+    lanes.release_connection(connection)
+    background.join(timeout=5)
+    interactive.join(timeout=5)
+
+    assert order == [INTERACTIVE, BACKGROUND]
+    # The slot of a connection is only given back once
+    lanes.release_connection(connection)
+    assert lanes.get_lane_stats()[BULK]["in_use_count"] == 0
+
+
+def test_pooled_connection_holds_a_slot_of_its_class(
+    stub_connection_manager: StubConnectionManager,
+) -> None:
+    owner_uri = "test_owner_uri_lanes"
+    details = ConnectionDetails(
+        options={"host": "localhost", "user": "test_user", "dbname": "test_db"}
+    )
+    stub_connection_manager.connect(owner_uri, details, config=Configuration())
+    lanes = stub_connection_manager._get_pool_lanes(details.to_hash())
+    assert lanes is not None
+
+    pooled_connection = stub_connection_manager.get_pooled_connection(owner_uri, BACKGROUND)
+    assert pooled_connection is not None
+    with pooled_connection:
+        assert lanes.get_lane_stats()[BACKGROUND]["in_use_count"] == 1
+
+    assert lanes.get_lane_stats()[BACKGROUND]["in_use_count"] == 0
+    metrics = stub_connection_manager._get_pool_metrics(details.to_hash())
+    assert metrics.get_lane_stats(BACKGROUND)["checkout_count"] == 1
+    assert metrics.get_lane_stats(INTERACTIVE)["checkout_count"] == 0
+
+
+def test_failed_checkout_gives_back_slot_and_connection(
+    stub_connection_manager: StubConnectionManager,
+) -> None:
+    owner_uri = "test_owner_uri_failed_checkout"
+    details = ConnectionDetails(
+        options={"host": "localhost", "user": "test_user", "dbname": "test_db"}
+    )
+    stub_connection_manager.connect(owner_uri, details, config=Configuration())
+    lanes = stub_connection_manager._get_pool_lanes(details.to_hash())
+    pool = stub_connection_manager.get_connection_pool(details)
+    assert lanes is not None and pool is not None
+    connection = mock.Mock()
+    pool.getconn = mock.Mock(return_value=connection)  # type: ignore[method-assign]
+
+    with (
+        mock.patch(
+            "ossdbtoolsservice.connection.core.connection_manager.ServerConnection",
+            side_effect=OSError("connection lost"),
+        ),
+        pytest.raises(OSError),
+    ):
+        stub_connection_manager._get_connection(pool, details, None, BACKGROUND)
+
+    assert lanes.get_lane_stats()[BACKGROUND]["in_use_count"] == 0
+    pool.putconn.assert_called_with(connection)  # type: ignore[attr-defined]
+
+
+def test_checkout_waits_once_for_the_connect_timeout(
+    stub_connection_manager: StubConnectionManager,
+) -> None:
+    owner_uri = "test_owner_uri_checkout_timeout"
+    details = ConnectionDetails(
+        options={"host": "localhost", "user": "test_user", "dbname": "test_db"}
+    )
+    stub_connection_manager.connect(owner_uri, details, config=Configuration())
+    lanes = stub_connection_manager._get_pool_lanes(details.to_hash())
+    pool = stub_connection_manager.get_connection_pool(details)
+    assert lanes is not None and pool is not None
+
+    def slow_acquire(priority: ConnectionPriority, timeout: float) -> None:
+        time.sleep(0.2)
+
+    with mock.patch.object(lanes, "acquire", side_effect=slow_acquire):
+        stub_connection_manager._get_connection(pool, details, None, BACKGROUND)
+
+    # The wait for the slot is taken from the timeout of the pool checkout
+    (getconn_timeout,) = pool.getconn.call_args.args  # type: ignore[attr-defined]
+    assert getconn_timeout <= details.connect_timeout - 0.2
+
+
+def test_checkout_waits_no_longer_than_its_checkout_timeout(
+    stub_connection_manager: StubConnectionManager,
+) -> None:
+    owner_uri = "test_owner_uri_checkout_timeout_override"
+    details = ConnectionDetails(
+        options={"host": "localhost", "user": "test_user", "dbname": "test_db"}
+    )
+    stub_connection_manager.connect(owner_uri, details, config=Configuration())
+    lanes = stub_connection_manager._get_pool_lanes(details.to_hash())
+    pool = stub_connection_manager.get_connection_pool(details)
+    assert lanes is not None and pool is not None
+
+    with mock.patch.object(lanes, "acquire", wraps=lanes.acquire) as acquire:
+        stub_connection_manager._get_connection(pool, details, None, BULK, 0.5)
+
+    acquire.assert_called_once_with(BULK, 0.5)
+    (getconn_timeout,) = pool.getconn.call_args.args  # type: ignore[attr-defined]
+    assert getconn_timeout <= 0.5
@@ -0,0 +1,99 @@
+import time
+from unittest import mock
+
+from ossdbtoolsservice.connection.contracts import ConnectionDetails
+from ossdbtoolsservice.connection.core.connection_manager import ConnectionManager
+from ossdbtoolsservice.connection.core.pool_maintenance import (
+    PoolMaintenance,
+    PoolMaintenanceSettings,
+)
+from ossdbtoolsservice.workspace.contracts.configuration import Configuration
+from tests_v2.test_utils.stub_pg_server import StubPGServer
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def get_mock_pool(pool_size: int, pool_available: int) -> mock.Mock:
+    pool = mock.Mock()
+    pool.closed = False
+    pool.min_size = 0
+    pool.max_size = 10
+    pool.get_stats.return_value = {"pool_size": pool_size, "pool_available": pool_available}
+    return pool
+
+
+def test_recently_used_connections_are_not_checked_on_checkout() -> None:
+    clock = FakeClock()
+    maintenance = PoolMaintenance(PoolMaintenanceSettings(check_interval=30), clock)
+    connection = mock.Mock()
+
+    with mock.patch(
+        "ossdbtoolsservice.connection.core.pool_maintenance.ConnectionPool.check_connection"
+    ) as check_connection:
+        clock.now = 40
+        maintenance.record_return(connection)
+        clock.now = 60
+        maintenance.check_connection(connection)
+        check_connection.assert_not_called()
+
+        # Neither used nor checked in the last interval
+        clock.now = 80
+        maintenance.check_connection(connection)
+        check_connection.assert_called_once_with(connection)
+
+
+def test_run_checks_idle_connections_when_due() -> None:
+    clock = FakeClock()
+    maintenance = PoolMaintenance(PoolMaintenanceSettings(check_interval=30), clock)
+    maintenance.pool = get_mock_pool(pool_size=1, pool_available=1)
+
+    maintenance.run()
+    maintenance.pool.check.assert_not_called()
+    assert maintenance.next_run_at == 30
+
+    clock.now = 30
+    maintenance.run()
+    maintenance.pool.check.assert_called_once()
+
+
+def test_run_keeps_warm_spares() -> None:
+    maintenance = PoolMaintenance(PoolMaintenanceSettings(warm_spares=2), FakeClock())
+    maintenance.pool = get_mock_pool(pool_size=4, pool_available=1)
+
+    maintenance.run()
+
+    # One more connection is opened, to have two idle ones
+    maintenance.pool.resize.assert_called_once_with(1, 10)
+
+
+def test_owner_joining_a_pool_opens_warm_spares() -> None:
+    config = Configuration()
+    config.pgsql.pool_warm_spares = 2
+    connection_manager = ConnectionManager(pool_stats_log_interval=None)
+    with StubPGServer() as server:
+        details = ConnectionDetails(
+            options={
+                "host": "127.0.0.1",
+                "port": server.port,
+                "user": "test_user",
+                "dbname": "test_db",
+                "sslmode": "disable",
+            }
+        )
+        connection_manager.connect("owner_1", details, config)
+        connection_manager.connect("owner_2", details, config)
+
+        deadline = time.monotonic() + 5
+        stats = connection_manager.get_pool_stats()[str(details.to_hash())]
+        while stats["pool_available"] < 2 and time.monotonic() < deadline:
+            time.sleep(0.01)
+            stats = connection_manager.get_pool_stats()[str(details.to_hash())]
+
+        assert stats["pool_available"] >= 2
+        connection_manager.close()
@@ -0,0 +1,160 @@
+import logging
+from unittest import mock
+
+import pytest
+
+from ossdbtoolsservice.connection.contracts import ConnectionDetails
+from ossdbtoolsservice.connection.core.connection_manager import ConnectionManager
+from ossdbtoolsservice.connection.core.pool_lanes import PoolLanes
+from ossdbtoolsservice.connection.core.pool_metrics import PoolMetrics
+from ossdbtoolsservice.connection.core.pool_sizing import (
+    ConnectionBudget,
+    PoolSizer,
+    PoolSizingSettings,
+)
+from ossdbtoolsservice.workspace.contracts.configuration import Configuration
+from tests_v2.test_utils.stub_pg_server import StubPGServer
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def get_mock_pool(max_size: int, pool_size: int = 0, pool_available: int = 0) -> mock.Mock:
+    pool = mock.Mock()
+    pool.name = "pool"
+    pool.closed = False
+    pool.min_size = 0
+    pool.max_size = max_size
+    pool.get_stats.return_value = {"pool_size": pool_size, "pool_available": pool_available}
+
+    def resize(min_size: int, max_size: int) -> None:
+        pool.min_size = min_size
+        pool.max_size = max_size
+
+    pool.resize.side_effect = resize
+    return pool
+
+
+def record_wait(metrics: PoolMetrics, clock: FakeClock, wait_seconds: float) -> None:
+    wait_start = metrics.start_wait()
+    clock.now += wait_seconds
+    metrics.end_wait(wait_start, object())
+
+
+def get_sizer(
+    clock: FakeClock,
+    budget: ConnectionBudget | None = None,
+    base_size: int = 10,
+    logger: logging.Logger | None = None,
+) -> tuple[PoolSizer, PoolMetrics]:
+    metrics = PoolMetrics(clock)
+    sizer = PoolSizer(
+        PoolSizingSettings(max_size=20, grow_wait_threshold_ms=100, shrink_cooldown=60),
+        base_size,
+        metrics,
+        budget or ConnectionBudget(100),
+        clock,
+        logger,
+    )
+    sizer.pool = get_mock_pool(base_size)
+    return sizer, metrics
+
+
+def test_pool_grows_toward_max_while_checkouts_wait() -> None:
+    clock = FakeClock()
+    sizer, metrics = get_sizer(clock)
+    sizer.lanes = PoolLanes(10)
+
+    record_wait(metrics, clock, 0.5)
+    sizer.run()
+    assert sizer.pool is not None
+    assert sizer.pool.max_size == 15
+    assert sizer.lanes.max_size == 15
+
+    record_wait(metrics, clock, 0.5)
+    sizer.run()
+    assert sizer.pool.max_size == 20
+
+    # Short waits do not grow the pool
+    record_wait(metrics, clock, 0.01)
+    sizer.run()
+    assert sizer.pool.max_size == 20
+
+
+def test_pool_shrinks_after_cool_down() -> None:
+    clock = FakeClock()
+    sizer, metrics = get_sizer(clock)
+    assert sizer.pool is not None
+    record_wait(metrics, clock, 0.5)
+    sizer.run()
+    assert sizer.pool.max_size == 15
+
+    clock.now += 30
+    sizer.run()
+    assert sizer.pool.max_size == 15
+
+    # Does not shrink below the connections in use
+    sizer.pool.get_stats.return_value = {"pool_size": 12, "pool_available": 0}
+    clock.now += 30
+    sizer.run()
+    assert sizer.pool.max_size == 12
+
+    sizer.pool.get_stats.return_value = {"pool_size": 12, "pool_available": 12}
+    sizer.run()
+    assert sizer.pool.max_size == 10
+
+
+def test_pools_grow_within_the_global_budget(caplog: pytest.LogCaptureFixture) -> None:
+    clock = FakeClock()
+    budget = ConnectionBudget(24)
+    logger = logging.getLogger("test_pool_sizing")
+    sizer_1, metrics_1 = get_sizer(clock, budget, logger=logger)
+    sizer_2, metrics_2 = get_sizer(clock, budget, logger=logger)
+
+    record_wait(metrics_1, clock, 0.5)
+    sizer_1.run()
+    assert sizer_1.pool is not None and sizer_1.pool.max_size == 14
+
+    with caplog.at_level(logging.INFO, logger="test_pool_sizing"):
+        for _ in range(2):
+            record_wait(metrics_2, clock, 0.5)
+            sizer_2.run()
+    assert sizer_2.pool is not None and sizer_2.pool.max_size == 10
+    # The exhausted budget is logged once
+    assert sum("global budget" in r.message for r in caplog.records) == 1
+
+    # Connections given back by a closed pool can be used by the others
+    sizer_1.close()
+    record_wait(metrics_2, clock, 0.5)
+    sizer_2.run()
+    assert sizer_2.pool.max_size == 15
+    assert budget.get_stats()["reserved_connections"] == 15
+
+
+def test_pools_are_sized_adaptively_only_when_turned_on() -> None:
+    config = Configuration()
+    connection_manager = ConnectionManager(pool_stats_log_interval=None)
+    with StubPGServer() as server:
+        details = ConnectionDetails(
+            options={
+                "host": "127.0.0.1",
+                "port": server.port,
+                "user": "test_user",
+                "dbname": "test_db",
+                "sslmode": "disable",
+            }
+        )
+        # By default max_connections is the cap of the pool
+        connection_manager.connect("owner_1", details, config)
+        assert details.to_hash() not in connection_manager._details_to_pool_sizer
+        connection_manager.disconnect("owner_1")
+
+        config.pgsql.pool_adaptive_max_connections = config.pgsql.max_connections * 2
+        connection_manager.connect("owner_2", details, config)
+        assert details.to_hash() in connection_manager._details_to_pool_sizer
+        connection_manager.close()
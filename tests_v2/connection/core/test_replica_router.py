@@ -0,0 +1,121 @@
+from unittest import mock
+
+from psycopg_pool import PoolTimeout
+
+from ossdbtoolsservice.connection.contracts import ConnectionDetails, ConnectionPriority
+from ossdbtoolsservice.connection.core.replica_router import ReplicaRouter
+from ossdbtoolsservice.workspace.contracts.configuration import Configuration
+from tests_v2.connection.conftest import StubConnectionManager
+
+
+def get_mock_pool(lag_row: tuple | None = (True, 1.0)) -> mock.MagicMock:
+    pool = mock.MagicMock()
+    conn = pool.connection.return_value.__enter__.return_value
+    conn.execute.return_value.fetchone.return_value = lag_row
+    return pool
+
+
+def get_router(*pools: mock.MagicMock, max_lag_seconds: float = 30) -> ReplicaRouter:
+    replicas = [ConnectionDetails({"host": f"replica{i}"}) for i in range(len(pools))]
+    pool_iter = iter(pools)
+    return ReplicaRouter(replicas, max_lag_seconds, lambda _: next(pool_iter))
+
+
+def test_replica_is_used_once_checked() -> None:
+    pool = get_mock_pool()
+    router = get_router(pool)
+    replica = router.replicas[0]
+
+    with mock.patch("threading.Thread"):
+        # Not checked yet, so the primary is used
+        assert router.get_replica() is None
+        router.check_replica(replica)
+        assert router.get_replica() is replica
+
+    assert replica.pool is pool
+    assert replica.lag_seconds == 1.0
+    stats = router.get_stats()
+    assert (stats["replica_checkout_count"], stats["primary_fallback_count"]) == (1, 1)
+
+
+def test_lagging_or_promoted_replicas_are_not_used() -> None:
+    router = get_router(get_mock_pool((True, 60.0)), get_mock_pool((False, 0)))
+
+    for replica in router.replicas:
+        router.check_replica(replica)
+
+    with mock.patch("threading.Thread"):
+        assert router.get_replica() is None
+
+
+def test_unreachable_replica_is_not_used() -> None:
+    replicas = [ConnectionDetails({"host": "replica"})]
+    router = ReplicaRouter(replicas, 30, mock.Mock(side_effect=ConnectionError()))
+
+    router.check_replica(router.replicas[0])
+
+    assert not router.replicas[0].usable
+    assert router.replicas[0].checked_at is not None
+
+
+def test_read_only_connections_go_to_a_usable_replica() -> None:
+    manager = StubConnectionManager()
+    details = ConnectionDetails(
+        {"host": "primary", "dbname": "test_db", "user": "user", "replicaHosts": "replica"}
+    )
+    manager.connect("owner", details, config=Configuration())
+    primary_pool = manager.get_connection_pool(details)
+    assert primary_pool is not None
+    router = manager._details_to_replica_router[details.to_hash()]
+    replica = router.replicas[0]
+    replica_pool = manager._create_replica_pool(replica.details, Configuration())
+    replica.pool = replica_pool
+    replica.usable = True
+    replica.checked_at = float("inf")
+    replica_hash = replica.details.to_hash()
+    replica_lanes = manager._get_pool_lanes(replica_hash)
+    assert replica_lanes is not None
+
+    pooled_connection = manager.get_pooled_connection(
+        "owner", ConnectionPriority.INTERACTIVE, read_only=True
+    )
+    assert pooled_connection is not None
+    with pooled_connection as conn:
+        assert conn.pool is replica.pool
+        # Replica checkouts take a slot of the replica's lanes, and are measured
+        lane_stats = replica_lanes.get_lane_stats()
+        assert lane_stats[ConnectionPriority.INTERACTIVE]["in_use_count"] == 1
+    replica_pool.putconn.assert_called_once()
+    lane_stats = replica_lanes.get_lane_stats()
+    assert lane_stats[ConnectionPriority.INTERACTIVE]["in_use_count"] == 0
+    assert manager._get_pool_metrics(replica_hash).checkout_count == 1
+
+    # A replica without a free connection in time is busy, not failed
+    replica_pool.getconn.side_effect = PoolTimeout()
+    replica_pool.get_stats.return_value = {"pool_size": 1, "pool_max": 1}
+    pooled_connection = manager.get_pooled_connection(
+        "owner", ConnectionPriority.INTERACTIVE, read_only=True
+    )
+    assert pooled_connection is not None
+    with pooled_connection as conn:
+        assert conn.pool is primary_pool
+    assert replica.usable
+    assert 0 < replica_pool.getconn.call_args.args[0] <= 1.0
+    assert manager._get_pool_metrics(replica_hash).checkout_timeouts == 1
+
+    # Writes still go to the primary
+    pooled_connection = manager.get_pooled_connection("owner")
+    assert pooled_connection is not None
+    with pooled_connection as conn:
+        assert conn.pool is primary_pool
+
+    # A replica that fails is not used until it is checked again
+    replica_pool.getconn.side_effect = ConnectionError()
+    pooled_connection = manager.get_pooled_connection("owner", read_only=True)
+    assert pooled_connection is not None
+    with pooled_connection as conn:
+        assert conn.pool is primary_pool
+    assert not replica.usable
+
+    manager.disconnect("owner")
+    replica_pool.close.assert_called_once()
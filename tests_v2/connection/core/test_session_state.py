@@ -0,0 +1,99 @@
+from collections.abc import Iterator
+
+import psycopg
+import pytest
+
+from ossdbtoolsservice.connection.core.server_connection import ServerConnection
+from ossdbtoolsservice.connection.core.session_state import (
+    DISCARD_ALL,
+    SessionStateChange,
+    get_reset_statement,
+    get_session_state_changes,
+)
+from tests_v2.test_utils.stub_pg_server import StubPGServer
+
+
+@pytest.mark.parametrize(
+    "query, expected",
+    [
+        ("SELECT * FROM pg_class", SessionStateChange.NONE),
+        ("UPDATE t SET a = 1", SessionStateChange.NONE),
+        ("SET LOCAL statement_timeout = 1000", SessionStateChange.NONE),
+        ("/* search path */\nset search_path TO app", SessionStateChange.SETTINGS),
+        ("SELECT set_config('x.y', '1', false)", SessionStateChange.SETTINGS),
+        ("CREATE TEMP TABLE t (a int)", SessionStateChange.TEMP_TABLES),
+        ("SELECT 1; LISTEN channel", SessionStateChange.LISTEN),
+        ("PREPARE p AS SELECT 1", SessionStateChange.PREPARED_STATEMENTS),
+        ("DECLARE c CURSOR WITH HOLD FOR SELECT 1", SessionStateChange.CURSORS),
+        ("SELECT pg_advisory_lock(1)", SessionStateChange.ADVISORY_LOCKS),
+        ("SELECT pg_advisory_xact_lock(1)", SessionStateChange.NONE),
+        ("SELECT nextval('s')", SessionStateChange.SEQUENCES),
+        ("DO $$ BEGIN PERFORM 1; END $$", SessionStateChange.UNKNOWN),
+    ],
+)
+def test_get_session_state_changes(query: str, expected: SessionStateChange) -> None:
+    assert get_session_state_changes(query) == expected
+
+
+def test_get_reset_statement() -> None:
+    assert get_reset_statement(SessionStateChange.NONE) is None
+    assert (
+        get_reset_statement(SessionStateChange.LISTEN | SessionStateChange.CURSORS)
+        == "CLOSE ALL; UNLISTEN *"
+    )
+    assert (
+        get_reset_statement(SessionStateChange.UNKNOWN | SessionStateChange.LISTEN)
+        == DISCARD_ALL
+    )
+
+
+@pytest.fixture
+def stub_server() -> Iterator[StubPGServer]:
+    with StubPGServer() as server:
+        yield server
+
+
+@pytest.fixture
+def server_connection(stub_server: StubPGServer) -> Iterator[ServerConnection]:
+    conn = psycopg.connect(
+        host="127.0.0.1",
+        port=stub_server.port,
+        user="test_user",
+        dbname="test_db",
+        sslmode="disable",
+        autocommit=True,
+    )
+    with conn:
+        yield ServerConnection(conn)
+
+
+def test_reset_is_skipped_when_session_state_is_untouched(
+    stub_server: StubPGServer, server_connection: ServerConnection
+) -> None:
+    server_connection.execute_statement("SELECT 1")
+
+    assert server_connection.reset() is None
+    assert stub_server.queries == ["SELECT 1"]
+
+
+def test_reset_only_resets_what_changed(
+    stub_server: StubPGServer, server_connection: ServerConnection
+) -> None:
+    server_connection.execute_statement("SET search_path TO app")
+    server_connection.execute_statement("LISTEN channel")
+
+    reset_statement = server_connection.reset()
+
+    assert reset_statement == "SET SESSION AUTHORIZATION DEFAULT; RESET ALL; UNLISTEN *"
+    assert stub_server.queries[-1] == reset_statement
+    # The session is clean after the reset
+    assert server_connection.reset() is None
+
+
+def test_reset_falls_back_to_discard_all(
+    stub_server: StubPGServer, server_connection: ServerConnection
+) -> None:
+    server_connection.execute_statement("CALL refresh_settings()")
+
+    assert server_connection.reset() == DISCARD_ALL
+    assert stub_server.queries[-1] == DISCARD_ALL
@@ -0,0 +1,145 @@
+from collections.abc import Iterator
+from unittest import mock
+
+import psycopg
+import pytest
+from psycopg import errors
+from psycopg.pq import TransactionStatus
+
+from ossdbtoolsservice.connection.contracts import BackgroundQueryCategory
+from ossdbtoolsservice.connection.core.server_connection import ServerConnection
+from ossdbtoolsservice.connection.core.statement_timeouts import (
+    StatementTimeoutPolicy,
+    StatementTimeouts,
+    is_timeout_error,
+)
+from tests_v2.test_utils.stub_pg_server import StubPGServer
+
+
+@pytest.fixture
+def stub_connection() -> Iterator[tuple[StubPGServer, psycopg.Connection]]:
+    with StubPGServer() as server:
+        conn = psycopg.connect(
+            host="127.0.0.1",
+            port=server.port,
+            user="test_user",
+            dbname="test_db",
+            sslmode="disable",
+            autocommit=True,
+        )
+        with conn:
+            yield server, conn
+
+
+def get_stats(
+    statement_timeouts: StatementTimeouts, category: BackgroundQueryCategory
+) -> dict:
+    return next(s for s in statement_timeouts.get_stats() if s["category"] == category)
+
+
+def test_configure_overrides_defaults() -> None:
+    statement_timeouts = StatementTimeouts()
+    statement_timeouts.configure({"Catalog": {"statementTimeoutMs": 5000}})
+
+    assert statement_timeouts.get_policy(
+        BackgroundQueryCategory.CATALOG
+    ) == StatementTimeoutPolicy(5000, 2000)
+    assert statement_timeouts.get_policy(
+        BackgroundQueryCategory.SCHEMA_EDITOR
+    ) == StatementTimeoutPolicy(60000, 2000)
+
+    with pytest.raises(ValueError):
+        statement_timeouts.configure({"Unknown": {"statementTimeoutMs": 5000}})
+    with pytest.raises(ValueError):
+        statement_timeouts.configure({"Catalog": {"lockTimeoutMs": -1}})
+    # Invalid settings leave the timeouts as they were
+    assert (
+        statement_timeouts.get_policy(BackgroundQueryCategory.CATALOG).statement_timeout_ms
+        == 5000
+    )
+
+
+def test_apply_sets_local_timeouts_in_own_transaction(
+    stub_connection: tuple[StubPGServer, psycopg.Connection],
+) -> None:
+    server, conn = stub_connection
+    statement_timeouts = StatementTimeouts(
+        {BackgroundQueryCategory.CATALOG: StatementTimeoutPolicy(1000, 200)}
+    )
+
+    with statement_timeouts.apply(conn, BackgroundQueryCategory.CATALOG):
+        conn.execute("SELECT 1")
+
+    assert server.queries == [
+        "BEGIN",
+        "SET LOCAL statement_timeout = 1000; SET LOCAL lock_timeout = 200",
+        "SELECT 1",
+        "COMMIT",
+    ]
+    assert (
+        get_stats(statement_timeouts, BackgroundQueryCategory.CATALOG)["operation_count"] == 1
+    )
+
+
+def test_operation_sets_timeouts_once_for_its_queries(
+    stub_connection: tuple[StubPGServer, psycopg.Connection],
+) -> None:
+    server, conn = stub_connection
+    server_connection = ServerConnection(conn)
+
+    # Object model queries run under the timeouts of the operation
+    with server_connection.statement_timeouts(BackgroundQueryCategory.CATALOG):
+        server_connection.execute_dict("SELECT 1")
+        server_connection.execute_dict("SELECT 2")
+
+    assert server.queries[0] == "BEGIN"
+    assert server.queries[1].startswith("SET LOCAL statement_timeout")
+    assert server.queries[2:] == ["SELECT 1", "SELECT 2", "COMMIT"]
+
+
+def test_apply_counts_timeouts(
+    stub_connection: tuple[StubPGServer, psycopg.Connection],
+) -> None:
+    server, conn = stub_connection
+    statement_timeouts = StatementTimeouts()
+
+    category = BackgroundQueryCategory.COMPLETION_METADATA
+    with pytest.raises(errors.QueryCanceled), statement_timeouts.apply(conn, category):
+        raise errors.QueryCanceled("canceling statement due to statement timeout")
+    with pytest.raises(errors.LockNotAvailable), statement_timeouts.apply(conn, category):
+        raise errors.LockNotAvailable("canceling statement due to lock timeout")
+    # Cancels requested by the user are not timeouts
+    with pytest.raises(errors.QueryCanceled), statement_timeouts.apply(conn, category):
+        raise errors.QueryCanceled("canceling statement due to user request")
+
+    assert server.queries[-1] == "ROLLBACK"
+    stats = get_stats(statement_timeouts, category)
+    assert stats["operation_count"] == 3
+    assert stats["statement_timeout_count"] == 1
+    assert stats["lock_timeout_count"] == 1
+
+
+def test_is_timeout_error() -> None:
+    assert is_timeout_error(
+        errors.QueryCanceled("canceling statement due to statement timeout")
+    )
+    assert is_timeout_error(
+        errors.LockNotAvailable("canceling statement due to lock timeout")
+    )
+    assert not is_timeout_error(
+        errors.QueryCanceled("canceling statement due to user request")
+    )
+    assert not is_timeout_error(psycopg.OperationalError("server closed the connection"))
+
+
+def test_apply_does_not_touch_open_transaction() -> None:
+    statement_timeouts = StatementTimeouts()
+    conn = mock.MagicMock()
+    conn.info.transaction_status = TransactionStatus.INTRANS
+
+    with statement_timeouts.apply(conn, BackgroundQueryCategory.CATALOG):
+        pass
+
+    # The timeouts would last until the end of the transaction of the user
+    conn.transaction.assert_not_called()
+    conn.execute.assert_not_called()
@@ -0,0 +1,141 @@
+"""A local stand-in for a PostgreSQL server, for tests that need real client connections.
+
+The server speaks just enough of the frontend/backend protocol for a client to connect
+and run statements that return no rows, and can delay the startup handshake to simulate
+a slow or unreachable server.
+"""
+
+import socket
+import struct
+import threading
+from types import TracebackType
+
+_SSL_REQUEST_CODE = 80877103
+_GSSENC_REQUEST_CODE = 80877104
+_CANCEL_REQUEST_CODE = 80877102
+
+_PARAMETERS = {
+    "server_version": "17.4",
+    "server_encoding": "UTF8",
+    "client_encoding": "UTF8",
+    "DateStyle": "ISO, MDY",
+    "integer_datetimes": "on",
+    "standard_conforming_strings": "on",
+    "TimeZone": "UTC",
+}
+
+
+def _message(message_type: bytes, payload: bytes = b"") -> bytes:
+    return message_type + struct.pack("!i", len(payload) + 4) + payload
+
+
+def _ready_for_query() -> bytes:
+    return _message(b"Z", b"I")
+
+
+class StubPGServer:
+    """Accepts client connections on a local port, each served by its own thread.
+
+    Args:
+        handshake_delay: Seconds to wait before answering the startup message.
+    """
+
+    def __init__(self, handshake_delay: float = 0.0) -> None:
+        self.handshake_delay = handshake_delay
+        self.connection_count = 0
+        # Text of the simple queries received, in order
+        self.queries: list[str] = []
+        self._socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self._socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self._socket.bind(("127.0.0.1", 0))
+        self._closed = threading.Event()
+
+    @property
+    def port(self) -> int:
+        return int(self._socket.getsockname()[1])
+
+    def __enter__(self) -> "StubPGServer":
+        self._socket.listen()
+        threading.Thread(target=self._accept, daemon=True).start()
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_value: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        self._closed.set()
+        self._socket.close()
+
+    def _accept(self) -> None:
+        while not self._closed.is_set():
+            try:
+                client, _ = self._socket.accept()
+            except OSError:
+                return
+            self.connection_count += 1
+            threading.Thread(target=self._serve, args=(client,), daemon=True).start()
+
+    def _serve(self, client: socket.socket) -> None:
+        with client:
+            try:
+                if self._start_up(client):
+                    self._answer_messages(client)
+            except OSError:
+                pass
+
+    def _start_up(self, client: socket.socket) -> bool:
+        while True:
+            length = self._read_int(client)
+            payload = self._read_exactly(client, length - 4)
+            code = struct.unpack("!i", payload[:4])[0]
+            if code in (_SSL_REQUEST_CODE, _GSSENC_REQUEST_CODE):
+                # Encryption is not supported, the client goes on unencrypted
+                client.sendall(b"N")
+            elif code == _CANCEL_REQUEST_CODE:
+                return False
+            else:
+                break
+
+        if self.handshake_delay and self._closed.wait(self.handshake_delay):
+            return False
+
+        response = _message(b"R", struct.pack("!i", 0))
+        for name, value in _PARAMETERS.items():
+            response += _message(b"S", name.encode() + b"\0" + value.encode() + b"\0")
+        response += _message(b"K", struct.pack("!ii", 1, 1))
+        client.sendall(response + _ready_for_query())
+        return True
+
+    def _answer_messages(self, client: socket.socket) -> None:
+        while True:
+            message_type = self._read_exactly(client, 1)
+            payload = self._read_exactly(client, self._read_int(client) - 4)
+            if message_type == b"X":
+                return
+            if message_type == b"Q":
+                self.queries.append(payload.rstrip(b"\0").decode())
+                client.sendall(_message(b"C", b"SELECT 0\0") + _ready_for_query())
+            elif message_type == b"P":
+                client.sendall(_message(b"1"))
+            elif message_type == b"B":
+                client.sendall(_message(b"2"))
+            elif message_type == b"D":
+                client.sendall(_message(b"n"))
+            elif message_type == b"E":
+                client.sendall(_message(b"C", b"SELECT 0\0"))
+            elif message_type == b"S":
+                client.sendall(_ready_for_query())
+
+    def _read_int(self, client: socket.socket) -> int:
+        return int(struct.unpack("!i", self._read_exactly(client, 4))[0])
+
+    def _read_exactly(self, client: socket.socket, count: int) -> bytes:
+        data = b""
+        while len(data) < count:
+            chunk = client.recv(count - len(data))
+            if not chunk:
+                raise OSError("Connection closed by the client")
+            data += chunk
+        return data